@@ -0,0 +1,93 @@
+"""Benchmark the array kernels in ``indicators.py`` against the loop versions.
+
+Usage::
+
+    python benchmarks/bench_indicators.py [rows]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from indicators import parabolic_sar, rolling_mad  # noqa: E402
+
+
+def parabolic_sar_iloc(high: pd.Series, low: pd.Series, step: float = 0.02, max_step: float = 0.2) -> pd.Series:
+    """Previous ``.iloc`` based implementation kept as the reference."""
+    sar = pd.Series(index=high.index, dtype=float)
+    if len(high) == 0:
+        return sar
+    sar.iloc[0] = low.iloc[0]
+    up_trend = True
+    ep = high.iloc[0]
+    af = step
+    for i in range(1, len(high)):
+        prev_sar = sar.iloc[i - 1]
+        sar_val = prev_sar + af * (ep - prev_sar)
+        if up_trend:
+            sar_val = min(sar_val, low.iloc[i - 1], low.iloc[i])
+        else:
+            sar_val = max(sar_val, high.iloc[i - 1], high.iloc[i])
+        if up_trend:
+            if low.iloc[i] < sar_val:
+                up_trend = False
+                sar_val = ep
+                ep = low.iloc[i]
+                af = step
+            elif high.iloc[i] > ep:
+                ep = high.iloc[i]
+                af = min(af + step, max_step)
+        else:
+            if high.iloc[i] > sar_val:
+                up_trend = True
+                sar_val = ep
+                ep = high.iloc[i]
+                af = step
+            elif low.iloc[i] < ep:
+                ep = low.iloc[i]
+                af = min(af + step, max_step)
+        sar.iloc[i] = sar_val
+    return sar
+
+
+def rolling_mad_apply(series: pd.Series, period: int) -> pd.Series:
+    """Previous ``rolling().apply`` implementation kept as the reference."""
+    return series.rolling(period).apply(lambda x: (abs(x - x.mean())).mean(), raw=True)
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(rows: int = 100_000) -> None:
+    rng = np.random.default_rng(0)
+    close = pd.Series(100 + np.cumsum(rng.normal(0, 1, rows)))
+    high = close + rng.uniform(0, 1, rows)
+    low = close - rng.uniform(0, 1, rows)
+    typical = (high + low + close) / 3
+
+    cases = [
+        ("parabolic_sar", parabolic_sar_iloc, parabolic_sar, (high, low)),
+        ("cci14 mad", rolling_mad_apply, rolling_mad, (typical, 14)),
+    ]
+    print(f"rows={rows}")
+    for name, before, after, args in cases:
+        expected, t_before = _timed(before, *args)
+        got, t_after = _timed(after, *args)
+        same = np.array_equal(expected.to_numpy(), got.to_numpy(), equal_nan=True)
+        print(
+            f"{name:<14} before={t_before:8.3f}s after={t_after:8.3f}s "
+            f"speedup={t_before / max(t_after, 1e-9):7.1f}x identical={same}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -28,7 +28,16 @@ def check_signals(symbol: str) -> dict:
         return result
     if not rows:
         return result
-    row = rows[-1]
+    return signals_from_row(rows[-1])
+
+
+def signals_from_row(row: dict) -> dict:
+    """Return signal flags for one prediction row.
+
+    ``row`` holds ``buy_signal``/``buy_prob`` and the ``rsi14``, ``ema5`` and
+    ``ema20`` feature values, either read from the prediction CSV or produced
+    by :mod:`f2_buy_signal.online_inference`.
+    """
     try:
         signal1 = bool(int(float(row.get("buy_signal", row.get("buy_prob", 0)))))
     except Exception:
@@ -47,7 +56,6 @@ def check_signals(symbol: str) -> dict:
         signal3 = ema5 > ema20
     except Exception:
         signal3 = False
-    result.update(signal1=bool(signal1), signal2=bool(signal2), signal3=bool(signal3))
-    return result
+    return {"signal1": bool(signal1), "signal2": bool(signal2), "signal3": bool(signal3)}
 
-__all__ = ["check_signals", "reload_strategy_settings"]
+__all__ = ["check_signals", "reload_strategy_settings", "signals_from_row"]
@@ -0,0 +1,330 @@
+"""Low-latency ML scoring for the signal loop.
+
+The batch path (collector -> ``run_pipeline`` -> ``08_pred`` CSV ->
+``check_signals``) leaves the ML signal several minutes behind the market.
+:class:`OnlineInference` keeps streaming feature state for every symbol,
+advances it by one step for each closed 1 minute candle and scores the newest
+feature row with the model held by :class:`model_registry.ModelCache`
+(the NumPy tree evaluator from ``tree_export`` when available). The
+batch pipeline only retrains and publishes models; a newly published version
+is picked up on the next closed candle.
+
+Features come from :class:`streaming_features.FeatureState`, the incremental
+form of the ``feature_graph`` nodes and the ``03_feature_engineering``
+cleanup. Candles are regridded to 1 minute bars the way ``02_data_cleaning``
+does. The state is warmed up by replaying the tail of the cleaned file, whose
+head also seeds the cumulative ``obv`` and ``vwap`` columns, and then the
+fetched candle history. A model is only scored online when every one of its
+features can be produced; otherwise, and for symbols the published pooled
+model is routed to while ``pooled.enabled`` is set (``08_predict`` scores
+those with the pooled model), the caller falls back to the batch prediction
+file.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PIPELINE_DIR = PROJECT_ROOT / "f5_ml_pipeline"
+if str(PIPELINE_DIR) not in sys.path:
+    sys.path.append(str(PIPELINE_DIR))
+
+from model_registry import ModelCache  # noqa: E402
+from pooled_model import CONFIG_PATH, POOLED_MODEL, pooled_enabled, pooled_symbols  # noqa: E402
+from streaming_features import FeatureState, cumulative_seed  # noqa: E402
+
+MODEL_DIR = PIPELINE_DIR / "ml_data" / "06_models"
+CLEAN_DIR = PIPELINE_DIR / "ml_data" / "02_clean"
+# Candles replayed per symbol to warm up the state. 12 hours lets the longest
+# EMA (120) converge to the batch value well below float32 precision.
+WINDOW = 720
+# Minimum history before a symbol is scored (EMA120/rolling warm-up).
+MIN_ROWS = 200
+THRESHOLD = 0.5
+# Features returned with the probability for ``signals_from_row``.
+SIGNAL_FEATURES = ["rsi14", "ema5", "ema20"]
+OHLCV = ["open", "high", "low", "close", "volume"]
+# pyupbit names the traded value column ``value``.
+RAW_ALIASES = {"value": "candle_acc_trade_price", "candle_acc_trade_price": "candle_acc_trade_price"}
+ONE_MINUTE = pd.Timedelta("1min")
+
+logger = logging.getLogger(__name__)
+
+Candle = Tuple[pd.Timestamp, Dict[str, Any]]
+
+
+def _to_utc(values: pd.Series) -> pd.Series:
+    """Upbit candles are KST; naive timestamps are assumed to be KST."""
+    ts = pd.to_datetime(values)
+    if ts.dt.tz is None:
+        ts = ts.dt.tz_localize("Asia/Seoul")
+    return ts.dt.tz_convert("UTC")
+
+
+def _closed_candles(candles: Any, closed: bool = False) -> List[Candle]:
+    """``(utc timestamp, row)`` pairs for the closed candles in ``candles``.
+
+    The last row of an Upbit minute response is the candle still being
+    formed, so it is skipped unless ``closed`` is True. Prices are rounded to
+    float32 like ``02_data_cleaning`` stores them.
+    """
+    if candles is None or getattr(candles, "empty", True):
+        return []
+    df = candles if closed else candles.iloc[:-1]
+    if df.empty or "timestamp" not in df.columns:
+        return []
+    ts = _to_utc(df["timestamp"])
+    if "candle_date_time_kst" in df.columns:
+        kst = pd.to_datetime(df["candle_date_time_kst"])
+    else:
+        kst = ts.dt.tz_convert("Asia/Seoul").dt.tz_localize(None)
+    values = df[OHLCV].astype(np.float32).astype(float)
+    for src, dst in RAW_ALIASES.items():
+        if src in df.columns:
+            values[dst] = pd.to_numeric(df[src], errors="coerce").astype(np.float32).astype(float)
+    values["kst"] = kst.to_numpy()
+    return list(zip(ts, values.to_dict("records")))
+
+
+class SymbolState:
+    """Streaming feature state and the last scoring result for one symbol."""
+
+    def __init__(self, symbol: str = "") -> None:
+        self.symbol = symbol
+        self.features = FeatureState()
+        self.candle: Dict[str, Any] | None = None
+        self.row: Dict[str, Any] = {}
+        self.rows = 0
+        self.last_ts: pd.Timestamp | None = None
+        self.result: Dict[str, Any] | None = None
+
+    def overlaps(self, ts: pd.Timestamp) -> bool:
+        """Whether a candle at ``ts`` continues the stream without a hole."""
+        return self.last_ts is None or ts <= self.last_ts + ONE_MINUTE
+
+    def push(self, ts: pd.Timestamp, candle: Dict[str, Any]) -> bool:
+        """Advance the state by a closed candle; older timestamps are ignored.
+
+        Upbit omits minutes without trades; like ``02_data_cleaning`` the
+        missing minutes repeat the previous candle so rolling windows cover
+        the same span as in training.
+        """
+        if self.last_ts is not None:
+            if ts <= self.last_ts:
+                return False
+            filled = self.last_ts + ONE_MINUTE
+            while filled < ts:
+                self._apply(filled, self.candle)
+                filled += ONE_MINUTE
+        self._apply(ts, candle)
+        self.candle = candle
+        self.last_ts = ts
+        return True
+
+    def _apply(self, ts: pd.Timestamp, candle: Dict[str, Any]) -> None:
+        kst = pd.Timestamp(candle["kst"])
+        row = self.features.update(ts.value, *(candle[c] for c in OHLCV), kst)
+        row.update({c: candle[c] for c in OHLCV})
+        if "candle_acc_trade_price" in candle:
+            row["candle_acc_trade_price"] = candle["candle_acc_trade_price"]
+        # Raw columns of the cleaned file: minute candles, the market code and
+        # the KST string (06_train coerces the two strings to 0).
+        row["unit"] = 1.0
+        row["market"] = self.symbol
+        row["candle_date_time_kst"] = kst.isoformat()
+        self.row = row
+        self.rows += 1
+
+
+class OnlineInference:
+    """Per-symbol streaming feature state scored against in-memory models.
+
+    Parameters
+    ----------
+    model_dir : Path
+        Model registry directory written by ``06_train``.
+    fetch : callable, optional
+        ``fetch(symbol, count)`` returning a candle DataFrame, used once per
+        symbol to seed ``window`` candles of history.
+    clean_dir : Path
+        ``02_clean`` directory whose files seed the cumulative features.
+    config_path : Path
+        ``train_config.yaml`` whose ``pooled.enabled`` decides whether the
+        published pooled model routes symbols to the batch path.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path = MODEL_DIR,
+        fetch: Optional[Callable[[str, int], Any]] = None,
+        window: int = WINDOW,
+        threshold: float = THRESHOLD,
+        clean_dir: Path = CLEAN_DIR,
+        config_path: Path = CONFIG_PATH,
+    ) -> None:
+        self.models = ModelCache(model_dir, compiled=True)
+        self.fetch = fetch
+        self.window = window
+        self.threshold = threshold
+        self.clean_dir = Path(clean_dir)
+        self.config_path = Path(config_path)
+        self._enabled: Tuple[Optional[int], bool] = (None, False)
+        self._states: Dict[str, SymbolState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, symbol: str) -> SymbolState:
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is None:
+                state = self._states[symbol] = SymbolState(symbol)
+            return state
+
+    def update(self, symbol: str, candles: Any, closed: bool = False) -> int:
+        """Add closed candles for ``symbol`` and return how many were new.
+
+        When the candles start after a hole in the stream (the loop stalled
+        for longer than one response covers) the state is dropped and
+        rebuilt by the next :meth:`score`.
+        """
+        rows = _closed_candles(candles, closed)
+        if not rows:
+            return 0
+        state = self._state(symbol)
+        if not state.overlaps(rows[0][0]):
+            logger.info("[ONLINE] %s missed candles after %s, reseeding", symbol, state.last_ts)
+            with self._lock:
+                self._states.pop(symbol, None)
+            return 0
+        return sum(state.push(ts, row) for ts, row in rows)
+
+    def _pooled_enabled(self) -> bool:
+        """``pooled.enabled``, re-read only when the config file changes."""
+        try:
+            mtime = self.config_path.stat().st_mtime_ns
+        except OSError:
+            return False
+        if self._enabled[0] != mtime:
+            self._enabled = (mtime, pooled_enabled(self.config_path))
+        return self._enabled[1]
+
+    def _pooled(self, symbol: str) -> bool:
+        """Whether the published pooled model serves ``symbol`` in batch."""
+        if not self._pooled_enabled():
+            return False
+        entry = self.models.get(POOLED_MODEL)
+        return entry is not None and symbol in pooled_symbols(entry[1])
+
+    def _history(self, symbol: str) -> SymbolState:
+        """State warmed up on the cleaned file, cumulative features seeded."""
+        state = SymbolState(symbol)
+        path = self.clean_dir / f"{symbol}_clean.parquet"
+        if not path.exists():
+            return state
+        try:
+            names = set(pq.read_schema(path).names)
+            wanted = ["timestamp", *OHLCV, "candle_date_time_kst", "candle_acc_trade_price"]
+            clean = pd.read_parquet(path, columns=[c for c in wanted if c in names])
+        except Exception as exc:
+            logger.warning("[ONLINE] %s cleaned history load failed: %s", symbol, exc)
+            return state
+        if clean.empty or not {"timestamp", *OHLCV} <= set(clean.columns):
+            return state
+        split = max(len(clean) - self.window, 0)
+        state.features.seed(cumulative_seed(clean.iloc[:split]))
+        for ts, row in _closed_candles(clean.iloc[split:], closed=True):
+            state.push(ts, row)
+        return state
+
+    def _seed(self, symbol: str) -> None:
+        if self._state(symbol).rows >= MIN_ROWS:
+            return
+        state = self._history(symbol)
+        rows: List[Candle] = []
+        if self.fetch is not None:
+            try:
+                rows = _closed_candles(self.fetch(symbol, self.window))
+            except Exception as exc:  # pragma: no cover - network access
+                logger.warning("[ONLINE] %s history fetch failed: %s", symbol, exc)
+        if rows and not state.overlaps(rows[0][0]):
+            # The cleaned file ends before the fetched history: the cumulative
+            # features would skip the minutes in between.
+            logger.info("[ONLINE] %s cleaned history is stale, seeding from candles only", symbol)
+            state = SymbolState(symbol)
+        for ts, row in rows:
+            state.push(ts, row)
+        if state.rows > self._state(symbol).rows:
+            with self._lock:
+                self._states[symbol] = state
+
+    def score(self, symbol: str, candles: Any = None) -> Dict[str, Any] | None:
+        """Return the latest ``buy_prob`` for ``symbol``.
+
+        ``None`` means no published model, a symbol routed to the pooled
+        model, a model feature the streaming state cannot produce, or not
+        enough history yet, so the caller should fall back to the batch
+        prediction file. The model is only evaluated when a new candle closed
+        or a new model version was published; otherwise the previous result
+        is returned.
+        """
+        if self._pooled(symbol):
+            return None
+        entry = self.models.get(symbol)
+        if entry is None:
+            return None
+        model, meta = entry
+        names = meta.get("features") or list(getattr(model, "feature_names_in_", []))
+        features = [str(f) for f in names]
+        self._seed(symbol)
+        self.update(symbol, candles)
+        state = self._state(symbol)
+        if state.rows < MIN_ROWS:
+            return None
+        missing = [f for f in features if f not in state.row]
+        if missing:
+            logger.debug("[ONLINE] %s model needs %s, using batch predictions", symbol, missing)
+            return None
+
+        version = self.models.version(symbol)
+        cached = state.result
+        if cached is not None and cached["timestamp"] == state.last_ts and cached["version"] == version:
+            return cached
+
+        start = time.perf_counter()
+        row = state.row
+        # Same numeric coercion as 06_train._load_frames.
+        X = (
+            pd.DataFrame([[row[f] for f in features]], columns=features)
+            .apply(pd.to_numeric, errors="coerce")
+            .fillna(0)
+            .astype(np.float32)
+        )
+        prob = float(model.predict_proba(X.to_numpy())[:, 1][0])
+        result: Dict[str, Any] = {
+            "timestamp": state.last_ts,
+            "version": version,
+            "buy_prob": prob,
+            "buy_signal": prob > self.threshold,
+            **{f: float(row[f]) for f in SIGNAL_FEATURES},
+        }
+        state.result = result
+        logger.debug(
+            "[ONLINE] %s %s prob=%.4f (%.1fms)",
+            symbol,
+            state.last_ts,
+            prob,
+            (time.perf_counter() - start) * 1000,
+        )
+        return result
+
+
+__all__ = ["OnlineInference", "SymbolState", "WINDOW", "MIN_ROWS"]
@@ -10,7 +10,7 @@ import sqlite3
 import json
 from pathlib import Path
 import threading
-from .utils import log_with_tag, apply_tick_size, tick_size
+from .utils import log_with_tag, calc_tp_price
 from common_utils import now
 from .upbit_api import UpbitClient
 from .utils import pretty_symbol
@@ -204,14 +204,8 @@ class PositionManager:
 
     def _calc_tp_price(self, entry_price: float, tp_pct: float) -> float:
         """Return TP price rounded up with a minimum tick distance."""
-        price = entry_price * (1 + tp_pct / 100)
-        price = apply_tick_size(price, "ceil")
-        tick = tick_size(entry_price)
         min_ticks = int(self.config.get("MINIMUM_TICKS", 2))
-        if price - entry_price <= tick * (min_ticks - 1):
-            price = entry_price + min_ticks * tick
-            price = apply_tick_size(price, "ceil")
-        return price
+        return calc_tp_price(entry_price, tp_pct, min_ticks)
 
     def place_tp_order(self, position):
         """Immediately place a limit sell order for take profit."""
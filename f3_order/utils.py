@@ -120,6 +120,21 @@ def tick_size(price: float) -> float:
     return 1000
 
 
+def calc_tp_price(entry_price: float, tp_pct: float, min_ticks: int = 2) -> float:
+    """Return the take-profit price rounded up with a minimum tick distance.
+
+    ``tp_pct`` is a percentage (``0.18`` means 0.18%). The price is at least
+    ``min_ticks`` ticks above ``entry_price``.
+    """
+    price = entry_price * (1 + tp_pct / 100)
+    price = apply_tick_size(price, "ceil")
+    tick = tick_size(entry_price)
+    if price - entry_price <= tick * (min_ticks - 1):
+        price = entry_price + min_ticks * tick
+        price = apply_tick_size(price, "ceil")
+    return price
+
+
 def pretty_symbol(symbol: str) -> str:
     """Return ``symbol`` without the market prefix like ``KRW-``."""
     if not isinstance(symbol, str):
@@ -1,30 +1,26 @@
-"""Download last 72 hours of 1 minute OHLCV data."""
+"""Refresh the last 72 hours of 1 minute OHLCV data from the candle store."""
 
 from __future__ import annotations
 
 import json
 import logging
-import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List
-import tempfile
+from typing import Iterable, List
 import shutil
 
-import pandas as pd
-import requests
+from candle_store import CandleStore, last_closed_minute
+from utils import ensure_dir, setup_logger
 
-from utils import ensure_dir, file_lock, save_parquet_atomic, backup_file, setup_logger
-BASE_URL = "https://api.upbit.com"
 PIPELINE_ROOT = Path(__file__).resolve().parent
 DATA_ROOT = PIPELINE_ROOT / "ml_data" / "00_72h_1min_data"
 RAW_DATA_DIR = PIPELINE_ROOT / "ml_data" / "01_raw"
 SELECTED_FILE = PIPELINE_ROOT / "ml_data" / "10_selected" / "selected_strategies.json"
 ROOT_DIR = PIPELINE_ROOT.parent
 COIN_LIST_FILE = ROOT_DIR / "config" / "f1_f5_data_collection_list.json"
-REQUEST_DELAY = 0.2
 LOG_PATH = ROOT_DIR / "logs" / "f5" / "00_72h_1min_data.log"
 CANDLE_LIMIT = 4320
+STORE = CandleStore()
 
 
 def load_coin_list(path: str = COIN_LIST_FILE) -> List[str]:
@@ -41,123 +37,37 @@ def load_coin_list(path: str = COIN_LIST_FILE) -> List[str]:
     return []
 
 
-def _request_json(url: str, params: Dict | None = None, retries: int = 3) -> List[Dict]:
-    """Wrapper for ``requests.get`` with retry and rate limiting."""
-    for _ in range(retries):
-        try:
-            resp = requests.get(url, params=params, timeout=10)
-            if resp.status_code == 429:
-                time.sleep(1)
-                continue
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as exc:  # pragma: no cover - network error path
-            logging.warning("Request error %s: %s", url, exc)
-            time.sleep(1)
-    return []
-
-
-def get_ohlcv_history(market: str) -> pd.DataFrame:
-    """Fetch last 72 hours of minute candles for ``market``."""
-    url = f"{BASE_URL}/v1/candles/minutes/1"
-    end = datetime.utcnow().replace(second=0, microsecond=0)
-    remaining = CANDLE_LIMIT
-    to = end.isoformat()
-    frames: List[pd.DataFrame] = []
-
-    while remaining > 0:
-        count = min(200, remaining)
-        params = {"market": market, "count": count, "to": to}
-        data = _request_json(url, params)
-        if not data:
-            break
-        frames.append(pd.DataFrame(data))
-        remaining -= len(data)
-        to = data[-1]["candle_date_time_utc"]
-        time.sleep(REQUEST_DELAY)
-
-    if not frames:
-        return pd.DataFrame()
-    df = pd.concat(frames, ignore_index=True)
-    df = df.sort_values("candle_date_time_utc").reset_index(drop=True)
-    return df
-
-
-def _dedupe_columns(df: pd.DataFrame) -> List[str] | None:
-    """Return best column set for duplicate removal."""
-    candidates = [
-        ["timestamp", "market"],
-        ["trade_timestamp", "market"],
-        ["sequential_id"],
-        ["candle_date_time_utc", "market"],
-    ]
-    for cols in candidates:
-        if all(c in df.columns for c in cols):
-            return cols
-    return None
-
-
-def save_data(df: pd.DataFrame, market: str, root: Path = DATA_ROOT) -> None:
-    """Save ``df`` under ``root`` directory."""
-    dir_path = ensure_dir(root)
-    file_path = dir_path / f"{market}_rawdata.parquet"
-
-    lock_file = file_path.with_suffix(file_path.suffix + ".lock")
-    with file_lock(lock_file):
-        if file_path.exists():
-            try:
-                old = pd.read_parquet(file_path)
-                df = pd.concat([old, df], ignore_index=True)
-            except Exception as exc:  # pragma: no cover - best effort
-                logging.warning("Failed reading %s: %s", file_path.name, exc)
-                new = backup_file(file_path)
-                logging.info("Backed up corrupt file to %s", new.name)
-
-        subset = _dedupe_columns(df)
-        if subset:
-            before = len(df)
-            df = df.drop_duplicates(subset=subset)
-            removed = before - len(df)
-            if removed:
-                logging.info("Drop duplicates %s - %d rows", file_path.name, removed)
+def collect_all(markets: Iterable[str], now: datetime | None = None) -> None:
+    """Refresh 72h history for all markets as a view over ``STORE``.
 
+    Only the minutes missing from the shared candle store are requested, so a
+    periodic refresh costs a few requests per market instead of downloading
+    all ``CANDLE_LIMIT`` candles again.
+    """
+    ensure_dir(DATA_ROOT)
+    end = last_closed_minute(now)
+    start = end - CANDLE_LIMIT
+    collected: List[str] = []
+    total_requests = 0
+    for market in markets:
         try:
-            save_parquet_atomic(df, file_path)
+            total_requests += STORE.ensure_range(market, start, end, now=now)
+            rows = STORE.write_view(market, DATA_ROOT / f"{market}_rawdata.parquet", start, end)
+            if not rows:
+                logging.warning("No data for %s", market)
+                continue
+            collected.append(market)
         except Exception as exc:  # pragma: no cover - best effort
-            logging.error("Parquet save failed %s: %s", file_path.name, exc)
+            logging.error("Collect error %s: %s", market, exc)
 
+    if not collected:
+        logging.error("No market data collected")
+        return
+    logging.info("72h refresh: %d markets, %d requests", len(collected), total_requests)
 
-def collect_all(markets: Iterable[str]) -> None:
-    """Collect 72h history for all markets."""
-    ensure_dir(DATA_ROOT)
-    for old in DATA_ROOT.glob("*"):
-        if old.is_file():
+    for old in DATA_ROOT.glob("*_rawdata.parquet"):
+        if old.name.split("_")[0] not in collected:
             old.unlink(missing_ok=True)
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_root = Path(tmpdir)
-        collected: List[str] = []
-        for market in markets:
-            try:
-                df = get_ohlcv_history(market)
-                if df.empty:
-                    logging.warning("No data for %s", market)
-                    continue
-                save_data(df, market, root=tmp_root)
-                collected.append(market)
-            except Exception as exc:  # pragma: no cover - best effort
-                logging.error("Collect error %s: %s", market, exc)
-
-        if not collected:
-            logging.error("No market data collected")
-            return
-
-        for market in collected:
-            file = tmp_root / f"{market}_rawdata.parquet"
-            try:
-                df = pd.read_parquet(file)
-                save_data(df, market, root=DATA_ROOT)
-            except Exception as exc:  # pragma: no cover - best effort
-                logging.error("Finalize error %s: %s", file.name, exc)
 
     refresh_raw_data_if_needed()
 
@@ -19,6 +19,8 @@ import pandas as pd
 import requests
 
 from utils import ensure_dir, file_lock, save_parquet_atomic, backup_file, setup_logger
+from candle_store import CandleStore
+from gap_index import GapIndex, coalesce_ranges, from_minute, to_minute
 
 BASE_URL = "https://api.upbit.com"
 # Base directory of this pipeline
@@ -34,6 +36,14 @@ COIN_LIST_FILE = ROOT_DIR / "config" / "f1_f5_data_collection_list.json"
 REQUEST_DELAY = 0.2  # seconds between API calls
 LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_data_collect.log"
 START_DELAY = 5  # seconds after each one-minute candle closes
+FILL_WINDOW = 60  # minutes checked by ``fill_last_hour``
+
+# Minutes already stored in ``DATA_ROOT`` per market. Updated on every append so
+# gap detection never needs to re-read the Parquet files.
+GAP_INDEX = GapIndex(retention=FILL_WINDOW * 24)
+# Closed candles are also recorded in the shared store so the 72h/100K
+# downloaders do not request minutes this collector already has.
+STORE = CandleStore()
 
 
 def load_coin_list(path: str = COIN_LIST_FILE) -> List[str]:
@@ -72,10 +82,13 @@ def get_ohlcv(market: str) -> List[Dict]:
     return _request_json(url, params={"market": market, "count": 1})
 
 
-def get_ohlcv_range(market: str, count: int = 60) -> List[Dict]:
-    """Fetch ``count`` latest 1 minute OHLCV rows."""
+def get_ohlcv_range(market: str, count: int = 60, to: datetime | None = None) -> List[Dict]:
+    """Fetch ``count`` 1 minute OHLCV rows ending before ``to`` (UTC)."""
     url = f"{BASE_URL}/v1/candles/minutes/1"
-    return _request_json(url, params={"market": market, "count": count})
+    params: Dict = {"market": market, "count": count}
+    if to is not None:
+        params["to"] = to.strftime("%Y-%m-%dT%H:%M:%S")
+    return _request_json(url, params=params)
 
 
 # Only OHLCV is collected. The helper functions for orderbook, trades and ticker
@@ -96,8 +109,18 @@ def _dedupe_columns(df: pd.DataFrame) -> List[str] | None:
     return None
 
 
-def save_data(df: pd.DataFrame, market: str, root: Path = DATA_ROOT) -> None:
-    """Append ``df`` to ``root`` directory."""
+def _candle_minutes(df: pd.DataFrame) -> List[int]:
+    """Return epoch minutes of the candles in ``df``."""
+    if "candle_date_time_utc" not in df.columns:
+        return []
+    ts = pd.to_datetime(df["candle_date_time_utc"], utc=True, errors="coerce").dropna()
+    return (ts.astype("int64") // 60_000_000_000).tolist()
+
+
+def save_data(df: pd.DataFrame, market: str, root: Path | None = None) -> None:
+    """Append ``df`` to ``root`` directory (``DATA_ROOT`` by default)."""
+    root = root or DATA_ROOT
+    new_minutes = _candle_minutes(df) if root == DATA_ROOT else []
     dir_path = ensure_dir(root)
     file_path = dir_path / f"{market}_rawdata.parquet"
 
@@ -124,34 +147,54 @@ def save_data(df: pd.DataFrame, market: str, root: Path = DATA_ROOT) -> None:
             save_parquet_atomic(df, file_path)
         except Exception as exc:  # pragma: no cover - best effort
             logging.error("Parquet save failed %s: %s", file_path.name, exc)
+            return
 
+    if new_minutes and GAP_INDEX.is_seeded(market):
+        GAP_INDEX.add_minutes(market, new_minutes)
 
-def fill_last_hour(market: str) -> None:
-    """Ensure last hour of minute data is complete for ``market``."""
+
+def _seed_gap_index(market: str, since: int) -> None:
+    """Load stored minutes for ``market`` into ``GAP_INDEX`` once."""
     file_path = DATA_ROOT / f"{market}_rawdata.parquet"
-    if not file_path.exists():
-        return
-    try:
-        df = pd.read_parquet(file_path)
-    except Exception as exc:
-        logging.error("Failed reading %s: %s", file_path.name, exc)
-        return
+    minutes: List[int] = []
+    if file_path.exists():
+        try:
+            df = pd.read_parquet(file_path, columns=["candle_date_time_utc"])
+            minutes = [m for m in _candle_minutes(df) if m >= since]
+        except Exception as exc:
+            logging.error("Failed reading %s: %s", file_path.name, exc)
+    GAP_INDEX.add_minutes(market, minutes)
 
-    if "candle_date_time_utc" not in df.columns:
-        return
 
-    ts = pd.to_datetime(df["candle_date_time_utc"], utc=True)
-    end = datetime.utcnow().replace(second=0, microsecond=0)
-    start = end - timedelta(hours=1)
-    recent_ts = ts[ts >= start]
-    idx = pd.date_range(start=start, end=end, freq="1min")
-    missing = idx.difference(recent_ts)
-    if missing.empty:
+def fill_last_hour(market: str, now: datetime | None = None) -> None:
+    """Ensure last hour of minute data is complete for ``market``.
+
+    Missing minutes are looked up in ``GAP_INDEX`` and fetched with the fewest
+    ``count=200`` requests. Requested windows are marked as checked so minutes
+    without trades are not fetched again every minute.
+    """
+    now = now or datetime.utcnow()
+    end = to_minute(now.replace(second=0, microsecond=0)) + 1
+    start = end - FILL_WINDOW - 1
+    if not GAP_INDEX.is_seeded(market):
+        _seed_gap_index(market, start)
+
+    missing = GAP_INDEX.missing(market, start, end)
+    if not missing:
         return
-    logging.info("%s missing %d rows - fetching", market, len(missing))
-    new_rows = get_ohlcv_range(market, count=60)
-    if new_rows:
-        save_data(pd.DataFrame(new_rows), market)
+    logging.info(
+        "%s missing %d rows - fetching",
+        market,
+        sum(e - s for s, e in missing),
+    )
+    for w_start, w_end in coalesce_ranges(missing):
+        new_rows = get_ohlcv_range(market, count=w_end - w_start, to=from_minute(w_end))
+        if not new_rows:
+            continue
+        df_new = pd.DataFrame(new_rows)
+        save_data(df_new, market)
+        GAP_INDEX.add_range(market, w_start, w_end)
+        STORE.append(market, df_new, checked=(w_start, w_end), now=now)
 
 
 def collect_once(markets: Iterable[str]) -> None:
@@ -163,6 +206,7 @@ def collect_once(markets: Iterable[str]) -> None:
                 df_now = pd.DataFrame(ohlcv)
                 save_data(df_now, market, root=NOW_DATA_ROOT)
                 save_data(df_now, market)
+                STORE.append(market, df_now)
                 fill_last_hour(market)
             time.sleep(REQUEST_DELAY)
         except Exception as exc:  # pragma: no cover - best effort
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 import logging
 from pathlib import Path
 
@@ -31,7 +32,7 @@ def _aggregate_trades(df: pd.DataFrame) -> pd.DataFrame:
 
 RAW_EXTS = {".csv", ".xlsx", ".xls", ".parquet"}
 
-from utils import ensure_dir, setup_logger
+from utils import ensure_dir, save_parquet_atomic, setup_logger
 
 # Raw data now contains only OHLCV files directly under ``01_raw``
 
@@ -41,19 +42,41 @@ CLEAN_DIR = PIPELINE_ROOT / "ml_data" / "02_clean"
 ROOT_DIR = PIPELINE_ROOT.parent
 LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_clean.log"
 
+# Incremental mode only re-cleans raw rows newer than the per-symbol watermark.
+# The overlap re-reads recent minutes so late candles written by
+# ``fill_last_hour`` (up to 60 minutes back) are merged as well.
+INCREMENTAL = True
+OVERLAP_MINUTES = 120
+RAW_TIME_COL = "candle_date_time_utc"
 
-def _load_raw_file(path: Path) -> pd.DataFrame | None:
-    """Load CSV, Excel or Parquet file as DataFrame."""
+
+def _load_raw_file(path: Path, since: str | None = None) -> pd.DataFrame | None:
+    """Load CSV, Excel or Parquet file as DataFrame.
+
+    ``since`` keeps only rows whose ``candle_date_time_utc`` is not older than
+    the given ``YYYY-MM-DDTHH:MM:SS`` string. Parquet files push the filter
+    down to the reader.
+    """
     logger = logging.getLogger(__name__)
     try:
         ext = path.suffix.lower()
         if ext == ".csv":
-            return pd.read_csv(path)
-        if ext in {".xlsx", ".xls"}:
-            return pd.read_excel(path)
-        if ext == ".parquet":
-            return pd.read_parquet(path)
-        logger.info("SKIP: %s", path.name)
+            df = pd.read_csv(path)
+        elif ext in {".xlsx", ".xls"}:
+            df = pd.read_excel(path)
+        elif ext == ".parquet":
+            if since is not None:
+                try:
+                    return pd.read_parquet(path, filters=[(RAW_TIME_COL, ">=", since)])
+                except Exception:
+                    pass
+            df = pd.read_parquet(path)
+        else:
+            logger.info("SKIP: %s", path.name)
+            return None
+        if since is not None and RAW_TIME_COL in df.columns:
+            df = df[df[RAW_TIME_COL].astype(str) >= since]
+        return df
     except Exception as exc:  # pragma: no cover - best effort
         logger.warning("%s 로드 실패: %s", path.name, exc)
     return None
@@ -199,12 +222,17 @@ def _clean_df(
     return df
 
 
-def _load_concat(files: List[Path], ohlcv: bool, prefix: str | None = None) -> pd.DataFrame:
+def _load_concat(
+    files: List[Path],
+    ohlcv: bool,
+    prefix: str | None = None,
+    since: str | None = None,
+) -> pd.DataFrame:
     """Load and concatenate ``files`` then clean them."""
     logger = logging.getLogger(__name__)
     dfs = []
     for f in files:
-        df = _load_raw_file(f)
+        df = _load_raw_file(f, since=since)
         if df is not None:
             dfs.append(df)
     if not dfs:
@@ -298,28 +326,111 @@ def clean_merge(files: List[Path], output_path: Path) -> None:
         logger.warning("Parquet 저장 실패 (%s), CSV 저장: %s", exc, csv_fallback.name)
 
 
-def clean_symbol(files: List[Path], output_dir: Path) -> None:
-    """Clean OHLCV files for a single symbol."""
+def _file_signature(path: Path) -> list[int]:
+    stat = Path(path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_watermark(path: Path) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.getLogger(__name__).warning("%s 로드 실패: %s", path.name, exc)
+        return None
+
+
+def _save_watermark(path: Path, df: pd.DataFrame, files: List[Path]) -> None:
+    data = {
+        "timestamp": df["timestamp"].max().isoformat(),
+        "files": {Path(f).name: _file_signature(f) for f in files},
+    }
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    tmp.replace(path)
+
+
+def _stitch(existing: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    """Replace rows of ``existing`` from the first ``new_df`` minute onward.
+
+    The last kept row is resampled together with ``new_df`` so minutes between
+    the two parts are forward filled exactly as a full clean would do.
+    """
+    start = new_df["timestamp"].iloc[0]
+    kept = existing[existing["timestamp"] < start]
+    if kept.empty:
+        return new_df
+    new_df = new_df.reindex(columns=kept.columns)
+    tail = pd.concat([kept.iloc[[-1]], new_df], ignore_index=True)
+    tail = tail.set_index("timestamp").resample("1min").ffill().reset_index()
+    tail = tail.iloc[1:].astype(kept.dtypes.to_dict())
+    return pd.concat([kept, tail], ignore_index=True)
+
+
+def _save_clean(df: pd.DataFrame, output_path: Path) -> bool:
+    logger = logging.getLogger(__name__)
+    try:
+        save_parquet_atomic(df, output_path)
+        logger.info("Saved %s", output_path.name)
+        return True
+    except Exception as exc:  # pragma: no cover - best effort
+        csv_fallback = output_path.with_suffix(".csv")
+        df.to_csv(csv_fallback, index=False)
+        logger.warning("Parquet 저장 실패 (%s), CSV 저장: %s", exc, csv_fallback.name)
+        return False
+
+
+def clean_symbol(files: List[Path], output_dir: Path, incremental: bool = False) -> None:
+    """Clean OHLCV files for a single symbol.
+
+    With ``incremental`` only raw rows newer than the stored watermark minus
+    ``OVERLAP_MINUTES`` are cleaned and merged into the existing clean file.
+    A full clean runs when no watermark exists or a raw file disappeared.
+    """
     if not files:
         return
 
     symbol = Path(files[0]).stem.split("_")[0]
     output_path = output_dir / f"{symbol}_clean.parquet"
+    watermark_path = output_dir / f"{symbol}_watermark.json"
 
     logger = logging.getLogger(__name__)
 
-    ohlcv_df = _load_concat(files, True)
+    existing = None
+    since = None
+    if incremental:
+        mark = _load_watermark(watermark_path)
+        seen = (mark or {}).get("files", {})
+        names = {Path(f).name for f in files}
+        if mark and output_path.exists() and set(seen) <= names:
+            if all(seen.get(Path(f).name) == _file_signature(f) for f in files):
+                logger.info("%s: 변경된 원본 없음 - 건너뜀", symbol)
+                return
+            try:
+                existing = pd.read_parquet(output_path)
+            except Exception as exc:  # pragma: no cover - best effort
+                logger.warning("%s 로드 실패, 전체 정제: %s", output_path.name, exc)
+            else:
+                mark_ts = pd.Timestamp(mark["timestamp"])
+                since_ts = mark_ts - pd.Timedelta(minutes=OVERLAP_MINUTES)
+                since = since_ts.tz_convert(None).strftime("%Y-%m-%dT%H:%M:%S")
+                logger.info("%s: 증분 정제 (watermark %s)", symbol, mark_ts)
+
+    ohlcv_df = _load_concat(files, True, since=since)
     if ohlcv_df.empty:
-        logger.warning("%s: OHLCV 파일 없음", symbol)
+        if existing is None:
+            logger.warning("%s: OHLCV 파일 없음", symbol)
         return
 
-    try:
-        ohlcv_df.to_parquet(output_path, index=False)
-        logger.info("Saved %s", output_path.name)
-    except Exception as exc:  # pragma: no cover - best effort
-        csv_fallback = output_path.with_suffix(".csv")
-        ohlcv_df.to_csv(csv_fallback, index=False)
-        logger.warning("Parquet 저장 실패 (%s), CSV 저장: %s", exc, csv_fallback.name)
+    if existing is not None and not existing.empty:
+        ohlcv_df = _stitch(existing, ohlcv_df)
+
+    if _save_clean(ohlcv_df, output_path):
+        _save_watermark(watermark_path, ohlcv_df, files)
+
 
 def main() -> None:
     """실행 엔트리 포인트."""
@@ -335,7 +446,7 @@ def main() -> None:
         file_map.setdefault(symbol, []).append(file)
 
     for files in file_map.values():
-        clean_symbol(files, CLEAN_DIR)
+        clean_symbol(files, CLEAN_DIR, incremental=INCREMENTAL)
 
 
 if __name__ == "__main__":
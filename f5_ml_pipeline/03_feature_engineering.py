@@ -4,31 +4,86 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
+from typing import Dict, Iterable, List, Mapping
 
+import numpy as np
 import pandas as pd
-import sys
-sys.path.append(str(Path(__file__).resolve().parent.parent))
-from indicators import (
-    macd,
-    mfi,
-    adx,
-    rsi,
-    atr,
-    stochastic,
-    vwap,
-)
-
-from utils import ensure_dir, setup_logger
+
+import feature_graph
+from feature_selection import load_selected
+from model_registry import list_models, load_model
+from pooled_model import POOL_FEATURES, REGIME_SOURCE, active_pooled
+from utils import compact_dtypes, ensure_dir, load_yaml_config, setup_logger
 
 PIPELINE_ROOT = Path(__file__).resolve().parent
 CLEAN_DIR = PIPELINE_ROOT / "ml_data" / "02_clean"
 FEATURE_DIR = PIPELINE_ROOT / "ml_data" / "03_feature"
 ROOT_DIR = PIPELINE_ROOT.parent
 LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_feature.log"
-
-
-def add_features(df: pd.DataFrame) -> pd.DataFrame:
-    """정제된 데이터프레임에 각종 지표/파생 컬럼을 추가."""
+MODEL_DIR = PIPELINE_ROOT / "ml_data" / "06_models"
+CONFIG_PATH = PIPELINE_ROOT / "config" / "train_config.yaml"
+SELECTED_PATH = PIPELINE_ROOT / "ml_data" / "06_feature_select" / "selected_features.json"
+# Symbols computed together in one (time x symbol) pass; bounds peak memory.
+BATCH_SIZE = 16
+# 08_predict 가 새 행만 읽을 때 이전 row group 을 건너뛸 수 있도록 나눠 저장합니다.
+ROW_GROUP_SIZE = 10_000
+# f2_buy_signal.check_signals 가 예측 결과에서 읽는 컬럼은 항상 계산합니다.
+ALWAYS_FEATURES = ["ema5", "ema20", "rsi14"]
+
+
+def model_features(model_dir: Path = MODEL_DIR) -> List[str] | None:
+    """저장된 모델들이 사용하는 피처 이름의 합집합을 반환 (모델이 없으면 None)."""
+    names: List[str] = []
+    for symbol in list_models(model_dir):
+        try:
+            model, meta = load_model(model_dir, symbol)
+        except Exception as exc:
+            logging.warning("%s 모델 로드 실패: %s", symbol, exc)
+            continue
+        cols = meta.get("features") or getattr(model, "feature_names_in_", None)
+        if cols is None and hasattr(model, "booster_"):
+            cols = model.booster_.feature_name()
+        for col in cols if cols is not None else []:
+            if col not in names:
+                names.append(str(col))
+    pooled = active_pooled(model_dir, CONFIG_PATH)
+    if pooled is not None:
+        # symbol_id/vol_regime 은 08 단계가 붙이며, vol_regime 은 volatility14 로 계산
+        for col in pooled[1]["features"] + [REGIME_SOURCE]:
+            if col not in names and col not in POOL_FEATURES:
+                names.append(col)
+    return names or None
+
+
+def selected_features() -> List[str] | None:
+    """``features.use_selected``/``features.prune_to_models`` 설정 시 계산할 피처 목록을 반환.
+
+    ``use_selected`` 이면 06_feature_select 가 고른 목록에, 아직 재학습 전인
+    모델이 쓰는 피처를 더해 계산합니다.
+    """
+    config = load_yaml_config(CONFIG_PATH) or {}
+    options = config.get("features") or {}
+    names = None
+    if options.get("use_selected"):
+        names = load_selected(SELECTED_PATH)
+        if names is None:
+            logging.info("[FEATURE] 선택된 피처 목록이 없습니다.")
+        else:
+            names = names + [f for f in model_features(MODEL_DIR) or [] if f not in names]
+    elif options.get("prune_to_models"):
+        names = model_features()
+        if names is None:
+            logging.info("[FEATURE] 저장된 모델이 없어 전체 피처를 계산합니다.")
+    if names is None:
+        return None
+    return names + [f for f in ALWAYS_FEATURES if f not in names]
+
+
+def add_features(df: pd.DataFrame, features: Iterable[str] | None = None) -> pd.DataFrame:
+    """정제된 데이터프레임에 각종 지표/파생 컬럼을 추가.
+
+    ``features`` 를 지정하면 해당 피처와 그 중간값만 계산합니다.
+    """
     df = df.copy()
     df.columns = [c.lower() for c in df.columns]
 
@@ -37,106 +92,22 @@ def add_features(df: pd.DataFrame) -> pd.DataFrame:
     if missing:
         raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
 
-    # === 이동 평균 ===
-    for span in [5, 8, 13, 20, 21, 60, 120]:
-        df[f"ema{span}"] = df["close"].ewm(span=span, adjust=False).mean()
-    for span in [5, 20]:
-        df[f"sma{span}"] = df["close"].rolling(span).mean()
-    df["ema5_ema20_diff"] = df["ema5"] - df["ema20"]
-    df["ema8_ema21_diff"] = df["ema8"] - df["ema21"]
-    df["ema5_ema60_diff"] = df["ema5"] - df["ema60"]
-    df["ema20_ema60_diff"] = df["ema20"] - df["ema60"]
-    df["ema_gc"] = (df["ema5"] > df["ema20"]).astype(int)
-    df["ema_dc"] = (df["ema5"] < df["ema20"]).astype(int)
-
-    # === 모멘텀 지표 ===
-    df["rsi7"] = rsi(df["close"], period=7)
-    df["rsi14"] = rsi(df["close"], period=14)
-    df["rsi21"] = rsi(df["close"], period=21)
-    df["rsi_oversold"] = (df["rsi14"] < 30).astype(int)
-    df["rsi_overbought"] = (df["rsi14"] > 70).astype(int)
-    df["atr14"] = atr(df["high"], df["low"], df["close"], period=14)
-
-    df["ma_vol5"] = df["volume"].rolling(5).mean()
-    df["ma_vol20"] = df["volume"].rolling(20).mean()
-    df["vol_ratio"] = df["volume"] / (df["ma_vol20"] + 1e-8)
-    df["vol_ratio_5"] = df["volume"] / (df["ma_vol5"] + 1e-8)
-    df["vol_chg"] = df["volume"].pct_change().fillna(0)
-
-    stoch_k7, stoch_d7 = stochastic(df["high"], df["low"], df["close"], k_period=7, d_period=3)
-    stoch_k14, stoch_d14 = stochastic(df["high"], df["low"], df["close"], k_period=14, d_period=3)
-    df["stoch_k7"] = stoch_k7
-    df["stoch_d7"] = stoch_d7
-    df["stoch_k14"] = stoch_k14
-    df["stoch_d14"] = stoch_d14
-    df["stoch_k"] = stoch_k14
-    df["stoch_d"] = stoch_d14
-
-    # === 파생 피처 및 변동률 ===
-
-    # 가격변동률(1, 5, 10분)
-    for p in [1, 5, 10]:
-        df[f"pct_change_{p}m"] = df["close"].pct_change(p)
-    df["mom10"] = df["close"].diff(10)
-    df["roc10"] = df["close"].pct_change(10)
-
-    # 캔들 신호/패턴/바디 비율
-    df["is_bull"] = (df["close"] > df["open"]).astype(int)
-    df["body_size"] = (df["close"] - df["open"]).abs()
-    df["body_pct"] = df["body_size"] / (df["high"] - df["low"]).replace(0, 1)
-    df["hl_range"] = df["high"] - df["low"]
-    df["oc_range"] = (df["open"] - df["close"]).abs()
-    df["body_to_range"] = df["body_size"] / (df["hl_range"] + 1e-8)
-
-    # 간단한 캔들패턴
-    upper_shadow = df["high"] - df[["open", "close"]].max(axis=1)
-    lower_shadow = df[["open", "close"]].min(axis=1) - df["low"]
-    df["is_doji"] = (df["body_size"] <= df["hl_range"] * 0.1).astype(int)
-    df["long_bull"] = ((df["close"] > df["open"]) & (df["body_size"] >= df["hl_range"] * 0.7)).astype(int)
-    df["long_bear"] = ((df["close"] < df["open"]) & (df["body_size"] >= df["hl_range"] * 0.7)).astype(int)
-    df["is_hammer"] = ((lower_shadow >= 2 * df["body_size"]) & (upper_shadow <= df["body_size"])).astype(int)
-
-    # 전봉 대비 변화/패턴
-    df["close_change"] = df["close"].diff()
-    df["high_break"] = (df["high"] > df["high"].shift(1)).astype(int)
-    df["low_break"] = (df["low"] < df["low"].shift(1)).astype(int)
-    df["pivot_up"] = ((df["close"] > df["open"]) & (df["close"].shift() < df["open"].shift())).astype(int)
-    df["pivot_down"] = ((df["close"] < df["open"]) & (df["close"].shift() > df["open"].shift())).astype(int)
-
-    # 볼린저밴드(20, 표준 2배수)
-    ma20 = df["close"].rolling(20).mean()
-    std20 = df["close"].rolling(20).std()
-    df["bb_mid"] = ma20
-    df["bb_upper"] = ma20 + 2 * std20
-    df["bb_lower"] = ma20 - 2 * std20
-    df["bb_width"] = (df["bb_upper"] - df["bb_lower"]) / (ma20 + 1e-8)
-    df["bb_dist"] = (df["close"] - ma20) / (std20 + 1e-8)
-    df["dis_ma20"] = (df["close"] - ma20) / (ma20 + 1e-8)
-    df["volatility14"] = df["close"].pct_change().rolling(14).std()
-    df["anomaly"] = ((df["close"] > df["bb_upper"]) | (df["close"] < df["bb_lower"])).astype(int)
-
-    # MACD (12, 26, 9)
-    macd_line, macd_signal, macd_hist = macd(df["close"])
-    df["macd"] = macd_line
-    df["macd_signal"] = macd_signal
-    df["macd_hist"] = macd_hist
-
-    # MFI와 ADX
-    df["mfi14"] = mfi(df["high"], df["low"], df["close"], df["volume"], period=14)
-    df["adx14"] = adx(df["high"], df["low"], df["close"], period=14)[0]
-    typical_price = (df["high"] + df["low"] + df["close"]) / 3
-    tp_mean = typical_price.rolling(14).mean()
-    tp_dev = typical_price.rolling(14).apply(lambda x: (abs(x - x.mean())).mean(), raw=True)
-    df["cci14"] = (typical_price - tp_mean) / (0.015 * tp_dev + 1e-8)
-    df["vwap"] = vwap(df["high"], df["low"], df["close"], df["volume"])
-
-    # OBV
-    direction = df["volume"].where(df["close"] > df["close"].shift(), -df["volume"])
-    df["obv"] = direction.cumsum().fillna(0)
+    for name, values in feature_graph.evaluate(df, features).items():
+        df[name] = values
+
+    return _finish_features(df, features)
 
 
+def _finish_features(df: pd.DataFrame, features: Iterable[str] | None = None) -> pd.DataFrame:
+    """타임스탬프 기반 피처를 더하고 결측치를 정리."""
+    wanted = None if features is None else set(features)
+
+    def needed(*names: str) -> bool:
+        return wanted is None or any(n in wanted for n in names)
+
     # 5분/일봉 변환
-    if "timestamp" in df.columns:
+    m5_cols = [f"m5_{c}" for c in ["open", "high", "low", "close", "volume"]]
+    if "timestamp" in df.columns and needed(*m5_cols, "d_close"):
         ts = pd.to_datetime(df["timestamp"])
         tmp = df.set_index(ts)
         res5 = tmp.resample("5min").agg({
@@ -147,10 +118,12 @@ def add_features(df: pd.DataFrame) -> pd.DataFrame:
             "volume": "sum",
         })
         res5 = res5.reindex(ts, method="ffill").add_prefix("m5_")
+        res5 = res5[[c for c in m5_cols if needed(c)]]
         df = pd.concat([df.reset_index(drop=True), res5.reset_index(drop=True)], axis=1)
 
-        day_close = tmp["close"].resample("1D").last().reindex(ts, method="ffill")
-        df["d_close"] = day_close.values
+        if needed("d_close"):
+            day_close = tmp["close"].resample("1D").last().reindex(ts, method="ffill")
+            df["d_close"] = day_close.values
 
     # 거래대금/체결/호가 관련 피처(1분봉 데이터만으로 계산 불가)
     # if {"candle_acc_trade_price", "market_cap"}.issubset(df.columns):
@@ -191,7 +164,7 @@ def add_features(df: pd.DataFrame) -> pd.DataFrame:
 
     # === 시간 피처 (단타/ML 특화) ===
     # Datetime 인덱스가 없는 경우, candle_date_time_kst 등에서 추출 권장
-    if "candle_date_time_kst" in df.columns:
+    if "candle_date_time_kst" in df.columns and needed("hour", "minute", "dayofweek"):
         dt = pd.to_datetime(df["candle_date_time_kst"])
         df["hour"] = dt.dt.hour
         df["minute"] = dt.dt.minute
@@ -199,17 +172,70 @@ def add_features(df: pd.DataFrame) -> pd.DataFrame:
 
     # 결측치/이상치 대체 - 숫자형 컬럼에 한해 inf 값 치환
     num_cols = df.select_dtypes(include="number").columns
-    df[num_cols] = df[num_cols].replace([float("inf"), float("-inf")], pd.NA)
+    df[num_cols] = df[num_cols].replace([np.inf, -np.inf], np.nan)
     df = df.ffill().bfill()
 
     # 필요 없는 컬럼 삭제(중간계산용)
     df = df.drop(columns=["ma_vol5", "ma_vol20"], errors="ignore")
     df = df.drop(columns=["return"], errors="ignore")
 
-    return df
+    # 저장 타입 정책: 연속값 float32, 플래그/시간 코드 int8
+    return compact_dtypes(df)
+
+
+def add_features_batch(
+    frames: Mapping[str, pd.DataFrame], features: Iterable[str] | None = None
+) -> Dict[str, pd.DataFrame]:
+    """여러 심볼의 피처를 (시간 x 심볼) 2차원 배열로 한 번에 계산.
+
+    각 심볼을 마지막 행 기준으로 정렬해 앞쪽을 NaN 으로 채운 넓은 프레임을 만든 뒤
+    피처 그래프를 한 번만 계산합니다. 지표는 모두 인과적이고 선행 NaN 을
+    건너뛰므로 심볼별 결과는 ``add_features`` 와 같습니다.
+    """
+    ohlcv = ["open", "high", "low", "close", "volume"]
+    prepared: Dict[str, pd.DataFrame] = {}
+    for symbol, df in frames.items():
+        df = df.copy()
+        df.columns = [c.lower() for c in df.columns]
+        missing = set(ohlcv) - set(df.columns)
+        if missing:
+            raise ValueError(f"{symbol}: Missing required columns: {', '.join(sorted(missing))}")
+        prepared[symbol] = df
+    if not prepared:
+        return {}
+
+    symbols = list(prepared)
+    n_rows = max(len(df) for df in prepared.values())
+    wide = {}
+    for col in ohlcv:
+        dtype = np.result_type(*(prepared[s][col].dtype for s in symbols), np.float32)
+        arr = np.full((n_rows, len(symbols)), np.nan, dtype=dtype)
+        for j, symbol in enumerate(symbols):
+            values = prepared[symbol][col].to_numpy()
+            arr[n_rows - len(values):, j] = values
+        wide[col] = pd.DataFrame(arr, columns=symbols)
+
+    feats = {
+        name: values.to_numpy()
+        for name, values in feature_graph.evaluate(wide, features).items()
+    }
+    results: Dict[str, pd.DataFrame] = {}
+    for j, symbol in enumerate(symbols):
+        df = prepared[symbol]
+        offset = n_rows - len(df)
+        new_cols = pd.DataFrame(
+            {name: values[offset:, j] for name, values in feats.items()}, index=df.index
+        )
+        if df.columns.intersection(new_cols.columns).empty:
+            df = pd.concat([df, new_cols], axis=1)
+        else:
+            for name in new_cols.columns:
+                df[name] = new_cols[name]
+        results[symbol] = _finish_features(df, features)
+    return results
 
 
-def process_file(file: Path) -> None:
+def process_file(file: Path, features: Iterable[str] | None = None) -> None:
     """단일 파케이 파일에 피처를 추가해 저장."""
     symbol = file.name.split("_")[0]
     output_path = FEATURE_DIR / f"{symbol}_feature.parquet"
@@ -220,8 +246,8 @@ def process_file(file: Path) -> None:
         return
 
     try:
-        df = add_features(df)
-        df.to_parquet(output_path, index=False)
+        df = add_features(df, features)
+        df.to_parquet(output_path, index=False, row_group_size=ROW_GROUP_SIZE)
         logging.info(
             "[FEATURE] %s → %s, shape=%s",
             file.name,
@@ -232,14 +258,46 @@ def process_file(file: Path) -> None:
         logging.warning("%s 저장 실패: %s", output_path.name, exc)
 
 
+def process_batch(files: List[Path], features: Iterable[str] | None = None) -> None:
+    """여러 심볼 파일을 한 번에 피처 계산 후 심볼별로 저장."""
+    frames: Dict[str, pd.DataFrame] = {}
+    for file in files:
+        try:
+            frames[file.name.split("_")[0]] = pd.read_parquet(file)
+        except Exception as exc:
+            logging.warning("%s 로드 실패: %s", file.name, exc)
+
+    try:
+        results = add_features_batch(frames, features)
+    except Exception as exc:
+        logging.warning("배치 피처 계산 실패, 개별 처리: %s", exc)
+        for file in files:
+            process_file(file, features)
+        return
+
+    for symbol, df in results.items():
+        output_path = FEATURE_DIR / f"{symbol}_feature.parquet"
+        try:
+            df.to_parquet(output_path, index=False, row_group_size=ROW_GROUP_SIZE)
+            logging.info("[FEATURE] %s → %s, shape=%s", symbol, output_path.name, df.shape)
+        except Exception as exc:
+            logging.warning("%s 저장 실패: %s", output_path.name, exc)
+
+
 def main() -> None:
     """실행 엔트리 포인트."""
     ensure_dir(CLEAN_DIR)
     ensure_dir(FEATURE_DIR)
     setup_logger(LOG_PATH)
 
-    for file in CLEAN_DIR.glob("*.parquet"):
-        process_file(file)
+    features = selected_features()
+    if features is not None:
+        logging.info("[FEATURE] 선택/모델 사용 피처 %d개만 계산", len(features))
+
+    # 길이가 비슷한 심볼끼리 묶어 2차원 배열의 NaN 패딩을 줄입니다.
+    files = sorted(CLEAN_DIR.glob("*.parquet"), key=lambda f: f.stat().st_size)
+    for i in range(0, len(files), BATCH_SIZE):
+        process_batch(files[i:i + BATCH_SIZE], features)
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import logging
+from dataclasses import dataclass
 from pathlib import Path
 from itertools import product
 
@@ -9,7 +10,7 @@ import numpy as np
 import pandas as pd
 from numpy.lib.stride_tricks import sliding_window_view
 
-from utils import ensure_dir, setup_logger
+from utils import compact_dtypes, ensure_dir, setup_logger
 
 DEFAULT_SIGNAL_HORIZONS = [1, 3, 5]
 DEFAULT_SIGNAL_THRESHOLDS = [0.003, 0.005, 0.01]
@@ -22,12 +23,103 @@ LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_label.log"
 
 THRESH_LIST      = [0.002, 0.025, 0.003]    # 익절(%)
 LOSS_LIST        = [0.002, 0.025, 0.003]    # 손절(%)
+TRAIL_LIST       = [(None, None)]           # (트레일 시작, 트레일 하락폭), None=미사용
+# 05_split 매니페스트로 세트별 행 범위만 읽을 수 있도록 row group 단위로 저장
+ROW_GROUP_SIZE = 10_000
+
+
+@dataclass
+class FutureWindows:
+    """심볼 하나의 미래 구간 배열 (행 i 기준 다음 1..depth 분).
+
+    ``high_max[i, k]`` / ``low_min[i, k]`` 는 다음 ``k + 1`` 분의 최고가/최저가,
+    ``closes[i, k]`` 는 ``k + 1`` 분 뒤 종가입니다. 데이터 끝을 넘는 칸은
+    -inf/inf/NaN 으로 채워집니다. 한 번 만들면 모든 horizon, 신호, 파라미터
+    그리드에서 재사용합니다.
+    """
+
+    close: np.ndarray
+    high_max: np.ndarray
+    low_min: np.ndarray
+    closes: np.ndarray
+
+    @property
+    def depth(self) -> int:
+        return self.high_max.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+
+def _float_values(df: pd.DataFrame, col: str) -> np.ndarray:
+    values = df[col].to_numpy()
+    return values if values.dtype.kind == "f" else values.astype(np.float64)
+
+
+def future_windows(df: pd.DataFrame, depth: int) -> FutureWindows:
+    """``df`` 의 다음 ``depth`` 분 최고/최저/종가 배열을 한 번에 계산."""
+    close = _float_values(df, "close")
+    n = len(close)
+
+    def ahead(values: np.ndarray, fill: float) -> np.ndarray:
+        padded = np.concatenate([values[1:], np.full(depth, fill, dtype=values.dtype)])
+        return sliding_window_view(padded, depth)[:n]
+
+    high = _float_values(df, "high")
+    low = _float_values(df, "low")
+    return FutureWindows(
+        close=close,
+        high_max=np.maximum.accumulate(ahead(high, -np.inf), axis=1),
+        low_min=np.minimum.accumulate(ahead(low, np.inf), axis=1),
+        closes=ahead(close, np.nan),
+    )
+
+
+def _windows_for(
+    df: pd.DataFrame, depth: int, windows: FutureWindows | None
+) -> FutureWindows:
+    if windows is None or windows.depth < depth or len(windows) != len(df):
+        return future_windows(df, depth)
+    return windows
+
+
+def _trailing_hits(
+    windows: FutureWindows, horizon: int, trail_start_pct: float, trail_down_pct: float
+) -> np.ndarray:
+    """진입 후 ``horizon`` 분 안에 트레일링스탑이 발동하는 행 마스크 (행 n - horizon 개).
+
+    종가 수익률이 ``trail_start_pct`` 에 처음 닿은 시점부터 누적 최고 종가를
+    추적하고, 이후 종가의 낙폭이 ``trail_down_pct`` 이상이면 발동합니다.
+    """
+    m = len(windows) - horizon
+    prices = windows.closes[:m, :horizon]
+    entry = windows.close[:m, None]
+    pct = (prices - entry) / entry
+    trigger = pct >= trail_start_pct
+    first = trigger.argmax(axis=1)[:, None]
+    cols = np.arange(horizon)[None, :]
+    running_max = np.maximum.accumulate(np.where(cols >= first, prices, -np.inf), axis=1)
+    # 발동 전 칸은 -inf 라 NaN 이 되며 아래 ``cols > first`` 조건에서 제외됩니다.
+    with np.errstate(invalid="ignore"):
+        drawdown = (prices - running_max) / running_max
+    return trigger.any(axis=1) & ((cols > first) & (drawdown <= -trail_down_pct)).any(axis=1)
+
+
+def _tp_sl_masks(
+    windows: FutureWindows, horizon: int, thresh_pct: float, loss_pct: float
+) -> tuple[np.ndarray, np.ndarray]:
+    m = len(windows) - horizon
+    entry = windows.close[:m]
+    tp = windows.high_max[:m, horizon - 1] >= entry * (1 + thresh_pct)
+    sl = windows.low_min[:m, horizon - 1] <= entry * (1 - loss_pct)
+    return tp, sl
 
 
 def add_signals(
     df: pd.DataFrame,
     horizons: list[int] | None = None,
     thresholds: list[float] | None = None,
+    windows: FutureWindows | None = None,
 ) -> pd.DataFrame:
     """Add boolean signal columns based on future high price reach."""
 
@@ -37,17 +129,15 @@ def add_signals(
         thresholds = DEFAULT_SIGNAL_THRESHOLDS
 
     df = df.copy()
-    high = df["high"].to_numpy()
-    close = df["close"].to_numpy()
+    windows = _windows_for(df, max(horizons, default=1), windows)
+    close = windows.close
     n = len(df)
 
     for idx, (h, thr) in enumerate(zip(horizons, thresholds), start=1):
         sig = np.zeros(n, dtype=bool)
         if n > h:
-            win_high = sliding_window_view(high, h + 1)[:, 1:]
-            future_high = win_high.max(axis=1)
-            sig[:-h] = future_high >= close[:-h] * (1 + thr)
-        df[f"signal{idx}"] = sig.tolist()
+            sig[:-h] = windows.high_max[:-h, h - 1] >= close[:-h] * (1 + thr)
+        df[f"signal{idx}"] = sig
     return df
 
 def make_labels_basic(
@@ -57,35 +147,27 @@ def make_labels_basic(
     loss_pct: float | None = None,
     signal_horizons: list[int] | None = None,
     signal_thresholds: list[float] | None = None,
+    windows: FutureWindows | None = None,
 ) -> pd.DataFrame:
     """TP/SL만 고려한 라벨 생성 (익절=1, 손절=-1, 관망=0)."""
     if loss_pct is None:
         loss_pct = thresh_pct
 
     df = df.copy()
-    close = df["close"].to_numpy()
-    high = df["high"].to_numpy()
-    low = df["low"].to_numpy()
     n = len(df)
 
-    labels = np.zeros(n, dtype=int)
+    labels = np.zeros(n, dtype=np.int8)
     if n <= horizon:
-        df["label"] = labels.tolist()
+        df["label"] = labels
         return df
 
-    windows_high = sliding_window_view(high, horizon + 1)[:, 1:]
-    windows_low = sliding_window_view(low, horizon + 1)[:, 1:]
-    future_max_high = windows_high.max(axis=1)
-    future_min_low = windows_low.min(axis=1)
-
-    entry = close[:-horizon]
-    tp = future_max_high >= entry * (1 + thresh_pct)
-    sl = future_min_low <= entry * (1 - loss_pct)
+    windows = _windows_for(df, horizon, windows)
+    tp, sl = _tp_sl_masks(windows, horizon, thresh_pct, loss_pct)
     labels[:-horizon] = np.where(tp, 1, np.where(sl, -1, 0))
 
-    df["label"] = labels.tolist()
+    df["label"] = labels
 
-    df = add_signals(df, signal_horizons, signal_thresholds)
+    df = add_signals(df, signal_horizons, signal_thresholds, windows)
     return df
 
 def make_labels_trailing(
@@ -97,6 +179,7 @@ def make_labels_trailing(
     trail_down_pct: float,
     signal_horizons: list[int] | None = None,
     signal_thresholds: list[float] | None = None,
+    windows: FutureWindows | None = None,
 ) -> pd.DataFrame:
     """트레일링스탑 포함 초단타 라벨 생성 (익절=1, 손절=-1, 트레일=2, 관망=0)."""
     if trail_start_pct is None or trail_down_pct is None:
@@ -107,53 +190,71 @@ def make_labels_trailing(
             loss_pct,
             signal_horizons=signal_horizons,
             signal_thresholds=signal_thresholds,
+            windows=windows,
         )
 
     df = df.copy()
-    close = df["close"].to_numpy()
-    high = df["high"].to_numpy()
-    low = df["low"].to_numpy()
     n = len(df)
 
-    labels = np.zeros(n, dtype=int)
+    labels = np.zeros(n, dtype=np.int8)
     if n <= horizon:
-        df["label"] = labels.tolist()
+        df["label"] = labels
         return df
 
-    win_high = sliding_window_view(high, horizon + 1)[:, 1:]
-    win_low = sliding_window_view(low, horizon + 1)[:, 1:]
-    future_high = win_high.max(axis=1)
-    future_low = win_low.min(axis=1)
-    win_close = sliding_window_view(close, horizon + 1)[:, 1:]
-    entry = close[:-horizon]
-
-    tp_mask = future_high >= entry * (1 + thresh_pct)
-    sl_mask = future_low <= entry * (1 - loss_pct)
-    labels[:-horizon][tp_mask] = 1
-    labels[:-horizon][~tp_mask & sl_mask] = -1
-
-    undecided = np.where(~tp_mask & ~sl_mask)[0]
-    for idx in undecided:
-        prices = win_close[idx]
-        ent = entry[idx]
-        pct = (prices - ent) / ent
-        trigger = np.where(pct >= trail_start_pct)[0]
-        if trigger.size:
-            t_idx = trigger[0]
-            max_price = prices[t_idx]
-            for p in prices[t_idx + 1 :]:
-                if p > max_price:
-                    max_price = p
-                drawdown = (p - max_price) / max_price
-                if drawdown <= -trail_down_pct:
-                    labels[idx] = 2
-                    break
-
-    df["label"] = labels.tolist()
-
-    df = add_signals(df, signal_horizons, signal_thresholds)
+    windows = _windows_for(df, horizon, windows)
+    tp, sl = _tp_sl_masks(windows, horizon, thresh_pct, loss_pct)
+    trail = _trailing_hits(windows, horizon, trail_start_pct, trail_down_pct)
+    labels[:-horizon] = np.where(tp, 1, np.where(sl, -1, np.where(trail, 2, 0)))
+
+    df["label"] = labels
+
+    df = add_signals(df, signal_horizons, signal_thresholds, windows)
     return df
 
+def label_grid_counts(
+    windows: FutureWindows,
+    horizon: int,
+    thresholds: list[float],
+    losses: list[float],
+    trails: list[tuple[float | None, float | None]],
+) -> np.ndarray:
+    """파라미터 그리드 전체의 라벨 개수를 한 번의 배열 연산으로 계산.
+
+    반환 배열의 shape 은 ``(len(thresholds), len(losses), len(trails), 4)`` 이고
+    마지막 축은 익절(1), 트레일(2), 손절(-1), 관망(0) 개수입니다.
+    ``make_labels_trailing`` 을 조합마다 호출한 결과와 같습니다.
+    """
+    n = len(windows)
+    counts = np.zeros((len(thresholds), len(losses), len(trails), 4), dtype=np.int64)
+    if n <= horizon:
+        counts[..., 3] = n
+        return counts
+
+    m = n - horizon
+    entry = windows.close[:m]
+    future_high = windows.high_max[:m, horizon - 1]
+    future_low = windows.low_min[:m, horizon - 1]
+    tp = np.stack([future_high >= entry * (1 + t) for t in thresholds])
+    sl = np.stack([future_low <= entry * (1 - l) for l in losses])
+    trail = np.stack([
+        np.zeros(m, dtype=bool) if start is None or down is None
+        else _trailing_hits(windows, horizon, start, down)
+        for start, down in trails
+    ])
+
+    undecided = ~tp[:, None, :] & ~sl[None, :, :]
+    n_tp = tp.sum(axis=1)[:, None, None]
+    n_sl = (~tp[:, None, :] & sl[None, :, :]).sum(axis=2)[:, :, None]
+    # (조합, 행) x (행, 트레일) 행렬곱으로 트레일 발동 개수를 한 번에 셉니다.
+    n_trail = (
+        undecided.reshape(-1, m).astype(np.float32) @ trail.T.astype(np.float32)
+    ).round().astype(np.int64).reshape(len(thresholds), len(losses), len(trails))
+    counts[..., 0] = n_tp
+    counts[..., 1] = n_trail
+    counts[..., 2] = n_sl
+    counts[..., 3] = n - n_tp - n_trail - n_sl
+    return counts
+
 def to_py_types(obj):
     if isinstance(obj, dict):
         return {k: to_py_types(v) for k, v in obj.items()}
@@ -167,24 +268,16 @@ def optimize_labeling_trailing(
     df: pd.DataFrame,
     symbol: str,
     horizon: int = 5,
+    windows: FutureWindows | None = None,
 ) -> dict:
     """트레일링 포함 파라미터 그리드 전체 실험, 최적 조합 자동 선정."""
+    windows = _windows_for(df, horizon, windows)
+    counts = label_grid_counts(windows, horizon, THRESH_LIST, LOSS_LIST, TRAIL_LIST)
+    n = len(df)
     results = []
-    for thresh, loss in product(THRESH_LIST, LOSS_LIST):
-        trail_start, trail_down = None, None
-        df_labeled = make_labels_trailing(
-            df,
-            horizon,
-            thresh,
-            loss,
-            trail_start,
-            trail_down,
-        )
-        n = len(df_labeled)
-        n1 = (df_labeled["label"] == 1).sum()
-        n2 = (df_labeled["label"] == 2).sum()
-        n_1 = (df_labeled["label"] == -1).sum()
-        n0 = (df_labeled["label"] == 0).sum()
+    grid = product(enumerate(THRESH_LIST), enumerate(LOSS_LIST), enumerate(TRAIL_LIST))
+    for (i, thresh), (j, loss), (k, (trail_start, trail_down)) in grid:
+        n1, n2, n_1, n0 = counts[i, j, k]
         ratio_1 = n1 / n
         ratio_2 = n2 / n
         ratio_m1 = n_1 / n
@@ -241,7 +334,9 @@ def process_file(file: Path, horizon: int = 5) -> None:
         logging.warning("%s 로드 실패: %s", file.name, exc)
         return
 
-    best_params = optimize_labeling_trailing(df, symbol, horizon)
+    # 미래 구간 배열을 한 번만 만들어 그리드 탐색, 라벨, 신호 계산에 재사용
+    windows = future_windows(df, max(horizon, *DEFAULT_SIGNAL_HORIZONS))
+    best_params = optimize_labeling_trailing(df, symbol, horizon, windows)
     df_best = make_labels_trailing(
         df,
         horizon=horizon,
@@ -249,10 +344,13 @@ def process_file(file: Path, horizon: int = 5) -> None:
         loss_pct=best_params["loss_pct"],
         trail_start_pct=best_params["trail_start_pct"],
         trail_down_pct=best_params["trail_down_pct"],
+        windows=windows,
     )
+    # 라벨 int8, 신호 bool, 피처 float32 로 저장
+    df_best = compact_dtypes(df_best)
     output_path = LABEL_DIR / f"{symbol}_label.parquet"
     try:
-        df_best.to_parquet(output_path, index=False)
+        df_best.to_parquet(output_path, index=False, row_group_size=ROW_GROUP_SIZE)
         dist = df_best["label"].value_counts().to_dict()
         logging.info("[LABEL] %s → %s, shape=%s, dist=%s, best_params=%s",
             file.name, output_path.name, df_best.shape, dist, best_params)
@@ -6,8 +6,10 @@ import logging
 from pathlib import Path
 
 import pandas as pd
+import pyarrow.parquet as pq
 
-from utils import ensure_dir, setup_logger
+from split_io import PARTS, walk_forward_bounds, write_manifest
+from utils import ensure_dir, load_yaml_config, setup_logger
 
 # Absolute paths relative to this file so the script behaves the same
 # regardless of the current working directory.
@@ -16,50 +18,86 @@ LABEL_DIR = PIPELINE_ROOT / "ml_data" / "04_label"
 SPLIT_DIR = PIPELINE_ROOT / "ml_data" / "05_split"
 ROOT_DIR = PIPELINE_ROOT.parent
 LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_split.log"
+CONFIG_PATH = PIPELINE_ROOT / "config" / "train_config.yaml"
+
+
+def split_bounds(
+    n: int, train_ratio: float = 0.7, valid_ratio: float = 0.2
+) -> dict[str, tuple[int, int]]:
+    """시간순 학습/검증/테스트 세트의 ``[start, stop)`` 행 범위."""
+    n_train = int(n * train_ratio)
+    n_valid = int(n * valid_ratio)
+    return {
+        "train": (0, n_train),
+        "valid": (n_train, n_train + n_valid),
+        "test": (n_train + n_valid, n),
+    }
 
 
 def time_split(
     df: pd.DataFrame, train_ratio: float = 0.7, valid_ratio: float = 0.2
 ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """시간순으로 학습/검증/테스트 세트를 분할."""
-    n = len(df)
-    n_train = int(n * train_ratio)
-    n_valid = int(n * valid_ratio)
-    train = df.iloc[:n_train]
-    valid = df.iloc[n_train : n_train + n_valid]
-    test = df.iloc[n_train + n_valid :]
-    return train, valid, test
+    bounds = split_bounds(len(df), train_ratio, valid_ratio)
+    return tuple(df.iloc[start:stop] for start, stop in bounds.values())  # type: ignore[return-value]
 
 
-def process_file(file: Path, train_ratio: float, valid_ratio: float) -> None:
-    """단일 라벨 파일을 분할해 저장."""
+def process_file(
+    file: Path, train_ratio: float, valid_ratio: float, walk_forward: dict | None = None
+) -> None:
+    """단일 라벨 파일의 분할 매니페스트를 저장.
+
+    데이터를 복사하지 않고 행 범위만 기록하며, 분포 로그용으로 ``label``
+    컬럼만 읽습니다. ``walk_forward`` (train_config 의 같은 항목) 의 ``folds`` 가
+    1 이상이면 워크 포워드 창도 함께 기록합니다.
+    """
     symbol = file.name.split("_")[0]
     try:
-        df = pd.read_parquet(file)
+        meta = pq.ParquetFile(file)
+        rows = meta.metadata.num_rows
+        has_label = "label" in meta.schema_arrow.names
+        labels = pd.read_parquet(file, columns=["label"])["label"] if has_label else None
     except Exception as exc:  # pragma: no cover - best effort
         logging.warning("%s 로드 실패: %s", file.name, exc)
         return
 
-    train, valid, test = time_split(df, train_ratio=train_ratio, valid_ratio=valid_ratio)
-
-    for split_df, suffix in (
-        (train, "train"),
-        (valid, "valid"),
-        (test, "test"),
-    ):
-        output_path = SPLIT_DIR / f"{symbol}_{suffix}.parquet"
-        try:
-            split_df.to_parquet(output_path, index=False)
-            dist = split_df.get("label", pd.Series()).value_counts().to_dict()
-            logging.info(
-                "[SPLIT] %s → %s, shape=%s, dist=%s",
-                file.name,
-                output_path.name,
-                split_df.shape,
-                dist,
-            )
-        except Exception as exc:  # pragma: no cover - best effort
-            logging.warning("%s 저장 실패: %s", output_path.name, exc)
+    bounds = split_bounds(rows, train_ratio=train_ratio, valid_ratio=valid_ratio)
+    wf = walk_forward or {}
+    folds = walk_forward_bounds(
+        rows,
+        int(wf.get("folds", 0)),
+        float(wf.get("test_ratio", 0.05)),
+        float(wf.get("valid_ratio", 0.05)),
+        wf.get("window", "expanding"),
+    )
+    if int(wf.get("folds", 0)) and not folds:
+        logging.warning("[SPLIT] %s 행 수 %d 로는 워크 포워드 창을 만들 수 없습니다", symbol, rows)
+    try:
+        output_path = write_manifest(SPLIT_DIR, symbol, file, rows, bounds, folds)
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 분할 매니페스트 저장 실패: %s", symbol, exc)
+        return
+
+    for suffix, (start, stop) in bounds.items():
+        dist = labels.iloc[start:stop].value_counts().to_dict() if labels is not None else {}
+        logging.info(
+            "[SPLIT] %s → %s[%s], rows=%d:%d, dist=%s",
+            file.name,
+            output_path.name,
+            suffix,
+            start,
+            stop,
+            dist,
+        )
+    for k, fold in enumerate(folds):
+        logging.info("[SPLIT] %s fold %d: %s", symbol, k, {part: list(b) for part, b in fold.items()})
+
+    # 예전 방식으로 복사해 둔 분할 파일은 매니페스트와 어긋나지 않도록 정리
+    for suffix in PARTS:
+        legacy = SPLIT_DIR / f"{symbol}_{suffix}.parquet"
+        if legacy.exists():
+            legacy.unlink()
+            logging.info("[SPLIT] 이전 분할 파일 삭제: %s", legacy.name)
 
 
 def main(train_ratio: float = 0.7, valid_ratio: float = 0.2) -> None:
@@ -70,8 +108,9 @@ def main(train_ratio: float = 0.7, valid_ratio: float = 0.2) -> None:
     logging.info("[SETUP] LABEL_DIR=%s", LABEL_DIR)
     logging.info("[SETUP] SPLIT_DIR=%s", SPLIT_DIR)
 
+    walk_forward = load_yaml_config(CONFIG_PATH).get("walk_forward")
     for file in LABEL_DIR.glob("*.parquet"):
-        process_file(file, train_ratio, valid_ratio)
+        process_file(file, train_ratio, valid_ratio, walk_forward)
 
 
 if __name__ == "__main__":
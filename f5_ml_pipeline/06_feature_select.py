@@ -0,0 +1,72 @@
+"""피처 중요도와 상관으로 학습/예측에 쓸 피처 목록을 골라 저장한다.
+
+5분 주기 파이프라인(``run_pipeline.py``)에는 포함되지 않으며 주기적으로 따로
+실행합니다. ``features.use_selected`` 를 켜면 03/06/08 단계가 저장된 목록을 사용합니다.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+
+from feature_selection import rank_symbols, select_features
+from split_io import list_symbols
+from utils import ensure_dir, load_yaml_config, setup_logger
+
+PIPELINE_ROOT = Path(__file__).resolve().parent
+SPLIT_DIR = PIPELINE_ROOT / "ml_data" / "05_split"
+OUT_DIR = PIPELINE_ROOT / "ml_data" / "06_feature_select"
+ROOT_DIR = PIPELINE_ROOT.parent
+LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_feature_select.log"
+CONFIG_PATH = PIPELINE_ROOT / "config" / "train_config.yaml"
+
+
+def main(workers: int | None = None) -> None:
+    """실행 엔트리 포인트."""
+    ensure_dir(OUT_DIR)
+    setup_logger(LOG_PATH)
+    config = load_yaml_config(CONFIG_PATH)
+    sel = config.get("selection") or {}
+    workers = int(workers or sel.get("workers", 1))
+    model = {**config["model"], **(sel.get("model") or {})}
+    tasks = [
+        (str(SPLIT_DIR), symbol, model, int(sel.get("sample_rows", 50_000)), int(sel.get("n_estimators", 200)))
+        for symbol in list_symbols(SPLIT_DIR)
+    ]
+
+    start = time.perf_counter()
+    ranks = rank_symbols(tasks, workers=workers)
+    if not ranks:
+        logging.info("[SELECT] 중요도를 계산한 심볼이 없어 목록을 저장하지 않습니다")
+        return
+    result = select_features(
+        ranks,
+        corr_threshold=float(sel.get("corr_threshold", 0.95)),
+        min_importance=float(sel.get("min_importance", 0.001)),
+        max_features=int(sel.get("max_features", 0)),
+    )
+    result["updated_at"] = datetime.now().isoformat(timespec="seconds")
+
+    path = OUT_DIR / "selected_features.json"
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    tmp.replace(path)
+
+    for name, reason in result["dropped"].items():
+        logging.info("[SELECT] %s 제외: %s", name, reason)
+    logging.info(
+        "[SELECT] %d개 심볼, 피처 %d개 중 %d개 선택 in %.1fs (workers=%d)",
+        result["symbols"],
+        len(result["importance"]),
+        len(result["features"]),
+        time.perf_counter() - start,
+        workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Optuna TPE 로 06_train 하이퍼파라미터를 탐색해 심볼별(또는 공통) 최적값을 저장한다.
+
+5분 주기 파이프라인(``run_pipeline.py``)에는 포함되지 않으며 야간 배치로 따로
+실행합니다. 작업자 프로세스는 우선순위를 낮춰 실행됩니다.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import optuna
+
+from feature_selection import load_selected
+from optuna_search import FIXED_PARAMS, lower_priority, run_worker, storage
+from split_io import list_symbols
+from utils import ensure_dir, load_yaml_config, setup_logger
+
+PIPELINE_ROOT = Path(__file__).resolve().parent
+SPLIT_DIR = PIPELINE_ROOT / "ml_data" / "05_split"
+CACHE_DIR = PIPELINE_ROOT / "ml_data" / "06_dataset_cache"
+TUNED_DIR = PIPELINE_ROOT / "ml_data" / "06_optuna"
+SELECTED_PATH = PIPELINE_ROOT / "ml_data" / "06_feature_select" / "selected_features.json"
+ROOT_DIR = PIPELINE_ROOT.parent
+LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_optuna.log"
+CONFIG_PATH = PIPELINE_ROOT / "config" / "train_config.yaml"
+POOLED_STUDY = "pooled"
+
+
+def plan_studies(mode: str, symbols: list[str]) -> dict[str, list[str]]:
+    """연구 이름 → 학습에 쓸 심볼 목록."""
+    if mode == POOLED_STUDY:
+        return {POOLED_STUDY: symbols} if symbols else {}
+    return {symbol: [symbol] for symbol in symbols}
+
+
+def split_trials(n_trials: int, workers: int) -> list[int]:
+    """시도 수를 작업자에게 고르게 나눈 목록 (0 인 몫은 제외)."""
+    shares = [n_trials // workers + (1 if i < n_trials % workers else 0) for i in range(workers)]
+    return [s for s in shares if s > 0]
+
+
+def write_best(name: str, url: str) -> Path | None:
+    """연구의 최고 시도를 ``06_train`` 이 읽는 ``{name}_params.json`` 으로 저장."""
+    study = optuna.load_study(study_name=name, storage=storage(url))
+    completed = [t for t in study.trials if t.state == optuna.trial.TrialState.COMPLETE]
+    if not completed:
+        return None
+    best = study.best_trial
+    path = TUNED_DIR / f"{name}_params.json"
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "params": {**best.params, **FIXED_PARAMS},
+                "auc": best.value,
+                "trial": best.number,
+                "trials": len(study.trials),
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+            },
+            f,
+            indent=2,
+        )
+    tmp.replace(path)
+    return path
+
+
+def main(workers: int | None = None) -> None:
+    """실행 엔트리 포인트."""
+    ensure_dir(TUNED_DIR)
+    setup_logger(LOG_PATH)
+    config = load_yaml_config(CONFIG_PATH)
+    opt = config.get("optuna") or {}
+    workers = int(workers or opt.get("workers", 1))
+    n_trials = int(opt.get("n_trials", 40))
+    timeout = opt.get("timeout_sec")
+    url = f"sqlite:///{TUNED_DIR / 'optuna.db'}"
+    # 06_train 이 만든 캐시와 같은 서명을 쓰도록 선택된 피처 목록을 함께 넘김
+    selected = load_selected(SELECTED_PATH) if (config.get("features") or {}).get("use_selected") else None
+
+    studies = plan_studies(opt.get("mode", "symbol"), list_symbols(SPLIT_DIR))
+    tasks = []
+    for name, symbols in studies.items():
+        optuna.create_study(study_name=name, storage=storage(url), direction="maximize", load_if_exists=True)
+        for seed, share in enumerate(split_trials(n_trials, workers)):
+            tasks.append((
+                name, url, str(SPLIT_DIR), str(CACHE_DIR), symbols, share,
+                float(timeout) if timeout else None, seed, config["model"], selected,
+            ))
+
+    start = time.perf_counter()
+    if workers <= 1 or len(tasks) <= 1:
+        done = [run_worker(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=lower_priority) as pool:
+            done = list(pool.map(run_worker, tasks))
+
+    for name in studies:
+        path = write_best(name, url)
+        if path is None:
+            logging.info("[OPTUNA] %s 완료된 시도 없음", name)
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            best = json.load(f)
+        logging.info("[OPTUNA] %s best auc=%.4f (trial %d / %d) %s", name, best["auc"], best["trial"],
+                     best["trials"], best["params"])
+    logging.info(
+        "[OPTUNA] %d studies, %d trials in %.1fs (workers=%d)",
+        len(studies),
+        sum(done),
+        time.perf_counter() - start,
+        workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,31 @@ from __future__ import annotations
 
 import json
 import logging
+from datetime import datetime, timedelta
 from pathlib import Path
 
-import joblib
 import lightgbm as lgb
+import numpy as np
 import pandas as pd
 from sklearn.metrics import classification_report, roc_auc_score
 
+from booster_model import BoosterClassifier, train_booster, trimmed_booster
+from dataset_cache import CachedSplit, DatasetCache, balanced_weights, dataset_signature
+from feature_selection import load_selected
+from model_registry import ModelRegistry
+from pooled_model import (
+    POOL_FEATURES,
+    POOLED_MODEL,
+    REGIME_SOURCE,
+    SYMBOL_FEATURE,
+    add_pool_features,
+    common_features,
+    load_pooled,
+    regime_edges,
+    route_symbols,
+    symbol_auc,
+)
+from split_io import list_symbols, load_split
 from utils import ensure_dir, load_yaml_config, setup_logger
 
 # Use absolute paths relative to this file so execution works regardless of
@@ -18,25 +36,29 @@ from utils import ensure_dir, load_yaml_config, setup_logger
 PIPELINE_ROOT = Path(__file__).resolve().parent
 SPLIT_DIR = PIPELINE_ROOT / "ml_data" / "05_split"
 MODEL_DIR = PIPELINE_ROOT / "ml_data" / "06_models"
+CACHE_DIR = PIPELINE_ROOT / "ml_data" / "06_dataset_cache"
+TUNED_DIR = PIPELINE_ROOT / "ml_data" / "06_optuna"
+SELECTED_PATH = PIPELINE_ROOT / "ml_data" / "06_feature_select" / "selected_features.json"
 ROOT_DIR = PIPELINE_ROOT.parent
 LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_train.log"
 CONFIG_PATH = Path(__file__).parent / "config" / "train_config.yaml"
 CONFIG = load_yaml_config(CONFIG_PATH)
+DATASET_CACHE = DatasetCache(CACHE_DIR)
 
 # 학습 시 사용할 피처 목록은 데이터에 존재하는 컬럼에서 자동 추출한다.
 IGNORE_COLS = {"timestamp", "label", "signal1", "signal2", "signal3"}
 
-def train_and_eval(symbol: str) -> None:
-    """단일 심볼의 모델을 학습하고 저장한다."""
-    train_path = SPLIT_DIR / f"{symbol}_train.parquet"
-    valid_path = SPLIT_DIR / f"{symbol}_valid.parquet"
+def _selected() -> list[str] | None:
+    """``features.use_selected`` 이면 06_feature_select 가 고른 피처 목록."""
+    if not (CONFIG.get("features") or {}).get("use_selected"):
+        return None
+    return load_selected(SELECTED_PATH)
 
-    try:
-        train_df = pd.read_parquet(train_path)
-        valid_df = pd.read_parquet(valid_path)
-    except Exception as exc:  # pragma: no cover - best effort
-        logging.warning("%s 데이터 로드 실패: %s", symbol, exc)
-        return
+
+def _load_frames(symbol: str) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
+    """학습/검증 세트를 읽어 숫자형으로 정리하고 피처 목록과 함께 반환."""
+    train_df = load_split(SPLIT_DIR, symbol, "train")
+    valid_df = load_split(SPLIT_DIR, symbol, "valid")
 
     # 학습 피처 자동 추출 - 숫자형 컬럼만 사용하도록 변환/필터링
     for df in (train_df, valid_df):
@@ -49,51 +71,234 @@ def train_and_eval(symbol: str) -> None:
 
     numeric_cols = train_df.select_dtypes(include=["number", "bool"]).columns
     features = [c for c in numeric_cols if c not in IGNORE_COLS]
+    selected = _selected()
+    if selected is not None:
+        features = [c for c in features if c in set(selected)]
     for df in (train_df, valid_df):
         for f in features:
             if f not in df.columns:
                 df[f] = 0
+    return train_df, valid_df, features
+
 
+def _target(df: pd.DataFrame) -> pd.Series:
     # ✅ signal1을 양성 클래스로 사용
-    y_train = train_df.get("signal1", pd.Series([0] * len(train_df))).astype(int)
-    y_valid = valid_df.get("signal1", pd.Series([0] * len(valid_df))).astype(int)
+    return df.get("signal1", pd.Series([0] * len(df))).astype(int)
 
+
+def _cached_split(symbol: str) -> tuple[CachedSplit | None, pd.DataFrame | None]:
+    """캐시된 Dataset 을 반환하고, 없으면 데이터를 읽어 캐시를 만든다.
+
+    캐시를 새로 만든 경우 정리된 학습 DataFrame 도 함께 반환한다.
+    """
+    signature = dataset_signature(SPLIT_DIR, symbol, _selected())
+    cached = DATASET_CACHE.load(symbol, signature)
+    if cached is not None:
+        return cached, None
+
+    train_df, valid_df, features = _load_frames(symbol)
     if not features:
         logging.warning("%s 학습 스킵: 사용 가능한 피처가 없습니다.", symbol)
+        return None, None
+    y_train = _target(train_df)
+    y_valid = _target(valid_df)
+    meta = {
+        "rows": len(train_df),
+        "trained_until": str(train_df["timestamp"].max()) if "timestamp" in train_df else None,
+        "label_classes": int(y_train.nunique()),
+        "feature_stats": _feature_stats(train_df[features]),
+        "signal_support": {
+            col: int(valid_df.get(col, pd.Series(dtype=int)).sum())
+            for col in ("signal1", "signal2", "signal3")
+        },
+    }
+    cached = DATASET_CACHE.build(
+        symbol, signature, train_df[features], y_train, valid_df[features], y_valid, meta
+    )
+    return cached, train_df
+
+
+def _model_params(symbol: str) -> dict:
+    """``model`` 설정에 06_optuna_tpe 가 찾은 값 (심볼별, 없으면 공통) 을 덮어쓴 파라미터."""
+    params = dict(CONFIG["model"])
+    if not (CONFIG.get("optuna") or {}).get("use_tuned", True):
+        return params
+    for name in (f"{symbol}_params.json", "pooled_params.json"):
+        try:
+            with open(TUNED_DIR / name, "r", encoding="utf-8") as f:
+                params.update(json.load(f)["params"])
+            break
+        except FileNotFoundError:
+            continue
+        except Exception as exc:  # pragma: no cover - best effort
+            logging.warning("%s 튜닝 파라미터 로드 실패: %s", name, exc)
+    return params
+
+
+def train_and_eval(symbol: str, now: datetime | None = None) -> None:
+    """단일 심볼의 모델을 학습하고 저장한다.
+
+    학습 데이터는 ``DATASET_CACHE`` 의 LightGBM 바이너리 Dataset 으로 재사용한다.
+    ``incremental.enabled`` 이면 직전 모델에서 이어서 부스팅하고, 예약된 주기,
+    피처 변경, 드리프트, AUC 하락 시에만 처음부터 다시 학습한다. 학습 이력은
+    metrics JSON 의 ``lineage`` 에 기록된다.
+    """
+    try:
+        cached, train_df = _cached_split(symbol)
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 데이터 로드 실패: %s", symbol, exc)
+        return
+    if cached is None:
         return
 
-    if y_train.nunique() < 2:
+    meta = cached.meta
+    features = meta["features"]
+    if meta["label_classes"] < 2:
         logging.warning("%s 학습 스킵: 라벨이 한 종류뿐입니다.", symbol)
         return
 
-    X_train = train_df[features]
-    X_valid = valid_df[features]
+    inc = CONFIG.get("incremental") or {}
+    now = now or datetime.now()
+    prev_model, prev_metrics = _load_previous(symbol)
+    prev_lineage = (prev_metrics or {}).get("lineage")
+    params = _model_params(symbol)
+    reason = _refresh_reason(inc, prev_model, prev_lineage, features, meta, now, params)
+
+    model = None
+    if reason is None and meta["trained_until"] == prev_lineage["trained_until"]:
+        logging.info("[TRAIN] %s 신규 데이터 없음, 기존 모델 유지", symbol)
+        return
+    if reason is None:
+        if train_df is None:
+            train_df = _load_frames(symbol)[0]
+        new_rows = train_df["timestamp"] > pd.Timestamp(prev_lineage["trained_until"])
+        X_new = train_df.loc[new_rows, features]
+        y_new = _target(train_df)[new_rows]
+        drift = _drift(X_new, prev_lineage["reference"].get("feature_stats", {}))
+        if drift > float(inc.get("max_drift", 0.5)):
+            logging.info("[TRAIN] %s 피처 드리프트 %.2f 감지, 전체 재학습", symbol, drift)
+            reason = "drift"
+        elif len(X_new) < int(inc.get("min_new_rows", 1)) or y_new.nunique() < 2:
+            # 신규 행이 모일 때까지 기존 모델 유지 (trained_until 을 갱신하지 않음)
+            logging.info("[TRAIN] %s 증분 학습 스킵: 신규 행 %d개", symbol, len(X_new))
+            return
+        else:
+            # 신규 행은 캐시된 학습 Dataset 의 구간 경계를 그대로 사용
+            new_set = lgb.Dataset(
+                X_new.to_numpy(dtype=np.float32),
+                label=y_new.to_numpy(),
+                weight=balanced_weights(y_new.to_numpy()),
+                feature_name=features,
+                reference=cached.train,
+                params=DATASET_CACHE.params,
+            )
+            model = _fit(
+                new_set,
+                cached,
+                n_estimators=int(inc.get("extra_estimators", 50)),
+                params=params,
+                init_model=trimmed_booster(prev_model),
+            )
+            metrics = _evaluate(model, cached)
+            reference = prev_lineage["reference"]
+            if metrics["auc"] < reference["auc"] - float(inc.get("max_auc_drop", 0.05)):
+                logging.info(
+                    "[TRAIN] %s 증분 모델 AUC 하락 %.4f → %.4f, 전체 재학습",
+                    symbol,
+                    reference["auc"],
+                    metrics["auc"],
+                )
+                model, reason = None, "auc_drop"
+            else:
+                metrics["lineage"] = {
+                    "mode": "incremental",
+                    "version": prev_lineage["version"] + 1,
+                    "parent_version": prev_lineage["version"],
+                    "base_version": prev_lineage["base_version"],
+                    "base_trained_at": prev_lineage["base_trained_at"],
+                    "trained_at": now.isoformat(timespec="seconds"),
+                    "trained_until": meta["trained_until"],
+                    "new_rows": len(X_new),
+                    "num_trees": model.booster_.num_trees(),
+                    "refresh_reason": None,
+                    "params": params,
+                    "reference": reference,
+                }
+
+    if model is None:
+        model = _fit(cached.train, cached, n_estimators=params["n_estimators"], params=params)
+        metrics = _evaluate(model, cached)
+        version = prev_lineage["version"] + 1 if prev_lineage else 1
+        metrics["lineage"] = {
+            "mode": "full",
+            "version": version,
+            "parent_version": None,
+            "base_version": version,
+            "base_trained_at": now.isoformat(timespec="seconds"),
+            "trained_at": now.isoformat(timespec="seconds"),
+            "trained_until": meta["trained_until"],
+            "new_rows": meta["rows"],
+            "num_trees": model.booster_.num_trees(),
+            "refresh_reason": reason,
+            "params": params,
+            "reference": {"auc": metrics["auc"], "feature_stats": meta["feature_stats"]},
+        }
 
-    params = CONFIG["model"]
-    model = lgb.LGBMClassifier(
-        class_weight="balanced",
-        learning_rate=params["learning_rate"],
-        num_leaves=params["num_leaves"],
-        n_estimators=params["n_estimators"],
-        random_state=42,
+    ensure_dir(MODEL_DIR)
+    version = ModelRegistry(MODEL_DIR).publish(
+        symbol,
+        model,
+        {
+            "features": features,
+            "trained_until": meta["trained_until"],
+            "train_rows": meta["rows"],
+            "metrics": metrics,
+        },
     )
-    callbacks: list[lgb.callback.Callback] = []
-    early_stopping_rounds = params.get("early_stopping_rounds")
-    if early_stopping_rounds:
-        callbacks.append(lgb.early_stopping(early_stopping_rounds))
 
-    model.fit(
-        X_train,
-        y_train,
-        eval_set=[(X_valid, y_valid)],
-        callbacks=callbacks or None,
+    metrics_path = MODEL_DIR / f"{symbol}_metrics.json"
+    with open(metrics_path, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+
+    logging.info(
+        "[TRAIN] %s published model v%d (%s v%d, reason=%s) and metrics %s (signal1 %d건)",
+        symbol,
+        version,
+        metrics["lineage"]["mode"],
+        metrics["lineage"]["version"],
+        metrics["lineage"]["refresh_reason"],
+        metrics.get("accuracy"),
+        metrics["signal1_support"],
+    )
+
+
+def _fit(
+    train_set: lgb.Dataset,
+    cached: CachedSplit,
+    n_estimators: int,
+    params: dict | None = None,
+    init_model: lgb.Booster | None = None,
+) -> BoosterClassifier:
+    """설정값(``params`` 가 없으면 ``model`` 항목)으로 부스팅 (``init_model`` 이 있으면 이어서 부스팅)."""
+    return train_booster(
+        params or CONFIG["model"],
+        train_set,
+        cached.X_valid,
+        cached.y_valid,
+        cached.meta["features"],
+        DATASET_CACHE.params,
+        n_estimators,
+        init_model=init_model,
     )
 
-    y_pred = model.predict(X_valid)
-    y_prob = model.predict_proba(X_valid)[:, 1]
+
+def _evaluate(model: BoosterClassifier, cached: CachedSplit) -> dict:
+    y_valid = cached.y_valid
+    y_prob = model.predict_proba(cached.X_valid)[:, 1]
+    y_pred = (y_prob > 0.5).astype(int)
 
     # 평가 지표: 성공 vs 실패로 계산 (상세 분포는 별도 분석)
-    metrics: dict[str, float | dict[str, float]] = classification_report(
+    metrics: dict = classification_report(
         y_valid,
         y_pred,
         output_dict=True,
@@ -103,25 +308,262 @@ def train_and_eval(symbol: str) -> None:
         metrics["auc"] = roc_auc_score(y_valid, y_prob)
     except ValueError:
         metrics["auc"] = 0.0
-    metrics["signal1_support"] = int(valid_df.get("signal1", pd.Series()).sum())
-    metrics["signal2_support"] = int(valid_df.get("signal2", pd.Series()).sum())
-    metrics["signal3_support"] = int(valid_df.get("signal3", pd.Series()).sum())
+    for col, support in cached.meta["signal_support"].items():
+        metrics[f"{col}_support"] = support
+    return metrics
 
-    ensure_dir(MODEL_DIR)
-    model_path = MODEL_DIR / f"{symbol}_model.pkl"
-    joblib.dump(model, model_path)
 
-    metrics_path = MODEL_DIR / f"{symbol}_metrics.json"
-    with open(metrics_path, "w", encoding="utf-8") as f:
+def _load_previous(symbol: str) -> tuple[BoosterClassifier | None, dict | None]:
+    """레지스트리에 공개된 직전 모델과 metrics (없으면 None)."""
+    registry = ModelRegistry(MODEL_DIR)
+    if registry.current_version(symbol) is None:
+        return None, None
+    try:
+        model, meta = registry.load(symbol)
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 이전 모델 로드 실패: %s", symbol, exc)
+        return None, None
+    return model, meta.get("metrics")
+
+
+def _feature_stats(X: pd.DataFrame) -> dict[str, list[float]]:
+    """드리프트 판단용 피처별 [평균, 표준편차]."""
+    values = X.astype("float64")
+    return {
+        col: [float(m), float(s)]
+        for col, m, s in zip(X.columns, values.mean().fillna(0), values.std(ddof=0).fillna(0))
+    }
+
+
+def _drift(X_new: pd.DataFrame, stats: dict[str, list[float]]) -> float:
+    """신규 구간 피처 평균의 이동량 (표준편차 단위) 중앙값.
+
+    가격 수준 피처(EMA, VWAP, OBV 등)는 추세만으로도 크게 움직이므로 최대값 대신
+    중앙값으로 피처 전반의 분포 변화를 판단한다.
+    """
+    means = X_new.astype("float64").mean()
+    shifts = [
+        abs(means[col] - mean) / std
+        for col, (mean, std) in stats.items()
+        if col in means and std > 0
+    ]
+    return float(np.median(shifts)) if shifts else 0.0
+
+
+def _refresh_reason(
+    inc: dict,
+    prev_model: BoosterClassifier | None,
+    lineage: dict | None,
+    features: list[str],
+    meta: dict,
+    now: datetime,
+    params: dict | None = None,
+) -> str | None:
+    """데이터를 읽지 않고 판단할 수 있는 전체 재학습 사유 (None 이면 증분 후보)."""
+    if not inc.get("enabled"):
+        return "disabled"
+    if prev_model is None or not lineage or lineage.get("trained_until") is None:
+        return "no_model"
+    if meta["trained_until"] is None:
+        return "no_timestamp"
+    if list(getattr(prev_model, "feature_name_", [])) != list(features):
+        return "features_changed"
+    # 튜닝 결과가 바뀌면 이전 파라미터로 쌓은 트리에 이어 붙이지 않음
+    if params is not None and lineage.get("params", params) != params:
+        return "params_changed"
+    base_trained_at = datetime.fromisoformat(lineage["base_trained_at"])
+    if now - base_trained_at >= timedelta(hours=float(inc.get("refresh_hours", 24))):
+        return "schedule"
+    if prev_model.booster_.num_trees() >= int(inc.get("max_trees", 1000)):
+        return "tree_limit"
+    return None
+
+
+def _own_auc(symbol: str, X_valid: pd.DataFrame, y_valid: np.ndarray) -> float | None:
+    """공개된 심볼 모델을 공통 모델과 같은 검증 행으로 평가한 AUC (모델이 없으면 None).
+
+    ``X_valid`` 는 공통 Dataset 에서 이 심볼의 검증 행이며, 공통 피처에 없는 모델
+    피처는 같은 검증 세트에서 읽어 채운다.
+    """
+    registry = ModelRegistry(MODEL_DIR)
+    if registry.current_version(symbol) is None:
+        return None
+    try:
+        model, model_meta = registry.load(symbol)
+        features = [str(f) for f in model_meta.get("features") or getattr(model, "feature_names_in_", [])]
+        X = X_valid.reset_index(drop=True)
+        missing = [f for f in features if f not in X.columns]
+        if missing:
+            valid_df = load_split(SPLIT_DIR, symbol, "valid")
+            if len(valid_df) != len(X):
+                raise ValueError(f"검증 행 수 불일치 ({len(valid_df)} != {len(X)})")
+            extra = valid_df.reindex(columns=missing).apply(pd.to_numeric, errors="coerce").fillna(0)
+            X = pd.concat([X, extra.reset_index(drop=True)], axis=1)
+        prob = model.predict_proba(X[features].to_numpy(dtype=np.float32))[:, 1]
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 심볼 모델 검증 실패: %s", symbol, exc)
+        return None
+    if len(np.unique(y_valid)) < 2:
+        return 0.0
+    return float(roc_auc_score(y_valid, prob))
+
+
+def _own_due(symbol: str, now: datetime, hours: float) -> bool:
+    """공통 모델과 비교할 자기 모델이 없거나 마지막 학습 후 ``hours`` 시간이 지났는지."""
+    try:
+        with open(MODEL_DIR / f"{symbol}_metrics.json", encoding="utf-8") as f:
+            trained_at = json.load(f)["lineage"]["trained_at"]
+    except Exception:
+        return True
+    return now - datetime.fromisoformat(trained_at) >= timedelta(hours=hours)
+
+
+def _pooled_split(symbols: list[str], regimes: int) -> CachedSplit | None:
+    """심볼별 학습/검증 행을 쌓은 공통 Dataset (캐시가 없으면 만든다)."""
+    signature = {
+        "symbols": {s: dataset_signature(SPLIT_DIR, s) for s in symbols},
+        "features": _selected(),
+        "regimes": regimes,
+    }
+    cached = DATASET_CACHE.load(POOLED_MODEL, signature)
+    if cached is not None:
+        return cached
+
+    frames = {}
+    for symbol in symbols:
+        try:
+            train_df, valid_df, features = _load_frames(symbol)
+        except Exception as exc:  # pragma: no cover - best effort
+            logging.warning("%s 데이터 로드 실패: %s", symbol, exc)
+            continue
+        if features:
+            frames[symbol] = (train_df, valid_df, features)
+    features = common_features([f for _, _, f in frames.values()])
+    if not features:
+        logging.warning("[TRAIN] 공통 모델 학습 스킵: 공통 피처가 없습니다.")
+        return None
+    names = list(frames)
+    edges = regime_edges(
+        np.concatenate([t.get(REGIME_SOURCE, pd.Series(dtype=float)).to_numpy(dtype=float)
+                        for t, _, _ in frames.values()]),
+        regimes,
+    )
+    columns = features + POOL_FEATURES
+    parts: dict[str, list] = {"X_train": [], "y_train": [], "X_valid": [], "y_valid": []}
+    for k, (train_df, valid_df, _) in enumerate(frames.values()):
+        for df, part in ((train_df, "train"), (valid_df, "valid")):
+            add_pool_features(df, k, edges)
+            parts[f"X_{part}"].append(df[columns].astype(np.float32))
+            parts[f"y_{part}"].append(_target(df))
+    X_train = pd.concat(parts["X_train"], ignore_index=True)
+    y_train = pd.concat(parts["y_train"], ignore_index=True)
+    meta = {
+        "rows": len(X_train),
+        "symbols": names,
+        "vol_edges": edges,
+        "trained_until": {
+            s: str(t["timestamp"].max()) if "timestamp" in t else None for s, (t, _, _) in frames.items()
+        },
+        "label_classes": int(y_train.nunique()),
+        "signal_support": {
+            col: int(sum(v.get(col, pd.Series(dtype=int)).sum() for _, v, _ in frames.values()))
+            for col in ("signal1", "signal2", "signal3")
+        },
+    }
+    return DATASET_CACHE.build(
+        POOLED_MODEL,
+        signature,
+        X_train,
+        y_train,
+        pd.concat(parts["X_valid"], ignore_index=True),
+        pd.concat(parts["y_valid"], ignore_index=True),
+        meta,
+        categorical=[SYMBOL_FEATURE],
+    )
+
+
+def train_pooled(symbols: list[str], now: datetime | None = None) -> list[str]:
+    """모든 심볼을 쌓은 공통 모델 하나를 학습/공개하고, 자기 모델로 학습할 심볼 목록을 반환.
+
+    공통 모델의 심볼별 검증 AUC 가 ``pooled.min_auc`` 미만이거나 공개된 자기
+    모델보다 ``pooled.max_auc_gap`` 이상 낮은 심볼은 ``routing`` 에 ``symbol`` 로
+    기록되어 기존 방식대로 학습/예측한다. ``pooled`` 로 라우팅된 심볼의 자기
+    모델은 ``main`` 이 ``pooled.own_refresh_hours`` 주기로 갱신해 비교 기준으로
+    쓴다. 데이터와 파라미터가 그대로이면 기존 공통 모델을 유지한다.
+    """
+    cfg = CONFIG.get("pooled") or {}
+    try:
+        cached = _pooled_split(symbols, int(cfg.get("vol_regimes", 3)))
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("[TRAIN] 공통 모델 데이터 로드 실패: %s", exc)
+        cached = None
+    if cached is None or cached.meta["label_classes"] < 2:
+        logging.warning("[TRAIN] 공통 모델 학습 스킵, 심볼별로 학습합니다.")
+        return symbols
+
+    meta = cached.meta
+    pooled = set(meta["symbols"])
+    params = _model_params(POOLED_MODEL)
+    previous = load_pooled(MODEL_DIR)
+    if previous is not None:
+        prev_meta = previous[1]
+        prev_lineage = prev_meta["metrics"]["lineage"]
+        if prev_meta["trained_until"] == meta["trained_until"] and prev_lineage["params"] == params:
+            logging.info("[TRAIN] 공통 모델 신규 데이터 없음, 기존 모델 유지")
+            routing = prev_meta.get("routing", {})
+            return [s for s in symbols if routing.get(s, "symbol") == "symbol"]
+
+    now = now or datetime.now()
+    model = _fit(cached.train, cached, n_estimators=params["n_estimators"], params=params)
+    metrics = _evaluate(model, cached)
+    prob = model.predict_proba(cached.X_valid)[:, 1]
+    ids = cached.X_valid[:, meta["features"].index(SYMBOL_FEATURE)]
+    metrics["symbol_auc"] = symbol_auc(prob, cached.y_valid, ids, meta["symbols"])
+    X_valid = pd.DataFrame(cached.X_valid, columns=meta["features"])
+    own_auc = {s: _own_auc(s, X_valid[ids == k], cached.y_valid[ids == k]) for k, s in enumerate(meta["symbols"])}
+    metrics["own_auc"] = own_auc
+    routing = route_symbols(
+        metrics["symbol_auc"],
+        own_auc,
+        float(cfg.get("max_auc_gap", 0.02)),
+        float(cfg.get("min_auc", 0.5)),
+    )
+    metrics["lineage"] = {
+        "mode": "pooled",
+        "trained_at": now.isoformat(timespec="seconds"),
+        "new_rows": meta["rows"],
+        "num_trees": model.booster_.num_trees(),
+        "params": params,
+    }
+
+    ensure_dir(MODEL_DIR)
+    version = ModelRegistry(MODEL_DIR).publish(
+        POOLED_MODEL,
+        model,
+        {
+            "features": meta["features"],
+            "symbols": meta["symbols"],
+            "vol_edges": meta["vol_edges"],
+            "routing": routing,
+            "trained_until": meta["trained_until"],
+            "train_rows": meta["rows"],
+            "metrics": metrics,
+        },
+    )
+    with open(MODEL_DIR / f"{POOLED_MODEL}_metrics.json", "w", encoding="utf-8") as f:
         json.dump(metrics, f, indent=2)
 
+    fallback = [s for s in symbols if s not in pooled or routing[s] == "symbol"]
     logging.info(
-        "[TRAIN] %s saved model %s and metrics %s (signal1 %d건)",
-        symbol,
-        model_path.name,
-        metrics.get("accuracy"),
-        metrics["signal1_support"],
+        "[TRAIN] 공통 모델 v%d 공개: %d개 심볼, %d행, auc=%.4f, 심볼 모델 유지 %s",
+        version,
+        len(pooled),
+        meta["rows"],
+        metrics["auc"],
+        fallback,
     )
+    return fallback
+
 
 def main() -> None:
     """실행 엔트리 포인트."""
@@ -130,10 +572,21 @@ def main() -> None:
     setup_logger(LOG_PATH)
     logging.info("[SETUP] SPLIT_DIR=%s", SPLIT_DIR)
     logging.info("[SETUP] MODEL_DIR=%s", MODEL_DIR)
-    
-    for file in SPLIT_DIR.glob("*_train.parquet"):
-        symbol = file.stem.split("_")[0]
+
+    symbols = list_symbols(SPLIT_DIR, "train")
+    cfg = CONFIG.get("pooled") or {}
+    if cfg.get("enabled"):
+        # 공통 모델로 라우팅된 심볼도 자기 모델을 느린 주기로 갱신해, 라우팅 비교가
+        # 오래된 자기 모델이 아니라 최신 도전 모델을 기준으로 하도록 한다.
+        now = datetime.now()
+        hours = float(cfg.get("own_refresh_hours", 24))
+        refreshed = [s for s in symbols if _own_due(s, now, hours)]
+        for symbol in refreshed:
+            train_and_eval(symbol, now)
+        symbols = [s for s in train_pooled(symbols, now) if s not in refreshed]
+    for symbol in symbols:
         train_and_eval(symbol)
 
+
 if __name__ == "__main__":
     main()
@@ -1,4 +1,8 @@
-"""테스트 세트를 이용해 학습된 모델을 평가한다."""
+"""테스트 세트를 이용해 학습된 모델을 평가한다.
+
+``pooled.enabled`` 이고 공통 모델(``_pooled``)이 공개되어 있으면 08_predict 와 같이 라우팅이 ``pooled`` 인
+심볼은 공통 모델로 평가하고, 공통 모델 자체의 테스트 지표도 저장한다.
+"""
 
 from __future__ import annotations
 
@@ -6,7 +10,6 @@ import json
 import logging
 from pathlib import Path
 
-import joblib
 import numpy as np
 import pandas as pd
 from sklearn.metrics import (
@@ -16,6 +19,9 @@ from sklearn.metrics import (
     roc_auc_score,
 )
 
+from model_registry import list_models, load_model
+from pooled_model import POOLED_MODEL, active_pooled, pooled_symbols, predict_universe
+from split_io import load_split
 from utils import ensure_dir, setup_logger
 
 PIPELINE_ROOT = Path(__file__).resolve().parent
@@ -24,46 +30,36 @@ MODEL_DIR = PIPELINE_ROOT / "ml_data" / "06_models"
 EVAL_DIR = PIPELINE_ROOT / "ml_data" / "07_eval"
 ROOT_DIR = PIPELINE_ROOT.parent
 LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_eval.log"
+CONFIG_PATH = PIPELINE_ROOT / "config" / "train_config.yaml"
 
 
 # 평가 단계에서도 모델에 저장된 피처 목록을 우선 사용한다.
 IGNORE_COLS = {"timestamp", "label", "signal1", "signal2", "signal3"}
 
-def evaluate(symbol: str) -> None:
-    """단일 심볼의 모델을 평가해 JSON으로 저장."""
-    test_path = SPLIT_DIR / f"{symbol}_test.parquet"
-    model_path = MODEL_DIR / f"{symbol}_model.pkl"
+def _numeric(df: pd.DataFrame) -> None:
+    """문자열 숫자 컬럼을 숫자로 바꾸고 결측을 0 으로 채운다 (``df`` 를 직접 수정)."""
+    for col in df.columns:
+        if df[col].dtype == "object":
+            converted = pd.to_numeric(df[col], errors="coerce")
+            if pd.api.types.is_numeric_dtype(converted):
+                df[col] = converted
+    df.fillna(0, inplace=True)
 
-    try:
-        test_df = pd.read_parquet(test_path)
-        model = joblib.load(model_path)
-    except Exception as exc:  # pragma: no cover - best effort
-        logging.warning("%s 평가 로드 실패: %s", symbol, exc)
-        return
 
-    # 모델이 학습에 사용한 피처 목록을 우선 사용하고, 없으면 데이터에서 추출
-    features = getattr(model, "feature_names_in_", None)
-    if features is None:
-        features = [c for c in test_df.columns if c not in IGNORE_COLS]
+def _next_roi(df: pd.DataFrame) -> pd.Series | None:
+    """다음 봉 종가 기준 수익률 (종가가 없으면 None)."""
+    if "close" not in df.columns:
+        return None
+    return (df["close"].shift(-1) - df["close"]) / df["close"]
 
-    for f in features:
-        if f not in test_df.columns:
-            test_df[f] = 0
-
-    for col in test_df.columns:
-        if test_df[col].dtype == "object":
-            converted = pd.to_numeric(test_df[col], errors="coerce")
-            if pd.api.types.is_numeric_dtype(converted):
-                test_df[col] = converted
-    test_df.fillna(0, inplace=True)
 
-    X_test = test_df[features]
+def compute_metrics(
+    test_df: pd.DataFrame, y_pred: np.ndarray, y_prob: np.ndarray, roi: pd.Series | None
+) -> dict:
+    """예측 결과의 분류 지표와 진입 수익률 지표."""
     # ✅ signal1을 기준으로 성공 여부 판단
     y_true = test_df.get("signal1", pd.Series([0] * len(test_df))).astype(int)
 
-    y_pred = model.predict(X_test)
-    y_prob = model.predict_proba(X_test)[:, 1]
-
     metrics: dict[str, float | dict[str, float]] = classification_report(
         y_true,
         y_pred,
@@ -82,7 +78,7 @@ def evaluate(symbol: str) -> None:
         metrics["pr_auc"] = average_precision_score(y_true, y_prob)
     metrics["brier"] = brier_score_loss(y_true, y_prob)
 
-    preds = y_pred == 1
+    preds = np.asarray(y_pred) == 1
     # ✅ signal1이 True일 때 성공으로 간주
     wins = preds & test_df.get("signal1", pd.Series()).astype(bool)
     metrics["win_rate"] = float(wins.sum() / preds.sum()) if preds.sum() else 0.0
@@ -93,9 +89,7 @@ def evaluate(symbol: str) -> None:
     metrics["signal3_support"] = int(test_df.get("signal3", pd.Series()).sum())
 
     # ROI/Sharpe 계산: horizon/라벨 기준 적용
-    if "close" in test_df.columns:
-        future_close = test_df["close"].shift(-1)
-        roi = (future_close - test_df["close"]) / test_df["close"]
+    if roi is not None:
         trade_roi = roi[preds].fillna(0)
         metrics["avg_roi"] = float(trade_roi.mean()) if not trade_roi.empty else 0.0
         if trade_roi.std(ddof=0) != 0 and not trade_roi.empty:
@@ -106,19 +100,91 @@ def evaluate(symbol: str) -> None:
     else:
         metrics["avg_roi"] = 0.0
         metrics["sharpe"] = 0.0
+    return metrics
+
 
+def save_metrics(name: str, metrics: dict) -> None:
+    """``{name}_metrics.json`` 으로 저장."""
     ensure_dir(EVAL_DIR)
-    metrics_path = EVAL_DIR / f"{symbol}_metrics.json"
+    metrics_path = EVAL_DIR / f"{name}_metrics.json"
     with open(metrics_path, "w", encoding="utf-8") as f:
         json.dump(metrics, f, indent=2)
 
     logging.info(
         "[EVAL] %s saved metrics %s (signal1 %d건)",
-        symbol,
+        name,
         metrics_path.name,
         metrics["signal1_support"],
     )
 
+
+def evaluate(symbol: str) -> None:
+    """단일 심볼의 모델을 평가해 JSON으로 저장."""
+    try:
+        test_df = load_split(SPLIT_DIR, symbol, "test")
+        model, _ = load_model(MODEL_DIR, symbol)
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 평가 로드 실패: %s", symbol, exc)
+        return
+
+    # 모델이 학습에 사용한 피처 목록을 우선 사용하고, 없으면 데이터에서 추출
+    features = getattr(model, "feature_names_in_", None)
+    if features is None:
+        features = [c for c in test_df.columns if c not in IGNORE_COLS]
+
+    for f in features:
+        if f not in test_df.columns:
+            test_df[f] = 0
+
+    _numeric(test_df)
+
+    X_test = test_df[features]
+    y_pred = model.predict(X_test)
+    y_prob = model.predict_proba(X_test)[:, 1]
+    save_metrics(symbol, compute_metrics(test_df, y_pred, y_prob, _next_roi(test_df)))
+
+
+def evaluate_pooled(pooled: tuple, routed: list[str]) -> None:
+    """공통 모델을 학습에 쓴 모든 심볼의 테스트 세트로 평가.
+
+    08_predict 와 같이 ``predict_universe`` 로 한 번에 예측하고, 전체 지표는
+    ``_pooled_metrics.json`` 에, ``routed`` 심볼은 심볼별 지표 파일에 저장한다.
+    """
+    model, meta = pooled
+    frames = {}
+    for symbol in meta["symbols"]:
+        try:
+            df = load_split(SPLIT_DIR, symbol, "test")
+        except Exception as exc:  # pragma: no cover - best effort
+            logging.warning("%s 평가 로드 실패: %s", symbol, exc)
+            continue
+        _numeric(df)
+        frames[symbol] = df
+
+    probs = predict_universe(model, meta, frames)
+    if not probs:
+        logging.info("[EVAL] 공통 모델 평가 대상 없음")
+        return
+    # LGBMClassifier.predict 와 같은 기준 (양성 확률 > 0.5)
+    preds = {s: (p > 0.5).astype(int) for s, p in probs.items()}
+    for symbol in routed:
+        if symbol in probs:
+            df = frames[symbol]
+            save_metrics(symbol, compute_metrics(df, preds[symbol], probs[symbol], _next_roi(df)))
+
+    names = list(probs)
+    stacked = pd.concat([frames[s] for s in names], ignore_index=True)
+    rois = [_next_roi(frames[s]) for s in names]
+    roi = pd.concat(rois, ignore_index=True) if all(r is not None for r in rois) else None
+    metrics = compute_metrics(
+        stacked,
+        np.concatenate([preds[s] for s in names]),
+        np.concatenate([probs[s] for s in names]),
+        roi,
+    )
+    metrics["symbols"] = names
+    save_metrics(POOLED_MODEL, metrics)
+
 def main() -> None:
     """실행 엔트리 포인트."""
     ensure_dir(SPLIT_DIR)
@@ -126,9 +192,13 @@ def main() -> None:
     ensure_dir(EVAL_DIR)
     setup_logger(LOG_PATH)
 
-    for model_file in MODEL_DIR.glob("*_model.pkl"):
-        symbol = model_file.stem.split("_")[0]
-        evaluate(symbol)
+    pooled = active_pooled(MODEL_DIR, CONFIG_PATH)
+    routed = pooled_symbols(pooled[1]) if pooled is not None else []
+    if pooled is not None:
+        evaluate_pooled(pooled, routed)
+    for symbol in list_models(MODEL_DIR):
+        if symbol not in routed:
+            evaluate(symbol)
 
 if __name__ == "__main__":
     main()
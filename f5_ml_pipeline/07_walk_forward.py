@@ -0,0 +1,91 @@
+"""워크 포워드 창마다 학습/평가/백테스트해 심볼별 성과를 집계한다."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from split_io import fold_count, list_symbols
+from utils import ensure_dir, load_yaml_config, setup_logger
+from walk_forward import aggregate, run_tasks
+
+PIPELINE_ROOT = Path(__file__).resolve().parent
+SPLIT_DIR = PIPELINE_ROOT / "ml_data" / "05_split"
+LABEL_DIR = PIPELINE_ROOT / "ml_data" / "04_label"
+CACHE_DIR = PIPELINE_ROOT / "ml_data" / "06_dataset_cache"
+OUT_DIR = PIPELINE_ROOT / "ml_data" / "07_walk_forward"
+ROOT_DIR = PIPELINE_ROOT.parent
+LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_walk_forward.log"
+CONFIG_PATH = PIPELINE_ROOT / "config" / "train_config.yaml"
+MAX_WORKERS = os.cpu_count() or 1
+
+
+def load_params(symbol: str) -> dict | None:
+    """04_labeling 이 고른 백테스트 파라미터 (없으면 None, 백테스트 생략)."""
+    try:
+        with open(LABEL_DIR / f"{symbol}_best_params.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 파라미터 로드 실패: %s", symbol, exc)
+        return None
+
+
+def build_tasks(config: dict) -> list[tuple]:
+    """심볼별 (창 목록) 작업. warm start 를 끄면 창마다 작업 하나."""
+    warm = bool((config.get("walk_forward") or {}).get("warm_start"))
+    tasks = []
+    for symbol in list_symbols(SPLIT_DIR):
+        folds = list(range(fold_count(SPLIT_DIR, symbol)))
+        if not folds:
+            continue
+        params = load_params(symbol)
+        groups = [folds] if warm else [[k] for k in folds]
+        tasks.extend((str(SPLIT_DIR), str(CACHE_DIR), symbol, group, config, params) for group in groups)
+    return tasks
+
+
+def main(workers: int = MAX_WORKERS) -> None:
+    """실행 엔트리 포인트."""
+    ensure_dir(OUT_DIR)
+    setup_logger(LOG_PATH)
+    config = load_yaml_config(CONFIG_PATH)
+    if not int((config.get("walk_forward") or {}).get("folds", 0)):
+        logging.info("[WF] walk_forward.folds 가 0 이라 건너뜁니다")
+        return
+
+    tasks = build_tasks(config)
+    start = time.perf_counter()
+    rows = run_tasks(tasks, workers=workers)
+    pd.DataFrame(rows).to_csv(OUT_DIR / "walk_forward_folds.csv", index=False)
+    summary = aggregate(rows)
+    with open(OUT_DIR / "walk_forward_summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    for symbol, item in summary.items():
+        logging.info(
+            "[WF] %s folds=%d auc=%.4f±%.4f bt_avg_roi=%.4f entries=%d",
+            symbol,
+            item["folds"],
+            item["auc_mean"],
+            item["auc_std"],
+            item["bt_avg_roi_mean"],
+            item["bt_total_entries"],
+        )
+    logging.info(
+        "[WF] %d tasks, %d fold results in %.1fs (workers=%d)",
+        len(tasks),
+        len(rows),
+        time.perf_counter() - start,
+        workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
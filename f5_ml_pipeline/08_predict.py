@@ -1,13 +1,23 @@
-"""새로운 데이터에 학습된 모델을 적용해 예측값을 저장한다."""
+"""새로운 데이터에 학습된 모델을 적용해 예측값을 저장한다.
+
+매 실행마다 마지막으로 예측한 시점 이후의 새 행만 읽어 예측하고
+``pred_store.PredictionStore`` 에 이어 붙인다. ``pooled.enabled`` 이고 06 단계가
+공통 모델을 공개했으면 공통 모델로 라우팅된 심볼들의 새 행을 쌓아 한 번에
+예측한다.
+"""
 
 from __future__ import annotations
 
 import logging
+import shutil
 from pathlib import Path
 
-import joblib
 import pandas as pd
+import pyarrow.parquet as pq
 
+from model_registry import list_models, load_model
+from pooled_model import POOL_FEATURES, REGIME_SOURCE, active_pooled, pooled_symbols, predict_universe
+from pred_store import PredictionStore, prediction_frame
 from utils import ensure_dir, setup_logger
 
 PIPELINE_ROOT = Path(__file__).resolve().parent
@@ -16,31 +26,30 @@ FEATURE_DIR = PIPELINE_ROOT / "ml_data" / "03_feature"
 PRED_DIR = PIPELINE_ROOT / "ml_data" / "08_pred"
 ROOT_DIR = PIPELINE_ROOT.parent
 LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_predict.log"
+CONFIG_PATH = PIPELINE_ROOT / "config" / "train_config.yaml"
 
 # 모델 저장 시 포함된 피처 목록을 우선 사용한다.
 IGNORE_COLS = {"timestamp"}
+# 신호 루프(f2_buy_signal)가 최신 행에서 함께 읽는 피처
+LATEST_FEATURES = ["rsi14", "ema5", "ema20"]
 
-def predict_signal(symbol: str) -> None:
-    """단일 심볼의 예측을 수행해 CSV로 저장."""
-    model_path = MODEL_DIR / f"{symbol}_model.pkl"
-    feature_path = FEATURE_DIR / f"{symbol}_feature.parquet"
-
-    try:
-        model = joblib.load(model_path)
-        df = pd.read_parquet(feature_path)
-    except Exception as exc:  # pragma: no cover - best effort
-        logging.warning("%s 로드 실패: %s", symbol, exc)
-        return
 
-    features = getattr(model, "feature_names_in_", None)
-    if features is None:
-        features = [c for c in df.columns if c not in IGNORE_COLS]
+def _read_new_rows(path: Path, since: pd.Timestamp | None, features=None) -> pd.DataFrame:
+    """``since`` 이후 행만 읽는다 (row group 통계로 이전 구간은 건너뜀).
 
+    ``features`` 를 주면 그 피처와 저장에 필요한 컬럼만 읽는다.
+    """
+    columns = None
+    if features is not None:
+        available = set(pq.read_schema(path).names)
+        wanted = ["timestamp", "close", *features, *LATEST_FEATURES]
+        columns = [c for c in dict.fromkeys(wanted) if c in available]
+    if since is None:
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_parquet(path, columns=columns, filters=[("timestamp", ">", since)])
 
-    for f in features:
-        if f not in df.columns:
-            df[f] = 0
 
+def _numeric(df: pd.DataFrame) -> None:
     for col in df.columns:
         if df[col].dtype == "object":
             converted = pd.to_numeric(df[col], errors="coerce")
@@ -48,21 +57,86 @@ def predict_signal(symbol: str) -> None:
                 df[col] = converted
     df.fillna(0, inplace=True)
 
-    X = df[features]
-    df["buy_signal"] = model.predict(X)
-    df["buy_prob"] = model.predict_proba(X)[:, 1]
 
+def _save(store: PredictionStore, symbol: str, df: pd.DataFrame, prob, full: bool) -> None:
+    """예측 확률을 저장소에 추가하고 최신 행을 기록."""
     # (옵션) buy_signal==1은 "익절 또는 트레일 수익 패턴" 예측
-    output_cols = ["timestamp", "close", "buy_signal", "buy_prob"] + list(features)
-    output = df[output_cols] if all(c in df.columns for c in output_cols) else df
+    pred = prediction_frame(df, prob)
+
+    try:
+        if full:
+            shutil.rmtree(PRED_DIR / symbol, ignore_errors=True)
+        store.append(symbol, pred)
+        latest = pred.tail(1).copy()
+        for col in LATEST_FEATURES:
+            if col in df.columns:
+                latest[col] = df[col].iloc[-1]
+        store.write_latest(symbol, latest)
+        logging.info(
+            "[PREDICT] %s 새 행 %d건 예측 (신호 %d건)",
+            symbol,
+            len(pred),
+            int(pred["buy_signal"].sum()),
+        )
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 예측 저장 실패: %s", symbol, exc)
+
+
+def predict_pooled(symbols: list[str], pooled: tuple, full: bool = False) -> None:
+    """공통 모델로 ``symbols`` 의 새 행을 쌓아 ``predict_proba`` 한 번으로 예측."""
+    model, meta = pooled
+    store = PredictionStore(PRED_DIR)
+    features = [f for f in meta["features"] if f not in POOL_FEATURES] + [REGIME_SOURCE]
+    frames = {}
+    for symbol in symbols:
+        since = None if full else store.last_timestamp(symbol)
+        try:
+            df = _read_new_rows(FEATURE_DIR / f"{symbol}_feature.parquet", since, features)
+        except Exception as exc:  # pragma: no cover - best effort
+            logging.warning("%s 로드 실패: %s", symbol, exc)
+            continue
+        if df.empty:
+            logging.info("[PREDICT] %s 새 행 없음", symbol)
+            continue
+        _numeric(df)
+        frames[symbol] = df
+
+    probs = predict_universe(model, meta, frames)
+    logging.info("[PREDICT] 공통 모델 %d개 심볼 %d행 일괄 예측", len(probs), sum(len(p) for p in probs.values()))
+    for symbol, prob in probs.items():
+        _save(store, symbol, frames[symbol], prob, full)
+
+
+def predict_signal(symbol: str, full: bool = False) -> None:
+    """마지막 예측 이후 새 행만 예측해 예측 저장소에 추가.
+
+    ``full`` 이 True 이면 기존 기록을 무시하고 전체 구간을 다시 예측한다.
+    """
+    feature_path = FEATURE_DIR / f"{symbol}_feature.parquet"
+    store = PredictionStore(PRED_DIR)
+    since = None if full else store.last_timestamp(symbol)
 
-    ensure_dir(PRED_DIR)
-    output_path = PRED_DIR / f"{symbol}_pred.csv"
     try:
-        output.to_csv(output_path, index=False)
-        logging.info("[PREDICT] %s → %s (총 %d건, 신호 %d건)", symbol, output_path.name, len(df), (df["buy_signal"] == 1).sum())
+        model, _ = load_model(MODEL_DIR, symbol)
+        features = getattr(model, "feature_names_in_", None)
+        # 모델 피처를 알면 그 컬럼만 읽는다
+        df = _read_new_rows(feature_path, since, None if features is None else list(features))
     except Exception as exc:  # pragma: no cover - best effort
-        logging.warning("%s 저장 실패: %s", output_path.name, exc)
+        logging.warning("%s 로드 실패: %s", symbol, exc)
+        return
+    if df.empty:
+        logging.info("[PREDICT] %s 새 행 없음", symbol)
+        return
+
+    if features is None:
+        features = [c for c in df.columns if c not in IGNORE_COLS]
+
+    for f in features:
+        if f not in df.columns:
+            df[f] = 0
+
+    _numeric(df)
+    _save(store, symbol, df, model.predict_proba(df[features])[:, 1], full)
 
 def main() -> None:
     """실행 엔트리 포인트."""
@@ -71,9 +145,13 @@ def main() -> None:
     ensure_dir(PRED_DIR)
     setup_logger(LOG_PATH)
 
-    for model_file in MODEL_DIR.glob("*_model.pkl"):
-        symbol = model_file.stem.split("_")[0]
-        predict_signal(symbol)
+    pooled = active_pooled(MODEL_DIR, CONFIG_PATH)
+    batched = pooled_symbols(pooled[1]) if pooled is not None else []
+    if batched:
+        predict_pooled(batched, pooled)
+    for symbol in list_models(MODEL_DIR):
+        if symbol not in batched:
+            predict_signal(symbol)
 
 if __name__ == "__main__":
     main()
@@ -9,6 +9,8 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
+from backtest_engine import COMMISSION, find_exit, load_frame, price_arrays, simulate_trades
+from pred_store import PredictionStore
 from utils import ensure_dir, setup_logger
 
 PIPELINE_ROOT = Path(__file__).resolve().parent
@@ -17,50 +19,13 @@ LABEL_DIR = PIPELINE_ROOT / "ml_data" / "04_label"
 OUT_DIR = PIPELINE_ROOT / "ml_data" / "09_backtest"
 ROOT_DIR = PIPELINE_ROOT.parent
 LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_backtest.log"
-COMMISSION = 0.001  # 0.1% upbit round trip
 
 
 
 def simulate_exit(df: pd.DataFrame, start_idx: int, params: dict) -> tuple[int, float, str]:
     """TP/SL/TS 중 먼저 충족되는 시점과 가격을 반환."""
-    tp_pct = params.get("thresh_pct", 0)
-    sl_pct = params.get("loss_pct", 0)
-    ts_start = params.get("trail_start_pct")
-    ts_down = params.get("trail_down_pct")
-
-    entry = df.iloc[start_idx].get("close", df.iloc[start_idx].get("close_pred"))
-
-    tp_price = entry * (1 + tp_pct)
-    sl_price = entry * (1 - sl_pct)
-
-    trail_active = False
-    highest = entry
-
-    for i in range(start_idx + 1, len(df)):
-        row = df.iloc[i]
-        close = row.get("close", row.get("close_pred"))
-        high = row.get("high", close)
-        low = row.get("low", close)
-
-        if high >= tp_price:
-            return i, tp_price, "TP"
-
-        if low <= sl_price:
-            return i, sl_price, "SL"
-
-        if ts_start is not None and ts_down is not None:
-            roi = (close - entry) / entry
-            if not trail_active and roi >= ts_start:
-                trail_active = True
-                highest = close
-            elif trail_active:
-                if close > highest:
-                    highest = close
-                if (close - highest) / highest <= -ts_down:
-                    return i, close, "TS"
-
-    final_close = df.iloc[-1].get("close", df.iloc[-1].get("close_pred"))
-    return len(df) - 1, final_close, "FORCE"
+    close, high, low = price_arrays(df)
+    return find_exit(close, high, low, start_idx, params)
 
 
 def summarize(rois: pd.Series) -> tuple[float, float]:
@@ -77,67 +42,41 @@ def summarize(rois: pd.Series) -> tuple[float, float]:
 
 def process_symbol(symbol: str) -> None:
     """단일 심볼의 백테스트 수행."""
-    pred_path = PRED_DIR / f"{symbol}_pred.csv"
-    label_path = LABEL_DIR / f"{symbol}_label.parquet"
     params_path = LABEL_DIR / f"{symbol}_best_params.json"
 
     try:
-        pred_df = pd.read_csv(pred_path)
-        label_df = pd.read_parquet(label_path)
+        df = load_frame(symbol, PRED_DIR, LABEL_DIR)
         with open(params_path, "r", encoding="utf-8") as f:
             params = json.load(f)
-        if "timestamp" in pred_df.columns:
-            pred_df["timestamp"] = pd.to_datetime(pred_df["timestamp"], utc=True)
-            pred_df["timestamp"] = pred_df["timestamp"].dt.tz_localize(None)
-        if "timestamp" in label_df.columns:
-            label_df["timestamp"] = pd.to_datetime(label_df["timestamp"], utc=True)
-            label_df["timestamp"] = label_df["timestamp"].dt.tz_localize(None)
     except Exception as exc:  # pragma: no cover - best effort
         logging.warning("%s 로드 실패: %s", symbol, exc)
         return
 
-    if "label" not in label_df.columns:
-        label_cols = ["timestamp"]
-    else:
-        label_cols = ["timestamp", "label"]
-    price_cols = [c for c in ["open", "high", "low", "close"] if c in label_df.columns]
-    df = pd.merge(
-        pred_df,
-        label_df[label_cols + price_cols],
-        on="timestamp",
-        how="inner",
-        suffixes=("_pred", ""),
-    )
-    for col in ["open", "high", "low", "close"]:
-        pred_col = f"{col}_pred"
-        if col not in df.columns and pred_col in df.columns:
-            df.rename(columns={pred_col: col}, inplace=True)
-
     if df.empty:
         logging.warning("%s 정합성 문제: 병합 결과 0 rows", symbol)
         return
 
+    close, high, low = price_arrays(df)
+    if "buy_signal" in df.columns:
+        signal = df["buy_signal"].to_numpy()
+    else:
+        signal = np.zeros(len(df))
+    timestamps = df["timestamp"]
+
     trades = []
-    i = 0
-    while i < len(df):
-        row = df.iloc[i]
-        if row.get("buy_signal") == 1:
-            exit_idx, exit_price, result = simulate_exit(df, i, params)
-            entry_price = row["close"]
-            gross = exit_price / entry_price - 1
-            net = gross - COMMISSION
-            trades.append({
-                "timestamp": row["timestamp"],
-                "entry_price": entry_price,
-                "result": result,
-                "exit_time": df.iloc[exit_idx]["timestamp"],
-                "exit_price": exit_price,
-                "gross_roi": gross,
-                "net_roi": net,
-            })
-            i = exit_idx + 1
-        else:
-            i += 1
+    for start, exit_idx, exit_price, result in simulate_trades(close, high, low, signal, params):
+        entry_price = close[start]
+        gross = exit_price / entry_price - 1
+        net = gross - COMMISSION
+        trades.append({
+            "timestamp": timestamps.iloc[start],
+            "entry_price": entry_price,
+            "result": result,
+            "exit_time": timestamps.iloc[exit_idx],
+            "exit_price": exit_price,
+            "gross_roi": gross,
+            "net_roi": net,
+        })
 
     if not trades:
         logging.info("[BACKTEST] %s 매매 없음", symbol)
@@ -196,8 +135,7 @@ def main() -> None:
     ensure_dir(OUT_DIR)
     setup_logger(LOG_PATH)
 
-    for file in PRED_DIR.glob("*_pred.csv"):
-        symbol = file.stem.split("_")[0]
+    for symbol in PredictionStore(PRED_DIR).symbols():
         process_symbol(symbol)
 
 
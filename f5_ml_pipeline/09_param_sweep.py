@@ -0,0 +1,136 @@
+"""익절/손절/트레일링/확률 임계값 조합을 백테스트해 순위표를 만든다.
+
+조합을 고른 구간의 성과는 고른 과정 때문에 과대평가되므로 두 구간을 나눠 씁니다.
+순위(``rank``)는 05_split 의 검증 구간 성과(``select_*`` 열)로 매기고, 보고와
+10 단계 선별에 쓰는 성과 열은 겹치지 않는 테스트 구간의 값입니다. 분할
+매니페스트가 없거나 두 구간 중 하나가 비어 있는 심볼은 건너뜁니다.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backtest_engine import load_frame, price_arrays
+from param_sweep import COMBO_KEYS, grid, run_sweep
+from pred_store import PredictionStore
+from split_io import load_split
+from utils import ensure_dir, setup_logger
+
+PIPELINE_ROOT = Path(__file__).resolve().parent
+PRED_DIR = PIPELINE_ROOT / "ml_data" / "08_pred"
+LABEL_DIR = PIPELINE_ROOT / "ml_data" / "04_label"
+SPLIT_DIR = PIPELINE_ROOT / "ml_data" / "05_split"
+OUT_DIR = PIPELINE_ROOT / "ml_data" / "09_sweep"
+OUT_FILE = OUT_DIR / "sweep_results.csv"
+ROOT_DIR = PIPELINE_ROOT.parent
+LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_param_sweep.log"
+
+# ----- 스윕 그리드 -----
+THRESH_LIST = [0.003, 0.005, 0.007, 0.01, 0.015, 0.02]    # 익절(%)
+LOSS_LIST = [0.003, 0.005, 0.007, 0.01, 0.015, 0.02]      # 손절(%)
+TRAIL_LIST = [(None, None), (0.003, 0.0015), (0.005, 0.002), (0.01, 0.003)]  # (시작, 하락폭)
+PROB_LIST = [0.5, 0.55, 0.6, 0.65, 0.7]                   # buy_prob 임계값
+# ----------------------
+MAX_WORKERS = os.cpu_count() or 1
+SELECT_PART = "valid"     # 조합 순위를 매기는 구간
+HOLDOUT_PART = "test"     # 순위 1위 조합의 성과를 보고하는 구간
+SELECT_PREFIX = "select_"
+
+
+def split_range(symbol: str, part: str) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """05_split ``part`` 구간의 첫/마지막 timestamp (UTC, tz 없음). 없으면 None."""
+    try:
+        ts = load_split(SPLIT_DIR, symbol, part, columns=["timestamp"])["timestamp"]
+    except Exception as exc:
+        logging.warning("[SWEEP] %s %s 구간 로드 실패: %s", symbol, part, exc)
+        return None
+    if ts.empty:
+        return None
+    ts = pd.to_datetime(ts, utc=True).dt.tz_localize(None)
+    return ts.min(), ts.max()
+
+
+def load_arrays(symbol: str, part: str = HOLDOUT_PART) -> dict | None:
+    """심볼의 ``part`` 구간 가격/확률 배열 (입력이 없거나 비어 있으면 None)."""
+    bounds = split_range(symbol, part)
+    if bounds is None:
+        logging.warning("[SWEEP] %s %s 구간 없음, 건너뜀", symbol, part)
+        return None
+    try:
+        df = load_frame(symbol, PRED_DIR, LABEL_DIR)
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 로드 실패: %s", symbol, exc)
+        return None
+    start, end = bounds
+    df = df[(df["timestamp"] >= start) & (df["timestamp"] <= end)].reset_index(drop=True)
+    if df.empty or "buy_prob" not in df.columns:
+        logging.warning("[SWEEP] %s %s 구간 병합 결과가 비었거나 buy_prob 없음", symbol, part)
+        return None
+    close, high, low = price_arrays(df)
+    prob = df["buy_prob"].to_numpy(dtype=np.float64)
+    return {"close": close, "high": high, "low": low, "prob": prob}
+
+
+def rank_results(selected: list[dict], holdout: list[dict]) -> pd.DataFrame:
+    """선택 구간 Sharpe, 평균 수익률 순으로 심볼별 ``rank`` 를 붙인다.
+
+    ``selected`` 성과는 ``select_`` 접두사 열로, ``holdout`` 성과는 원래 이름의
+    열로 같은 (심볼, 조합) 행에 붙습니다.
+    """
+    keys = ["symbol", *COMBO_KEYS]
+    chosen = pd.DataFrame(selected)
+    if chosen.empty:
+        return chosen
+    chosen = chosen.rename(columns={c: SELECT_PREFIX + c for c in chosen.columns if c not in keys})
+    df = pd.DataFrame(holdout).merge(chosen, on=keys, how="inner")
+    df = df.sort_values(
+        ["symbol", *(SELECT_PREFIX + c for c in ["sharpe", "avg_roi", "total_entries"])],
+        ascending=[True, False, False, False],
+        kind="mergesort",
+    ).reset_index(drop=True)
+    df.insert(1, "rank", df.groupby("symbol").cumcount() + 1)
+    return df
+
+
+def main(workers: int = MAX_WORKERS) -> None:
+    """실행 엔트리 포인트."""
+    ensure_dir(OUT_DIR)
+    setup_logger(LOG_PATH)
+
+    selected, holdout = {}, {}
+    for symbol in PredictionStore(PRED_DIR).symbols():
+        chosen = load_arrays(symbol, SELECT_PART)
+        held = load_arrays(symbol, HOLDOUT_PART)
+        if chosen is not None and held is not None:
+            selected[symbol], holdout[symbol] = chosen, held
+    combos = grid(THRESH_LIST, LOSS_LIST, TRAIL_LIST, PROB_LIST)
+
+    start = time.perf_counter()
+    ranked = rank_results(
+        run_sweep(selected, combos, workers=workers),
+        run_sweep(holdout, combos, workers=workers),
+    )
+    columns = ["symbol", "rank", *COMBO_KEYS]
+    if not ranked.empty:
+        columns += [c for c in ranked.columns if c not in columns]
+    tmp = OUT_FILE.with_name(OUT_FILE.name + ".tmp")
+    ranked.reindex(columns=columns).to_csv(tmp, index=False)
+    tmp.replace(OUT_FILE)
+
+    logging.info(
+        "[SWEEP] %d symbols x %d combos in %.1fs (workers=%d)",
+        len(holdout),
+        len(combos),
+        time.perf_counter() - start,
+        workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
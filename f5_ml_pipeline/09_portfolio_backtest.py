@@ -0,0 +1,83 @@
+"""모든 심볼의 예측 신호를 합쳐 MAX_SYMBOLS/원화 잔고 제약으로 포트폴리오 백테스트."""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backtest_engine import load_frame, price_arrays
+from portfolio_backtest import INITIAL_KRW, run_portfolio
+from pred_store import PredictionStore
+from sell_simulator import load_settings
+from utils import ensure_dir, setup_logger
+
+PIPELINE_ROOT = Path(__file__).resolve().parent
+PRED_DIR = PIPELINE_ROOT / "ml_data" / "08_pred"
+LABEL_DIR = PIPELINE_ROOT / "ml_data" / "04_label"
+OUT_DIR = PIPELINE_ROOT / "ml_data" / "09_portfolio"
+ROOT_DIR = PIPELINE_ROOT.parent
+LOG_PATH = ROOT_DIR / "logs" / "f5" / "F5_ml_portfolio_backtest.log"
+
+
+def load_arrays(symbol: str) -> dict | None:
+    """심볼의 시각(초)/가격/매수 신호 배열 (입력이 없거나 비어 있으면 None)."""
+    try:
+        df = load_frame(symbol, PRED_DIR, LABEL_DIR)
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 로드 실패: %s", symbol, exc)
+        return None
+    if df.empty or "buy_signal" not in df.columns:
+        logging.warning("[PORTFOLIO] %s 병합 결과가 비었거나 buy_signal 없음", symbol)
+        return None
+    df = df.sort_values("timestamp", kind="mergesort")
+    close, high, _ = price_arrays(df)
+    times = df["timestamp"].to_numpy().astype("datetime64[s]").astype(np.int64)
+    return {"times": times, "close": close, "high": high, "signal": df["buy_signal"].to_numpy()}
+
+
+def main(initial_krw: float = INITIAL_KRW) -> None:
+    """실행 엔트리 포인트."""
+    ensure_dir(OUT_DIR)
+    setup_logger(LOG_PATH)
+
+    data = {}
+    for symbol in PredictionStore(PRED_DIR).symbols():
+        arrays = load_arrays(symbol)
+        if arrays is not None:
+            data[symbol] = arrays
+    config = load_settings()
+
+    start = time.perf_counter()
+    result = run_portfolio(data, config, initial_krw)
+    pd.DataFrame({
+        "timestamp": pd.to_datetime(result.times, unit="s"),
+        "equity": result.equity,
+        "invested": result.invested,
+        "slots": result.slots,
+    }).to_csv(OUT_DIR / "portfolio_equity.csv", index=False)
+    trades = pd.DataFrame(result.trades)
+    for col in ["entry_time", "exit_time"]:
+        if col in trades.columns:
+            trades[col] = pd.to_datetime(trades[col], unit="s")
+    trades.to_csv(OUT_DIR / "portfolio_trades.csv", index=False)
+    with open(OUT_DIR / "portfolio_summary.json", "w", encoding="utf-8") as f:
+        json.dump(result.summary, f, indent=2)
+
+    logging.info(
+        "[PORTFOLIO] %d symbols entries=%d return=%.2f%% mdd=%.2f%% utilization=%.1f%% in %.1fs",
+        len(data),
+        result.summary["total_entries"],
+        result.summary["total_return"] * 100,
+        result.summary["mdd"] * 100,
+        result.summary["capital_utilization"] * 100,
+        time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import csv
 import json
 import logging
 from pathlib import Path
@@ -13,6 +14,7 @@ PIPELINE_ROOT = Path(__file__).resolve().parent
 PROJECT_ROOT = PIPELINE_ROOT.parent
 SUMMARY_DIR = PIPELINE_ROOT / "ml_data" / "09_backtest"
 PARAM_DIR = PIPELINE_ROOT / "ml_data" / "04_label"
+SWEEP_FILE = PIPELINE_ROOT / "ml_data" / "09_sweep" / "sweep_results.csv"
 OUT_DIR = PIPELINE_ROOT / "ml_data" / "10_selected"
 OUT_FILE = OUT_DIR / "selected_strategies.json"
 ROOT_DIR = PIPELINE_ROOT.parent
@@ -36,6 +38,7 @@ MAX_MDD = 0.10           # 최대 낙폭 10% 이하
 MIN_ENTRIES = 50         # 최소 50회 진입
 TOP_N = 20               # 상위 20개 전략만 채택
 # -------------------------------------------------
+SWEEP_PARAM_KEYS = ["thresh_pct", "loss_pct", "trail_start_pct", "trail_down_pct", "prob_threshold"]
 
 
 
@@ -70,15 +73,65 @@ def passes_criteria(summary: dict) -> bool:
     )
 
 
+def _sweep_params(row: dict) -> dict:
+    """스윕 결과 행의 파라미터 (빈 칸은 미사용 None)."""
+    params = {}
+    for key in SWEEP_PARAM_KEYS:
+        value = row.get(key)
+        params[key] = None if value in (None, "") else _to_float(value)
+    return params
+
+
+def load_sweep_candidates() -> dict[str, dict]:
+    """``09_param_sweep`` 순위표에서 심볼별 1위 조합 중 기준을 통과한 것.
+
+    순위는 검증 구간 성과로 정해지고 성과 열은 테스트 구간 값이므로, 1위
+    조합만 테스트 성과로 판정합니다. 탈락하면 다음 순위로 내려가지 않습니다
+    (테스트 구간으로 조합을 다시 고르는 셈이 되기 때문).
+    """
+    if not SWEEP_FILE.exists():
+        return {}
+    best: dict[str, dict] = {}
+    try:
+        with open(SWEEP_FILE, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                symbol = row.get("symbol")
+                if not symbol or int(_to_float(row.get("rank"))) != 1:
+                    continue
+                if not passes_criteria(row):
+                    logging.info("[SELECT] %s sweep pick failed on holdout", symbol)
+                    continue
+                best[symbol] = {"row": row}
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 로드 실패: %s", SWEEP_FILE, exc)
+        return {}
+    logging.info("[SELECT] sweep candidates: %d symbols", len(best))
+    return {
+        symbol: {
+            "symbol": symbol,
+            "win_rate": _to_float(item["row"].get("win_rate")),
+            "avg_roi": _to_float(item["row"].get("avg_roi")),
+            "sharpe": _to_float(item["row"].get("sharpe")),
+            "max_drawdown": abs(_to_float(item["row"].get("mdd"))),
+            "total_entries": int(_to_float(item["row"].get("total_entries"))),
+            "params": _sweep_params(item["row"]),
+        }
+        for symbol, item in best.items()
+    }
+
+
 def select_strategies() -> list[dict]:
     """요건을 만족하는 전략을 정렬 후 반환."""
     logging.info("[SELECT] scanning summaries in %s", SUMMARY_DIR)
-    strategies = []
+    swept = load_sweep_candidates()
+    strategies = list(swept.values())
     files = list(SUMMARY_DIR.glob("*_summary.json"))
     if not files:
         logging.info("[SELECT] no summary files found")
     for file in files:
         symbol = file.stem.split("_")[0]
+        if symbol in swept:
+            continue
         logging.info("[SELECT] processing %s", symbol)
         try:
             summary = load_json(file)
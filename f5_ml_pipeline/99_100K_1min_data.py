@@ -1,28 +1,30 @@
-"""Download last 100k minutes of 1 minute OHLCV data."""
+"""Download last 100k minutes of 1 minute OHLCV data into the candle store."""
 
 from __future__ import annotations
 
 import json
 import logging
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List
-import tempfile
+from typing import Iterable, List
 
 import pandas as pd
-import requests
 
-from utils import ensure_dir, file_lock, save_parquet_atomic, backup_file, setup_logger
+from candle_store import FLUSH_PAGES, CandleStore, last_closed_minute
+from utils import RateLimiter, ensure_dir, setup_logger
 
-BASE_URL = "https://api.upbit.com"
 PIPELINE_ROOT = Path(__file__).resolve().parent
 DATA_ROOT = PIPELINE_ROOT / "ml_data" / "99_100K_1min_data"
 ROOT_DIR = PIPELINE_ROOT.parent
 COIN_LIST_FILE = ROOT_DIR / "config" / "f1_f5_data_collection_list.json"
-REQUEST_DELAY = 0.2
 LOG_PATH = ROOT_DIR / "logs" / "f5" / "99_100K_1min_data.log"
 CANDLE_LIMIT = 100_000
+# Upbit allows 10 quotation requests per second per IP; keep some headroom for
+# the realtime collector running in the same process.
+REQUEST_RATE = 8
+MAX_WORKERS = 4
+STORE = CandleStore(limiter=RateLimiter(REQUEST_RATE))
 
 
 def load_coin_list(path: str = COIN_LIST_FILE) -> List[str]:
@@ -39,109 +41,20 @@ def load_coin_list(path: str = COIN_LIST_FILE) -> List[str]:
     return []
 
 
-def _request_json(url: str, params: Dict | None = None, retries: int = 3) -> List[Dict]:
-    """Wrapper for ``requests.get`` with retry and rate limiting."""
-    for _ in range(retries):
-        try:
-            resp = requests.get(url, params=params, timeout=10)
-            if resp.status_code == 429:
-                time.sleep(1)
-                continue
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as exc:  # pragma: no cover - network error path
-            logging.warning("Request error %s: %s", url, exc)
-            time.sleep(1)
-    return []
-
-
-def get_ohlcv_history(market: str) -> pd.DataFrame:
-    """Fetch last 100k minutes of minute candles for ``market``."""
-    url = f"{BASE_URL}/v1/candles/minutes/1"
-    end = datetime.utcnow().replace(second=0, microsecond=0)
-    remaining = CANDLE_LIMIT
-    to = end.isoformat()
-    frames: List[pd.DataFrame] = []
-
-    while remaining > 0:
-        count = min(200, remaining)
-        params = {"market": market, "count": count, "to": to}
-        data = _request_json(url, params)
-        if not data:
-            break
-        frames.append(pd.DataFrame(data))
-        remaining -= len(data)
-        to = data[-1]["candle_date_time_utc"]
-        time.sleep(REQUEST_DELAY)
-
-    if not frames:
-        return pd.DataFrame()
-    df = pd.concat(frames, ignore_index=True)
-    df = df.sort_values("candle_date_time_utc").reset_index(drop=True)
-    return df
-
-
-def _dedupe_columns(df: pd.DataFrame) -> List[str] | None:
-    """Return best column set for duplicate removal."""
-    candidates = [
-        ["timestamp", "market"],
-        ["trade_timestamp", "market"],
-        ["sequential_id"],
-        ["candle_date_time_utc", "market"],
-    ]
-    for cols in candidates:
-        if all(c in df.columns for c in cols):
-            return cols
-    return None
-
-
-def save_data(df: pd.DataFrame, market: str, root: Path = DATA_ROOT) -> None:
-    """Save ``df`` under ``root`` directory."""
-    dir_path = ensure_dir(root)
-    file_path = dir_path / f"{market}_rawdata.parquet"
-
-    lock_file = file_path.with_suffix(file_path.suffix + ".lock")
-    with file_lock(lock_file):
-        if file_path.exists():
-            try:
-                old = pd.read_parquet(file_path)
-                df = pd.concat([old, df], ignore_index=True)
-            except Exception as exc:  # pragma: no cover - best effort
-                logging.warning("Failed reading %s: %s", file_path.name, exc)
-                new = backup_file(file_path)
-                logging.info("Backed up corrupt file to %s", new.name)
-
-        subset = _dedupe_columns(df)
-        if subset:
-            before = len(df)
-            df = df.drop_duplicates(subset=subset)
-            removed = before - len(df)
-            if removed:
-                logging.info("Drop duplicates %s - %d rows", file_path.name, removed)
-
-        try:
-            save_parquet_atomic(df, file_path)
-        except Exception as exc:  # pragma: no cover - best effort
-            logging.error("Parquet save failed %s: %s", file_path.name, exc)
-
-
-def validate_data(root: Path, markets: Iterable[str]) -> List[str]:
-    """Return list of markets with incomplete data."""
+def validate_data(markets: Iterable[str], now: datetime | None = None) -> List[str]:
+    """Return list of markets whose stored range is incomplete."""
+    end = last_closed_minute(now)
+    start = end - CANDLE_LIMIT
     incomplete: List[str] = []
     for market in markets:
-        file_path = root / f"{market}_rawdata.parquet"
-        try:
-            df = pd.read_parquet(file_path)
-            if len(df) < CANDLE_LIMIT:
-                logging.warning(
-                    "%s expected %d rows but got %d",
-                    market,
-                    CANDLE_LIMIT,
-                    len(df),
-                )
-                incomplete.append(market)
-        except Exception as exc:
-            logging.error("Failed reading %s: %s", file_path.name, exc)
+        missing = STORE.missing(market, start, end)
+        if missing:
+            logging.warning(
+                "%s missing %d of %d minutes",
+                market,
+                sum(e - s for s, e in missing),
+                CANDLE_LIMIT,
+            )
             incomplete.append(market)
     return incomplete
 
@@ -156,46 +69,42 @@ def ask_retry(market: str, rows: int) -> bool:
             return ans == "y"
 
 
-def collect_markets(markets: Iterable[str]) -> List[str]:
-    """Collect history for ``markets`` with progress output."""
+def download_market(market: str, start: int, end: int) -> int:
+    """Fill ``[start, end)`` of ``market`` in the store and write its view.
+
+    Progress is flushed to the store every ``FLUSH_PAGES`` pages so a restart
+    continues from the oldest minute already saved.
+    """
+    STORE.ensure_range(market, start, end, flush_pages=FLUSH_PAGES)
+    return STORE.write_view(market, DATA_ROOT / f"{market}_rawdata.parquet", start, end)
+
+
+def collect_markets(markets: Iterable[str], workers: int = MAX_WORKERS) -> List[str]:
+    """Collect history for ``markets`` concurrently with progress output."""
     items = list(markets)
     total = len(items)
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_root = Path(tmpdir)
-        collected: List[str] = []
-        incomplete: List[str] = []
-        for idx, market in enumerate(items, start=1):
-            print(f"[{idx}/{total}] Collecting {market} ...", flush=True)
+    end = last_closed_minute()
+    start = end - CANDLE_LIMIT
+    incomplete: List[str] = []
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(download_market, m, start, end): m for m in items}
+        print(f"Collecting {total} markets with {workers} workers ...", flush=True)
+        for fut in as_completed(futures):
+            market = futures[fut]
+            done += 1
             try:
-                df = get_ohlcv_history(market)
-                if df.empty:
-                    logging.warning("No data for %s", market)
-                    incomplete.append(market)
-                    continue
-                if len(df) < CANDLE_LIMIT:
-                    logging.warning(
-                        "%s expected %d rows but got %d",
-                        market,
-                        CANDLE_LIMIT,
-                        len(df),
-                    )
-                    incomplete.append(market)
-                    continue
-                save_data(df, market, root=tmp_root)
-                collected.append(market)
-                print(f"[{idx}/{total}] {market} done", flush=True)
+                rows = fut.result()
             except Exception as exc:  # pragma: no cover - best effort
                 logging.error("Collect error %s: %s", market, exc)
                 incomplete.append(market)
-
-        for market in collected:
-            file = tmp_root / f"{market}_rawdata.parquet"
-            try:
-                df = pd.read_parquet(file)
-                save_data(df, market, root=DATA_ROOT)
-            except Exception as exc:  # pragma: no cover - best effort
-                logging.error("Finalize error %s: %s", file.name, exc)
-        return incomplete
+                continue
+            if not rows:
+                logging.warning("No data for %s", market)
+                incomplete.append(market)
+                continue
+            print(f"[{done}/{total}] {market} done ({rows} rows)", flush=True)
+    return incomplete
 
 
 def main() -> None:
@@ -207,15 +116,12 @@ def main() -> None:
         return
 
     ensure_dir(DATA_ROOT)
-    for old in DATA_ROOT.glob("*"):
-        if old.is_file():
-            old.unlink(missing_ok=True)
 
     pending = markets
     while pending:
         logging.info("Collect 100k history for %s", pending)
         incomplete = collect_markets(pending)
-        incomplete.extend(validate_data(DATA_ROOT, pending))
+        incomplete.extend(validate_data(pending))
         next_round: List[str] = []
         for market in set(incomplete):
             file_path = DATA_ROOT / f"{market}_rawdata.parquet"
@@ -224,7 +130,6 @@ def main() -> None:
             except Exception:
                 rows = 0
             retry = ask_retry(market, rows)
-            file_path.unlink(missing_ok=True)
             if retry:
                 next_round.append(market)
             else:
@@ -0,0 +1,291 @@
+"""NumPy 배열 기반 TP/SL/TS 청산 시뮬레이터.
+
+``09_backtest`` 의 예전 구현은 진입마다 ``df.iloc`` 로 한 행씩 읽으며 청산
+조건을 확인해, 10만 분 이상의 이력에서는 심볼 하나에 수십 초가 걸렸습니다.
+여기서는 가격을 배열로 한 번 꺼낸 뒤 진입 이후 구간을 블록 단위로 잘라
+
+* TP(고가 >= 목표가)와 SL(저가 <= 손절가)의 첫 도달 지점을 비교 연산으로,
+* 트레일링 스탑은 누적 최고가(``fmax.accumulate``)로 발동 이후 하락폭을
+
+한꺼번에 계산합니다. 블록 크기는 청산이 없을 때마다 두 배로 늘어나므로
+보유 기간에 비례하는 연산만 합니다.
+
+같은 봉에서는 예전과 같이 TP, SL, TS 순서로 판정하고, 가격 연산은 원래
+자료형(float32 라벨이면 float32)으로 한 뒤 비교만 float64 로 해서 예전
+루프와 같은 청산 시점, 가격, 수익률을 돌려줍니다.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pred_store import PredictionStore
+
+COMMISSION = 0.001  # 0.1% upbit round trip
+# 첫 탐색 블록 길이와 최대 블록 길이 (청산이 없으면 두 배씩 늘림)
+INITIAL_BLOCK = 64
+MAX_BLOCK = 65536
+# exit_table: 여러 진입을 한 번에 볼 때의 창 길이 단계와 한 번에 처리할 진입 수
+TABLE_WINDOWS = (64, 512)
+TABLE_ROWS = 4096
+REASONS = ("TP", "SL", "TS", "FORCE")
+
+
+def _first(mask: np.ndarray) -> Optional[int]:
+    """``mask`` 에서 처음 True 인 위치 (없으면 None)."""
+    idx = int(np.argmax(mask)) if len(mask) else 0
+    return idx if len(mask) and mask[idx] else None
+
+
+def _as_float64(values: np.ndarray) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def load_frame(symbol: str, pred_dir: Path, label_dir: Path) -> pd.DataFrame:
+    """예측 결과와 라벨 가격을 timestamp 기준으로 병합한 백테스트 입력."""
+    pred_df = PredictionStore(pred_dir).load(symbol)
+    label_df = pd.read_parquet(Path(label_dir) / f"{symbol}_label.parquet")
+    for frame in (pred_df, label_df):
+        if "timestamp" in frame.columns:
+            frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True)
+            frame["timestamp"] = frame["timestamp"].dt.tz_localize(None)
+
+    if "label" not in label_df.columns:
+        label_cols = ["timestamp"]
+    else:
+        label_cols = ["timestamp", "label"]
+    price_cols = [c for c in ["open", "high", "low", "close"] if c in label_df.columns]
+    df = pd.merge(
+        pred_df,
+        label_df[label_cols + price_cols],
+        on="timestamp",
+        how="inner",
+        suffixes=("_pred", ""),
+    )
+    for col in ["open", "high", "low", "close"]:
+        pred_col = f"{col}_pred"
+        if col not in df.columns and pred_col in df.columns:
+            df.rename(columns={pred_col: col}, inplace=True)
+    return df
+
+
+def price_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """종가/고가/저가 배열 (고가·저가가 없으면 종가 사용)."""
+    close_col = "close" if "close" in df.columns else "close_pred"
+    close = df[close_col].to_numpy()
+    high = df["high"].to_numpy() if "high" in df.columns else close
+    low = df["low"].to_numpy() if "low" in df.columns else close
+    return close, high, low
+
+
+def find_exit(
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    start: int,
+    params: dict,
+    high64: Optional[np.ndarray] = None,
+    low64: Optional[np.ndarray] = None,
+) -> Tuple[int, Any, str]:
+    """``start`` 봉 종가에 진입했을 때 (청산 위치, 청산가, 사유) 를 반환.
+
+    사유는 ``TP``/``SL``/``TS`` 이며 끝까지 청산되지 않으면 마지막 종가로
+    ``FORCE`` 청산합니다. ``high64``/``low64`` 는 여러 진입에서 재사용할
+    float64 변환본입니다.
+    """
+    tp_pct = params.get("thresh_pct", 0)
+    sl_pct = params.get("loss_pct", 0)
+    ts_start = params.get("trail_start_pct")
+    ts_down = params.get("trail_down_pct")
+    trailing = ts_start is not None and ts_down is not None
+
+    if high64 is None:
+        high64 = _as_float64(high)
+    if low64 is None:
+        low64 = _as_float64(low)
+
+    n = len(close)
+    entry = close[start]
+    tp_price = entry * (1 + tp_pct)
+    sl_price = entry * (1 - sl_pct)
+
+    active = False
+    highest = entry
+    lo = start + 1
+    size = INITIAL_BLOCK
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        while lo < n:
+            hi = min(n, lo + size)
+            tp_at = _first(high64[lo:hi] >= tp_price)
+            sl_at = _first(low64[lo:hi] <= sl_price)
+            ts_at = None
+            if trailing:
+                seg = close[lo:hi]
+                offset = 0
+                if not active:
+                    roi = _as_float64((seg - entry) / entry)
+                    at = _first(roi >= ts_start)
+                    if at is not None:
+                        # 발동한 봉은 최고가만 기록하고 하락폭은 다음 봉부터 본다
+                        active = True
+                        highest = seg[at]
+                        offset = at + 1
+                if active and offset < len(seg):
+                    rest = seg[offset:]
+                    running = np.fmax(np.fmax.accumulate(rest), highest)
+                    drop = _as_float64((rest - running) / running)
+                    down = _first(drop <= -ts_down)
+                    if down is not None:
+                        ts_at = offset + down
+                    highest = running[-1]
+
+            candidates = [
+                (at, order, reason)
+                for order, (at, reason) in enumerate(((tp_at, "TP"), (sl_at, "SL"), (ts_at, "TS")))
+                if at is not None
+            ]
+            if candidates:
+                at, _, reason = min(candidates)
+                idx = lo + at
+                if reason == "TP":
+                    return idx, tp_price, reason
+                if reason == "SL":
+                    return idx, sl_price, reason
+                return idx, close[idx], reason
+            lo = hi
+            size = min(size * 2, MAX_BLOCK)
+
+    return n - 1, close[n - 1], "FORCE"
+
+
+def _exit_block(
+    close: np.ndarray,
+    high64: np.ndarray,
+    low64: np.ndarray,
+    starts: np.ndarray,
+    params: dict,
+    window: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``starts`` 각각의 다음 ``window`` 봉 안 청산 (위치, 사유 코드, 가격).
+
+    창 안에서 청산되지 않으면 위치가 -1 입니다. 판정과 자료형 규칙은
+    :func:`find_exit` 과 같습니다.
+    """
+    n = len(close)
+    ts_start = params.get("trail_start_pct")
+    ts_down = params.get("trail_down_pct")
+    cols = np.arange(window)
+    pos = starts[:, None] + 1 + cols
+    valid = pos < n
+    pos = np.minimum(pos, n - 1)
+    entry = close[starts]
+    entry64 = _as_float64(entry)
+    tp_price = entry64 * (1 + params.get("thresh_pct", 0))
+    sl_price = entry64 * (1 - params.get("loss_pct", 0))
+
+    def first(hit: np.ndarray) -> np.ndarray:
+        return np.where(hit.any(axis=1), hit.argmax(axis=1), window)
+
+    t_tp = first((high64[pos] >= tp_price[:, None]) & valid)
+    t_sl = first((low64[pos] <= sl_price[:, None]) & valid)
+    t_ts = np.full(len(starts), window)
+    if ts_start is not None and ts_down is not None:
+        seg = close[pos]
+        roi = _as_float64((seg - entry[:, None]) / entry[:, None])
+        activated = (roi >= ts_start) & valid
+        has = activated.any(axis=1)
+        at = activated.argmax(axis=1)[:, None]
+        running = np.fmax.accumulate(np.where(cols >= at, seg, np.nan), axis=1)
+        drop = _as_float64((seg - running) / running)
+        t_ts = first((drop <= -ts_down) & (cols > at) & has[:, None] & valid)
+
+    earliest = np.minimum(np.minimum(t_tp, t_sl), t_ts)
+    reason = np.where(t_tp == earliest, 0, np.where(t_sl == earliest, 1, 2)).astype(np.int8)
+    idx = starts + 1 + earliest
+    done = earliest < window
+    price = np.where(
+        reason == 0, tp_price, np.where(reason == 1, sl_price, _as_float64(close[np.minimum(idx, n - 1)]))
+    )
+    # 창이 데이터 끝까지 닿았는데 청산이 없으면 마지막 종가로 강제 청산
+    force = ~done & (starts + window >= n - 1)
+    reason[force] = 3
+    price[force] = close[n - 1]
+    idx = np.where(done, idx, np.where(force, n - 1, -1))
+    return idx, reason, price
+
+
+def exit_table(
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    starts: np.ndarray,
+    params: dict,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """여러 진입 위치의 청산 (위치, ``REASONS`` 코드, float64 가격) 을 한 번에 계산.
+
+    진입끼리의 겹침은 따지지 않으므로 파라미터 스윕처럼 같은 청산 규칙을
+    여러 신호 집합에 적용할 때 씁니다. 짧은 창부터 행렬 연산으로 판정하고,
+    마지막 창에서도 청산되지 않은 진입만 :func:`find_exit` 로 끝까지 찾습니다.
+    """
+    starts = np.asarray(starts, dtype=np.intp)
+    exit_idx = np.full(len(starts), -1, dtype=np.intp)
+    reason = np.zeros(len(starts), dtype=np.int8)
+    price = np.zeros(len(starts), dtype=np.float64)
+    high64 = _as_float64(high)
+    low64 = _as_float64(low)
+    pending = np.arange(len(starts))
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        for window in TABLE_WINDOWS:
+            for i in range(0, len(pending), TABLE_ROWS):
+                rows = pending[i:i + TABLE_ROWS]
+                idx, code, value = _exit_block(close, high64, low64, starts[rows], params, window)
+                exit_idx[rows], reason[rows], price[rows] = idx, code, value
+            pending = pending[exit_idx[pending] < 0]
+    for row in pending:
+        idx, value, name = find_exit(close, high, low, int(starts[row]), params, high64, low64)
+        exit_idx[row], reason[row], price[row] = idx, REASONS.index(name), value
+    return exit_idx, reason, price
+
+
+def simulate_trades(
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    signal: np.ndarray,
+    params: dict,
+) -> List[Tuple[int, int, Any, str]]:
+    """``signal == 1`` 봉마다 진입해 (진입, 청산, 청산가, 사유) 목록을 반환.
+
+    보유 중 발생한 신호는 무시하고 청산 다음 봉부터 다시 진입합니다.
+    """
+    entries = np.flatnonzero(np.asarray(signal) == 1)
+    high64 = _as_float64(high)
+    low64 = _as_float64(low)
+    trades: List[Tuple[int, int, Any, str]] = []
+    pos = 0
+    while True:
+        k = int(np.searchsorted(entries, pos))
+        if k >= len(entries):
+            break
+        start = int(entries[k])
+        exit_idx, price, reason = find_exit(close, high, low, start, params, high64, low64)
+        trades.append((start, exit_idx, price, reason))
+        pos = exit_idx + 1
+    return trades
+
+
+__all__ = [
+    "COMMISSION",
+    "exit_table",
+    "find_exit",
+    "load_frame",
+    "price_arrays",
+    "simulate_trades",
+    "INITIAL_BLOCK",
+    "MAX_BLOCK",
+    "REASONS",
+]
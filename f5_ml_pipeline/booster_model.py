@@ -0,0 +1,93 @@
+"""``lgb.train`` 으로 학습한 Booster 를 LGBMClassifier 처럼 쓰기 위한 래퍼.
+
+06_train 은 캐시된 LightGBM ``Dataset`` 으로 학습하기 위해 sklearn API 대신
+``lgb.train`` 을 사용합니다. 07_eval, 08_predict 등은 저장된 모델에서
+``predict``/``predict_proba``/``feature_names_in_`` 만 사용하므로 이 래퍼를
+pickle 로 저장하면 기존 코드를 그대로 쓸 수 있습니다. :func:`train_booster` 는
+06_train 과 워크 포워드/튜닝 단계가 같은 방식으로 학습하도록 공유하는 함수입니다.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import lightgbm as lgb
+import numpy as np
+
+
+class BoosterClassifier:
+    """이진 분류 Booster 래퍼 (양성 확률 0.5 초과 시 1)."""
+
+    def __init__(self, booster: lgb.Booster, best_iteration: int | None = None) -> None:
+        self.booster_ = booster
+        self.best_iteration_ = best_iteration or booster.current_iteration()
+        self.feature_name_ = booster.feature_name()
+        self.feature_names_in_ = np.array(self.feature_name_)
+        self.n_features_in_ = len(self.feature_name_)
+        self.classes_ = np.array([0, 1])
+
+    def _prob(self, X: Any) -> np.ndarray:
+        if hasattr(X, "columns"):
+            X = X[self.feature_name_]
+        return self.booster_.predict(X, num_iteration=self.best_iteration_)
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        prob = self._prob(X)
+        return np.column_stack([1 - prob, prob])
+
+    def predict(self, X: Any) -> np.ndarray:
+        return (self._prob(X) > 0.5).astype(int)
+
+
+def trimmed_booster(model: BoosterClassifier) -> lgb.Booster:
+    """조기 종료 지점 이후의 트리를 뺀 booster (예측에 쓰인 트리만 이어 받음)."""
+    booster = model.booster_
+    best = getattr(model, "best_iteration_", None)
+    if best and best < booster.current_iteration():
+        return lgb.Booster(model_str=booster.model_to_string(num_iteration=best))
+    return booster
+
+
+def train_booster(
+    params: Dict[str, Any],
+    train_set: lgb.Dataset,
+    X_valid: np.ndarray,
+    y_valid: np.ndarray,
+    features: List[str],
+    dataset_params: Dict[str, Any],
+    n_estimators: int,
+    init_model: Optional[lgb.Booster] = None,
+    callbacks: Optional[List[Any]] = None,
+) -> BoosterClassifier:
+    """``train_config`` 의 ``model`` 항목 형식 ``params`` 로 이진 분류 부스팅.
+
+    ``learning_rate``/``num_leaves`` 외의 LightGBM 파라미터도 그대로 넘기며,
+    ``early_stopping_rounds`` 가 있으면 검증 세트로 조기 종료합니다.
+    """
+    skip = {"n_estimators", "early_stopping_rounds"}
+    train_params = {
+        **dataset_params,
+        "objective": "binary",
+        "seed": 42,
+        **{k: v for k, v in params.items() if k not in skip},
+    }
+    valid_set = lgb.Dataset(
+        X_valid,
+        label=y_valid,
+        feature_name=features,
+        reference=train_set,
+        params=dataset_params,
+    )
+    callbacks = list(callbacks or [])
+    early_stopping_rounds = params.get("early_stopping_rounds")
+    if early_stopping_rounds:
+        callbacks.append(lgb.early_stopping(early_stopping_rounds))
+    booster = lgb.train(
+        train_params,
+        train_set,
+        num_boost_round=n_estimators,
+        valid_sets=[valid_set],
+        callbacks=callbacks or None,
+        init_model=init_model,
+    )
+    return BoosterClassifier(booster, booster.best_iteration or None)
@@ -0,0 +1,269 @@
+"""Range-aware store of closed 1 minute candles shared by the collectors.
+
+Candles are kept per market in daily Parquet partitions together with a
+``coverage.json`` file listing the minute ranges that were already answered by
+the exchange. ``00_72h_1min_data``, ``99_100K_1min_data`` and
+``01_data_collect`` only request the ranges that are still missing and write
+their output directories as views over this store.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+import pandas as pd
+import requests
+
+from gap_index import IntervalSet, coalesce_ranges, from_minute, to_minute
+from utils import RateLimiter, ensure_dir, file_lock, save_parquet_atomic
+
+BASE_URL = "https://api.upbit.com"
+PIPELINE_ROOT = Path(__file__).resolve().parent
+STORE_ROOT = PIPELINE_ROOT / "ml_data" / "00_candle_store"
+REQUEST_DELAY = 0.2
+# Pages buffered in memory before they are written to the day partitions.
+FLUSH_PAGES = 10
+TIME_COL = "candle_date_time_utc"
+
+Fetcher = Callable[[str, int, datetime], List[Dict]]
+
+
+def _request_json(
+    url: str,
+    params: Dict | None = None,
+    retries: int = 3,
+    limiter: RateLimiter | None = None,
+) -> List[Dict]:
+    """Wrapper for ``requests.get`` with retry and rate limiting."""
+    for _ in range(retries):
+        try:
+            if limiter is not None:
+                limiter.acquire()
+            resp = requests.get(url, params=params, timeout=10)
+            if resp.status_code == 429:
+                if limiter is not None:
+                    limiter.backoff(1)
+                else:
+                    time.sleep(1)
+                continue
+            resp.raise_for_status()
+            return resp.json()
+        except Exception as exc:  # pragma: no cover - network error path
+            logging.warning("Request error %s: %s", url, exc)
+            time.sleep(1)
+    return []
+
+
+def fetch_candles(
+    market: str, count: int, to: datetime, limiter: RateLimiter | None = None
+) -> List[Dict]:
+    """Fetch up to ``count`` 1 minute candles before ``to`` (UTC)."""
+    url = f"{BASE_URL}/v1/candles/minutes/1"
+    params = {"market": market, "count": count, "to": to.strftime("%Y-%m-%dT%H:%M:%S")}
+    return _request_json(url, params, limiter=limiter)
+
+
+def _minutes(df: pd.DataFrame) -> pd.Series:
+    """Return epoch minutes of ``df`` candles."""
+    ts = pd.to_datetime(df[TIME_COL], utc=True, errors="coerce")
+    return ts.astype("int64") // 60_000_000_000
+
+
+class CandleStore:
+    """Daily partitioned candle store with per-market coverage intervals.
+
+    ``limiter`` replaces the fixed ``request_delay`` when several threads
+    download through the same store.
+    """
+
+    def __init__(
+        self,
+        root: Path = STORE_ROOT,
+        fetch: Fetcher | None = None,
+        request_delay: float = REQUEST_DELAY,
+        limiter: RateLimiter | None = None,
+    ) -> None:
+        self.root = Path(root)
+        self.fetch = fetch or self._fetch_remote
+        self.request_delay = request_delay
+        self.limiter = limiter
+
+    def _fetch_remote(self, market: str, count: int, to: datetime) -> List[Dict]:
+        return fetch_candles(market, count, to, limiter=self.limiter)
+
+    # ------------------------------------------------------------------
+    # paths and coverage
+    def market_dir(self, market: str) -> Path:
+        return self.root / market
+
+    def _coverage_path(self, market: str) -> Path:
+        return self.market_dir(market) / "coverage.json"
+
+    def _lock_path(self, market: str) -> Path:
+        return ensure_dir(self.market_dir(market)) / ".lock"
+
+    def coverage(self, market: str) -> IntervalSet:
+        """Return the minutes already answered for ``market``."""
+        path = self._coverage_path(market)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return IntervalSet.from_list(json.load(f).get("intervals", []))
+        except FileNotFoundError:
+            return IntervalSet()
+        except Exception as exc:  # pragma: no cover - best effort
+            logging.warning("Coverage load failed %s: %s", path, exc)
+            return IntervalSet()
+
+    def _save_coverage(self, market: str, cover: IntervalSet) -> None:
+        path = self._coverage_path(market)
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"market": market, "intervals": cover.to_list()}, f)
+        tmp.replace(path)
+
+    def missing(self, market: str, start: int, end: int) -> List[tuple[int, int]]:
+        """Return ``[start, end)`` minute ranges not yet stored for ``market``."""
+        return self.coverage(market).missing(start, end)
+
+    # ------------------------------------------------------------------
+    # writing
+    def append(
+        self,
+        market: str,
+        df: pd.DataFrame,
+        checked: tuple[int, int] | Iterable[tuple[int, int]] | None = None,
+        now: datetime | None = None,
+    ) -> int:
+        """Store closed candles from ``df`` and update coverage.
+
+        ``checked`` marks additional ``[start, end)`` ranges (one tuple or a
+        list of tuples) as answered by the exchange, covering minutes without
+        trades. Rows of the minute that is still forming are ignored. Returns
+        the number of stored rows.
+        """
+        if checked is None:
+            ranges = []
+        elif isinstance(checked, tuple) and not isinstance(checked[0], tuple):
+            ranges = [checked]
+        else:
+            ranges = list(checked)
+        current = to_minute((now or datetime.utcnow()).replace(second=0, microsecond=0))
+        if df is not None and not df.empty and TIME_COL in df.columns:
+            minutes = _minutes(df)
+            df = df[(minutes >= 0) & (minutes < current)]
+        else:
+            df = pd.DataFrame()
+
+        with file_lock(self._lock_path(market)):
+            if not df.empty:
+                days = pd.to_datetime(df[TIME_COL], utc=True).dt.strftime("%Y-%m-%d")
+                for day, part in df.groupby(days.to_numpy()):
+                    self._write_partition(market, day, part)
+            cover = self.coverage(market)
+            if not df.empty:
+                cover.add_minutes(_minutes(df).tolist())
+            for start, end in ranges:
+                cover.add(start, min(end, current))
+            self._save_coverage(market, cover)
+        return len(df)
+
+    def _write_partition(self, market: str, day: str, df: pd.DataFrame) -> None:
+        path = self.market_dir(market) / f"{day}.parquet"
+        if path.exists():
+            try:
+                df = pd.concat([pd.read_parquet(path), df], ignore_index=True)
+            except Exception as exc:  # pragma: no cover - best effort
+                logging.warning("Partition read failed %s: %s", path, exc)
+        df = df.drop_duplicates(subset=[TIME_COL], keep="last")
+        df = df.sort_values(TIME_COL).reset_index(drop=True)
+        save_parquet_atomic(df, path)
+
+    # ------------------------------------------------------------------
+    # fetching
+    def ensure_range(
+        self,
+        market: str,
+        start: int,
+        end: int,
+        now: datetime | None = None,
+        flush_pages: int = 1,
+    ) -> int:
+        """Fetch missing candles of ``[start, end)`` and return request count.
+
+        Windows are requested newest first. Up to ``flush_pages`` pages are
+        kept in memory before they are written together with their coverage,
+        so an interrupted download resumes from the last flushed page.
+        """
+        requests_made = 0
+        frames: List[pd.DataFrame] = []
+        checked: List[tuple[int, int]] = []
+        for w_start, w_end in reversed(coalesce_ranges(self.missing(market, start, end))):
+            count = w_end - w_start
+            rows = self.fetch(market, count, from_minute(w_end))
+            requests_made += 1
+            if self.limiter is None:
+                time.sleep(self.request_delay)
+            if not rows:
+                logging.warning("No candles for %s before %s", market, from_minute(w_end))
+                continue
+            df = pd.DataFrame(rows)
+            earliest = int(_minutes(df).min())
+            # A full page reaches back past the window start even when some
+            # minutes had no trades, a short page means history ends here.
+            checked_start = min(earliest, w_start) if len(rows) < count else earliest
+            frames.append(df)
+            checked.append((checked_start, w_end))
+            if len(frames) >= flush_pages:
+                self.append(market, pd.concat(frames, ignore_index=True), checked=checked, now=now)
+                frames, checked = [], []
+        if frames:
+            self.append(market, pd.concat(frames, ignore_index=True), checked=checked, now=now)
+        return requests_made
+
+    # ------------------------------------------------------------------
+    # reading
+    def load(self, market: str, start: int | None = None, end: int | None = None) -> pd.DataFrame:
+        """Return stored candles of ``[start, end)`` sorted by time."""
+        files = sorted(self.market_dir(market).glob("*.parquet"))
+        if start is not None:
+            first_day = from_minute(start).strftime("%Y-%m-%d")
+            files = [f for f in files if f.stem >= first_day]
+        if end is not None:
+            last_day = from_minute(end - 1).strftime("%Y-%m-%d")
+            files = [f for f in files if f.stem <= last_day]
+        frames = []
+        for f in files:
+            try:
+                frames.append(pd.read_parquet(f))
+            except Exception as exc:  # pragma: no cover - best effort
+                logging.warning("Partition read failed %s: %s", f, exc)
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        minutes = _minutes(df)
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= minutes >= start
+        if end is not None:
+            mask &= minutes < end
+        return df[mask].sort_values(TIME_COL).reset_index(drop=True)
+
+    def write_view(self, market: str, path: Path, start: int | None = None, end: int | None = None) -> int:
+        """Materialise ``[start, end)`` of ``market`` to ``path``."""
+        df = self.load(market, start, end)
+        if df.empty:
+            return 0
+        ensure_dir(Path(path).parent)
+        with file_lock(Path(path).with_suffix(Path(path).suffix + ".lock")):
+            save_parquet_atomic(df, path)
+        return len(df)
+
+
+def last_closed_minute(now: datetime | None = None) -> int:
+    """Return the epoch minute right after the last closed candle."""
+    return to_minute((now or datetime.utcnow()).replace(second=0, microsecond=0))
@@ -0,0 +1,145 @@
+"""06_train 용 LightGBM 바이너리 Dataset 캐시.
+
+심볼마다 학습 세트를 구간화(bin)한 LightGBM 바이너리 파일과 검증 세트의
+float32 배열을 저장합니다. 캐시 키는 분할 데이터의 서명(매니페스트 원본 파일
+크기/수정 시각과 행 범위)과 구간화 파라미터로 만들어지므로, 데이터가 그대로이면
+Parquet 읽기, 숫자 변환, 구간 계산 없이 바로 부스팅을 시작합니다. 학습 파라미터
+(learning_rate, num_leaves 등)는 키에 포함되지 않아 하이퍼파라미터 실험 간에도
+같은 캐시를 재사용합니다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+import lightgbm as lgb
+import numpy as np
+
+from split_io import split_signature
+from utils import ensure_dir
+
+CACHE_VERSION = 1
+# 구간화 파라미터. feature_pre_filter 를 끄면 min_data_in_leaf 등을 바꿔도
+# 같은 Dataset 으로 학습할 수 있습니다.
+DATASET_PARAMS: Dict[str, Any] = {"max_bin": 255, "feature_pre_filter": False, "verbose": -1}
+
+
+@dataclass
+class CachedSplit:
+    """캐시된 학습 Dataset 과 검증 배열, 빌드 시 계산한 메타데이터."""
+
+    train: lgb.Dataset
+    X_valid: np.ndarray
+    y_valid: np.ndarray
+    meta: Dict[str, Any]
+
+
+def dataset_signature(split_dir: Path, symbol: str, features: List[str] | None = None) -> Dict[str, Any]:
+    """06_train 캐시 서명: 학습/검증 분할 서명과 (선택된 경우) 피처 목록."""
+    signature: Dict[str, Any] = {part: split_signature(split_dir, symbol, part) for part in ("train", "valid")}
+    if features is not None:
+        signature["features"] = list(features)
+    return signature
+
+
+def balanced_weights(y: np.ndarray) -> np.ndarray:
+    """sklearn ``class_weight="balanced"`` 과 같은 행별 가중치."""
+    y = np.asarray(y, dtype=int)
+    counts = np.bincount(y, minlength=2).astype(float)
+    classes = np.count_nonzero(counts)
+    return len(y) / (classes * counts[y])
+
+
+class DatasetCache:
+    """심볼별 학습/검증 데이터 캐시."""
+
+    def __init__(self, root: Path, params: Dict[str, Any] | None = None) -> None:
+        self.root = Path(root)
+        self.params = dict(DATASET_PARAMS if params is None else params)
+
+    def _paths(self, symbol: str) -> Dict[str, Path]:
+        return {
+            "train": self.root / f"{symbol}.train.bin",
+            "X_valid": self.root / f"{symbol}.valid_X.npy",
+            "y_valid": self.root / f"{symbol}.valid_y.npy",
+            "meta": self.root / f"{symbol}.meta.json",
+        }
+
+    def key(self, signature: Dict[str, Any]) -> str:
+        payload = {"version": CACHE_VERSION, "params": self.params, "signature": signature}
+        return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _read_meta(self, symbol: str) -> Dict[str, Any] | None:
+        try:
+            with open(self._paths(symbol)["meta"], "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as exc:  # pragma: no cover - best effort
+            logging.warning("%s 데이터셋 캐시 메타 로드 실패: %s", symbol, exc)
+            return None
+
+    def load(self, symbol: str, signature: Dict[str, Any]) -> CachedSplit | None:
+        """``signature`` 가 같으면 캐시를 반환 (없거나 바뀌었으면 None)."""
+        meta = self._read_meta(symbol)
+        if meta is None or meta.get("key") != self.key(signature):
+            return None
+        paths = self._paths(symbol)
+        try:
+            train = lgb.Dataset(str(paths["train"]), params=self.params).construct()
+            X_valid = np.load(paths["X_valid"], mmap_mode="r")
+            y_valid = np.load(paths["y_valid"])
+        except Exception as exc:  # pragma: no cover - best effort
+            logging.warning("%s 데이터셋 캐시 로드 실패: %s", symbol, exc)
+            return None
+        return CachedSplit(train, X_valid, y_valid, meta)
+
+    def build(
+        self,
+        symbol: str,
+        signature: Dict[str, Any],
+        X_train: Any,
+        y_train: np.ndarray,
+        X_valid: Any,
+        y_valid: np.ndarray,
+        meta: Dict[str, Any],
+        categorical: List[str] | None = None,
+    ) -> CachedSplit:
+        """학습 Dataset 을 구간화해 저장하고 캐시 항목을 반환.
+
+        ``categorical`` 컬럼은 LightGBM 범주형 피처로 구간화합니다. 이때 ``lgb.train``
+        이 범주형 설정을 다시 확인하므로 원본 데이터를 해제하지 않습니다.
+        """
+        features = list(X_train.columns)
+        train = lgb.Dataset(
+            np.ascontiguousarray(X_train.to_numpy(dtype=np.float32)),
+            label=np.asarray(y_train),
+            weight=balanced_weights(y_train),
+            feature_name=features,
+            categorical_feature=categorical or "auto",
+            params=self.params,
+            free_raw_data=not categorical,
+        ).construct()
+        X_valid_arr = np.ascontiguousarray(X_valid[features].to_numpy(dtype=np.float32))
+        y_valid_arr = np.asarray(y_valid, dtype=np.int8)
+        meta = {**meta, "key": self.key(signature), "features": features}
+
+        paths = self._paths(symbol)
+        ensure_dir(self.root)
+        try:
+            paths["train"].unlink(missing_ok=True)
+            train.save_binary(str(paths["train"]))
+            np.save(paths["X_valid"], X_valid_arr)
+            np.save(paths["y_valid"], y_valid_arr)
+            tmp = paths["meta"].with_suffix(".json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f, default=str)
+            tmp.replace(paths["meta"])
+        except Exception as exc:  # pragma: no cover - best effort
+            logging.warning("%s 데이터셋 캐시 저장 실패: %s", symbol, exc)
+        return CachedSplit(train, X_valid_arr, y_valid_arr, meta)
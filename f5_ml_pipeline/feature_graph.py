@@ -0,0 +1,190 @@
+"""03_feature_engineering 피처의 선언형 계산 그래프.
+
+각 노드는 이름, 입력 노드 이름, 계산 함수를 가집니다. ``evaluate`` 는 요청된
+피처와 그 의존 노드만 한 번씩 계산하므로 ``rolling(20)``, EMA, 기준 가격(TP),
+진폭(TR) 같은 공통 중간값이 여러 피처에서 재사용됩니다. 입력 값은 심볼 하나의
+Series 또는 (시간 x 심볼) DataFrame 모두 가능합니다.
+"""
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from indicators import (  # noqa: E402
+    adx,
+    atr,
+    mfi,
+    rolling_mad,
+    rsi_from_moves,
+    stochastic,
+    true_range,
+    vwap,
+)
+
+BASE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class Node:
+    """피처 그래프 노드. ``output`` 이 False 이면 중간값으로만 사용됩니다."""
+
+    name: str
+    inputs: Tuple[str, ...]
+    func: Callable[..., Any]
+    output: bool = True
+
+
+def _n(name: str, inputs: str, func: Callable[..., Any], output: bool = True) -> Node:
+    return Node(name, tuple(inputs.split()), func, output)
+
+
+def _ema(span: int) -> Callable[[Any], Any]:
+    return lambda close: close.ewm(span=span, adjust=False).mean()
+
+
+def _flag(series: Any) -> Any:
+    return series.astype(np.int8)
+
+
+# 노드 순서가 곧 출력 컬럼 순서입니다(기존 add_features 와 동일). 의존 노드는
+# 뒤에 선언되어도 먼저 계산됩니다.
+NODES: List[Node] = [
+    # === 이동 평균 ===
+    *[_n(f"ema{span}", "close", _ema(span)) for span in [5, 8, 13, 20, 21, 60, 120]],
+    _n("sma5", "close", lambda c: c.rolling(5).mean()),
+    _n("sma20", "close", lambda c: c.rolling(20).mean()),
+    _n("ema5_ema20_diff", "ema5 ema20", lambda a, b: a - b),
+    _n("ema8_ema21_diff", "ema8 ema21", lambda a, b: a - b),
+    _n("ema5_ema60_diff", "ema5 ema60", lambda a, b: a - b),
+    _n("ema20_ema60_diff", "ema20 ema60", lambda a, b: a - b),
+    _n("ema_gc", "ema5 ema20", lambda a, b: _flag(a > b)),
+    _n("ema_dc", "ema5 ema20", lambda a, b: _flag(a < b)),
+    # === 모멘텀 지표 ===
+    _n("_delta", "close", lambda c: c.diff(), output=False),
+    _n("_up", "_delta", lambda d: d.clip(lower=0), output=False),
+    _n("_down", "_delta", lambda d: -d.clip(upper=0), output=False),
+    _n("rsi7", "_up _down", lambda u, d: rsi_from_moves(u, d, 7)),
+    _n("rsi14", "_up _down", lambda u, d: rsi_from_moves(u, d, 14)),
+    _n("rsi21", "_up _down", lambda u, d: rsi_from_moves(u, d, 21)),
+    _n("rsi_oversold", "rsi14", lambda r: _flag(r < 30)),
+    _n("rsi_overbought", "rsi14", lambda r: _flag(r > 70)),
+    _n("_tr", "high low close", true_range, output=False),
+    _n("atr14", "high low close _tr", lambda h, l, c, tr: atr(h, l, c, 14, tr=tr)),
+    _n("ma_vol5", "volume", lambda v: v.rolling(5).mean(), output=False),
+    _n("ma_vol20", "volume", lambda v: v.rolling(20).mean(), output=False),
+    _n("vol_ratio", "volume ma_vol20", lambda v, m: v / (m + 1e-8)),
+    _n("vol_ratio_5", "volume ma_vol5", lambda v, m: v / (m + 1e-8)),
+    _n("vol_chg", "volume", lambda v: v.pct_change().fillna(0)),
+    _n("_stoch7", "high low close", lambda h, l, c: stochastic(h, l, c, k_period=7, d_period=3), output=False),
+    _n("_stoch14", "high low close", lambda h, l, c: stochastic(h, l, c, k_period=14, d_period=3), output=False),
+    _n("stoch_k7", "_stoch7", lambda s: s[0]),
+    _n("stoch_d7", "_stoch7", lambda s: s[1]),
+    _n("stoch_k14", "_stoch14", lambda s: s[0]),
+    _n("stoch_d14", "_stoch14", lambda s: s[1]),
+    _n("stoch_k", "stoch_k14", lambda s: s),
+    _n("stoch_d", "stoch_d14", lambda s: s),
+    # === 파생 피처 및 변동률 ===
+    _n("pct_change_1m", "close", lambda c: c.pct_change(1)),
+    _n("pct_change_5m", "close", lambda c: c.pct_change(5)),
+    _n("pct_change_10m", "close", lambda c: c.pct_change(10)),
+    _n("mom10", "close", lambda c: c.diff(10)),
+    _n("roc10", "pct_change_10m", lambda p: p),
+    # 캔들 신호/패턴/바디 비율
+    _n("is_bull", "open close", lambda o, c: _flag(c > o)),
+    _n("body_size", "open close", lambda o, c: (c - o).abs()),
+    _n("body_pct", "body_size hl_range", lambda b, r: b / r.replace(0, 1)),
+    _n("hl_range", "high low", lambda h, l: h - l),
+    _n("oc_range", "open close", lambda o, c: (o - c).abs()),
+    _n("body_to_range", "body_size hl_range", lambda b, r: b / (r + 1e-8)),
+    _n("is_doji", "body_size hl_range", lambda b, r: _flag(b <= r * 0.1)),
+    _n("long_bull", "open close body_size hl_range", lambda o, c, b, r: _flag((c > o) & (b >= r * 0.7))),
+    _n("long_bear", "open close body_size hl_range", lambda o, c, b, r: _flag((c < o) & (b >= r * 0.7))),
+    _n("_upper_shadow", "high open close", lambda h, o, c: h - np.fmax(o, c), output=False),
+    _n("_lower_shadow", "low open close", lambda l, o, c: np.fmin(o, c) - l, output=False),
+    _n(
+        "is_hammer",
+        "_upper_shadow _lower_shadow body_size",
+        lambda u, lo, b: _flag((lo >= 2 * b) & (u <= b)),
+    ),
+    # 전봉 대비 변화/패턴
+    _n("_prev_open", "open", lambda o: o.shift(), output=False),
+    _n("_prev_close", "close", lambda c: c.shift(), output=False),
+    _n("close_change", "_delta", lambda d: d),
+    _n("high_break", "high", lambda h: _flag(h > h.shift(1))),
+    _n("low_break", "low", lambda l: _flag(l < l.shift(1))),
+    _n("pivot_up", "open close _prev_open _prev_close", lambda o, c, po, pc: _flag((c > o) & (pc < po))),
+    _n("pivot_down", "open close _prev_open _prev_close", lambda o, c, po, pc: _flag((c < o) & (pc > po))),
+    # 볼린저밴드(20, 표준 2배수)
+    _n("_std20", "close", lambda c: c.rolling(20).std(), output=False),
+    _n("bb_mid", "sma20", lambda m: m),
+    _n("bb_upper", "sma20 _std20", lambda m, s: m + 2 * s),
+    _n("bb_lower", "sma20 _std20", lambda m, s: m - 2 * s),
+    _n("bb_width", "bb_upper bb_lower sma20", lambda u, lo, m: (u - lo) / (m + 1e-8)),
+    _n("bb_dist", "close sma20 _std20", lambda c, m, s: (c - m) / (s + 1e-8)),
+    _n("dis_ma20", "close sma20", lambda c, m: (c - m) / (m + 1e-8)),
+    _n("volatility14", "pct_change_1m", lambda p: p.rolling(14).std()),
+    _n("anomaly", "close bb_upper bb_lower", lambda c, u, lo: _flag((c > u) | (c < lo))),
+    # MACD (12, 26, 9)
+    _n("_ema12", "close", _ema(12), output=False),
+    _n("_ema26", "close", _ema(26), output=False),
+    _n("macd", "_ema12 _ema26", lambda f, s: f - s),
+    _n("macd_signal", "macd", _ema(9)),
+    _n("macd_hist", "macd macd_signal", lambda m, s: m - s),
+    # MFI, ADX, CCI, VWAP
+    _n("_tp", "high low close", lambda h, l, c: (h + l + c) / 3, output=False),
+    _n("mfi14", "high low close volume _tp", lambda h, l, c, v, tp: mfi(h, l, c, v, period=14, typical_price=tp)),
+    _n("adx14", "high low close _tr", lambda h, l, c, tr: adx(h, l, c, period=14, tr=tr)[0]),
+    _n(
+        "cci14",
+        "_tp",
+        lambda tp: (tp - tp.rolling(14).mean()) / (0.015 * rolling_mad(tp, 14) + 1e-8),
+    ),
+    _n("vwap", "high low close volume _tp", lambda h, l, c, v, tp: vwap(h, l, c, v, typical_price=tp)),
+    # OBV
+    _n("obv", "close volume _prev_close", lambda c, v, pc: v.where(c > pc, -v).cumsum().fillna(0)),
+]
+
+NODE_MAP: Dict[str, Node] = {node.name: node for node in NODES}
+OUTPUT_FEATURES: List[str] = [node.name for node in NODES if node.output]
+
+
+def dependencies(wanted: Iterable[str]) -> List[str]:
+    """``wanted`` 계산에 필요한 노드 이름을 위상 순서로 반환합니다."""
+    order: List[str] = []
+    seen: set[str] = set(BASE_COLUMNS)
+
+    def visit(name: str) -> None:
+        if name in seen:
+            return
+        node = NODE_MAP.get(name)
+        if node is None:
+            raise KeyError(f"Unknown feature: {name}")
+        seen.add(name)
+        for dep in node.inputs:
+            visit(dep)
+        order.append(name)
+
+    for name in wanted:
+        visit(name)
+    return order
+
+
+def evaluate(base: Dict[str, Any], wanted: Iterable[str] | None = None) -> Dict[str, Any]:
+    """``base`` OHLCV 로부터 ``wanted`` 피처를 계산해 선언 순서대로 반환합니다.
+
+    ``wanted`` 가 None 이면 모든 출력 피처를 계산합니다. 알 수 없는 이름은
+    무시합니다(모델 피처 목록에 m5/시간 피처가 섞여 있을 수 있음).
+    """
+    targets = OUTPUT_FEATURES if wanted is None else [n for n in wanted if n in NODE_MAP]
+    values: Dict[str, Any] = {col: base[col] for col in BASE_COLUMNS}
+    for name in dependencies(targets):
+        node = NODE_MAP[name]
+        values[name] = node.func(*(values[dep] for dep in node.inputs))
+    selected = set(targets)
+    return {name: values[name] for name in OUTPUT_FEATURES if name in selected}
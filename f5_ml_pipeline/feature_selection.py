@@ -0,0 +1,230 @@
+"""심볼별 중요도와 피처 간 상관으로 학습에 쓸 피처 목록을 고른다.
+
+03 단계는 90개 가까운 숫자형 컬럼을 만들고 06 단계는 그 전부를 피처로 쓰지만,
+``stoch_k``/``stoch_k14`` 나 ``ema5``/``ema20`` 처럼 거의 같은 값을 담은 컬럼이
+많습니다. 심볼마다 작은 LightGBM 모델을 학습해 gain 중요도와 검증 세트 순열
+중요도(컬럼을 섞었을 때의 AUC 하락)를 구하고, 심볼 평균 점수 순으로 피처를
+고르되 이미 고른 피처와 상관이 높은 피처는 중복으로 제외합니다.
+
+결과는 ``selected_features.json`` 으로 저장되며 ``features.use_selected`` 를 켜면
+03 단계는 이 피처만 계산하고 06 단계는 이 피처로만 학습합니다. 08 단계는 모델이
+쓰는 컬럼만 읽습니다. 그래서 중요도는 분할 파일에 저장된 피처가 아니라 OHLCV 로
+03 단계 전체 피처를 다시 계산해 구하며, 이전 선택에서 빠진 피처도 매번 다시 평가합니다.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+import feature_graph
+from booster_model import train_booster
+from dataset_cache import DATASET_PARAMS, balanced_weights
+from split_io import load_split
+
+IGNORE_COLS = {"timestamp", "label", "signal1", "signal2", "signal3"}
+SEED = 42
+# 피처를 다시 계산할 때 표본 앞에 더 읽는 학습 행 (EMA120/일봉 피처 수렴용, 하루)
+WARMUP_ROWS = 1440
+PIPELINE_DIR = Path(__file__).resolve().parent
+
+# (split_dir, symbol, model 파라미터, 최대 학습 행 수, 최대 부스팅 라운드)
+Task = Tuple[str, str, Dict[str, Any], int, int]
+
+
+def load_selected(path: Path) -> Optional[List[str]]:
+    """저장된 피처 목록 (파일이 없으면 None)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return list(json.load(f)["features"])
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("피처 목록 로드 실패: %s", exc)
+        return None
+
+
+def _feature_module():
+    """``03_feature_engineering`` 스크립트 모듈 (프로세스마다 한 번만 읽음)."""
+    name = "f5_feature_engineering"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, PIPELINE_DIR / "03_feature_engineering.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[name] = module
+    return sys.modules[name]
+
+
+def full_features(df: pd.DataFrame) -> pd.DataFrame:
+    """OHLCV 로 03 단계의 전체 피처를 다시 계산해 덮어쓴다 (라벨 등 다른 컬럼은 유지).
+
+    OHLCV 가 없으면 저장된 컬럼을 그대로 반환한다.
+    """
+    if not set(feature_graph.BASE_COLUMNS).issubset(df.columns):
+        logging.warning("OHLCV 컬럼이 없어 저장된 피처로 중요도를 계산합니다.")
+        return df
+    base = [c for c in ("timestamp", "candle_date_time_kst", *feature_graph.BASE_COLUMNS) if c in df.columns]
+    full = _feature_module().add_features(df[base].reset_index(drop=True))
+    df = df.reset_index(drop=True)
+    return pd.concat([full, df.drop(columns=[c for c in df.columns if c in full.columns])], axis=1)
+
+
+def _numeric(df: pd.DataFrame) -> pd.DataFrame:
+    for col in df.columns:
+        if df[col].dtype == "object":
+            converted = pd.to_numeric(df[col], errors="coerce")
+            if pd.api.types.is_numeric_dtype(converted):
+                df[col] = converted
+    df.fillna(0, inplace=True)
+    return df
+
+
+def _frames(split_dir: Path, symbol: str, sample_rows: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """학습 세트 마지막 ``sample_rows`` 행과 검증 세트 (전체 피처를 다시 계산).
+
+    학습 세트 끝과 검증 세트는 이어진 구간이므로 ``WARMUP_ROWS`` 를 앞에 붙여
+    한 번에 계산한 뒤 다시 나눈다.
+    """
+    train_df = load_split(split_dir, symbol, "train")
+    valid_df = load_split(split_dir, symbol, "valid")
+    if sample_rows:
+        train_df = train_df.tail(sample_rows + WARMUP_ROWS)
+    warmup = max(len(train_df) - sample_rows, 0) if sample_rows else 0
+    both = full_features(pd.concat([train_df, valid_df], ignore_index=True))
+    n_train = len(train_df)
+    return (
+        _numeric(both.iloc[warmup:n_train].reset_index(drop=True)),
+        _numeric(both.iloc[n_train:].reset_index(drop=True)),
+    )
+
+
+def _target(df: pd.DataFrame) -> np.ndarray:
+    return df.get("signal1", pd.Series([0] * len(df))).astype(int).to_numpy()
+
+
+def permutation_drop(model: Any, X: np.ndarray, y: np.ndarray, seed: int = SEED) -> np.ndarray:
+    """컬럼마다 값을 섞었을 때의 검증 AUC 하락 (음수는 0)."""
+    rng = np.random.default_rng(seed)
+    base = roc_auc_score(y, model.predict_proba(X)[:, 1])
+    drops = np.zeros(X.shape[1])
+    work = X.copy()
+    for j in range(X.shape[1]):
+        original = work[:, j].copy()
+        work[:, j] = rng.permutation(original)
+        drops[j] = base - roc_auc_score(y, model.predict_proba(work)[:, 1])
+        work[:, j] = original
+    return np.clip(drops, 0, None)
+
+
+def rank_symbol(task: Task) -> Optional[Dict[str, Any]]:
+    """한 심볼의 피처별 gain 비중, 순열 중요도, 학습 구간 상관 행렬."""
+    split_dir, symbol, params, sample_rows, n_estimators = task
+    try:
+        train_df, valid_df = _frames(Path(split_dir), symbol, sample_rows)
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("%s 데이터 로드 실패: %s", symbol, exc)
+        return None
+    numeric_cols = train_df.select_dtypes(include=["number", "bool"]).columns
+    features = [c for c in numeric_cols if c not in IGNORE_COLS]
+    y_train, y_valid = _target(train_df), _target(valid_df)
+    if not features or len(np.unique(y_train)) < 2 or len(np.unique(y_valid)) < 2:
+        logging.warning("%s 중요도 계산 스킵: 피처가 없거나 라벨이 한 종류뿐입니다.", symbol)
+        return None
+
+    X_train = train_df[features].to_numpy(dtype=np.float32)
+    X_valid = valid_df.reindex(columns=features, fill_value=0).to_numpy(dtype=np.float32)
+    train_set = lgb.Dataset(
+        X_train, label=y_train, weight=balanced_weights(y_train), feature_name=features, params=DATASET_PARAMS
+    )
+    model = train_booster(params, train_set, X_valid, y_valid, features, DATASET_PARAMS, n_estimators)
+    gain = model.booster_.feature_importance("gain", iteration=model.best_iteration_)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.nan_to_num(np.abs(np.corrcoef(X_train.astype(np.float64), rowvar=False)))
+    return {
+        "symbol": symbol,
+        "features": features,
+        "gain": gain / gain.sum() if gain.sum() > 0 else gain,
+        "permutation": permutation_drop(model, X_valid, y_valid),
+        "corr": corr,
+    }
+
+
+def rank_symbols(tasks: Sequence[Task], workers: int = 1) -> List[Dict[str, Any]]:
+    """작업 목록을 실행 (``workers`` 가 2 이상이면 프로세스 풀)."""
+    if workers <= 1 or len(tasks) <= 1:
+        results = [rank_symbol(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(rank_symbol, tasks))
+    return [r for r in results if r is not None]
+
+
+def _share(values: np.ndarray) -> np.ndarray:
+    total = values.sum()
+    return values / total if total > 0 else values
+
+
+def select_features(
+    ranks: Sequence[Dict[str, Any]],
+    corr_threshold: float = 0.95,
+    min_importance: float = 0.001,
+    max_features: int = 0,
+) -> Dict[str, Any]:
+    """심볼 결과를 모아 점수 순으로 피처를 고른다.
+
+    점수는 심볼 평균 gain 비중과 순열 중요도 비중의 평균이다. 점수가
+    ``min_importance`` 미만이거나, 이미 고른 피처와 심볼 평균 절대 상관이
+    ``corr_threshold`` 이상이거나, ``max_features`` 를 넘는 피처는 제외한다.
+    모든 심볼에 있는 피처만 대상으로 하며 ``features`` 는 원래 컬럼 순서를 따른다.
+    """
+    if not ranks:
+        return {"features": [], "dropped": {}, "importance": {}, "symbols": 0}
+    shared = set(ranks[0]["features"]).intersection(*(set(r["features"]) for r in ranks[1:]))
+    features = [f for f in ranks[0]["features"] if f in shared]
+    gain = np.zeros(len(features))
+    perm = np.zeros(len(features))
+    corr = np.zeros((len(features), len(features)))
+    for r in ranks:
+        idx = [r["features"].index(f) for f in features]
+        gain += r["gain"][idx]
+        perm += r["permutation"][idx]
+        corr += r["corr"][np.ix_(idx, idx)]
+    gain, perm, corr = gain / len(ranks), perm / len(ranks), corr / len(ranks)
+    score = (_share(gain) + _share(perm)) / 2 if perm.sum() > 0 else _share(gain)
+
+    kept: List[int] = []
+    dropped: Dict[str, str] = {}
+    for j in np.argsort(-score, kind="stable"):
+        name = features[j]
+        if score[j] < min_importance:
+            dropped[name] = "low_importance"
+            continue
+        dup = next((k for k in kept if corr[j, k] >= corr_threshold), None)
+        if dup is not None:
+            dropped[name] = f"correlated:{features[dup]}"
+        elif max_features and len(kept) >= max_features:
+            dropped[name] = "max_features"
+        else:
+            kept.append(j)
+    return {
+        "features": [features[j] for j in sorted(kept)],
+        "dropped": dropped,
+        "importance": {
+            f: {"score": float(score[j]), "gain": float(gain[j]), "permutation": float(perm[j])}
+            for j, f in sorted(enumerate(features), key=lambda item: -score[item[0]])
+        },
+        "symbols": len(ranks),
+    }
+
+
+__all__ = ["full_features", "load_selected", "permutation_drop", "rank_symbol", "rank_symbols", "select_features"]
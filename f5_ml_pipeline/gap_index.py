@@ -0,0 +1,176 @@
+"""In-memory minute coverage index used to find candle gaps without file reads."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+
+# Upbit returns at most 200 candles per request.
+CANDLE_MAX_COUNT = 200
+
+
+def to_minute(value: datetime | str) -> int:
+    """Return epoch minute for ``value`` (naive values are treated as UTC)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp()) // 60
+
+
+def from_minute(minute: int) -> datetime:
+    """Return naive UTC datetime for epoch ``minute``."""
+    return datetime.fromtimestamp(minute * 60, tz=timezone.utc).replace(tzinfo=None)
+
+
+class IntervalSet:
+    """Sorted, non-overlapping half-open ``[start, end)`` minute intervals."""
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]] | None = None) -> None:
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        for start, end in intervals or []:
+            self.add(start, end)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self):
+        return iter(zip(self._starts, self._ends))
+
+    def total(self) -> int:
+        """Return the number of covered minutes."""
+        return sum(e - s for s, e in zip(self._starts, self._ends))
+
+    def add(self, start: int, end: int) -> None:
+        """Mark ``[start, end)`` as covered, merging adjacent intervals."""
+        if end <= start:
+            return
+        # first interval whose end reaches ``start`` and last whose start reaches ``end``
+        lo = bisect_right(self._ends, start - 1)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def add_minutes(self, minutes: Iterable[int]) -> None:
+        """Mark individual ``minutes`` as covered."""
+        run_start = run_end = None
+        for m in sorted(set(int(x) for x in minutes)):
+            if run_end is not None and m == run_end:
+                run_end += 1
+                continue
+            if run_start is not None:
+                self.add(run_start, run_end)
+            run_start, run_end = m, m + 1
+        if run_start is not None:
+            self.add(run_start, run_end)
+
+    def covers(self, minute: int) -> bool:
+        """Return ``True`` if ``minute`` is covered."""
+        idx = bisect_right(self._starts, minute) - 1
+        return idx >= 0 and minute < self._ends[idx]
+
+    def missing(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Return uncovered ``[start, end)`` sub-ranges of the given range."""
+        gaps: List[Tuple[int, int]] = []
+        cursor = start
+        idx = max(bisect_right(self._starts, start) - 1, 0)
+        while cursor < end and idx < len(self._starts):
+            s, e = self._starts[idx], self._ends[idx]
+            if e <= cursor:
+                idx += 1
+                continue
+            if s >= end:
+                break
+            if s > cursor:
+                gaps.append((cursor, s))
+            cursor = max(cursor, e)
+            idx += 1
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def trim(self, before: int) -> None:
+        """Forget coverage older than ``before`` to keep the set compact."""
+        idx = bisect_right(self._ends, before)
+        del self._starts[:idx]
+        del self._ends[:idx]
+        if self._starts and self._starts[0] < before:
+            self._starts[0] = before
+
+    def to_list(self) -> List[List[int]]:
+        """Return intervals as JSON serialisable ``[[start, end], ...]``."""
+        return [[s, e] for s, e in self]
+
+    @classmethod
+    def from_list(cls, data: Iterable[Iterable[int]]) -> "IntervalSet":
+        """Build an interval set from :meth:`to_list` output."""
+        return cls((int(s), int(e)) for s, e in data)
+
+
+class GapIndex:
+    """Per-market :class:`IntervalSet` of collected minutes.
+
+    ``retention`` limits how many minutes of coverage are kept in memory.
+    """
+
+    def __init__(self, retention: int | None = None) -> None:
+        self.retention = retention
+        self._sets: Dict[str, IntervalSet] = {}
+
+    def is_seeded(self, market: str) -> bool:
+        return market in self._sets
+
+    def _get(self, market: str) -> IntervalSet:
+        return self._sets.setdefault(market, IntervalSet())
+
+    def add_minutes(self, market: str, minutes: Iterable[int]) -> None:
+        """Record appended candle ``minutes`` for ``market``."""
+        cover = self._get(market)
+        cover.add_minutes(minutes)
+        self._trim(cover)
+
+    def add_range(self, market: str, start: int, end: int) -> None:
+        """Record ``[start, end)`` as checked for ``market``."""
+        cover = self._get(market)
+        cover.add(start, end)
+        self._trim(cover)
+
+    def missing(self, market: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """Return missing ``[start, end)`` ranges for ``market``."""
+        return self._get(market).missing(start, end)
+
+    def _trim(self, cover: IntervalSet) -> None:
+        if self.retention and len(cover):
+            last_end = list(cover)[-1][1]
+            cover.trim(last_end - self.retention)
+
+
+def coalesce_ranges(
+    ranges: Iterable[Tuple[int, int]], max_count: int = CANDLE_MAX_COUNT
+) -> List[Tuple[int, int]]:
+    """Group missing ``ranges`` into the fewest request windows.
+
+    Each returned ``(start, end)`` window spans at most ``max_count`` minutes
+    and can be fetched with ``to=end`` and ``count=end - start``. Windows are
+    filled greedily from the oldest gap which is optimal for fixed-size
+    windows on a line.
+    """
+    windows: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        while start < end:
+            if windows and start < windows[-1][0] + max_count:
+                w_start, w_end = windows[-1]
+                new_end = min(end, w_start + max_count)
+                if new_end > w_end:
+                    windows[-1] = (w_start, new_end)
+                start = max(start, new_end)
+                continue
+            new_end = min(end, start + max_count)
+            windows.append((start, new_end))
+            start = new_end
+    return windows
@@ -0,0 +1,185 @@
+"""버전별 모델 저장소와 메모리 캐시.
+
+``{model_dir}/{symbol}/v000001/`` 폴더에 ``model.pkl`` 과 ``meta.json`` (피처 목록,
+학습 구간, 평가 지표, 학습 이력)을 저장하고 ``{symbol}/CURRENT`` 파일이 현재
+버전을 가리킵니다. 새 버전은 폴더를 모두 쓴 뒤 ``CURRENT`` 를 ``os.replace`` 로
+교체해 공개하므로, 읽는 쪽은 항상 완성된 이전 버전이나 새 버전 중 하나만 봅니다.
+
+LightGBM 이진 분류 모델은 ``tree_export`` 로 변환한 ``model.npz`` 도 함께
+저장합니다. ``ModelCache`` 는 신호 루프나 예측 서비스처럼 오래 실행되는
+프로세스에서 모델을 메모리에 두고, ``CURRENT`` 가 바뀐 경우에만 다시 읽습니다.
+레지스트리에 버전이 없는 심볼은 예전 방식의 ``{symbol}_model.pkl`` 을 읽습니다.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import joblib
+
+from tree_export import CompiledTrees, export_model
+from utils import ensure_dir, file_lock
+
+CURRENT_FILE = "CURRENT"
+COMPILED_FILE = "model.npz"
+# 공개 후에도 남겨 둘 이전 버전 수 (로드 중인 프로세스 보호)
+KEEP_VERSIONS = 5
+
+
+def _version_name(version: int) -> str:
+    return f"v{version:06d}"
+
+
+class ModelRegistry:
+    """심볼별 버전 모델 저장소."""
+
+    def __init__(self, root: Path, keep: int = KEEP_VERSIONS) -> None:
+        self.root = Path(root)
+        self.keep = keep
+
+    def _symbol_dir(self, symbol: str) -> Path:
+        return self.root / symbol
+
+    def versions(self, symbol: str) -> List[int]:
+        """저장된 버전 번호 목록 (오름차순)."""
+        path = self._symbol_dir(symbol)
+        if not path.is_dir():
+            return []
+        return sorted(
+            int(p.name[1:]) for p in path.iterdir() if p.is_dir() and p.name[1:].isdigit()
+        )
+
+    def current_version(self, symbol: str) -> int | None:
+        """``CURRENT`` 가 가리키는 버전 (없으면 None)."""
+        try:
+            text = (self._symbol_dir(symbol) / CURRENT_FILE).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        text = text.strip()
+        return int(text[1:]) if text.startswith("v") and text[1:].isdigit() else None
+
+    def symbols(self) -> List[str]:
+        """현재 버전이 공개된 심볼 목록."""
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            p.name for p in self.root.iterdir() if (p / CURRENT_FILE).is_file()
+        )
+
+    def publish(self, symbol: str, model: Any, meta: Dict[str, Any]) -> int:
+        """새 버전을 저장하고 ``CURRENT`` 를 원자적으로 교체한 뒤 버전을 반환."""
+        symbol_dir = ensure_dir(self._symbol_dir(symbol))
+        with file_lock(symbol_dir / ".lock"):
+            version = max(self.versions(symbol), default=0) + 1
+            name = _version_name(version)
+            staging = symbol_dir / f".{name}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            staging.mkdir()
+            joblib.dump(model, staging / "model.pkl")
+            try:
+                export_model(model).save(staging / COMPILED_FILE)
+            except Exception as exc:  # LightGBM 이진 분류 모델만 변환 가능
+                logging.debug("%s 트리 변환 생략: %s", symbol, exc)
+            with open(staging / "meta.json", "w", encoding="utf-8") as f:
+                json.dump({**meta, "symbol": symbol, "version": version}, f, indent=2, default=str)
+            staging.rename(symbol_dir / name)
+
+            pointer = symbol_dir / f"{CURRENT_FILE}.tmp"
+            pointer.write_text(name, encoding="utf-8")
+            os.replace(pointer, symbol_dir / CURRENT_FILE)
+            self._prune(symbol, version)
+        return version
+
+    def _prune(self, symbol: str, current: int) -> None:
+        old = [v for v in self.versions(symbol) if v != current]
+        for version in old[: max(len(old) - self.keep, 0)]:
+            shutil.rmtree(self._symbol_dir(symbol) / _version_name(version), ignore_errors=True)
+
+    def load(self, symbol: str, version: int | None = None) -> Tuple[Any, Dict[str, Any]]:
+        """``version`` (기본: 현재 버전) 모델과 메타데이터를 반환."""
+        if version is None:
+            version = self.current_version(symbol)
+        if version is None:
+            raise FileNotFoundError(f"No published model for {symbol}")
+        path = self._symbol_dir(symbol) / _version_name(version)
+        model = joblib.load(path / "model.pkl")
+        with open(path / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return model, meta
+
+
+    def load_compiled(self, symbol: str, version: int | None = None) -> Tuple[Any, Dict[str, Any]]:
+        """``model.npz`` 가 있으면 :class:`CompiledTrees` 로, 없으면 pickle 모델을 반환."""
+        if version is None:
+            version = self.current_version(symbol)
+        if version is None:
+            raise FileNotFoundError(f"No published model for {symbol}")
+        path = self._symbol_dir(symbol) / _version_name(version)
+        if not (path / COMPILED_FILE).is_file():
+            return self.load(symbol, version)
+        with open(path / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return CompiledTrees.load(path / COMPILED_FILE), meta
+
+
+def load_model(model_dir: Path, symbol: str) -> Tuple[Any, Dict[str, Any]]:
+    """현재 공개된 모델을 반환. 레지스트리에 없으면 ``{symbol}_model.pkl`` 을 읽는다."""
+    registry = ModelRegistry(model_dir)
+    if registry.current_version(symbol) is not None:
+        return registry.load(symbol)
+    return joblib.load(Path(model_dir) / f"{symbol}_model.pkl"), {}
+
+
+def list_models(model_dir: Path) -> List[str]:
+    """레지스트리 또는 예전 pickle 이 있는 심볼 목록.
+
+    ``_`` 로 시작하는 레지스트리 항목(공통 모델 등)은 심볼이 아니므로 제외한다.
+    """
+    symbols = {s for s in ModelRegistry(model_dir).symbols() if not s.startswith("_")}
+    symbols |= {p.stem.split("_")[0] for p in Path(model_dir).glob("*_model.pkl")}
+    return sorted(symbols)
+
+
+class ModelCache:
+    """메모리에 올려 둔 모델을 새 버전이 공개될 때만 다시 읽는 캐시.
+
+    ``compiled`` 가 True 이면 pickle 대신 ``model.npz`` 의 NumPy 트리 평가기를
+    올립니다(한 행 예측 지연이 짧고 로드가 빠름).
+    """
+
+    def __init__(self, model_dir: Path, compiled: bool = False) -> None:
+        self.registry = ModelRegistry(model_dir)
+        self.compiled = compiled
+        self._models: Dict[str, Tuple[int, Any, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> Tuple[Any, Dict[str, Any]] | None:
+        """``symbol`` 의 현재 모델과 메타데이터 (공개된 버전이 없으면 None)."""
+        version = self.registry.current_version(symbol)
+        if version is None:
+            return None
+        with self._lock:
+            cached = self._models.get(symbol)
+            if cached is not None and cached[0] == version:
+                return cached[1], cached[2]
+        try:
+            loader = self.registry.load_compiled if self.compiled else self.registry.load
+            model, meta = loader(symbol, version)
+        except Exception as exc:  # pragma: no cover - best effort
+            logging.warning("%s 모델 v%d 로드 실패: %s", symbol, version, exc)
+            return (cached[1], cached[2]) if cached is not None else None
+        with self._lock:
+            self._models[symbol] = (version, model, meta)
+        logging.info("[MODEL] %s v%d 로드", symbol, version)
+        return model, meta
+
+    def version(self, symbol: str) -> int | None:
+        """메모리에 올라간 버전."""
+        cached = self._models.get(symbol)
+        return cached[0] if cached is not None else None
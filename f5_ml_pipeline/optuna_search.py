@@ -0,0 +1,142 @@
+"""06_train LightGBM 하이퍼파라미터를 Optuna TPE 로 찾는 작업자 함수.
+
+연구(study) 는 SQLite 저장소에 두어 여러 프로세스가 같은 연구에 시도를 나눠
+기록하고, 다음 실행은 이어서 탐색합니다. 학습 데이터는 06_train 이 만든
+:class:`DatasetCache` 의 바이너리 Dataset 을 그대로 읽으므로 시도마다 Parquet
+읽기나 구간화를 하지 않습니다 (캐시가 없는 심볼은 건너뜀).
+
+* 심볼 하나의 연구는 ``LightGBMPruningCallback`` 으로 부스팅 중간의 검증 AUC 를
+  보고해 가망 없는 시도를 일찍 멈춥니다.
+* ``pooled`` 연구는 모든 심볼에 같은 파라미터를 쓰며, 심볼 하나를 학습할 때마다
+  지금까지의 평균 AUC 를 보고해 가지치기합니다.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import optuna
+from optuna.integration import LightGBMPruningCallback
+
+from booster_model import train_booster
+from dataset_cache import CachedSplit, DatasetCache, dataset_signature
+from tree_export import MAX_LEAVES
+
+# 탐색하지 않고 고정하는 파라미터 (bagging_fraction 을 쓰려면 bagging_freq > 0)
+FIXED_PARAMS = {"bagging_freq": 1}
+SQLITE_TIMEOUT = 30
+# 작업자 프로세스의 nice 증가분 (5분 주기 파이프라인보다 뒤로)
+WORKER_NICE = 10
+
+# (연구 이름, 저장소 URL, split_dir, cache_dir, 심볼 목록, 시도 수, 제한 시간(초), 시드, 기본 model 파라미터,
+#  선택된 피처 목록)
+Task = Tuple[str, str, str, str, List[str], int, Optional[float], int, Dict[str, Any], Optional[List[str]]]
+
+_CACHED: Dict[str, Optional[CachedSplit]] = {}
+
+
+def suggest_params(trial: optuna.Trial) -> Dict[str, Any]:
+    """탐색 공간. ``train_config`` 의 ``model`` 항목에 덮어쓸 값.
+
+    ``num_leaves`` 는 :mod:`tree_export` 가 내보낼 수 있는 ``MAX_LEAVES`` 까지만 찾습니다.
+    """
+    return {
+        "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.2, log=True),
+        "num_leaves": trial.suggest_int("num_leaves", 7, MAX_LEAVES, log=True),
+        "min_data_in_leaf": trial.suggest_int("min_data_in_leaf", 10, 300, log=True),
+        "feature_fraction": trial.suggest_float("feature_fraction", 0.5, 1.0),
+        "bagging_fraction": trial.suggest_float("bagging_fraction", 0.5, 1.0),
+        "lambda_l1": trial.suggest_float("lambda_l1", 1e-8, 10.0, log=True),
+        "lambda_l2": trial.suggest_float("lambda_l2", 1e-8, 10.0, log=True),
+        **FIXED_PARAMS,
+    }
+
+
+def lower_priority() -> None:
+    """프로세스 풀 initializer: 작업자 우선순위를 낮춘다."""
+    if hasattr(os, "nice"):
+        os.nice(WORKER_NICE)
+
+
+def storage(url: str) -> optuna.storages.RDBStorage:
+    """동시에 쓰는 작업자가 잠금을 기다리도록 타임아웃을 준 SQLite 저장소."""
+    return optuna.storages.RDBStorage(url, engine_kwargs={"connect_args": {"timeout": SQLITE_TIMEOUT}})
+
+
+def load_cached(
+    split_dir: Path, cache: DatasetCache, symbol: str, selected: Optional[List[str]] = None
+) -> Optional[CachedSplit]:
+    """06_train 과 같은 서명으로 캐시된 Dataset (프로세스마다 한 번만 읽음)."""
+    if symbol not in _CACHED:
+        cached = cache.load(symbol, dataset_signature(split_dir, symbol, selected))
+        if cached is not None and cached.meta.get("label_classes", 0) < 2:
+            cached = None
+        _CACHED[symbol] = cached
+    return _CACHED[symbol]
+
+
+def _valid_auc(
+    params: Dict[str, Any], cached: CachedSplit, dataset_params: Dict[str, Any], callbacks: List[Any]
+) -> float:
+    model = train_booster(
+        {**params, "metric": "auc"},
+        cached.train,
+        cached.X_valid,
+        cached.y_valid,
+        cached.meta["features"],
+        dataset_params,
+        int(params["n_estimators"]),
+        callbacks=callbacks,
+    )
+    return float(model.booster_.best_score["valid_0"]["auc"])
+
+
+def objective(
+    trial: optuna.Trial,
+    caches: List[CachedSplit],
+    base: Dict[str, Any],
+    dataset_params: Dict[str, Any],
+) -> float:
+    """검증 AUC (여러 심볼이면 평균) 를 최대화."""
+    params = {**base, **suggest_params(trial)}
+    if len(caches) == 1:
+        callbacks = [LightGBMPruningCallback(trial, "auc", valid_name="valid_0")]
+        return _valid_auc(params, caches[0], dataset_params, callbacks)
+    scores = []
+    for step, cached in enumerate(caches):
+        scores.append(_valid_auc(params, cached, dataset_params, []))
+        trial.report(float(np.mean(scores)), step)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+    return float(np.mean(scores))
+
+
+def run_worker(task: Task) -> int:
+    """연구 하나에 ``n_trials`` 시도를 추가하고 실행한 시도 수를 반환."""
+    name, url, split_dir, cache_dir, symbols, n_trials, timeout, seed, base, selected = task
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    cache = DatasetCache(Path(cache_dir))
+    caches = [c for c in (load_cached(Path(split_dir), cache, s, selected) for s in symbols) if c is not None]
+    if not caches or n_trials <= 0:
+        logging.warning("[OPTUNA] %s 캐시된 Dataset 이 없어 건너뜁니다 (06_train 먼저 실행)", name)
+        return 0
+    # 심볼 하나는 부스팅 라운드, pooled 는 심볼 순서가 가지치기 단계
+    pruner = optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=20 if len(caches) == 1 else 1)
+    study = optuna.load_study(study_name=name, storage=storage(url), pruner=pruner)
+    # 작업자와 실행마다 다른 무작위 시작점을 쓰도록 기존 시도 수를 시드에 더함
+    study.sampler = optuna.samplers.TPESampler(seed=seed + len(study.trials))
+    ran = []
+
+    def run(trial: optuna.Trial) -> float:
+        ran.append(trial.number)
+        return objective(trial, caches, base, cache.params)
+
+    study.optimize(run, n_trials=n_trials, timeout=timeout)
+    return len(ran)
+
+
+__all__ = ["FIXED_PARAMS", "lower_priority", "objective", "run_worker", "storage", "suggest_params"]
@@ -0,0 +1,208 @@
+"""TP/SL/트레일링/확률 임계값 그리드 백테스트 엔진.
+
+모든 심볼의 가격(close/high/low)과 ``buy_prob`` 배열을 하나의 공유 메모리
+블록에 한 번만 올리고, 프로세스 풀의 워커가 이 블록을 복사 없이 붙여
+(심볼, 조합 묶음) 작업을 나눠 백테스트합니다. 청산 판정은
+:mod:`backtest_engine` 을 그대로 사용하므로 ``09_backtest`` 와 같은 규칙입니다.
+"""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backtest_engine import COMMISSION, REASONS, exit_table
+
+# 조합 하나: (thresh_pct, loss_pct, trail_start_pct, trail_down_pct, prob_threshold)
+Combo = Tuple[float, float, Optional[float], Optional[float], float]
+COMBO_KEYS = ["thresh_pct", "loss_pct", "trail_start_pct", "trail_down_pct", "prob_threshold"]
+ARRAYS = ["close", "high", "low", "prob"]
+# 공유 메모리 안 배열 시작 위치 정렬 (바이트)
+ALIGN = 64
+
+_ATTACHED: Dict[str, np.ndarray] = {}
+_SHM: Optional[shared_memory.SharedMemory] = None
+
+
+def grid(
+    thresh_list: Iterable[float],
+    loss_list: Iterable[float],
+    trail_list: Iterable[Tuple[Optional[float], Optional[float]]],
+    prob_list: Iterable[float],
+) -> List[Combo]:
+    """파라미터 목록의 모든 조합."""
+    return [
+        (tp, sl, ts_start, ts_down, prob)
+        for tp, sl, (ts_start, ts_down), prob in product(thresh_list, loss_list, trail_list, prob_list)
+    ]
+
+
+class SharedArrays:
+    """이름 붙은 NumPy 배열 여러 개를 담은 공유 메모리 블록.
+
+    ``layout`` 은 (키, 오프셋, dtype, 길이) 목록으로, 블록 이름과 함께 워커에
+    넘기면 :meth:`attach` 로 같은 배열을 읽기 전용 뷰로 얻습니다.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]) -> None:
+        layout = []
+        offset = 0
+        for key, values in arrays.items():
+            values = np.ascontiguousarray(values)
+            layout.append((key, offset, values.dtype.str, len(values)))
+            offset += -(-values.nbytes // ALIGN) * ALIGN
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.layout = layout
+        for (key, start, dtype, length), values in zip(layout, arrays.values()):
+            np.ndarray(length, dtype=dtype, buffer=self.shm.buf, offset=start)[:] = values
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @staticmethod
+    def attach(shm: shared_memory.SharedMemory, layout: Sequence[tuple]) -> Dict[str, np.ndarray]:
+        views = {}
+        for key, start, dtype, length in layout:
+            view = np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=start)
+            view.flags.writeable = False
+            views[key] = view
+        return views
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+def summarize_trades(reasons: np.ndarray, net: np.ndarray) -> Dict[str, float]:
+    """``REASONS`` 코드와 순수익률로 ``09_backtest`` 요약과 같은 지표 계산."""
+    total = len(net)
+    tp, sl, trail, force = np.bincount(reasons, minlength=len(REASONS))[:4].tolist()
+    sharpe = 0.0
+    mdd = 0.0
+    if total:
+        std = net.std()
+        if total > 1 and std != 0:
+            sharpe = float(net.mean() / std * math.sqrt(total))
+        equity = np.cumprod(1 + net)
+        running = np.maximum.accumulate(equity)
+        mdd = float(((equity - running) / running).min())
+    return {
+        "total_entries": total,
+        "tp_count": tp,
+        "trail_count": trail,
+        "sl_count": sl,
+        "force_count": force,
+        "win_rate": (tp + trail) / total if total else 0.0,
+        "loss_rate": sl / total if total else 0.0,
+        "avg_roi": float(net.mean()) if total else 0.0,
+        "cum_roi": float(net.sum()),
+        "sharpe": sharpe,
+        "mdd": mdd,
+    }
+
+
+def chain_entries(starts: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    """정렬된 진입 후보에서 보유 중이 아닌 진입만 고른 위치 (``simulate_trades`` 규칙)."""
+    following = np.searchsorted(starts, exits, side="right").tolist()
+    picked = []
+    k = 0
+    while k < len(following):
+        picked.append(k)
+        k = following[k]
+    return np.array(picked, dtype=np.intp)
+
+
+def sweep_symbol(arrays: Dict[str, np.ndarray], combos: Sequence[Combo]) -> List[Dict[str, float]]:
+    """심볼 하나의 배열로 ``combos`` 를 백테스트 (입력 순서대로 결과 반환).
+
+    청산 위치는 확률 임계값과 무관하므로 같은 청산 파라미터의 조합끼리
+    가장 낮은 임계값의 신호 전체에 대해 :func:`exit_table` 을 한 번만
+    계산하고, 임계값마다 겹치지 않는 진입만 이어 붙입니다.
+    """
+    close, high, low, prob = (arrays[key] for key in ARRAYS)
+    close64 = np.asarray(close, dtype=np.float64)
+    groups: Dict[tuple, List[int]] = {}
+    for i, combo in enumerate(combos):
+        groups.setdefault(tuple(combo[:4]), []).append(i)
+
+    rows: List[Dict[str, float]] = [{} for _ in combos]
+    for exit_params, members in groups.items():
+        params = dict(zip(COMBO_KEYS, exit_params))
+        # 08_predict 와 같은 규칙: prob > 임계값이면 매수 신호
+        lowest = min(combos[i][4] for i in members)
+        candidates = np.flatnonzero(prob > lowest)
+        exit_idx, reason, price = exit_table(close, high, low, candidates, params)
+        cand_prob = prob[candidates]
+        for i in members:
+            threshold = combos[i][4]
+            sel = np.flatnonzero(cand_prob > threshold)
+            picked = sel[chain_entries(candidates[sel], exit_idx[sel])]
+            net = price[picked] / close64[candidates[picked]] - 1 - COMMISSION
+            rows[i] = {**dict(zip(COMBO_KEYS, combos[i])), **summarize_trades(reason[picked], net)}
+    return rows
+
+
+def _init_worker(name: str, layout: Sequence[tuple]) -> None:
+    global _SHM
+    _SHM = shared_memory.SharedMemory(name=name)
+    _ATTACHED.clear()
+    _ATTACHED.update(SharedArrays.attach(_SHM, layout))
+
+
+def _run_task(task: Tuple[str, Sequence[Combo]]) -> List[Dict[str, float]]:
+    symbol, combos = task
+    arrays = {key: _ATTACHED[f"{symbol}/{key}"] for key in ARRAYS}
+    return [{"symbol": symbol, **row} for row in sweep_symbol(arrays, combos)]
+
+
+def run_sweep(
+    data: Dict[str, Dict[str, np.ndarray]],
+    combos: Sequence[Combo],
+    workers: int = 1,
+) -> List[Dict[str, float]]:
+    """``data[symbol]`` (close/high/low/prob 배열) 에 대해 모든 조합을 백테스트.
+
+    작업 하나는 (심볼, 청산 파라미터가 같은 조합 묶음) 입니다. ``workers`` 가
+    1 이면 현재 프로세스에서 실행하고, 그보다 크면 배열을 공유 메모리에
+    올려 프로세스 풀에 나눠 줍니다.
+    """
+    groups: Dict[tuple, List[Combo]] = {}
+    for combo in combos:
+        groups.setdefault(tuple(combo[:4]), []).append(combo)
+    tasks = [(symbol, group) for symbol in data for group in groups.values()]
+    if workers <= 1 or len(tasks) <= 1:
+        rows = []
+        for symbol, part in tasks:
+            rows.extend({"symbol": symbol, **row} for row in sweep_symbol(data[symbol], part))
+        return rows
+
+    shared = SharedArrays(
+        {f"{symbol}/{key}": arrays[key] for symbol, arrays in data.items() for key in ARRAYS}
+    )
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(shared.name, shared.layout)
+        ) as pool:
+            rows = []
+            for part in pool.map(_run_task, tasks):
+                rows.extend(part)
+        return rows
+    finally:
+        shared.close()
+
+
+__all__ = [
+    "COMBO_KEYS",
+    "SharedArrays",
+    "chain_entries",
+    "grid",
+    "run_sweep",
+    "summarize_trades",
+    "sweep_symbol",
+]
@@ -0,0 +1,164 @@
+"""모든 심볼의 행을 쌓아 학습하는 공통(pooled) 모델 도우미.
+
+심볼마다 모델을 두면 데이터가 적은 코인은 학습이 불안정하고, 학습/저장/로드와
+예측 호출도 심볼 수만큼 반복됩니다. 공통 모델은 심볼별 학습 행을 한 Dataset 으로
+쌓고 두 피처를 더합니다.
+
+* ``symbol_id`` : 모델 메타데이터의 ``symbols`` 목록 순번 (LightGBM 범주형 피처)
+* ``vol_regime`` : ``volatility14`` 를 학습 구간 전체의 분위수 경계로 나눈 변동성 국면
+
+공통 모델은 :class:`model_registry.ModelRegistry` 에 ``POOLED_MODEL`` 이름으로
+공개되며, 메타데이터의 ``routing`` 이 심볼마다 공통 모델(``pooled``)과 자기
+모델(``symbol``) 중 무엇을 쓸지 기록합니다. 검증 AUC 가 자기 모델보다 크게 낮거나
+최소 기준에 못 미치는 심볼은 자기 모델로 되돌립니다.
+
+공개된 공통 모델은 ``train_config.yaml`` 의 ``pooled.enabled`` 가 켜져 있을 때만
+라우팅에 쓰입니다(:func:`active_pooled`). 설정을 끄면 레지스트리에 버전이 남아
+있어도 03/07/08 단계와 온라인 추론이 모든 심볼을 자기 모델로 처리합니다.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+from model_registry import ModelRegistry
+from utils import load_yaml_config
+
+# 레지스트리에서 공통 모델이 쓰는 이름 (``_`` 로 시작해 list_models 에서 제외)
+POOLED_MODEL = "_pooled"
+SYMBOL_FEATURE = "symbol_id"
+REGIME_FEATURE = "vol_regime"
+REGIME_SOURCE = "volatility14"
+POOL_FEATURES = [SYMBOL_FEATURE, REGIME_FEATURE]
+CONFIG_PATH = Path(__file__).resolve().parent / "config" / "train_config.yaml"
+
+
+def common_features(feature_lists: Sequence[Sequence[str]]) -> List[str]:
+    """모든 심볼에 있는 피처 (첫 목록 순서 유지, 공통 모델 피처는 제외)."""
+    if not feature_lists:
+        return []
+    shared = set(feature_lists[0]).intersection(*map(set, feature_lists[1:]))
+    return [f for f in feature_lists[0] if f in shared and f not in POOL_FEATURES]
+
+
+def regime_edges(values: np.ndarray, regimes: int) -> List[float]:
+    """``regimes`` 개 국면으로 나누는 분위수 경계 (유한한 값이 없으면 빈 목록)."""
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if regimes <= 1 or not len(values):
+        return []
+    edges = np.quantile(values, np.arange(1, regimes) / regimes)
+    return [float(e) for e in np.unique(edges)]
+
+
+def add_pool_features(df: pd.DataFrame, symbol_id: int, edges: Sequence[float]) -> pd.DataFrame:
+    """``symbol_id`` 와 ``vol_regime`` 컬럼을 추가 (``df`` 를 직접 수정)."""
+    df[SYMBOL_FEATURE] = symbol_id
+    source = df[REGIME_SOURCE].to_numpy(dtype=float) if REGIME_SOURCE in df else np.zeros(len(df))
+    df[REGIME_FEATURE] = np.searchsorted(np.asarray(edges, dtype=float), source, side="right")
+    return df
+
+
+def symbol_auc(prob: np.ndarray, y: np.ndarray, ids: np.ndarray, symbols: Sequence[str]) -> Dict[str, float]:
+    """검증 행을 ``symbol_id`` 별로 나눈 AUC (한 클래스뿐이면 0)."""
+    result = {}
+    for k, symbol in enumerate(symbols):
+        mask = ids == k
+        if len(np.unique(y[mask])) < 2:
+            result[symbol] = 0.0
+            continue
+        result[symbol] = float(roc_auc_score(y[mask], prob[mask]))
+    return result
+
+
+def route_symbols(
+    pooled_auc: Mapping[str, float],
+    own_auc: Mapping[str, float | None],
+    max_gap: float,
+    min_auc: float,
+) -> Dict[str, str]:
+    """심볼별 사용할 모델: 공통 모델 AUC 가 ``min_auc`` 미만이거나 자기 모델보다 ``max_gap`` 이상 낮으면 ``symbol``."""
+    routing = {}
+    for symbol, auc in pooled_auc.items():
+        own = own_auc.get(symbol)
+        worse = own is not None and auc < own - max_gap
+        routing[symbol] = "symbol" if worse or auc < min_auc else "pooled"
+    return routing
+
+
+def load_pooled(model_dir: Path) -> Tuple[Any, Dict[str, Any]] | None:
+    """공개된 공통 모델과 메타데이터 (없으면 None)."""
+    registry = ModelRegistry(model_dir)
+    if registry.current_version(POOLED_MODEL) is None:
+        return None
+    try:
+        return registry.load(POOLED_MODEL)
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning("공통 모델 로드 실패: %s", exc)
+        return None
+
+
+def pooled_enabled(config_path: Path = CONFIG_PATH) -> bool:
+    """``pooled.enabled`` 설정값 (설정 파일이 없으면 False)."""
+    if not Path(config_path).exists():
+        return False
+    config = load_yaml_config(config_path) or {}
+    return bool((config.get("pooled") or {}).get("enabled"))
+
+
+def active_pooled(model_dir: Path, config_path: Path = CONFIG_PATH) -> Tuple[Any, Dict[str, Any]] | None:
+    """라우팅에 쓸 공통 모델. ``pooled.enabled`` 가 꺼져 있으면 공개 버전이 있어도 None."""
+    if not pooled_enabled(config_path):
+        return None
+    return load_pooled(model_dir)
+
+
+def pooled_symbols(meta: Mapping[str, Any]) -> List[str]:
+    """공통 모델로 예측할 심볼 목록."""
+    routing = meta.get("routing") or {}
+    return [s for s in meta.get("symbols", []) if routing.get(s, "pooled") == "pooled"]
+
+
+def pool_matrix(df: pd.DataFrame, meta: Mapping[str, Any], symbol: str) -> np.ndarray:
+    """숫자형으로 정리된 ``df`` 를 공통 모델 입력 행렬로 변환 (없는 피처는 0)."""
+    frame = add_pool_features(df.copy(), meta["symbols"].index(symbol), meta.get("vol_edges", []))
+    return frame.reindex(columns=meta["features"], fill_value=0).to_numpy(dtype=np.float32)
+
+
+def predict_universe(
+    model: Any, meta: Mapping[str, Any], frames: Mapping[str, pd.DataFrame]
+) -> Dict[str, np.ndarray]:
+    """여러 심볼의 행을 쌓아 ``predict_proba`` 한 번으로 예측하고 심볼별 확률로 나눈다."""
+    names = [s for s, df in frames.items() if s in meta["symbols"] and len(df)]
+    if not names:
+        return {}
+    blocks = [pool_matrix(frames[s], meta, s) for s in names]
+    prob = model.predict_proba(np.vstack(blocks))[:, 1]
+    offsets = np.cumsum([0] + [len(b) for b in blocks])
+    return {s: prob[offsets[i]:offsets[i + 1]] for i, s in enumerate(names)}
+
+
+__all__ = [
+    "POOLED_MODEL",
+    "POOL_FEATURES",
+    "REGIME_FEATURE",
+    "REGIME_SOURCE",
+    "SYMBOL_FEATURE",
+    "active_pooled",
+    "add_pool_features",
+    "common_features",
+    "load_pooled",
+    "pool_matrix",
+    "pooled_enabled",
+    "pooled_symbols",
+    "predict_universe",
+    "regime_edges",
+    "route_symbols",
+    "symbol_auc",
+]
@@ -0,0 +1,195 @@
+"""모든 심볼의 매수 신호를 한 시간축에 합쳐 실전 주문 제약으로 돌리는 포트폴리오 백테스트.
+
+``09_backtest`` 와 :mod:`sell_simulator` 는 심볼마다 따로 진입하므로 동시에 몇
+개를 들고 있는지, 원화 잔고가 남아 있는지를 보지 않습니다. 실전 ``OrderExecutor`` 는
+
+* 보유 중이거나 주문이 걸려 있는 심볼에는 다시 진입하지 않고,
+* 보유/미체결 포지션이 ``MAX_SYMBOLS`` 개면 새 신호를 건너뛰며,
+* 진입마다 ``ENTRY_SIZE_INITIAL`` 원을 공용 원화 잔고에서 씁니다.
+
+여기서는 심볼별 후보 진입의 청산을 :func:`sell_simulator.exit_table` 로 미리
+계산해 두고, 모든 후보를 (시각, 심볼 순서) 로 정렬한 이벤트 큐를 한 번 훑으며
+위 제약과 수수료를 적용합니다. 포지션 상태는 심볼별 배열과 청산 시각 힙으로
+관리하고, 평가금액 곡선은 채택된 거래 구간을 공통 시간축 배열에 더해 만듭니다.
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from backtest_engine import COMMISSION, REASONS
+from sell_simulator import CHAIN_WINDOW, exit_table, scaling_enabled
+
+FEE_RATE = COMMISSION / 2  # Upbit 원화 마켓 편도 수수료
+INITIAL_KRW = 1_000_000
+# 건너뛴 신호 집계 순서: 같은 심볼 보유 중, MAX_SYMBOLS 도달, 원화 잔고 부족
+SKIP_REASONS = ("holding", "max_symbols", "balance")
+# 청산 사유별 요약 키 (09_backtest 요약과 같은 이름, 실전 매도에는 손절이 없음)
+COUNT_KEYS = {"TP": "tp_count", "TS": "trail_count", "FORCE": "force_count"}
+
+
+@dataclass
+class PortfolioResult:
+    """포트폴리오 백테스트 결과. 곡선 배열은 모두 ``times`` 와 길이가 같습니다."""
+
+    times: np.ndarray
+    equity: np.ndarray
+    invested: np.ndarray
+    slots: np.ndarray
+    trades: List[Dict[str, Any]]
+    summary: Dict[str, Any]
+
+
+def _ffill_on_grid(grid: np.ndarray, times: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """심볼 종가를 공통 시간축에 놓고 빈 칸은 직전 값으로 채운다."""
+    values = np.full(len(grid), np.nan)
+    values[np.searchsorted(grid, times)] = close
+    filled = np.where(np.isnan(values), 0, np.arange(len(grid)))
+    return values[np.maximum.accumulate(filled)]
+
+
+def run_portfolio(
+    data: Dict[str, Dict[str, np.ndarray]],
+    config: dict,
+    initial_krw: float = INITIAL_KRW,
+) -> PortfolioResult:
+    """``data[symbol]`` (``times`` 초 단위, ``close``, ``high``, ``signal``) 로 포트폴리오 백테스트.
+
+    ``config`` 는 :func:`sell_simulator.load_settings` 처럼 매수/매도 설정을 합친
+    값입니다. 같은 시각의 신호는 ``data`` 의 심볼 순서대로 처리하고, 청산은 그
+    봉이 끝난 뒤 자리를 비우므로 다음 봉부터 새 진입에 쓸 수 있습니다.
+    """
+    if scaling_enabled(config):
+        raise ValueError("불타기/물타기 설정은 포트폴리오 백테스트에서 지원하지 않습니다")
+    symbols = list(data)
+    entry_size = float(config.get("ENTRY_SIZE_INITIAL", 7000))
+    max_symbols = config.get("MAX_SYMBOLS")
+    limit = len(symbols) if max_symbols is None else int(max_symbols)
+    cost = entry_size * (1 + FEE_RATE)
+
+    series = []
+    for symbol in symbols:
+        arrays = data[symbol]
+        times = np.asarray(arrays["times"], dtype=np.int64)
+        close = np.asarray(arrays["close"], dtype=np.float64)
+        high = np.asarray(arrays["high"], dtype=np.float64)
+        starts = np.flatnonzero((np.asarray(arrays["signal"]) == 1) & ~np.isnan(close))
+        table = exit_table(close, high, starts, config, times, max_window=CHAIN_WINDOW)
+        series.append((times, close, high, starts, table))
+
+    grid = np.unique(np.concatenate([s[0] for s in series])) if series else np.zeros(0, np.int64)
+    code = np.concatenate([np.full(len(s[3]), k, dtype=np.intp) for k, s in enumerate(series)] or [[]])
+    row = np.concatenate([np.arange(len(s[3])) for s in series] or [[]]).astype(np.intp)
+    t_entry = np.concatenate([s[0][s[3]] for s in series] or [[]]).astype(np.int64)
+    order = np.lexsort((code, t_entry))
+
+    busy_until = np.full(len(symbols), np.iinfo(np.int64).min)
+    open_exits: List[tuple] = []  # (청산 시각, 매도 대금) 힙
+    cash = float(initial_krw)
+    skipped = np.zeros(len(SKIP_REASONS), dtype=np.int64)
+    taken = []
+    for k in order.tolist():
+        t, s, r = int(t_entry[k]), int(code[k]), int(row[k])
+        while open_exits and open_exits[0][0] < t:
+            cash += heapq.heappop(open_exits)[1]
+        if busy_until[s] >= t:
+            skipped[0] += 1
+            continue
+        if len(open_exits) >= limit:
+            skipped[1] += 1
+            continue
+        if cash < cost:
+            skipped[2] += 1
+            continue
+        times, close, high, starts, (exit_idx, reason, price, entry) = series[s]
+        if exit_idx[r] < 0:
+            one = exit_table(close, high, starts[r:r + 1], config, times)
+            exit_idx[r], reason[r], price[r], entry[r] = (col[0] for col in one)
+        proceeds = entry_size / entry[r] * price[r] * (1 - FEE_RATE)
+        cash -= cost
+        busy_until[s] = times[exit_idx[r]]
+        heapq.heappush(open_exits, (int(times[exit_idx[r]]), proceeds))
+        taken.append((s, r, proceeds))
+
+    # 평가금액 곡선: 진입 봉부터 청산 직전까지 보유 평가금액, 현금은 진입/청산 봉에서 변동
+    invested = np.zeros(len(grid))
+    cash_delta = np.zeros(len(grid) + 1)
+    slot_delta = np.zeros(len(grid) + 1, dtype=np.int64)
+    filled: Dict[int, np.ndarray] = {}
+    trades = []
+    for s, r, proceeds in taken:
+        times, close, _, starts, (exit_idx, reason, price, entry) = series[s]
+        if s not in filled:
+            filled[s] = _ffill_on_grid(grid, times, close)
+        g0, g1 = np.searchsorted(grid, [times[starts[r]], times[exit_idx[r]]])
+        qty = entry_size / entry[r]
+        invested[g0:g1] += qty * filled[s][g0:g1]
+        cash_delta[g0] -= cost
+        cash_delta[g1] += proceeds
+        slot_delta[g0] += 1
+        slot_delta[g1 + 1] -= 1
+        trades.append({
+            "symbol": symbols[s],
+            "entry_time": int(times[starts[r]]),
+            "exit_time": int(times[exit_idx[r]]),
+            "entry_price": float(entry[r]),
+            "exit_price": float(price[r]),
+            "result": REASONS[reason[r]],
+            "qty": float(qty),
+            "pnl": float(proceeds - cost),
+            "net_roi": float(proceeds / cost - 1),
+        })
+
+    equity = initial_krw + np.cumsum(cash_delta[:-1]) + invested
+    slots = np.cumsum(slot_delta[:-1])
+    return PortfolioResult(
+        times=grid,
+        equity=equity,
+        invested=invested,
+        slots=slots,
+        trades=trades,
+        summary=_summarize(equity, invested, slots, trades, skipped, initial_krw, limit),
+    )
+
+
+def _summarize(
+    equity: np.ndarray,
+    invested: np.ndarray,
+    slots: np.ndarray,
+    trades: List[Dict[str, Any]],
+    skipped: np.ndarray,
+    initial_krw: float,
+    limit: int,
+) -> Dict[str, Any]:
+    """수익률, 낙폭, 자금/슬롯 사용률과 건너뛴 신호 수."""
+    final = float(equity[-1]) if len(equity) else float(initial_krw)
+    mdd = 0.0
+    utilization = 0.0
+    if len(equity):
+        running = np.maximum.accumulate(equity)
+        mdd = float(((equity - running) / running).min())
+        utilization = float((invested / equity).mean())
+    wins = sum(t["pnl"] > 0 for t in trades)
+    summary = {
+        "total_entries": len(trades),
+        "final_equity": final,
+        "total_return": final / initial_krw - 1,
+        "mdd": mdd,
+        "capital_utilization": utilization,
+        "slot_utilization": float(slots.mean() / limit) if len(slots) and limit else 0.0,
+        "max_slots_used": int(slots.max()) if len(slots) else 0,
+        "win_rate": wins / len(trades) if trades else 0.0,
+        "avg_roi": float(np.mean([t["net_roi"] for t in trades])) if trades else 0.0,
+    }
+    for name, key in COUNT_KEYS.items():
+        summary[key] = sum(t["result"] == name for t in trades)
+    for name, count in zip(SKIP_REASONS, skipped.tolist()):
+        summary[f"skipped_{name}"] = count
+    return summary
+
+
+__all__ = ["FEE_RATE", "INITIAL_KRW", "PortfolioResult", "run_portfolio"]
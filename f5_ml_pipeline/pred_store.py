@@ -0,0 +1,117 @@
+"""08_predict 예측 결과 저장소.
+
+예측 결과는 ``{pred_dir}/{symbol}/part-000001.parquet`` 처럼 실행마다 새로 예측한
+행만 담은 작은 Parquet 조각으로 이어 붙입니다. 컬럼은 ``timestamp``, ``close``,
+``buy_signal``, ``buy_prob`` 네 개뿐이며 피처 컬럼은 저장하지 않습니다. 조각 수가
+``COMPACT_PARTS`` 를 넘으면 하나로 합쳐 읽기 비용이 계속 늘지 않게 합니다.
+
+신호 루프가 최신 값만 빠르게 읽을 수 있도록 마지막 행은 ``{symbol}_pred.csv`` 로도
+저장합니다. 예전 방식으로 전체 기록이 들어 있는 ``{symbol}_pred.csv`` 만 있는
+심볼은 :meth:`PredictionStore.load` 가 그 파일을 읽습니다.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils import ensure_dir, save_parquet_atomic
+
+PRED_COLUMNS = ["timestamp", "close", "buy_signal", "buy_prob"]
+# 조각이 이 수를 넘으면 하나로 합침 (1분 주기 기준 약 1시간)
+COMPACT_PARTS = 64
+PART_PREFIX = "part-"
+
+
+class PredictionStore:
+    """심볼별 예측 결과 저장소."""
+
+    def __init__(self, root: Path, compact_parts: int = COMPACT_PARTS) -> None:
+        self.root = Path(root)
+        self.compact_parts = compact_parts
+
+    def _symbol_dir(self, symbol: str) -> Path:
+        return self.root / symbol
+
+    def latest_path(self, symbol: str) -> Path:
+        return self.root / f"{symbol}_pred.csv"
+
+    def parts(self, symbol: str) -> List[Path]:
+        """저장된 조각 파일 목록 (시간 순)."""
+        path = self._symbol_dir(symbol)
+        if not path.is_dir():
+            return []
+        return sorted(path.glob(f"{PART_PREFIX}*.parquet"))
+
+    def symbols(self) -> List[str]:
+        """예측 기록이 있는 심볼 목록 (예전 CSV 포함)."""
+        if not self.root.is_dir():
+            return []
+        symbols = {p.name for p in self.root.iterdir() if p.is_dir() and self.parts(p.name)}
+        symbols |= {p.name[: -len("_pred.csv")] for p in self.root.glob("*_pred.csv")}
+        return sorted(symbols)
+
+    def last_timestamp(self, symbol: str) -> pd.Timestamp | None:
+        """마지막으로 예측한 행의 timestamp (기록이 없으면 None)."""
+        parts = self.parts(symbol)
+        if not parts:
+            return None
+        ts = pq.read_table(parts[-1], columns=["timestamp"]).column("timestamp").to_pandas()
+        return ts.max() if len(ts) else None
+
+    def append(self, symbol: str, df: pd.DataFrame) -> Path:
+        """새 예측 행을 조각 파일로 추가 (조각이 많으면 합침)."""
+        symbol_dir = ensure_dir(self._symbol_dir(symbol))
+        parts = self.parts(symbol)
+        seq = int(parts[-1].stem[len(PART_PREFIX):]) + 1 if parts else 1
+        path = symbol_dir / f"{PART_PREFIX}{seq:06d}.parquet"
+        save_parquet_atomic(df.reset_index(drop=True), path)
+        if len(parts) + 1 > self.compact_parts:
+            path = self.compact(symbol)
+        return path
+
+    def write_latest(self, symbol: str, row: pd.DataFrame) -> None:
+        """신호 루프용 최신 행 CSV 를 원자적으로 교체."""
+        path = self.latest_path(symbol)
+        tmp = path.with_suffix(".csv.tmp")
+        row.to_csv(tmp, index=False)
+        tmp.replace(path)
+
+    def compact(self, symbol: str) -> Path:
+        """모든 조각을 하나로 합친다."""
+        parts = self.parts(symbol)
+        if len(parts) <= 1:
+            return parts[0] if parts else self._symbol_dir(symbol)
+        df = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+        target = parts[-1]
+        save_parquet_atomic(df, target)
+        for p in parts[:-1]:
+            p.unlink(missing_ok=True)
+        return target
+
+    def load(self, symbol: str, columns: Sequence[str] | None = None) -> pd.DataFrame:
+        """``symbol`` 의 전체 예측 기록을 반환."""
+        parts = self.parts(symbol)
+        cols = list(columns) if columns is not None else None
+        if parts:
+            return pd.concat([pd.read_parquet(p, columns=cols) for p in parts], ignore_index=True)
+        df = pd.read_csv(self.latest_path(symbol))
+        if "timestamp" in df.columns:
+            df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+        return df[cols] if cols is not None else df
+
+
+def prediction_frame(df: pd.DataFrame, prob: np.ndarray) -> pd.DataFrame:
+    """피처 프레임과 양성 확률로 저장용 예측 프레임을 만든다."""
+    prob = np.asarray(prob, dtype=np.float32)
+    out = pd.DataFrame(index=range(len(df)))
+    for col in ("timestamp", "close"):
+        if col in df.columns:
+            out[col] = df[col].reset_index(drop=True)
+    out["buy_signal"] = (prob > 0.5).astype(np.int8)
+    out["buy_prob"] = prob
+    return out
@@ -33,6 +33,7 @@ PIPELINE_STEPS = [
     "07_eval.py",
     "08_predict.py",
     "09_backtest.py",
+    "09_portfolio_backtest.py",
     "10_select_best_strategies.py",
 ]
 
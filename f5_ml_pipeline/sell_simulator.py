@@ -0,0 +1,320 @@
+"""F3 ``PositionManager`` 매도 규칙을 1분봉 이력으로 재현하는 시뮬레이터.
+
+``09_backtest`` 의 TP/SL/TS 는 퍼센트 규칙이라 실전 매도와 다릅니다. 실전
+``PositionManager.hold_loop`` 는
+
+* 진입 즉시 ``calc_tp_price`` (Upbit 호가 단위 올림, ``MINIMUM_TICKS`` 최소
+  간격) 가격에 지정가 익절 주문을 걸고,
+* 매 틱마다 최고가를 갱신해 ``TRAIL_START_PCT`` 이상 오른 뒤
+  ``TRAIL_STEP_PCT`` 이상 밀리면 시장가로 트레일링 매도하며 (``TS_FLAG``),
+* ``HOLD_SECS`` 이전에는 불타기/물타기로 평균 단가와 익절가를 다시 잡고,
+  이후에는 트레일링만 확인합니다. 손절 규칙은 없습니다.
+
+여기서는 각 1분봉의 종가를 ``hold_loop`` 한 틱의 현재가로 보고, 걸려 있는
+지정가 익절 주문은 그 봉의 고가가 주문가 이상이면 체결된 것으로 봅니다.
+:func:`simulate_position` 은 위 규칙을 그대로 옮긴 한 포지션 루프이고,
+:func:`exit_table` 은 불타기/물타기가 꺼져 있으면(기본 설정) 여러 진입의
+청산을 창 단위 행렬 연산으로 한꺼번에 계산해 같은 결과를 돌려줍니다.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from backtest_engine import COMMISSION, REASONS  # noqa: E402
+from f3_order.utils import calc_tp_price  # noqa: E402
+from f6_setting.buy_config import load_buy_config  # noqa: E402
+from f6_setting.sell_config import load_sell_config  # noqa: E402
+from param_sweep import summarize_trades  # noqa: E402
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SELL_PATH = PROJECT_ROOT / "config" / "f6_sell_settings.json"
+BUY_PATH = PROJECT_ROOT / "config" / "f6_buy_settings.json"
+CANDLE_SECS = 60
+# exit_table: 첫 창 길이, 청산되지 않은 진입의 창 확대 배수, 한 번에 만들 행렬 칸 수
+FIRST_WINDOW = 64
+WINDOW_GROWTH = 8
+BLOCK_CELLS = 1 << 18
+# 연속 진입 시뮬레이션에서 미리 행렬로 계산할 최대 창 (그보다 긴 보유는 실제로
+# 진입한 경우에만 계산)
+CHAIN_WINDOW = 4096
+
+
+def load_settings(sell_path: Path = SELL_PATH, buy_path: Path = BUY_PATH) -> dict:
+    """``OrderExecutor`` 와 같은 방식으로 매수/매도 설정을 합친다."""
+    config = load_buy_config(str(buy_path))
+    config.update(load_sell_config(str(sell_path)))
+    config["TRAILING_STOP_ENABLED"] = str(config.get("TS_FLAG", "OFF")).upper() == "ON"
+    return config
+
+
+def scaling_enabled(config: dict) -> bool:
+    """불타기/물타기가 실제로 일어날 수 있는 설정인지."""
+    pyr = config.get("PYR_ENABLED", False) and config.get("PYR_MAX_COUNT", 0) > 0
+    avg = config.get("AVG_ENABLED", False) and config.get("AVG_MAX_COUNT", 0) > 0
+    return bool(pyr or avg)
+
+
+def _elapsed(times: Optional[np.ndarray], start: int, i: int) -> float:
+    if times is None:
+        return (i - start) * CANDLE_SECS
+    return float(times[i] - times[start])
+
+
+def simulate_position(
+    close: np.ndarray,
+    high: np.ndarray,
+    start: int,
+    config: dict,
+    times: Optional[np.ndarray] = None,
+) -> Tuple[int, float, str, float]:
+    """``start`` 봉 종가에 진입한 포지션의 (청산 위치, 청산가, 사유, 평균 단가).
+
+    사유는 ``TP`` (지정가 익절), ``TS`` (트레일링 시장가), ``FORCE`` (데이터
+    끝) 입니다. ``times`` 는 봉 시각(초)으로 ``HOLD_SECS`` 경과 판단에 쓰며,
+    없으면 1분 간격으로 봅니다.
+    """
+    tp = float(config.get("TP_PCT", 0.15))
+    min_ticks = int(config.get("MINIMUM_TICKS", 2))
+    hold_secs = config.get("HOLD_SECS", 0)
+    trailing = config.get("TRAILING_STOP_ENABLED", True)
+    start_pct = config.get("TRAIL_START_PCT", 0.7)
+    step_pct = config.get("TRAIL_STEP_PCT", 1.0)
+
+    n = len(close)
+    entry = float(close[start])
+    if entry != entry:
+        return n - 1, float(close[n - 1]), "FORCE", entry
+    qty = float(config.get("ENTRY_SIZE_INITIAL", 7000)) / entry
+    pyramid_count = 0
+    avgdown_count = 0
+    tp_price = calc_tp_price(entry, tp, min_ticks)
+    max_price = None
+
+    for i in range(start + 1, n):
+        # 걸려 있던 지정가 익절 주문 (TP_PCT <= 0 이면 주문을 내지 않음)
+        if tp > 0 and float(high[i]) >= tp_price:
+            return i, tp_price, "TP", entry
+        cur = float(close[i])
+        if cur != cur:
+            continue
+
+        max_price = cur if max_price is None else max(max_price, cur)
+        change_pct = (cur - entry) / entry * 100
+        tp_pct_adj = (calc_tp_price(entry, tp, min_ticks) - entry) / entry * 100
+        if change_pct >= tp_pct_adj:
+            continue
+        held_too_long = hold_secs and _elapsed(times, start, i) >= hold_secs
+
+        if not held_too_long:
+            if (
+                config.get("PYR_ENABLED", False)
+                and pyramid_count < config.get("PYR_MAX_COUNT", 0)
+                and (cur - entry) / entry * 100 >= config.get("PYR_TRIGGER", 1.0)
+            ):
+                add = config.get("PYR_SIZE", 0) / cur
+                total = qty + add
+                entry = (entry * qty + cur * add) / total
+                qty = total
+                pyramid_count += 1
+                tp_price = calc_tp_price(entry, tp, min_ticks)
+            if (
+                config.get("AVG_ENABLED", False)
+                and avgdown_count < config.get("AVG_MAX_COUNT", 0)
+                and (entry - cur) / entry * 100 >= config.get("AVG_TRIGGER", 1.0)
+            ):
+                add = config.get("AVG_SIZE", 0) / cur
+                total = qty + add
+                entry = (entry * qty + cur * add) / total
+                qty = total
+                avgdown_count += 1
+                tp_price = calc_tp_price(entry, tp, min_ticks)
+
+        if trailing:
+            gain_pct = (max_price - entry) / entry * 100
+            if gain_pct >= start_pct and (max_price - cur) / max_price * 100 >= step_pct:
+                return i, cur, "TS", entry
+
+    return n - 1, float(close[n - 1]), "FORCE", entry
+
+
+def _exit_block(
+    close: np.ndarray,
+    high: np.ndarray,
+    starts: np.ndarray,
+    tp_prices: np.ndarray,
+    config: dict,
+    window: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """불타기/물타기 없는 포지션들의 다음 ``window`` 봉 안 청산 (위치, 코드, 가격)."""
+    n = len(close)
+    tp = float(config.get("TP_PCT", 0.15))
+    cols = np.arange(window)
+    pos = starts[:, None] + 1 + cols
+    valid = pos < n
+    pos = np.minimum(pos, n - 1)
+    entry = close[starts][:, None]
+    seg = close[pos]
+
+    def first(hit: np.ndarray) -> np.ndarray:
+        return np.where(hit.any(axis=1), hit.argmax(axis=1), window)
+
+    t_tp = first((high[pos] >= tp_prices[:, None]) & valid) if tp > 0 else np.full(len(starts), window)
+    t_ts = np.full(len(starts), window)
+    if config.get("TRAILING_STOP_ENABLED", True):
+        ticked = valid & ~np.isnan(seg)
+        max_price = np.fmax.accumulate(np.where(ticked, seg, np.nan), axis=1)
+        below = (seg - entry) / entry * 100 < ((tp_prices - entry[:, 0]) / entry[:, 0] * 100)[:, None]
+        gain = (max_price - entry) / entry * 100 >= config.get("TRAIL_START_PCT", 0.7)
+        drop = (max_price - seg) / max_price * 100 >= config.get("TRAIL_STEP_PCT", 1.0)
+        t_ts = first(ticked & below & gain & drop)
+
+    done = np.minimum(t_tp, t_ts) < window
+    is_tp = t_tp <= t_ts
+    idx = starts + 1 + np.minimum(t_tp, t_ts)
+    reason = np.where(is_tp, 0, 2).astype(np.int8)
+    price = np.where(is_tp, tp_prices, close[np.minimum(idx, n - 1)])
+    force = ~done & (starts + window >= n - 1)
+    reason[force] = 3
+    price[force] = close[n - 1]
+    idx = np.where(done, idx, np.where(force, n - 1, -1))
+    return idx, reason, price
+
+
+def exit_table(
+    close: np.ndarray,
+    high: np.ndarray,
+    starts: np.ndarray,
+    config: dict,
+    times: Optional[np.ndarray] = None,
+    max_window: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """여러 진입의 (청산 위치, ``REASONS`` 코드, 청산가, 평균 단가) 를 계산.
+
+    진입끼리의 겹침은 따지지 않습니다. 짧은 창부터 행렬 연산으로 판정하고
+    청산되지 않은 진입만 창을 넓혀 다시 봅니다. 불타기/물타기가 켜져 있으면
+    평균 단가가 경로에 따라 바뀌므로 :func:`simulate_position` 을 진입마다 돌립니다.
+    ``max_window`` 를 주면 그 창 안에서 청산되지 않은 진입은 위치 -1 로 남깁니다.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    starts = np.asarray(starts, dtype=np.intp)
+    exit_idx = np.full(len(starts), -1, dtype=np.intp)
+    reason = np.zeros(len(starts), dtype=np.int8)
+    price = np.zeros(len(starts), dtype=np.float64)
+    entry = close[starts].copy()
+
+    if scaling_enabled(config):
+        pending = np.arange(len(starts))
+    else:
+        # 익절가는 진입가(호가 단위)별로 한 번만 계산
+        tp = float(config.get("TP_PCT", 0.15))
+        min_ticks = int(config.get("MINIMUM_TICKS", 2))
+        unique, inverse = np.unique(entry, return_inverse=True)
+        tp_prices = np.array(
+            [calc_tp_price(float(u), tp, min_ticks) if u == u else np.nan for u in unique]
+        )[inverse]
+        pending = np.arange(len(starts))
+        window = FIRST_WINDOW
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # 손절이 없어 보유가 길어질 수 있으므로 남은 진입만 창을 넓혀 다시 본다
+            while len(pending) and (max_window is None or window <= max_window):
+                window = min(window, len(close) - int(starts[pending].min()))
+                step = max(1, BLOCK_CELLS // window)
+                for i in range(0, len(pending), step):
+                    rows = pending[i:i + step]
+                    idx, code, value = _exit_block(close, high, starts[rows], tp_prices[rows], config, window)
+                    exit_idx[rows], reason[rows], price[rows] = idx, code, value
+                pending = pending[exit_idx[pending] < 0]
+                window *= WINDOW_GROWTH
+
+    if max_window is not None:
+        return exit_idx, reason, price, entry
+    for row in pending:
+        idx, value, name, avg = simulate_position(close, high, int(starts[row]), config, times)
+        exit_idx[row], reason[row], price[row], entry[row] = idx, REASONS.index(name), value, avg
+    return exit_idx, reason, price, entry
+
+
+def _chain(
+    close: np.ndarray,
+    high: np.ndarray,
+    starts: np.ndarray,
+    config: dict,
+    times: Optional[np.ndarray],
+) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """겹치지 않게 실제로 진입하는 후보 위치와 후보별 청산 표.
+
+    긴 보유는 ``CHAIN_WINDOW`` 안에서 청산되지 않은 후보 중 실제로 진입한
+    것만 끝까지 계산하므로, 하락장에서 신호가 몰려도 전체 비용이 봉 수에
+    비례합니다.
+    """
+    table = exit_table(close, high, starts, config, times, max_window=CHAIN_WINDOW)
+    exit_idx, reason, price, entry = table
+    picked = []
+    k = 0
+    while k < len(starts):
+        if exit_idx[k] < 0:
+            one = exit_table(close, high, starts[k:k + 1], config, times)
+            exit_idx[k], reason[k], price[k], entry[k] = (col[0] for col in one)
+        picked.append(k)
+        k = int(np.searchsorted(starts, exit_idx[k], side="right"))
+    return np.array(picked, dtype=np.intp), table
+
+
+def simulate_trades(
+    close: np.ndarray,
+    high: np.ndarray,
+    signal: np.ndarray,
+    config: dict,
+    times: Optional[np.ndarray] = None,
+) -> List[Tuple[int, int, float, str, float]]:
+    """``signal == 1`` 봉마다 진입해 (진입, 청산, 청산가, 사유, 평균 단가) 목록을 반환.
+
+    보유 중 발생한 신호는 무시하고 청산 다음 봉부터 다시 진입합니다.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    starts = np.flatnonzero(np.asarray(signal) == 1)
+    picked, (exit_idx, reason, price, entry) = _chain(close, high, starts, config, times)
+    return [
+        (int(starts[k]), int(exit_idx[k]), float(price[k]), REASONS[reason[k]], float(entry[k]))
+        for k in picked
+    ]
+
+
+def sweep_settings(
+    data: Dict[str, Dict[str, np.ndarray]],
+    settings: Sequence[dict],
+) -> List[Dict[str, Any]]:
+    """심볼별 ``close``/``high``/``signal`` (선택 ``times``) 배열에 매도 설정 목록을 적용.
+
+    반환 행은 심볼, 설정 값, ``09_backtest`` 요약과 같은 지표입니다. 수익률은
+    평균 단가 기준이며 왕복 수수료 ``COMMISSION`` 을 뺍니다.
+    """
+    rows = []
+    for symbol, arrays in data.items():
+        close = np.asarray(arrays["close"], dtype=np.float64)
+        starts = np.flatnonzero(np.asarray(arrays["signal"]) == 1)
+        for config in settings:
+            picked, (_, reason, price, entry) = _chain(
+                close, arrays["high"], starts, config, arrays.get("times")
+            )
+            net = price[picked] / entry[picked] - 1 - COMMISSION
+            rows.append({"symbol": symbol, **config, **summarize_trades(reason[picked], net)})
+    return rows
+
+
+__all__ = [
+    "exit_table",
+    "load_settings",
+    "scaling_enabled",
+    "simulate_position",
+    "simulate_trades",
+    "sweep_settings",
+]
@@ -0,0 +1,201 @@
+"""05_split 매니페스트 읽기/쓰기.
+
+분할 단계는 라벨 파일을 복사하지 않고 ``{symbol}_split.json`` 에 세트별 행 범위만
+기록합니다. 학습/평가 단계는 :func:`load_split` 으로 원본 라벨 Parquet 를
+메모리 맵으로 열어 필요한 row group 만 읽은 뒤 잘라 씁니다. 예전 방식의
+``{symbol}_{part}.parquet`` 파일이 있으면 매니페스트가 없을 때 그대로 읽습니다.
+
+워크 포워드 평가용으로 매니페스트에 ``folds`` (시간순 여러 개의 학습/검증/테스트
+범위) 를 함께 기록할 수 있으며, ``fold`` 인자로 해당 창의 세트를 읽습니다.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+MANIFEST_SUFFIX = "_split.json"
+PARTS = ("train", "valid", "test")
+
+
+class StaleSplitError(RuntimeError):
+    """매니페스트 작성 이후 원본 라벨 파일이 바뀌어 행 범위를 믿을 수 없음."""
+
+
+def manifest_path(split_dir: Path, symbol: str) -> Path:
+    return Path(split_dir) / f"{symbol}{MANIFEST_SUFFIX}"
+
+
+def _signature(path: Path) -> Dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def walk_forward_bounds(
+    n: int,
+    folds: int,
+    test_ratio: float,
+    valid_ratio: float,
+    window: str = "expanding",
+) -> List[Dict[str, Tuple[int, int]]]:
+    """마지막 ``folds`` 개 테스트 창과 그 직전 검증 창, 학습 창의 ``[start, stop)`` 범위.
+
+    테스트 창은 겹치지 않고 시간순으로 이어지며, ``expanding`` 은 학습 시작을 0 에
+    고정하고 ``rolling`` 은 첫 창의 학습 길이를 유지한 채 함께 밀립니다. 첫 학습
+    창이 비면 빈 목록을 반환합니다.
+    """
+    n_test = int(n * test_ratio)
+    n_valid = int(n * valid_ratio)
+    first_train = n - folds * n_test - n_valid
+    if folds <= 0 or n_test <= 0 or n_valid <= 0 or first_train <= 0:
+        return []
+    result = []
+    for k in range(folds):
+        test_start = first_train + n_valid + k * n_test
+        valid_start = test_start - n_valid
+        train_start = k * n_test if window == "rolling" else 0
+        result.append({
+            "train": (train_start, valid_start),
+            "valid": (valid_start, test_start),
+            "test": (test_start, test_start + n_test),
+        })
+    return result
+
+
+def write_manifest(
+    split_dir: Path,
+    symbol: str,
+    source: Path,
+    rows: int,
+    bounds: Dict[str, Tuple[int, int]],
+    folds: Optional[List[Dict[str, Tuple[int, int]]]] = None,
+) -> Path:
+    """``source`` 의 세트별 ``[start, stop)`` 행 범위 (와 워크 포워드 창) 를 매니페스트로 저장."""
+    path = manifest_path(split_dir, symbol)
+    data = {
+        "symbol": symbol,
+        # 파이프라인 폴더를 옮겨도 유효하도록 매니페스트 기준 상대 경로로 저장
+        "source": os.path.relpath(Path(source).resolve(), Path(split_dir).resolve()),
+        "rows": rows,
+        "source_signature": _signature(Path(source)),
+        "splits": {part: [int(start), int(stop)] for part, (start, stop) in bounds.items()},
+    }
+    if folds:
+        data["folds"] = [
+            {part: [int(start), int(stop)] for part, (start, stop) in fold.items()} for fold in folds
+        ]
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    tmp.replace(path)
+    return path
+
+
+def read_manifest(split_dir: Path, symbol: str) -> dict | None:
+    path = manifest_path(split_dir, symbol)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def read_rows(
+    source: Path, start: int, stop: int, columns: Sequence[str] | None = None
+) -> pd.DataFrame:
+    """Parquet ``source`` 의 ``[start, stop)`` 행만 메모리 맵으로 읽어 반환."""
+    pf = pq.ParquetFile(source, memory_map=True)
+    groups: List[int] = []
+    first_row = offset = 0
+    for i in range(pf.metadata.num_row_groups):
+        n = pf.metadata.row_group(i).num_rows
+        if offset + n > start and offset < stop:
+            if not groups:
+                first_row = offset
+            groups.append(i)
+        offset += n
+    if not groups:
+        return pf.schema_arrow.empty_table().to_pandas()
+    cols = list(columns) if columns is not None else None
+    table = pf.read_row_groups(groups, columns=cols, use_pandas_metadata=True)
+    table = table.slice(start - first_row, stop - start)
+    return table.to_pandas().reset_index(drop=True)
+
+
+def _source(split_dir: Path, symbol: str, manifest: dict) -> Path:
+    """매니페스트 원본 라벨 파일 경로 (분할 이후 바뀌었으면 :class:`StaleSplitError`)."""
+    source = (Path(split_dir) / manifest["source"]).resolve()
+    if _signature(source) != manifest.get("source_signature"):
+        raise StaleSplitError(f"{symbol} 라벨 파일이 분할 이후 변경되었습니다. 05_split 을 다시 실행하세요.")
+    return source
+
+
+def _bounds(manifest: dict, part: str, fold: int | None) -> List[int]:
+    if fold is None:
+        return manifest["splits"][part]
+    return manifest["folds"][fold][part]
+
+
+def load_split(
+    split_dir: Path,
+    symbol: str,
+    part: str,
+    columns: Sequence[str] | None = None,
+    fold: int | None = None,
+) -> pd.DataFrame:
+    """``symbol`` 의 ``part`` (train/valid/test) 세트를 DataFrame 으로 반환.
+
+    ``fold`` 를 주면 매니페스트의 해당 워크 포워드 창에서 읽습니다. 분할 이후
+    원본 라벨 파일이 바뀌었으면 다른 행을 잘라 내지 않도록 :class:`StaleSplitError` 를 냅니다.
+    """
+    manifest = read_manifest(split_dir, symbol)
+    if manifest is None:
+        if fold is not None:
+            raise FileNotFoundError(f"{symbol} 워크 포워드 창은 분할 매니페스트가 있어야 합니다")
+        return pd.read_parquet(Path(split_dir) / f"{symbol}_{part}.parquet", columns=columns)
+
+    source = _source(split_dir, symbol, manifest)
+    start, stop = _bounds(manifest, part, fold)
+    return read_rows(source, start, stop, columns)
+
+
+def split_signature(
+    split_dir: Path, symbol: str, part: str, fold: int | None = None
+) -> Dict[str, object]:
+    """세트 내용이 바뀌면 달라지는 서명 (캐시 키 용도)."""
+    manifest = read_manifest(split_dir, symbol)
+    if manifest is not None:
+        source = (Path(split_dir) / manifest["source"]).resolve()
+        return {"source": _signature(source), "range": _bounds(manifest, part, fold)}
+    path = Path(split_dir) / f"{symbol}_{part}.parquet"
+    return {"file": path.name, **_signature(path)}
+
+
+def load_range(
+    split_dir: Path, symbol: str, start: int, stop: int, columns: Sequence[str] | None = None
+) -> pd.DataFrame:
+    """매니페스트 원본 라벨 파일의 ``[start, stop)`` 행 (세트 경계와 무관한 범위)."""
+    manifest = read_manifest(split_dir, symbol)
+    if manifest is None:
+        raise FileNotFoundError(f"{symbol} 분할 매니페스트가 없습니다")
+    source = _source(split_dir, symbol, manifest)
+    return read_rows(source, start, stop, columns)
+
+
+def fold_count(split_dir: Path, symbol: str) -> int:
+    """매니페스트에 기록된 워크 포워드 창 수 (없으면 0)."""
+    manifest = read_manifest(split_dir, symbol)
+    return len(manifest.get("folds", [])) if manifest else 0
+
+
+def list_symbols(split_dir: Path, part: str = "train") -> List[str]:
+    """매니페스트 또는 예전 분할 파일이 있는 심볼 목록."""
+    split_dir = Path(split_dir)
+    symbols = {p.name[: -len(MANIFEST_SUFFIX)] for p in split_dir.glob(f"*{MANIFEST_SUFFIX}")}
+    symbols |= {p.stem.split("_")[0] for p in split_dir.glob(f"*_{part}.parquet")}
+    return sorted(symbols)
@@ -0,0 +1,255 @@
+"""03_feature_engineering 피처의 스트리밍(증분) 계산.
+
+:class:`FeatureState` 는 ``feature_graph`` 의 출력 피처와 03 단계의 m5/일봉/
+시간 피처를 ``streaming_indicators`` 의 지표 상태로 보관하고, 1분 격자로 정리된
+캔들 한 개마다 O(1) 로 갱신합니다. 누적 피처인 ``obv``/``vwap`` 는 정제 파일
+앞부분에서 계산한 누적 상태(:func:`cumulative_seed`)로 이어 붙여야 배치 값과
+같아지며, 시드가 없으면 계산할 수 없는 피처로 취급합니다.
+
+값 정의는 ``feature_graph.NODES`` 와 ``_finish_features`` 를 따릅니다. 배치와 같이
+inf/NaN 은 직전 유효값으로 채우고, m5/일봉 피처는 현재 캔들까지의 구간 값(마지막
+행을 배치로 계산했을 때와 같은 값)을 사용합니다.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Dict, Set
+
+import numpy as np
+import pandas as pd
+
+import feature_graph
+from streaming_indicators import (
+    ADX,
+    ATR,
+    EMA,
+    MACD,
+    MFI,
+    RSI,
+    VWAP,
+    Stochastic,
+    _div,
+    _isnan,
+    _Window,
+)
+
+NAN = float("nan")
+# 정제 파일의 OHLCV 는 float32 이며 배치 피처 일부는 그 정밀도로 계산됩니다.
+F32 = np.float32
+EMA_SPANS = [5, 8, 13, 20, 21, 60, 120]
+M5_COLUMNS = [f"m5_{c}" for c in ["open", "high", "low", "close", "volume"]]
+TIME_COLUMNS = ["hour", "minute", "dayofweek"]
+CUMULATIVE = {"obv", "vwap"}
+FIVE_MINUTES = pd.Timedelta("5min").value
+# 03 단계가 중간값으로만 쓰고 저장하지 않는 노드
+_DROPPED = {"ma_vol5", "ma_vol20"}
+FEATURES: Set[str] = (
+    set(feature_graph.OUTPUT_FEATURES) - _DROPPED
+) | set(M5_COLUMNS) | {"d_close"} | set(TIME_COLUMNS)
+
+
+def _flag(cond: bool) -> int:
+    return 1 if cond else 0
+
+
+def _pct(x: float, prev: float) -> float:
+    """``pct_change`` 값. 03 단계처럼 float32 연산으로 계산합니다."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(F32(x) / F32(prev) - F32(1))
+
+
+def cumulative_seed(frame: pd.DataFrame) -> Dict[str, float]:
+    """정제 파일 ``frame`` 마지막 행까지의 ``obv``/``vwap`` 누적 상태를 반환합니다.
+
+    03 단계는 RangeIndex 프레임에서 계산하므로 두 피처 모두 파일 처음부터
+    누적됩니다. ``obv`` 는 배치와 같은 dtype 의 ``cumsum`` 으로 계산해 시드 시점
+    값이 저장된 피처와 같습니다. 빈 프레임은 파일 시작 상태를 반환합니다.
+    """
+    if frame.empty:
+        return {"obv": 0.0, "cum_vol": 0.0, "cum_pv": 0.0, "close": NAN}
+    close, volume = frame["close"], frame["volume"]
+    obv = volume.where(close > close.shift(), -volume).cumsum().fillna(0)
+    tp = (frame["high"] + frame["low"] + close) / 3
+    return {
+        "obv": float(obv.iloc[-1]),
+        "cum_vol": math.fsum(volume.dropna().astype(float)),
+        "cum_pv": math.fsum((tp * volume).dropna().astype(float)),
+        "close": float(close.iloc[-1]),
+    }
+
+
+class FeatureState:
+    """심볼 하나의 피처 계산 상태.
+
+    ``update()`` 는 1분 격자의 캔들(빠진 분은 호출 측에서 직전 캔들로 채움)을
+    받아 :data:`FEATURES` 값을 딕셔너리로 반환합니다. ``cumulative_seed`` 결과를
+    ``seed()`` 로 넣은 경우에만 ``obv``/``vwap`` 가 포함됩니다.
+    """
+
+    def __init__(self) -> None:
+        self.emas = [EMA(span=span) for span in EMA_SPANS]
+        self.sma5 = _Window(5)
+        self.close20 = _Window(20)
+        self.rsis = [RSI(7), RSI(14), RSI(21)]
+        self.atr = ATR(14)
+        self.vol5 = _Window(5)
+        self.vol20 = _Window(20)
+        self.stoch7 = Stochastic(7, 3)
+        self.stoch14 = Stochastic(14, 3)
+        self.closes: deque = deque(maxlen=11)
+        self.pct1 = _Window(14)
+        self.macd = MACD()
+        self.mfi = MFI(14)
+        self.adx = ADX(14)
+        self.tp14 = _Window(14)
+        self.vwap = VWAP()
+        self.obv = F32(0)
+        self.seeded = False
+        self.prev: tuple | None = None
+        self.bucket: int | None = None
+        self.m5: Dict[str, float] = {}
+        self.last: Dict[str, float] = {}
+
+    def seed(self, state: Dict[str, float]) -> None:
+        """:func:`cumulative_seed` 상태로 ``obv``/``vwap`` 누적값을 이어 붙입니다."""
+        self.obv = F32(state["obv"])
+        self.vwap.cum_vol = state["cum_vol"]
+        self.vwap.cum_pv = state["cum_pv"]
+        if self.prev is None:
+            self.prev = (NAN, NAN, NAN, state["close"], NAN)
+        self.seeded = True
+
+    def _m5(self, ts: int, o: float, h: float, l: float, c: float, v: float) -> None:
+        # resample("5min") 의 현재 구간을 지금 캔들까지 집계합니다.
+        bucket = ts - ts % FIVE_MINUTES
+        if bucket != self.bucket:
+            self.bucket = bucket
+            self.m5 = {"m5_open": o, "m5_high": h, "m5_low": l, "m5_close": c, "m5_volume": v}
+            return
+        m5 = self.m5
+        m5["m5_high"] = max(m5["m5_high"], h)
+        m5["m5_low"] = min(m5["m5_low"], l)
+        m5["m5_close"] = c
+        m5["m5_volume"] += v
+
+    def update(
+        self,
+        ts: int,
+        o: float,
+        h: float,
+        l: float,
+        c: float,
+        v: float,
+        kst: pd.Timestamp,
+    ) -> Dict[str, float]:
+        """캔들 한 개를 반영하고 피처 값을 반환합니다.
+
+        ``ts`` 는 UTC 나노초 타임스탬프, ``kst`` 는 ``candle_date_time_kst`` 입니다.
+        """
+        po, ph, pl, pc, pv = self.prev if self.prev is not None else (NAN,) * 5
+        prev_closes = list(self.closes)
+        self.prev = (o, h, l, c, v)
+        self.closes.append(c)
+        f: Dict[str, Any] = {}
+
+        for span, ema in zip(EMA_SPANS, self.emas):
+            f[f"ema{span}"] = ema.update(c)
+        self.sma5.push(c)
+        self.close20.push(c)
+        f["sma5"] = self.sma5.mean()
+        sma20, std20 = self.close20.mean(), self.close20.std()
+        f["sma20"] = sma20
+        f["ema5_ema20_diff"] = f["ema5"] - f["ema20"]
+        f["ema8_ema21_diff"] = f["ema8"] - f["ema21"]
+        f["ema5_ema60_diff"] = f["ema5"] - f["ema60"]
+        f["ema20_ema60_diff"] = f["ema20"] - f["ema60"]
+        f["ema_gc"] = _flag(f["ema5"] > f["ema20"])
+        f["ema_dc"] = _flag(f["ema5"] < f["ema20"])
+
+        for period, rsi in zip((7, 14, 21), self.rsis):
+            f[f"rsi{period}"] = rsi.update(c)
+        f["rsi_oversold"] = _flag(f["rsi14"] < 30)
+        f["rsi_overbought"] = _flag(f["rsi14"] > 70)
+        f["atr14"] = self.atr.update(h, l, c)
+        self.vol5.push(v)
+        self.vol20.push(v)
+        f["vol_ratio"] = _div(v, self.vol20.mean() + 1e-8)
+        f["vol_ratio_5"] = _div(v, self.vol5.mean() + 1e-8)
+        vol_chg = _pct(v, pv)
+        f["vol_chg"] = 0.0 if _isnan(vol_chg) else vol_chg
+        f["stoch_k7"], f["stoch_d7"] = self.stoch7.update(h, l, c)
+        f["stoch_k14"], f["stoch_d14"] = self.stoch14.update(h, l, c)
+        f["stoch_k"], f["stoch_d"] = f["stoch_k14"], f["stoch_d14"]
+
+        def pct(n: int) -> float:
+            return _pct(c, prev_closes[-n]) if len(prev_closes) >= n else NAN
+
+        f["pct_change_1m"] = pct(1)
+        f["pct_change_5m"] = pct(5)
+        f["pct_change_10m"] = pct(10)
+        f["mom10"] = c - prev_closes[-10] if len(prev_closes) >= 10 else NAN
+        f["roc10"] = f["pct_change_10m"]
+
+        body, rng = abs(c - o), h - l
+        f["is_bull"] = _flag(c > o)
+        f["body_size"] = body
+        f["body_pct"] = _div(body, rng if rng != 0 else 1)
+        f["hl_range"] = rng
+        f["oc_range"] = abs(o - c)
+        f["body_to_range"] = _div(body, rng + 1e-8)
+        f["is_doji"] = _flag(body <= rng * 0.1)
+        f["long_bull"] = _flag(c > o and body >= rng * 0.7)
+        f["long_bear"] = _flag(c < o and body >= rng * 0.7)
+        upper, lower = h - max(o, c), min(o, c) - l
+        f["is_hammer"] = _flag(lower >= 2 * body and upper <= body)
+        f["close_change"] = c - pc
+        f["high_break"] = _flag(h > ph)
+        f["low_break"] = _flag(l < pl)
+        f["pivot_up"] = _flag(c > o and pc < po)
+        f["pivot_down"] = _flag(c < o and pc > po)
+
+        f["bb_mid"] = sma20
+        f["bb_upper"] = sma20 + 2 * std20
+        f["bb_lower"] = sma20 - 2 * std20
+        f["bb_width"] = _div(f["bb_upper"] - f["bb_lower"], sma20 + 1e-8)
+        f["bb_dist"] = _div(c - sma20, std20 + 1e-8)
+        f["dis_ma20"] = _div(c - sma20, sma20 + 1e-8)
+        self.pct1.push(f["pct_change_1m"])
+        f["volatility14"] = self.pct1.std()
+        f["anomaly"] = _flag(c > f["bb_upper"] or c < f["bb_lower"])
+        f["macd"], f["macd_signal"], f["macd_hist"] = self.macd.update(c)
+
+        tp = float((F32(h) + F32(l) + F32(c)) / F32(3))
+        f["mfi14"] = self.mfi.update(h, l, c, v)
+        f["adx14"] = self.adx.update(h, l, c)[0]
+        self.tp14.push(tp)
+        if self.tp14.ready():
+            window = np.asarray(self.tp14.values, dtype=float)
+            mad = np.abs(window - window.mean()).mean()
+            f["cci14"] = _div(tp - self.tp14.mean(), 0.015 * mad + 1e-8)
+        else:
+            f["cci14"] = NAN
+        vwap = self.vwap.update(h, l, c, v)
+        # 배치 obv 는 float32 cumsum 이므로 같은 정밀도로 누적합니다.
+        self.obv += F32(v if c > pc else -v)
+        if self.seeded:
+            f["vwap"] = vwap
+            f["obv"] = float(self.obv)
+
+        self._m5(ts, o, h, l, c, v)
+        f.update(self.m5)
+        f["d_close"] = c
+        f["hour"], f["minute"], f["dayofweek"] = kst.hour, kst.minute, kst.dayofweek
+
+        # 03 단계의 inf -> NaN 치환 후 forward fill
+        for name, value in f.items():
+            if math.isfinite(value):
+                self.last[name] = value
+            else:
+                f[name] = self.last.get(name, NAN)
+        return f
+
+
+__all__ = ["FEATURES", "FeatureState", "cumulative_seed"]
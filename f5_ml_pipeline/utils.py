@@ -4,6 +4,8 @@ from pathlib import Path
 from contextlib import contextmanager
 from typing import Any
 import logging
+import threading
+import time
 from logging.handlers import RotatingFileHandler
 
 
@@ -85,6 +87,33 @@ def save_parquet_atomic(df: "pd.DataFrame", path: str | Path) -> None:
             tmp.unlink(missing_ok=True)
 
 
+def compact_dtypes(df: "pd.DataFrame") -> "pd.DataFrame":
+    """피처/라벨 프레임의 숫자형 컬럼을 저장용 작은 타입으로 변환.
+
+    실수형은 float32, 정수형(플래그, 라벨, 시간 코드)은 값 범위에 맞는 가장 작은
+    부호 있는 정수형으로 바꿉니다. bool, 문자열, 날짜 컬럼은 그대로 둡니다.
+    """
+    import numpy as np
+
+    df = df.copy()
+    for col in df.columns:
+        dtype = df[col].dtype
+        if not isinstance(dtype, np.dtype):
+            continue
+        if dtype.kind == "f" and dtype != np.float32:
+            df[col] = df[col].astype(np.float32)
+        elif dtype.kind in "iu":
+            values = df[col].to_numpy()
+            lo, hi = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+            for target in (np.int8, np.int16, np.int32):
+                info = np.iinfo(target)
+                if info.min <= lo and hi <= info.max:
+                    if dtype != target:
+                        df[col] = df[col].astype(target)
+                    break
+    return df
+
+
 def backup_file(path: str | Path, label: str = "corrupt") -> Path:
     """Rename ``path`` to ``<name>.<label>.<timestamp>`` and return the new path."""
     target = Path(path)
@@ -141,3 +170,31 @@ def file_lock(path: str | Path):
                 msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
         finally:
             fh.close()
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls to at most ``rate`` per second.
+
+    One instance is shared by every worker that talks to the same API so
+    concurrent downloads stay inside the exchange request budget.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the next request slot is available."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def backoff(self, seconds: float) -> None:
+        """Delay every following request by ``seconds`` (e.g. after HTTP 429)."""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
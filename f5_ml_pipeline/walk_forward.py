@@ -0,0 +1,221 @@
+"""05_split 매니페스트의 워크 포워드 창마다 학습 → 테스트 평가 → 백테스트.
+
+단일 70/20/10 분할은 테스트 구간 하나의 성과만 보여 주므로, 시간순으로 밀리는
+여러 (학습, 검증, 테스트) 창에서 같은 절차를 반복해 심볼별 성과의 평균과
+편차를 봅니다.
+
+* 창별 학습 Dataset 은 06_train 과 같은 :class:`DatasetCache` 에
+  ``{symbol}.wf{k}`` 이름으로 캐시되어 다시 실행할 때 구간화를 건너뜁니다.
+* ``warm_start`` 이면 06_train 증분 학습처럼 직전 창 모델에서 이어서, 직전 창
+  이후 새로 학습 구간에 들어온 행으로만 ``extra_estimators`` 라운드를 부스팅합니다.
+  직전 창 모델은 현재 창 학습 구간보다 앞선 데이터만 봤으므로 테스트 구간이
+  새지 않습니다.
+* 작업 단위는 (심볼, 창 목록) 이며 프로세스 풀에 나눠 실행합니다. warm start 를
+  끄면 창 하나가 작업 하나라 창끼리도 병렬로 돕니다.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score, brier_score_loss, roc_auc_score
+
+from backtest_engine import COMMISSION, REASONS, price_arrays, simulate_trades
+from booster_model import BoosterClassifier, train_booster, trimmed_booster
+from dataset_cache import CachedSplit, DatasetCache, balanced_weights
+from param_sweep import summarize_trades
+from split_io import load_range, load_split, read_manifest, split_signature
+
+IGNORE_COLS = {"timestamp", "label", "signal1", "signal2", "signal3"}
+# 창별 지표 중 심볼 단위로 평균/표준편차를 내는 항목
+SUMMARY_KEYS = ["auc", "pr_auc", "brier", "precision", "bt_avg_roi", "bt_sharpe", "bt_win_rate"]
+
+# (split_dir, cache_dir, symbol, 창 목록, train_config, 백테스트 파라미터)
+Task = Tuple[str, str, str, List[int], Dict[str, Any], Optional[Dict[str, Any]]]
+
+
+def _numeric(df: pd.DataFrame) -> None:
+    """06_train 과 같이 object 컬럼을 숫자로 바꾸고 결측을 0 으로 채운다."""
+    for col in df.columns:
+        if df[col].dtype == "object":
+            converted = pd.to_numeric(df[col], errors="coerce")
+            if pd.api.types.is_numeric_dtype(converted):
+                df[col] = converted
+    df.fillna(0, inplace=True)
+
+
+def _target(df: pd.DataFrame) -> pd.Series:
+    return df.get("signal1", pd.Series([0] * len(df))).astype(int)
+
+
+def fold_dataset(
+    split_dir: Path, cache: DatasetCache, symbol: str, fold: int
+) -> Tuple[Optional[CachedSplit], pd.DataFrame]:
+    """창 ``fold`` 의 캐시된 학습 Dataset 과 숫자형으로 정리한 테스트 세트."""
+    signature = {part: split_signature(split_dir, symbol, part, fold=fold) for part in ("train", "valid")}
+    name = f"{symbol}.wf{fold}"
+    cached = cache.load(name, signature)
+    if cached is None:
+        train_df = load_split(split_dir, symbol, "train", fold=fold)
+        valid_df = load_split(split_dir, symbol, "valid", fold=fold)
+        for df in (train_df, valid_df):
+            _numeric(df)
+        numeric_cols = train_df.select_dtypes(include=["number", "bool"]).columns
+        features = [c for c in numeric_cols if c not in IGNORE_COLS]
+        if features:
+            for f in features:
+                if f not in valid_df.columns:
+                    valid_df[f] = 0
+            y_train = _target(train_df)
+            meta = {"rows": len(train_df), "label_classes": int(y_train.nunique())}
+            cached = cache.build(
+                name, signature, train_df[features], y_train, valid_df[features], _target(valid_df), meta
+            )
+    test_df = load_split(split_dir, symbol, "test", fold=fold)
+    _numeric(test_df)
+    return cached, test_df
+
+
+def score_fold(
+    model: BoosterClassifier, test_df: pd.DataFrame, params: Optional[Dict[str, Any]]
+) -> Dict[str, float]:
+    """테스트 창의 분류 지표와 (파라미터가 있으면) ``prob > 0.5`` 신호 백테스트 요약."""
+    features = list(model.feature_name_)
+    X = np.zeros((len(test_df), len(features)), dtype=np.float32)
+    for j, f in enumerate(features):
+        if f in test_df.columns:
+            X[:, j] = test_df[f].to_numpy(dtype=np.float32)
+    y = _target(test_df).to_numpy()
+    prob = model.predict_proba(X)[:, 1]
+    pred = prob > 0.5
+
+    two_classes = len(np.unique(y)) == 2
+    metrics: Dict[str, float] = {
+        "test_rows": len(test_df),
+        "signals": int(pred.sum()),
+        "auc": float(roc_auc_score(y, prob)) if two_classes else 0.0,
+        "pr_auc": float(average_precision_score(y, prob)) if two_classes else 0.0,
+        "brier": float(brier_score_loss(y, prob)) if len(y) else 0.0,
+        "precision": float(y[pred].mean()) if pred.any() else 0.0,
+    }
+    if params and "close" in test_df.columns:
+        close, high, low = price_arrays(test_df)
+        trades = simulate_trades(close, high, low, pred.astype(int), params)
+        reasons = np.array([REASONS.index(t[3]) for t in trades], dtype=np.intp)
+        net = np.array([float(p) / float(close[s]) - 1 - COMMISSION for s, _, p, _ in trades])
+        summary = summarize_trades(reasons, net)
+        metrics.update({f"bt_{key}": value for key, value in summary.items()})
+    return metrics
+
+
+def _new_rows_set(
+    split_dir: Path, symbol: str, start: int, stop: int, cached: CachedSplit, params: Dict[str, Any]
+) -> Optional[lgb.Dataset]:
+    """``[start, stop)`` 행을 캐시된 학습 Dataset 의 구간 경계로 묶은 Dataset (양성/음성이 모두 있을 때)."""
+    features = cached.meta["features"]
+    new_df = load_range(split_dir, symbol, start, stop)
+    _numeric(new_df)
+    y_new = _target(new_df).to_numpy()
+    if len(np.unique(y_new)) < 2:
+        return None
+    return lgb.Dataset(
+        new_df.reindex(columns=features, fill_value=0).to_numpy(dtype=np.float32),
+        label=y_new,
+        weight=balanced_weights(y_new),
+        feature_name=features,
+        reference=cached.train,
+        params=params,
+    )
+
+
+def run_folds(task: Task) -> List[Dict[str, Any]]:
+    """한 심볼의 창들을 순서대로 학습/평가해 창별 결과 행을 반환."""
+    split_dir, cache_dir, symbol, folds, config, params = task
+    cache = DatasetCache(Path(cache_dir))
+    wf = config.get("walk_forward") or {}
+    bounds = read_manifest(Path(split_dir), symbol)["folds"]
+    rows = []
+    prev: Optional[BoosterClassifier] = None
+    prev_stop = 0
+    for fold in folds:
+        try:
+            cached, test_df = fold_dataset(Path(split_dir), cache, symbol, fold)
+        except Exception as exc:  # pragma: no cover - best effort
+            logging.warning("%s fold %d 로드 실패: %s", symbol, fold, exc)
+            prev = None
+            continue
+        if cached is None or cached.meta["label_classes"] < 2:
+            logging.warning("%s fold %d 학습 스킵: 피처가 없거나 라벨이 한 종류뿐입니다.", symbol, fold)
+            prev = None
+            continue
+
+        features = cached.meta["features"]
+        train_set, init_model = cached.train, None
+        n_estimators = int(config["model"]["n_estimators"])
+        if wf.get("warm_start") and prev is not None and list(prev.feature_name_) == features:
+            new_set = _new_rows_set(
+                Path(split_dir), symbol, prev_stop, bounds[fold]["train"][1],
+                cached, cache.params,
+            )
+            if new_set is not None:
+                train_set, init_model = new_set, trimmed_booster(prev)
+                n_estimators = int(wf.get("extra_estimators", 100))
+        model = train_booster(
+            config["model"],
+            train_set,
+            cached.X_valid,
+            cached.y_valid,
+            features,
+            cache.params,
+            n_estimators,
+            init_model=init_model,
+        )
+        rows.append({
+            "symbol": symbol,
+            "fold": fold,
+            "mode": "warm" if init_model is not None else "full",
+            "train_rows": cached.meta["rows"],
+            "num_trees": model.booster_.num_trees(),
+            **score_fold(model, test_df, params),
+        })
+        prev, prev_stop = model, bounds[fold]["train"][1]
+    return rows
+
+
+def run_tasks(tasks: Sequence[Task], workers: int = 1) -> List[Dict[str, Any]]:
+    """작업 목록을 실행 (``workers`` 가 2 이상이면 프로세스 풀)."""
+    if workers <= 1 or len(tasks) <= 1:
+        return [row for task in tasks for row in run_folds(task)]
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(run_folds, tasks):
+            rows.extend(part)
+    return rows
+
+
+def aggregate(rows: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """심볼별 창 수, ``SUMMARY_KEYS`` 평균/표준편차, 백테스트 진입 수와 누적 수익률 합."""
+    by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_symbol.setdefault(row["symbol"], []).append(row)
+    result = {}
+    for symbol, folds in by_symbol.items():
+        summary: Dict[str, Any] = {"folds": len(folds)}
+        for key in SUMMARY_KEYS:
+            values = [r[key] for r in folds if key in r and not math.isnan(r[key])]
+            summary[f"{key}_mean"] = float(np.mean(values)) if values else 0.0
+            summary[f"{key}_std"] = float(np.std(values)) if values else 0.0
+        summary["bt_total_entries"] = int(sum(r.get("bt_total_entries", 0) for r in folds))
+        summary["bt_cum_roi"] = float(sum(r.get("bt_cum_roi", 0.0) for r in folds))
+        result[symbol] = summary
+    return result
+
+
+__all__ = ["SUMMARY_KEYS", "aggregate", "fold_dataset", "run_folds", "run_tasks", "score_fold"]
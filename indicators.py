@@ -15,6 +15,10 @@ def rsi(series: pd.Series, period: int = 14) -> pd.Series:
     # 상승과 하락 구분
     up = delta.clip(lower=0)
     down = -delta.clip(upper=0)
+    return rsi_from_moves(up, down, period)
+
+def rsi_from_moves(up: pd.Series, down: pd.Series, period: int = 14) -> pd.Series:
+    """상승폭/하락폭 시리즈로 RSI 를 계산합니다(여러 기간이 같은 입력을 공유)."""
     # 평균 상승/하락 계산
     avg_gain = up.ewm(alpha=1/period, adjust=False).mean()
     avg_loss = down.ewm(alpha=1/period, adjust=False).mean()
@@ -22,16 +26,21 @@ def rsi(series: pd.Series, period: int = 14) -> pd.Series:
     rsi = 100 - (100 / (1 + rs))
     return rsi
 
-def atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
-    """주어진 기간의 ATR(평균 진폭)을 계산합니다."""
+def true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    """진폭(TR)을 계산합니다."""
     # 진폭 계산 요소
     prev_close = close.shift(1)
     tr1 = high - low
     tr2 = (high - prev_close).abs()
     tr3 = (low - prev_close).abs()
-    true_range = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    # NaN 을 건너뛰는 원소별 최대값: Series 와 (시간 x 심볼) DataFrame 모두 지원
+    return np.fmax(tr1, np.fmax(tr2, tr3))
+
+def atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14, tr: pd.Series | None = None) -> pd.Series:
+    """주어진 기간의 ATR(평균 진폭)을 계산합니다. ``tr`` 로 계산된 진폭을 재사용할 수 있습니다."""
+    true_range_ = true_range(high, low, close) if tr is None else tr
     # ATR을 위한 Wilder 지수 가중치
-    atr = true_range.ewm(alpha=1/period, adjust=False).mean()
+    atr = true_range_.ewm(alpha=1/period, adjust=False).mean()
     return atr
 
 def macd(series: pd.Series, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
@@ -65,12 +74,14 @@ def bollinger_bands(series: pd.Series, period: int = 20, stddev: float = 2):
     lower = mid - stddev * std
     return mid, upper, lower
 
-def vwap(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series) -> pd.Series:
+def vwap(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series,
+         typical_price: pd.Series | None = None) -> pd.Series:
     """거래량 가중 평균가(VWAP)를 계산합니다."""
     # 일자별 그룹화를 위한 인덱스 확인
     # 기본적으로 인덱스나 'date' 컬럼을 사용
     # 기준 가격 계산
-    typical_price = (high + low + close) / 3.0
+    if typical_price is None:
+        typical_price = (high + low + close) / 3.0
     # 날짜별 누적 합 계산
     if hasattr(close.index, 'tz') or isinstance(close.index, pd.DatetimeIndex):
         day_index = close.index.date
@@ -84,15 +95,18 @@ def vwap(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series) -
     vwap_series = cum_vol_price / cum_vol
     return vwap_series
 
-def mfi(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, period: int = 14) -> pd.Series:
+def mfi(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, period: int = 14,
+        typical_price: pd.Series | None = None) -> pd.Series:
     """주어진 기간의 MFI(자금 흐름 지수)를 계산합니다."""
-    typical_price = (high + low + close) / 3.0
+    if typical_price is None:
+        typical_price = (high + low + close) / 3.0
     money_flow = typical_price * volume
     # 매수/매도 흐름 방향 판단
     # 오늘의 기준 가격이 어제보다 높으면 양의 흐름
     tp_diff = typical_price.diff()
-    pos_flow = money_flow.where(tp_diff > 0, 0.0)
-    neg_flow = money_flow.where(tp_diff < 0, 0.0)
+    # 입력이 없는 행(NaN)은 0 이 아닌 NaN 으로 남겨 롤링 관측치에서 제외합니다.
+    pos_flow = money_flow.where(tp_diff > 0, 0.0).where(money_flow.notna())
+    neg_flow = money_flow.where(tp_diff < 0, 0.0).where(money_flow.notna())
     # 기간 동안의 흐름 합산
     pos_flow_sum = pos_flow.rolling(window=period, min_periods=period).sum()
     neg_flow_sum = neg_flow.rolling(window=period, min_periods=period).sum()
@@ -101,23 +115,19 @@ def mfi(high: pd.Series, low: pd.Series, close: pd.Series, volume: pd.Series, pe
     mfi = 100 - (100 / (1 + money_flow_ratio))
     return mfi
 
-def adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14):
+def adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14, tr: pd.Series | None = None):
     """ADX와 +DI, -DI 값을 계산하여 반환합니다."""
     # TR과 방향성 지표 계산
     prev_high = high.shift(1)
     prev_low = low.shift(1)
-    prev_close = close.shift(1)
     # 방향성 이동량 계산
     up_move = high - prev_high
     down_move = prev_low - low
     plus_dm = up_move.where((up_move > 0) & (up_move > down_move), 0.0)
     minus_dm = down_move.where((down_move > 0) & (down_move > up_move), 0.0)
     # 진폭(TR) 계산
-    tr = pd.DataFrame({
-        'tr1': high - low,
-        'tr2': (high - prev_close).abs(),
-        'tr3': (low - prev_close).abs()
-    }).max(axis=1)
+    if tr is None:
+        tr = true_range(high, low, close)
     # Wilder 방식의 지수 이동 평균 적용
     atr_series = tr.ewm(alpha=1/period, adjust=False).mean()
     plus_dm_smoothed = plus_dm.ewm(alpha=1/period, adjust=False).mean()
@@ -157,50 +167,67 @@ def ichimoku(high: pd.Series, low: pd.Series, close: pd.Series,
 def parabolic_sar(high: pd.Series, low: pd.Series, step: float = 0.02, max_step: float = 0.2) -> pd.Series:
     """주어진 고가/저가 시리즈로 파라볼릭 SAR을 계산합니다."""
     length = len(high)
-    sar = pd.Series(index=high.index, dtype=float)
-    # 초기 추세 방향과 극단값 설정
     if length == 0:
-        return sar
+        return pd.Series(index=high.index, dtype=float)
+    # 경로 의존 계산이므로 벡터화 대신 원시 배열 위에서 반복합니다.
+    # ``.iloc`` 스칼라 접근보다 수십 배 빠르며 결과는 동일합니다.
+    hi = np.asarray(high, dtype=float).tolist()
+    lo = np.asarray(low, dtype=float).tolist()
+    out = [0.0] * length
     # 처음 두 봉을 기준으로 추세 결정
-    sar.iloc[0] = low.iloc[0]  # 시작 SAR 값
+    sar_val = lo[0]  # 시작 SAR 값
+    out[0] = sar_val
     up_trend = True
     # 초기 극단값 설정
-    ep = high.iloc[0]
+    ep = hi[0]
     af = step
     for i in range(1, length):
-        prev_sar = sar.iloc[i-1]
         # SAR 업데이트
-        sar_val = prev_sar + af * (ep - prev_sar)
+        sar_val = sar_val + af * (ep - sar_val)
         # 직전 두 봉 범위 내에 있도록 보정
         if up_trend:
-            sar_val = min(sar_val, low.iloc[i-1], low.iloc[i])
-        else:
-            sar_val = max(sar_val, high.iloc[i-1], high.iloc[i])
-        # Determine trend reversal
-        if up_trend:
-            if low.iloc[i] < sar_val:
+            sar_val = min(sar_val, lo[i - 1], lo[i])
+            # 추세 반전 여부 판단
+            if lo[i] < sar_val:
                 up_trend = False
                 sar_val = ep
-                ep = low.iloc[i]
+                ep = lo[i]
                 af = step
-            else:
+            elif hi[i] > ep:
                 # 상승 추세 지속
-                if high.iloc[i] > ep:
-                    ep = high.iloc[i]
-                    af = min(af + step, max_step)
+                ep = hi[i]
+                af = min(af + step, max_step)
         else:
-            if high.iloc[i] > sar_val:
+            sar_val = max(sar_val, hi[i - 1], hi[i])
+            if hi[i] > sar_val:
                 up_trend = True
                 sar_val = ep
-                ep = high.iloc[i]
+                ep = hi[i]
                 af = step
-            else:
+            elif lo[i] < ep:
                 # 하락 추세 지속
-                if low.iloc[i] < ep:
-                    ep = low.iloc[i]
-                    af = min(af + step, max_step)
-        sar.iloc[i] = sar_val
-    return sar
+                ep = lo[i]
+                af = min(af + step, max_step)
+        out[i] = sar_val
+    return pd.Series(out, index=high.index, dtype=float)
+
+
+def rolling_mad(series: pd.Series, period: int) -> pd.Series:
+    """기간별 평균 절대 편차(MAD)를 계산합니다.
+
+    ``rolling(period).apply(lambda x: abs(x - x.mean()).mean(), raw=True)`` 와
+    같은 값을 슬라이딩 윈도우 뷰로 한 번에 계산합니다. DataFrame 은 열마다
+    계산합니다.
+    """
+    if isinstance(series, pd.DataFrame):
+        return series.apply(lambda col: rolling_mad(col, period))
+    values = np.asarray(series, dtype=float)
+    out = np.full(len(values), np.nan)
+    if period > 0 and len(values) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(values, period)
+        dev = np.abs(windows - windows.mean(axis=1, keepdims=True))
+        out[period - 1:] = dev.mean(axis=1)
+    return pd.Series(out, index=series.index)
 
 
 def calc_buy_sell_qty_5m(trades: pd.DataFrame, window: str = "5min") -> pd.DataFrame:
@@ -19,7 +19,11 @@ from f1_universe.universe_selector import (
     load_universe_from_file,
     init_coin_positions,
 )
-from f2_buy_signal import check_signals
+from f2_buy_signal import check_signals, signals_from_row
+from f2_buy_signal.online_inference import OnlineInference
+
+# In-memory models and per-symbol candle state for immediate ML scoring.
+_online = OnlineInference(fetch=lambda symbol, count: fetch_ohlcv(symbol, "minute1", count=count))
 
 
 def ensure_kst(timestamp_col):
@@ -91,9 +95,17 @@ def process_symbol(symbol: str) -> Optional[dict]:
     pm = _default_executor.position_manager
     open_pos = [p for p in pm.positions if p.get("symbol") == symbol and p.get("status") == "open"]
 
-    signals = check_signals(symbol)
+    try:
+        online = _online.score(symbol, df_1m)
+    except Exception as exc:  # pragma: no cover - best effort
+        logging.warning(f"[{symbol}] Online inference failed: {exc}")
+        online = None
+    # Without a published model the batch prediction file is used.
+    signals = signals_from_row(online) if online is not None else check_signals(symbol)
     buy_ok = not open_pos and all(signals.values())
     result = {"symbol": symbol, "buy_signal": buy_ok, "sell_signal": False, "buy_triggers": [], "sell_triggers": []}
+    if online is not None:
+        result["buy_prob"] = online["buy_prob"]
     if getattr(df_1m, "empty", True) is False and hasattr(df_1m, "iloc") and "close" in getattr(df_1m, "columns", []):
         result["price"] = float(df_1m["close"].iloc[-1])
     logging.info(f"[F1-F2] process_symbol() signals={signals} result={buy_ok}: {symbol}")
@@ -0,0 +1,427 @@
+"""indicators.py 지표의 스트리밍(증분) 버전.
+
+각 클래스는 재귀 상태(EMA/Wilder 평활, 롤링 윈도우, 일별 누적 VWAP)를 보관하고
+``update()`` 로 캔들 한 개씩 받아 배치 함수와 같은 값을 반환합니다.
+``snapshot()`` / ``restore()`` 로 상태를 저장하고 복원할 수 있어 매 분 피처를
+갱신할 때 전체 이력을 다시 계산할 필요가 없습니다.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Dict
+
+import numpy as np
+
+NAN = float("nan")
+
+
+def _isnan(x: float) -> bool:
+    return x != x
+
+
+def _div(a: float, b: float) -> float:
+    """0 나눗셈 시 pandas 와 동일하게 inf/NaN 을 반환합니다."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(np.float64(a) / np.float64(b))
+
+
+def _nanmax(*values: float) -> float:
+    """NaN 을 건너뛰는 최대값 (``DataFrame.max(axis=1)`` 과 동일)."""
+    valid = [v for v in values if not _isnan(v)]
+    return max(valid) if valid else NAN
+
+
+class StreamingIndicator:
+    """스트리밍 지표 공통 기반 클래스.
+
+    인스턴스 속성 전체를 상태로 취급하며 하위 지표 객체와 ``deque`` 는
+    재귀적으로 직렬화합니다.
+    """
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 상태를 JSON 직렬화 가능한 딕셔너리로 반환합니다."""
+        state: Dict[str, Any] = {}
+        for key, value in self.__dict__.items():
+            if isinstance(value, StreamingIndicator):
+                state[key] = value.snapshot()
+            elif isinstance(value, deque):
+                state[key] = list(value)
+            elif isinstance(value, date):
+                state[key] = value.isoformat()
+            else:
+                state[key] = value
+        return state
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """``snapshot()`` 결과로 상태를 복원합니다."""
+        for key, value in state.items():
+            current = self.__dict__.get(key)
+            if isinstance(current, StreamingIndicator):
+                current.restore(value)
+            elif isinstance(current, deque):
+                current.clear()
+                current.extend(value)
+            elif key == "_day" and isinstance(value, str):
+                self._day = date.fromisoformat(value)
+            else:
+                self.__dict__[key] = value
+
+
+class _Window(StreamingIndicator):
+    """고정 길이 롤링 윈도우 (``rolling(window, min_periods)``).
+
+    합계와 제곱편차합(Welford)을 증분으로 유지하고 최소/최대값은 단조 덱으로
+    관리하므로 ``push`` 와 조회가 (분할상환) O(1) 입니다. 빼기로 쌓이는
+    부동소수 오차는 ``size`` 번 갱신마다 윈도우 전체로 다시 맞춥니다.
+    """
+
+    def __init__(self, size: int, min_periods: int | None = None) -> None:
+        self.size = size
+        self.min_periods = size if min_periods is None else min_periods
+        self.values: deque = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.avg = 0.0
+        self.m2 = 0.0
+        self.pushed = 0
+        # (위치, 값) 쌍. lows 는 값이 증가, highs 는 감소하는 순서를 유지합니다.
+        self.lows: deque = deque()
+        self.highs: deque = deque()
+
+    def _add(self, x: float) -> None:
+        self.count += 1
+        self.total += x
+        delta = x - self.avg
+        self.avg += delta / self.count
+        self.m2 += delta * (x - self.avg)
+
+    def _remove(self, x: float) -> None:
+        self.count -= 1
+        self.total -= x
+        if self.count == 0:
+            self.avg = self.m2 = 0.0
+            return
+        delta = x - self.avg
+        self.avg -= delta / self.count
+        self.m2 -= delta * (x - self.avg)
+
+    def _resync(self) -> None:
+        valid = [v for v in self.values if not _isnan(v)]
+        self.count = len(valid)
+        self.total = math.fsum(valid)
+        self.avg = self.total / self.count if valid else 0.0
+        self.m2 = math.fsum((v - self.avg) ** 2 for v in valid)
+
+    def push(self, x: float) -> None:
+        x = float(x)
+        if len(self.values) == self.size and not _isnan(self.values[0]):
+            self._remove(self.values[0])
+        self.values.append(x)
+        pos = self.pushed
+        self.pushed += 1
+        for extremes in (self.lows, self.highs):
+            while extremes and extremes[0][0] <= pos - self.size:
+                extremes.popleft()
+        if not _isnan(x):
+            self._add(x)
+            while self.lows and self.lows[-1][1] >= x:
+                self.lows.pop()
+            self.lows.append((pos, x))
+            while self.highs and self.highs[-1][1] <= x:
+                self.highs.pop()
+            self.highs.append((pos, x))
+        if self.pushed % self.size == 0:
+            self._resync()
+
+    def ready(self) -> bool:
+        return self.count >= max(self.min_periods, 1)
+
+    def sum(self) -> float:
+        return self.total if self.ready() else NAN
+
+    def mean(self) -> float:
+        return self.total / self.count if self.ready() else NAN
+
+    def min(self) -> float:
+        return self.lows[0][1] if self.ready() else NAN
+
+    def max(self) -> float:
+        return self.highs[0][1] if self.ready() else NAN
+
+    def std(self, ddof: int = 1) -> float:
+        if not self.ready() or self.count <= ddof:
+            return NAN
+        return math.sqrt(max(self.m2 / (self.count - ddof), 0.0))
+
+
+class EMA(StreamingIndicator):
+    """``Series.ewm(adjust=False).mean()`` 과 동일한 지수 이동 평균.
+
+    ``span`` 또는 ``alpha`` 중 하나를 지정합니다. NaN 입력은 pandas 의
+    ``ignore_na=False`` 규칙대로 가중치만 감소시킵니다.
+    """
+
+    def __init__(self, span: float | None = None, alpha: float | None = None) -> None:
+        # pandas 와 같은 순서로 com -> alpha 를 계산해 비트 단위로 일치시킵니다.
+        if span is not None:
+            com = (span - 1) / 2.0
+        elif alpha is not None:
+            com = 1.0 / alpha - 1.0
+        else:
+            raise ValueError("span or alpha is required")
+        self.alpha = 1.0 / (1.0 + com)
+        self.weighted = NAN
+        self.old_wt = 1.0
+
+    def update(self, x: float) -> float:
+        """값 하나를 반영하고 현재 EMA 를 반환합니다."""
+        x = float(x)
+        is_obs = not _isnan(x)
+        if not _isnan(self.weighted):
+            self.old_wt *= 1.0 - self.alpha
+            if is_obs:
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * x) / (
+                        self.old_wt + self.alpha
+                    )
+                self.old_wt = 1.0
+        elif is_obs:
+            self.weighted = x
+        return self.weighted
+
+
+class Wilder(EMA):
+    """Wilder 평활 (``ewm(alpha=1/period, adjust=False)``)."""
+
+    def __init__(self, period: int) -> None:
+        super().__init__(alpha=1 / period)
+
+
+class SMA(StreamingIndicator):
+    """단순 이동 평균 (``rolling(period).mean()``)."""
+
+    def __init__(self, period: int) -> None:
+        self.window = _Window(period)
+
+    def update(self, x: float) -> float:
+        self.window.push(x)
+        return self.window.mean()
+
+
+class RSI(StreamingIndicator):
+    """Wilder 방식 RSI."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.gain = Wilder(period)
+        self.loss = Wilder(period)
+        self.prev = NAN
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        delta = close - self.prev
+        self.prev = close
+        up = max(delta, 0.0) if not _isnan(delta) else NAN
+        down = -min(delta, 0.0) if not _isnan(delta) else NAN
+        rs = _div(self.gain.update(up), self.loss.update(down))
+        return 100 - _div(100, 1 + rs)
+
+
+class ATR(StreamingIndicator):
+    """평균 진폭(ATR)."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.avg = Wilder(period)
+        self.prev_close = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = _nanmax(
+            high - low,
+            abs(high - self.prev_close),
+            abs(low - self.prev_close),
+        )
+        self.prev_close = float(close)
+        return self.avg.update(tr)
+
+
+class MACD(StreamingIndicator):
+    """MACD (MACD선, 신호선, 히스토그램)."""
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> None:
+        self.fast = EMA(span=fast_period)
+        self.slow = EMA(span=slow_period)
+        self.signal = EMA(span=signal_period)
+
+    def update(self, close: float) -> tuple[float, float, float]:
+        line = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(line)
+        return line, signal, line - signal
+
+
+class Stochastic(StreamingIndicator):
+    """스토캐스틱 오실레이터 (%K, %D)."""
+
+    def __init__(self, k_period: int = 14, d_period: int = 3, smooth_period: int = 3) -> None:
+        self.lows = _Window(k_period)
+        self.highs = _Window(k_period)
+        self.smooth = _Window(smooth_period) if smooth_period and smooth_period > 1 else None
+        self.d = _Window(d_period)
+
+    def update(self, high: float, low: float, close: float) -> tuple[float, float]:
+        self.lows.push(low)
+        self.highs.push(high)
+        lowest = self.lows.min()
+        k = _div(close - lowest, self.highs.max() - lowest) * 100
+        if self.smooth is not None:
+            self.smooth.push(k)
+            k = self.smooth.mean()
+        self.d.push(k)
+        return k, self.d.mean()
+
+
+class BollingerBands(StreamingIndicator):
+    """볼린저 밴드 (중앙선, 상단선, 하단선).
+
+    ``ddof=0`` 은 ``indicators.bollinger_bands``, ``ddof=1`` 은 피처 엔지니어링의
+    ``rolling(20).std()`` 와 같습니다.
+    """
+
+    def __init__(self, period: int = 20, stddev: float = 2, ddof: int = 0) -> None:
+        self.window = _Window(period)
+        self.stddev = stddev
+        self.ddof = ddof
+
+    def update(self, close: float) -> tuple[float, float, float]:
+        self.window.push(close)
+        mid = self.window.mean()
+        std = self.window.std(self.ddof)
+        return mid, mid + self.stddev * std, mid - self.stddev * std
+
+
+class VWAP(StreamingIndicator):
+    """일별 누적 VWAP.
+
+    ``timestamp`` 를 넘기면 날짜가 바뀔 때 누적값을 초기화합니다(DatetimeIndex
+    입력과 동일). 생략하면 초기화 없이 전체 구간을 누적합니다.
+    """
+
+    def __init__(self) -> None:
+        self.cum_vol = 0.0
+        self.cum_pv = 0.0
+        self._day: date | None = None
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        timestamp: datetime | None = None,
+    ) -> float:
+        if timestamp is not None:
+            day = timestamp.date()
+            if day != self._day:
+                self._day = day
+                self.cum_vol = 0.0
+                self.cum_pv = 0.0
+        pv = (high + low + close) / 3.0 * volume
+        # groupby().cumsum() 처럼 NaN 은 해당 행만 NaN 이고 누적에서 제외됩니다.
+        if not _isnan(volume):
+            self.cum_vol += volume
+        if not _isnan(pv):
+            self.cum_pv += pv
+        if _isnan(volume) or _isnan(pv):
+            return NAN
+        return _div(self.cum_pv, self.cum_vol)
+
+
+class MFI(StreamingIndicator):
+    """자금 흐름 지수(MFI)."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.pos = _Window(period)
+        self.neg = _Window(period)
+        self.prev_tp = NAN
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        tp = (high + low + close) / 3.0
+        flow = tp * volume
+        diff = tp - self.prev_tp
+        self.prev_tp = tp
+        self.pos.push(flow if (diff > 0 or _isnan(flow)) else 0.0)
+        self.neg.push(flow if (diff < 0 or _isnan(flow)) else 0.0)
+        ratio = _div(self.pos.sum(), self.neg.sum())
+        return 100 - _div(100, 1 + ratio)
+
+
+class ADX(StreamingIndicator):
+    """ADX 와 +DI, -DI."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.tr = Wilder(period)
+        self.plus = Wilder(period)
+        self.minus = Wilder(period)
+        self.adx = Wilder(period)
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+
+    def update(self, high: float, low: float, close: float) -> tuple[float, float, float]:
+        up = high - self.prev_high
+        down = self.prev_low - low
+        plus_dm = up if (up > 0 and up > down) else 0.0
+        minus_dm = down if (down > 0 and down > up) else 0.0
+        tr = _nanmax(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_high, self.prev_low, self.prev_close = float(high), float(low), float(close)
+
+        atr_val = self.tr.update(tr)
+        plus_di = 100 * _div(self.plus.update(plus_dm), atr_val)
+        minus_di = 100 * _div(self.minus.update(minus_dm), atr_val)
+        dx = 100 * _div(abs(plus_di - minus_di), plus_di + minus_di)
+        return self.adx.update(dx), plus_di, minus_di
+
+
+class ParabolicSAR(StreamingIndicator):
+    """파라볼릭 SAR."""
+
+    def __init__(self, step: float = 0.02, max_step: float = 0.2) -> None:
+        self.step = step
+        self.max_step = max_step
+        self.sar = NAN
+        self.up_trend = True
+        self.ep = NAN
+        self.af = step
+        self.prev_low = NAN
+        self.prev_high = NAN
+
+    def update(self, high: float, low: float) -> float:
+        high, low = float(high), float(low)
+        if _isnan(self.sar) and _isnan(self.ep):
+            self.sar, self.ep = low, high
+        else:
+            sar_val = self.sar + self.af * (self.ep - self.sar)
+            if self.up_trend:
+                sar_val = min(sar_val, self.prev_low, low)
+                if low < sar_val:
+                    self.up_trend = False
+                    sar_val = self.ep
+                    self.ep = low
+                    self.af = self.step
+                elif high > self.ep:
+                    self.ep = high
+                    self.af = min(self.af + self.step, self.max_step)
+            else:
+                sar_val = max(sar_val, self.prev_high, high)
+                if high > sar_val:
+                    self.up_trend = True
+                    sar_val = self.ep
+                    self.ep = high
+                    self.af = self.step
+                elif low < self.ep:
+                    self.ep = low
+                    self.af = min(self.af + self.step, self.max_step)
+            self.sar = sar_val
+        self.prev_low, self.prev_high = low, high
+        return self.sar
@@ -0,0 +1,91 @@
+"""Shared fixtures for the f5_ml_pipeline stage tests."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+PIPELINE_DIR = Path(__file__).resolve().parents[1] / "f5_ml_pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+
+def _load_stage(name, filename):
+    spec = importlib.util.spec_from_file_location(name, PIPELINE_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _synthetic_frame(start, n, seed, noise=0.5, x2_weight=0.0, extra=()):
+    """1-minute rows whose ``signal1`` is ``x1 + x2_weight * x2 + noise > 0.8``.
+
+    ``extra`` adds optional columns: ``prices`` (close/high/low random walk),
+    ``volatility14``, ``x1_copy`` (near duplicate of ``x1``) and ``noise``.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    x1 = rng.normal(size=n)
+    x2 = rng.normal(size=n)
+    df = pd.DataFrame({"timestamp": pd.date_range(start, periods=n, freq="1min", tz="UTC")})
+    if "prices" in extra:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+        df["close"] = close
+        df["high"] = close * (1 + rng.uniform(0, 0.003, n))
+        df["low"] = close * (1 - rng.uniform(0, 0.003, n))
+    df["x1"] = x1
+    if "x1_copy" in extra:
+        df["x1_copy"] = 2 * x1 + 0.01 * rng.normal(size=n)
+    df["x2"] = x2
+    if "volatility14" in extra:
+        df["volatility14"] = rng.uniform(0, 0.01, size=n)
+    if "noise" in extra:
+        df["noise"] = rng.normal(size=n)
+    df["signal1"] = (x1 + x2_weight * x2 + noise * rng.normal(size=n) > 0.8).astype(int)
+    return df
+
+
+def _upbit_minutes(n=1500, seed=0, drop=0.15):
+    """Upbit minute candles in API format; minutes without trades are left out."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    ts = pd.date_range("2025-01-01 14:30", periods=n, freq="min", tz="UTC")
+    df = pd.DataFrame({
+        "market": "KRW-AAA",
+        "candle_date_time_utc": ts.strftime("%Y-%m-%dT%H:%M:%S"),
+        "candle_date_time_kst": ts.tz_convert("Asia/Seoul").strftime("%Y-%m-%dT%H:%M:%S"),
+        "opening_price": close + rng.normal(0, 0.1, n),
+        "high_price": close + rng.uniform(0.1, 0.5, n),
+        "low_price": close - rng.uniform(0.1, 0.5, n),
+        "trade_price": close,
+        "candle_acc_trade_price": rng.uniform(1e5, 1e6, n),
+        "candle_acc_trade_volume": rng.uniform(0, 10, n),
+        "unit": 1,
+    })
+    df.loc[100:110, "candle_acc_trade_volume"] = 0.0
+    keep = rng.random(n) > drop
+    keep[0] = True
+    return df[keep].reset_index(drop=True)
+
+
+@pytest.fixture
+def load_stage():
+    """Import a pipeline script (e.g. ``06_train.py``) as a fresh module."""
+    return _load_stage
+
+
+@pytest.fixture
+def make_frame():
+    """Factory for synthetic split/label frames, see :func:`_synthetic_frame`."""
+    return _synthetic_frame
+
+
+@pytest.fixture
+def make_upbit_minutes():
+    """Factory for raw Upbit minute candles, see :func:`_upbit_minutes`."""
+    return _upbit_minutes
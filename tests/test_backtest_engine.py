@@ -0,0 +1,164 @@
+import importlib.util
+import json
+import sys
+from pathlib import Path
+import pytest
+
+PIPELINE_DIR = Path(__file__).resolve().parents[1] / "f5_ml_pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+try:
+    import numpy as np
+    import pandas as pd
+    pandas_available = True
+except Exception:  # pragma: no cover - pandas missing
+    pandas_available = False
+
+PARAMS = [
+    {"thresh_pct": 0.01, "loss_pct": 0.008, "trail_start_pct": 0.004, "trail_down_pct": 0.002},
+    {"thresh_pct": 0.006, "loss_pct": 0.01, "trail_start_pct": None, "trail_down_pct": None},
+    {"thresh_pct": 0.05, "loss_pct": 0.05, "trail_start_pct": 0.0, "trail_down_pct": 0.0005},
+    {"thresh_pct": 0.2, "loss_pct": 0.2},
+]
+
+
+def _load_backtest_module():
+    spec = importlib.util.spec_from_file_location("backtest_mod", PIPELINE_DIR / "09_backtest.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _reference_exit(df, start_idx, params):
+    """예전 ``df.iloc`` 루프 구현."""
+    tp_pct = params.get("thresh_pct", 0)
+    sl_pct = params.get("loss_pct", 0)
+    ts_start = params.get("trail_start_pct")
+    ts_down = params.get("trail_down_pct")
+    entry = df.iloc[start_idx]["close"]
+    tp_price = entry * (1 + tp_pct)
+    sl_price = entry * (1 - sl_pct)
+    trail_active = False
+    highest = entry
+    for i in range(start_idx + 1, len(df)):
+        row = df.iloc[i]
+        close = row["close"]
+        high = row.get("high", close)
+        low = row.get("low", close)
+        if high >= tp_price:
+            return i, tp_price, "TP"
+        if low <= sl_price:
+            return i, sl_price, "SL"
+        if ts_start is not None and ts_down is not None:
+            roi = (close - entry) / entry
+            if not trail_active and roi >= ts_start:
+                trail_active = True
+                highest = close
+            elif trail_active:
+                if close > highest:
+                    highest = close
+                if (close - highest) / highest <= -ts_down:
+                    return i, close, "TS"
+    return len(df) - 1, df.iloc[-1]["close"], "FORCE"
+
+
+def _reference_trades(df, params):
+    trades = []
+    i = 0
+    while i < len(df):
+        row = df.iloc[i]
+        if row.get("buy_signal") == 1:
+            exit_idx, exit_price, result = _reference_exit(df, i, params)
+            trades.append((i, exit_idx, exit_price, result))
+            i = exit_idx + 1
+        else:
+            i += 1
+    return trades
+
+
+def _prices(n, seed, dtype=np.float32, with_high_low=True):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-01", periods=n, freq="min"),
+        "buy_signal": (rng.random(n) < 0.05).astype(np.int8),
+        "close": close.astype(dtype),
+    })
+    if with_high_low:
+        df["high"] = (close * (1 + rng.uniform(0, 0.003, n))).astype(dtype)
+        df["low"] = (close * (1 - rng.uniform(0, 0.003, n))).astype(dtype)
+        df.loc[rng.random(n) < 0.01, "high"] = np.nan
+    return df
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+@pytest.mark.parametrize("params", PARAMS)
+@pytest.mark.parametrize("dtype,with_high_low", [(np.float32, True), (np.float64, True), (np.float32, False)])
+def test_engine_matches_row_loop(params, dtype, with_high_low):
+    from backtest_engine import simulate_trades
+
+    df = _prices(1500, seed=7, dtype=dtype, with_high_low=with_high_low)
+    close = df["close"].to_numpy()
+    high = df["high"].to_numpy() if with_high_low else close
+    low = df["low"].to_numpy() if with_high_low else close
+    result = simulate_trades(close, high, low, df["buy_signal"].to_numpy(), params)
+    expected = _reference_trades(df, params)
+    assert expected
+    assert result == expected
+    assert [type(t[2]) for t in result] == [type(t[2]) for t in expected]
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_process_symbol_output_unchanged(tmp_path, monkeypatch):
+    from pred_store import PredictionStore, prediction_frame
+
+    mod = _load_backtest_module()
+    for name in ["PRED_DIR", "LABEL_DIR", "OUT_DIR"]:
+        monkeypatch.setattr(mod, name, tmp_path / name)
+        (tmp_path / name).mkdir()
+
+    df = _prices(3000, seed=11)
+    prob = np.where(df["buy_signal"] == 1, 0.9, 0.1)
+    pred = prediction_frame(df.assign(timestamp=df["timestamp"].dt.tz_localize("UTC")), prob)
+    PredictionStore(mod.PRED_DIR).append("AAA", pred)
+    df.assign(label=np.int8(1)).to_parquet(mod.LABEL_DIR / "AAA_label.parquet", index=False)
+    params = PARAMS[0]
+    (mod.LABEL_DIR / "AAA_best_params.json").write_text(json.dumps(params))
+
+    mod.process_symbol("AAA")
+
+    rows = []
+    for start, exit_idx, exit_price, result in _reference_trades(df, params):
+        entry = df.iloc[start]["close"]
+        gross = exit_price / entry - 1
+        rows.append({
+            "timestamp": df.iloc[start]["timestamp"],
+            "entry_price": entry,
+            "result": result,
+            "exit_time": df.iloc[exit_idx]["timestamp"],
+            "exit_price": exit_price,
+            "gross_roi": gross,
+            "net_roi": gross - mod.COMMISSION,
+        })
+    expected = pd.DataFrame(rows).to_csv(index=False)
+    assert (mod.OUT_DIR / "AAA_trades.csv").read_text() == expected
+    summary = json.loads((mod.OUT_DIR / "AAA_summary.json").read_text())
+    assert summary["total_entries"] == len(rows)
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+@pytest.mark.parametrize("params", PARAMS)
+def test_exit_table_matches_find_exit(params, monkeypatch):
+    import backtest_engine
+    from backtest_engine import REASONS, exit_table, find_exit
+
+    # 작은 창으로 행렬 판정, 창 연장, find_exit 대체 경로를 모두 거치게 한다
+    monkeypatch.setattr(backtest_engine, "TABLE_WINDOWS", (4, 16))
+    monkeypatch.setattr(backtest_engine, "TABLE_ROWS", 100)
+    df = _prices(800, seed=5)
+    close, high, low = (df[c].to_numpy() for c in ["close", "high", "low"])
+    starts = np.arange(len(df))
+    exit_idx, reason, price = exit_table(close, high, low, starts, params)
+    for s in starts:
+        idx, value, name = find_exit(close, high, low, int(s), params)
+        assert (exit_idx[s], REASONS[reason[s]], price[s]) == (idx, name, float(value))
@@ -0,0 +1,129 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+import pytest
+
+PIPELINE_DIR = Path(__file__).resolve().parents[1] / "f5_ml_pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+try:
+    import pandas as pd
+except Exception:
+    pandas_available = False
+else:
+    pandas_available = True
+
+from gap_index import from_minute, to_minute  # noqa: E402
+
+
+def _fake_exchange(skip=()):
+    """Return a fetcher serving every minute except ``skip`` and its calls."""
+    calls = []
+
+    def fetch(market, count, to):
+        calls.append((count, to))
+        end = to_minute(to)
+        rows = []
+        for m in range(end - count, end):
+            if m in skip:
+                continue
+            rows.append({
+                "market": market,
+                "candle_date_time_utc": from_minute(m).strftime("%Y-%m-%dT%H:%M:%S"),
+                "trade_price": float(m),
+            })
+        return rows[::-1]
+
+    return fetch, calls
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_ensure_range_fetches_only_missing(tmp_path):
+    from candle_store import CandleStore
+
+    now = datetime(2024, 1, 2, 0, 10, 30)
+    end = to_minute(datetime(2024, 1, 2, 0, 10))
+    skip = {end - 50}
+    fetch, calls = _fake_exchange(skip)
+    store = CandleStore(root=tmp_path, fetch=fetch, request_delay=0)
+
+    assert store.ensure_range("KRW-AAA", end - 300, end, now=now) == 2
+    assert store.missing("KRW-AAA", end - 300, end) == []
+    # rows span two daily partitions
+    assert sorted(p.name for p in (tmp_path / "KRW-AAA").glob("*.parquet")) == [
+        "2024-01-01.parquet",
+        "2024-01-02.parquet",
+    ]
+
+    calls.clear()
+    assert store.ensure_range("KRW-AAA", end - 300, end, now=now) == 0
+    assert calls == []
+
+    # extending the window only requests the new minutes
+    later = datetime(2024, 1, 2, 0, 15, 30)
+    assert store.ensure_range("KRW-AAA", end - 295, end + 5, now=later) == 1
+    assert calls == [(5, from_minute(end + 5))]
+
+    df = store.load("KRW-AAA", end - 300, end + 5)
+    assert len(df) == 304
+    assert df["candle_date_time_utc"].is_monotonic_increasing
+
+    out = tmp_path / "view" / "KRW-AAA_rawdata.parquet"
+    assert store.write_view("KRW-AAA", out, end - 10, end) == 10
+    assert len(pd.read_parquet(out)) == 10
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_append_ignores_forming_minute(tmp_path):
+    from candle_store import CandleStore
+
+    store = CandleStore(root=tmp_path, request_delay=0)
+    now = datetime(2024, 1, 1, 12, 0, 30)
+    df = pd.DataFrame({
+        "candle_date_time_utc": ["2024-01-01T11:59:00", "2024-01-01T12:00:00"],
+        "trade_price": [1.0, 2.0],
+    })
+    assert store.append("KRW-AAA", df, now=now) == 1
+    minute = to_minute(datetime(2024, 1, 1, 11, 59))
+    assert store.coverage("KRW-AAA").to_list() == [[minute, minute + 1]]
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_ensure_range_resumes_after_failure(tmp_path):
+    from candle_store import CandleStore
+
+    now = datetime(2024, 1, 2, 0, 0, 30)
+    end = to_minute(datetime(2024, 1, 2))
+    fetch, calls = _fake_exchange()
+
+    def flaky(market, count, to):
+        if len(calls) == 3:
+            raise RuntimeError("connection reset")
+        return fetch(market, count, to)
+
+    store = CandleStore(root=tmp_path, fetch=flaky, request_delay=0)
+    with pytest.raises(RuntimeError):
+        store.ensure_range("KRW-AAA", end - 1000, end, now=now, flush_pages=2)
+    # the first two pages were flushed before the failure
+    assert store.missing("KRW-AAA", end - 1000, end) == [(end - 1000, end - 400)]
+
+    store.fetch = fetch
+    calls.clear()
+    assert store.ensure_range("KRW-AAA", end - 1000, end, now=now, flush_pages=2) == 3
+    assert [c[1] for c in calls] == [from_minute(end - 400), from_minute(end - 600), from_minute(end - 800)]
+    assert len(store.load("KRW-AAA", end - 1000, end)) == 1000
+
+
+def test_rate_limiter_spaces_calls(monkeypatch):
+    import utils
+
+    clock = [100.0]
+    sleeps = []
+    monkeypatch.setattr(utils.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(utils.time, "sleep", lambda s: sleeps.append(round(s, 3)))
+    limiter = utils.RateLimiter(4)
+    for _ in range(3):
+        limiter.acquire()
+    limiter.backoff(1)
+    limiter.acquire()
+    assert sleeps == [0.25, 0.5, 1.0]
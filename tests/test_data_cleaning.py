@@ -28,3 +28,56 @@ def test_clean_missing_ohlc(tmp_path):
     dst = tmp_path / "out.parquet"
     data_cleaning.clean_one_file(src, dst, True)
     assert dst.exists() or dst.with_suffix(".csv").exists()
+
+
+def _raw_candles(start, periods, drop=()):
+    stamps = pd.date_range(start, periods=periods, freq="min").delete(list(drop))
+    price = np.arange(len(stamps), dtype=float) + 100
+    return pd.DataFrame({
+        "market": "KRW-AAA",
+        "candle_date_time_utc": stamps.strftime("%Y-%m-%dT%H:%M:%S"),
+        "opening_price": price,
+        "high_price": price + 1,
+        "low_price": price - 1,
+        "trade_price": price,
+        "candle_acc_trade_volume": 1.0,
+    })
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_incremental_clean_matches_full(tmp_path, monkeypatch):
+    raw = tmp_path / "KRW-AAA_rawdata.parquet"
+    inc_dir = tmp_path / "inc"
+    full_dir = tmp_path / "full"
+    inc_dir.mkdir()
+    full_dir.mkdir()
+
+    first = _raw_candles("2024-01-01 00:00", 300, drop=[50, 51, 299])
+    first.to_parquet(raw, index=False)
+    data_cleaning.clean_symbol([raw], inc_dir, incremental=True)
+    assert (inc_dir / "KRW-AAA_watermark.json").exists()
+
+    # unchanged raw files are skipped without loading them
+    monkeypatch.setattr(data_cleaning, "_load_concat", lambda *a, **k: 1 / 0)
+    data_cleaning.clean_symbol([raw], inc_dir, incremental=True)
+    monkeypatch.undo()
+
+    later = _raw_candles("2024-01-01 05:00", 200, drop=[0, 1, 2, 120])
+    pd.concat([first, later], ignore_index=True).to_parquet(raw, index=False)
+    loaded = []
+    orig_load = data_cleaning._load_raw_file
+
+    def spy(path, since=None):
+        df = orig_load(path, since=since)
+        loaded.append(len(df))
+        return df
+
+    monkeypatch.setattr(data_cleaning, "_load_raw_file", spy)
+    data_cleaning.clean_symbol([raw], inc_dir, incremental=True)
+    monkeypatch.undo()
+    assert loaded == [len(later) + data_cleaning.OVERLAP_MINUTES + 1]
+
+    data_cleaning.clean_symbol([raw], full_dir)
+    inc = pd.read_parquet(inc_dir / "KRW-AAA_clean.parquet")
+    full = pd.read_parquet(full_dir / "KRW-AAA_clean.parquet")
+    pd.testing.assert_frame_equal(inc, full)
@@ -57,3 +57,71 @@ def test_add_features_missing_column():
     })
     with pytest.raises(ValueError):
         feature_engineering.add_features(df)
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_add_features_batch_matches_single():
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    frames = {}
+    for symbol, n in [("KRW-AAA", 300), ("KRW-BBB", 180), ("KRW-CCC", 40)]:
+        ts = pd.date_range("2024-01-01 23:00", periods=n, freq="1min", tz="UTC")
+        close = (100 + np.cumsum(rng.normal(0, 1, n))).astype("float32")
+        frames[symbol] = pd.DataFrame({
+            "timestamp": ts,
+            "open": close + rng.normal(0, 0.1, n).astype("float32"),
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": rng.uniform(0, 5, n).astype("float32"),
+            "candle_date_time_kst": (ts + pd.Timedelta(hours=9)).strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+    batch = feature_engineering.add_features_batch(frames)
+    assert list(batch) == list(frames)
+    for symbol, df in frames.items():
+        pd.testing.assert_frame_equal(batch[symbol], feature_engineering.add_features(df))
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_add_features_prunes_to_requested_columns():
+    import numpy as np
+    import feature_graph
+
+    deps = feature_graph.dependencies(["bb_width", "dis_ma20", "sma20", "cci14", "mfi14"])
+    assert deps.count("sma20") == 1 and deps.count("_tp") == 1
+    assert "ema120" not in deps and "macd" not in deps
+
+    n = 120
+    close = 100 + np.cumsum(np.random.default_rng(1).normal(0, 1, n))
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n, freq="1min", tz="UTC"),
+        "open": close,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": np.ones(n),
+    })
+    wanted = ["rsi14", "dis_ma20", "m5_close"]
+    pruned = feature_engineering.add_features(df, wanted)
+    full = feature_engineering.add_features(df)
+    assert list(pruned.columns) == list(df.columns) + wanted
+    pd.testing.assert_frame_equal(pruned[wanted], full[wanted])
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_add_features_compact_dtypes():
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2021-01-01", periods=40, freq="1min"),
+        "candle_date_time_kst": pd.date_range("2021-01-01 09:00", periods=40, freq="1min").astype(str),
+        "open": [float(x) for x in range(40)],
+        "high": [x + 1.5 for x in range(40)],
+        "low": [x - 0.5 for x in range(40)],
+        "close": [x + 0.5 for x in range(40)],
+        "volume": [1.0 + x % 3 for x in range(40)],
+    })
+    result = feature_engineering.add_features(df)
+    for col in ["ema5", "rsi14", "vwap", "m5_close", "d_close"]:
+        assert result[col].dtype == "float32"
+    for col in ["ema_gc", "is_doji", "rsi_oversold", "hour", "dayofweek"]:
+        assert result[col].dtype == "int8"
@@ -0,0 +1,138 @@
+import json
+import pytest
+
+try:
+    import numpy as np
+    import pandas as pd  # noqa: F401
+    import lightgbm  # noqa: F401
+    deps_available = True
+except Exception:  # pragma: no cover - optional deps missing
+    deps_available = False
+
+CONFIG_TEXT = """model:
+  learning_rate: 0.1
+  num_leaves: 7
+  n_estimators: 30
+features:
+  use_selected: true
+selection:
+  corr_threshold: 0.95
+  min_importance: 0.05
+  sample_rows: 1000
+  n_estimators: 30
+"""
+# x1_copy 는 x1 과 거의 같고 noise 는 라벨과 무관하다
+FRAME_OPTS = {"noise": 0.3, "x2_weight": 0.5, "extra": ["x1_copy", "noise"]}
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_select_features_drops_duplicates_and_weak_features():
+    from feature_selection import select_features
+
+    corr = np.array([[1.0, 0.99, 0.1], [0.99, 1.0, 0.1], [0.1, 0.1, 1.0]])
+    ranks = [
+        {"features": ["a", "b", "c"], "gain": np.array([0.5, 0.45, 0.05]),
+         "permutation": np.array([0.1, 0.0, 0.0]), "corr": corr},
+        {"features": ["c", "b", "a"], "gain": np.array([0.0, 0.5, 0.5]),
+         "permutation": np.array([0.0, 0.0, 0.1]), "corr": corr[::-1, ::-1]},
+    ]
+    result = select_features(ranks, corr_threshold=0.95, min_importance=0.02)
+    assert result["features"] == ["a"]
+    assert result["dropped"] == {"b": "correlated:a", "c": "low_importance"}
+    assert list(result["importance"]) == ["a", "b", "c"]
+    assert select_features(ranks, corr_threshold=1.1, max_features=1)["dropped"]["b"] == "max_features"
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_selected_features_drive_train_and_feature_stage(tmp_path, monkeypatch, load_stage, make_frame):
+    stage = load_stage("select_stage", "06_feature_select.py")
+    train_mod = load_stage("train_select", "06_train.py")
+    feature_mod = load_stage("feature_select_mod", "03_feature_engineering.py")
+    split_dir = tmp_path / "05_split"
+    split_dir.mkdir()
+    for seed, symbol in enumerate(["AAA", "BBB"]):
+        make_frame("2024-01-01", 1500, seed, **FRAME_OPTS).to_parquet(split_dir / f"{symbol}_train.parquet", index=False)
+        make_frame("2024-01-03", 500, seed + 10, **FRAME_OPTS).to_parquet(split_dir / f"{symbol}_valid.parquet", index=False)
+    config_path = tmp_path / "train_config.yaml"
+    config_path.write_text(CONFIG_TEXT, encoding="utf-8")
+    out_dir = tmp_path / "06_feature_select"
+    for name, value in [("SPLIT_DIR", split_dir), ("OUT_DIR", out_dir),
+                        ("LOG_PATH", tmp_path / "select.log"), ("CONFIG_PATH", config_path)]:
+        monkeypatch.setattr(stage, name, value)
+
+    stage.main(workers=2)
+    with open(out_dir / "selected_features.json", encoding="utf-8") as f:
+        result = json.load(f)
+    assert result["symbols"] == 2
+    assert "x2" in result["features"] and "noise" not in result["features"]
+    # x1 과 x1_copy 중 하나만 남는다
+    kept = [f for f in ("x1", "x1_copy") if f in result["features"]]
+    assert len(kept) == 1
+    other = "x1_copy" if kept == ["x1"] else "x1"
+    assert result["dropped"][other] == f"correlated:{kept[0]}"
+
+    selected_path = out_dir / "selected_features.json"
+    config = {"model": {"learning_rate": 0.1, "num_leaves": 7, "n_estimators": 20},
+              "features": {"use_selected": True}}
+    for name, value in [("SPLIT_DIR", split_dir), ("MODEL_DIR", tmp_path / "06_models"), ("CONFIG", config),
+                        ("SELECTED_PATH", selected_path), ("TUNED_DIR", tmp_path / "06_optuna"),
+                        ("DATASET_CACHE", train_mod.DatasetCache(tmp_path / "cache"))]:
+        monkeypatch.setattr(train_mod, name, value)
+    train_mod.train_and_eval("AAA")
+    model, _ = train_mod.ModelRegistry(tmp_path / "06_models").load("AAA")
+    assert list(model.feature_name_) == result["features"]
+
+    # 목록을 끄면 캐시 서명이 달라 전체 피처로 다시 만든다
+    config["features"]["use_selected"] = False
+    cached, _ = train_mod._cached_split("AAA")
+    assert cached.meta["features"] == ["x1", "x1_copy", "x2", "noise"]
+
+    monkeypatch.setattr(feature_mod, "CONFIG_PATH", config_path)
+    monkeypatch.setattr(feature_mod, "SELECTED_PATH", selected_path)
+    monkeypatch.setattr(feature_mod, "MODEL_DIR", tmp_path / "06_models")
+    assert feature_mod.selected_features() == result["features"] + feature_mod.ALWAYS_FEATURES
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_selection_reranks_full_feature_set_after_use_selected(tmp_path, monkeypatch, load_stage, make_frame):
+    from feature_selection import full_features
+
+    stage = load_stage("select_twice", "06_feature_select.py")
+    split_dir = tmp_path / "05_split"
+    split_dir.mkdir()
+    frames = {}
+    for seed, symbol in enumerate(["AAA", "BBB"]):
+        df = make_frame("2024-01-01", 3000, seed, extra=["prices"]).drop(columns=["x1", "x2"])
+        df["open"] = df["close"].shift(1).fillna(df["close"].iloc[0])
+        df["volume"] = np.random.default_rng(seed).uniform(1, 10, len(df))
+        # 라벨은 가격 지표와 관련이 있어야 중요도가 갈린다
+        df["signal1"] = (df["close"] > df["close"].rolling(20, min_periods=1).mean()).astype(int)
+        frames[symbol] = full_features(df)
+
+    def write_splits(columns=None):
+        for symbol, df in frames.items():
+            keep = df if columns is None else df[["timestamp", "open", "high", "low", "close", "volume",
+                                                   *columns, "signal1"]]
+            keep.iloc[:2400].to_parquet(split_dir / f"{symbol}_train.parquet", index=False)
+            keep.iloc[2400:].to_parquet(split_dir / f"{symbol}_valid.parquet", index=False)
+
+    config_path = tmp_path / "train_config.yaml"
+    config_path.write_text(CONFIG_TEXT, encoding="utf-8")
+    out_dir = tmp_path / "06_feature_select"
+    for name, value in [("SPLIT_DIR", split_dir), ("OUT_DIR", out_dir),
+                        ("LOG_PATH", tmp_path / "select.log"), ("CONFIG_PATH", config_path)]:
+        monkeypatch.setattr(stage, name, value)
+
+    def run():
+        stage.main(workers=1)
+        with open(out_dir / "selected_features.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    write_splits()
+    first = run()
+    assert 0 < len(first["features"]) < len(first["importance"])
+    # use_selected 로 03 단계가 고른 피처만 계산한 뒤에도 전체 피처를 다시 평가한다
+    write_splits([f for f in first["features"] if f not in {"open", "high", "low", "close", "volume"}])
+    second = run()
+    assert set(second["importance"]) == set(first["importance"])
+    assert second["features"] == first["features"]
@@ -0,0 +1,88 @@
+import importlib.util
+import sys
+from datetime import datetime
+from pathlib import Path
+import pytest
+
+PIPELINE_DIR = Path(__file__).resolve().parents[1] / "f5_ml_pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+from gap_index import GapIndex, IntervalSet, coalesce_ranges, to_minute  # noqa: E402
+
+try:
+    import pandas as pd
+except Exception:
+    pandas_available = False
+else:
+    pandas_available = True
+
+
+def test_interval_set_merge_and_missing():
+    cover = IntervalSet()
+    cover.add(0, 10)
+    cover.add(20, 30)
+    cover.add(10, 12)
+    cover.add_minutes([15, 16, 17])
+    assert cover.to_list() == [[0, 12], [15, 18], [20, 30]]
+    assert cover.missing(5, 35) == [(12, 15), (18, 20), (30, 35)]
+    assert cover.covers(16) and not cover.covers(18)
+    cover.trim(16)
+    assert cover.to_list() == [[16, 18], [20, 30]]
+
+
+def test_coalesce_ranges_uses_fewest_windows():
+    gaps = [(0, 5), (100, 150), (190, 260), (600, 601)]
+    windows = coalesce_ranges(gaps, max_count=200)
+    assert windows == [(0, 200), (200, 260), (600, 601)]
+    assert all(e - s <= 200 for s, e in windows)
+
+
+def test_gap_index_retention():
+    index = GapIndex(retention=10)
+    index.add_minutes("KRW-AAA", range(0, 100))
+    assert index.missing("KRW-AAA", 90, 100) == []
+    assert index.missing("KRW-AAA", 80, 95) == [(80, 90)]
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_fill_last_hour_requests_only_missing(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location(
+        "data_collect", PIPELINE_DIR / "01_data_collect.py"
+    )
+    data_collect = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(data_collect)
+    monkeypatch.setattr(data_collect, "DATA_ROOT", tmp_path)
+
+    now = datetime(2024, 1, 1, 12, 0, 30)
+    stamps = pd.date_range("2024-01-01 11:00", "2024-01-01 12:00", freq="1min")
+    stamps = stamps.delete([10, 11, 12])
+    rows = pd.DataFrame({
+        "market": "KRW-AAA",
+        "candle_date_time_utc": stamps.strftime("%Y-%m-%dT%H:%M:%S"),
+        "trade_price": 1.0,
+    })
+    data_collect.save_data(rows, "KRW-AAA")
+
+    calls = []
+
+    def fake_range(market, count=60, to=None):
+        calls.append((count, to))
+        return []
+
+    monkeypatch.setattr(data_collect, "get_ohlcv_range", fake_range)
+    data_collect.fill_last_hour("KRW-AAA", now=now)
+    assert calls == [(3, datetime(2024, 1, 1, 11, 13))]
+
+    # appended rows update the index without reading the file again
+    monkeypatch.setattr(pd, "read_parquet", lambda *a, **k: pd.DataFrame(columns=rows.columns))
+    missing = rows.iloc[:0].copy()
+    missing["candle_date_time_utc"] = ["2024-01-01T11:10:00", "2024-01-01T11:11:00", "2024-01-01T11:12:00"]
+    missing["market"] = "KRW-AAA"
+    missing["trade_price"] = 1.0
+    data_collect.save_data(missing, "KRW-AAA")
+    calls.clear()
+    data_collect.fill_last_hour("KRW-AAA", now=now)
+    assert calls == []
+    assert data_collect.GAP_INDEX.missing(
+        "KRW-AAA", to_minute(datetime(2024, 1, 1, 11)), to_minute(datetime(2024, 1, 1, 12, 1))
+    ) == []
@@ -0,0 +1,36 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+try:
+    import pandas as pd
+    import numpy as np
+except Exception:
+    pandas_available = False
+else:
+    pandas_available = True
+    import indicators
+    sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+    import bench_indicators
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_array_kernels_match_loop_versions():
+    rng = np.random.default_rng(3)
+    close = pd.Series(100 + np.cumsum(rng.normal(0, 1, 2000)))
+    high = close + rng.uniform(0, 1, 2000)
+    low = close - rng.uniform(0, 1, 2000)
+    high.iloc[100] = np.nan
+    typical = (high + low + close) / 3
+
+    pd.testing.assert_series_equal(
+        indicators.parabolic_sar(high, low), bench_indicators.parabolic_sar_iloc(high, low)
+    )
+    pd.testing.assert_series_equal(
+        indicators.rolling_mad(typical, 14), bench_indicators.rolling_mad_apply(typical, 14)
+    )
+    assert indicators.parabolic_sar(high.iloc[:0], low.iloc[:0]).empty
+    assert indicators.rolling_mad(typical.iloc[:5], 14).isna().all()
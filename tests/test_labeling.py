@@ -82,3 +82,76 @@ def test_make_labels_trailing_multistage():
         trail_down_pct=0.005,
     )
     assert list(result["label"][:4]) == [2, -1, 1, 0]
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_label_dtypes_are_compact():
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2021-01-01", periods=6, freq="T"),
+            "open": [101, 102, 100, 101, 100, 100],
+            "high": [101, 102, 100, 101, 100, 100],
+            "low": [101, 102, 100, 101, 100, 100],
+            "close": [101.0, 102, 100, 101, 100, 100],
+            "volume": [1] * 6,
+        }
+    )
+    result = labeling.make_labels_trailing(df, 2, 0.01, 0.01, 0.005, 0.005)
+    assert result["label"].dtype == "int8"
+    assert result["signal1"].dtype == bool
+    compact = labeling.compact_dtypes(result)
+    assert compact["close"].dtype == "float32"
+    assert compact["volume"].dtype == "int8"
+    assert list(compact["label"]) == list(result["label"])
+
+
+def _trailing_reference(close, high, low, horizon, thresh, loss, start, down):
+    """Row-by-row trailing stop labels used to check the vectorised version."""
+    n = len(close)
+    labels = [0] * n
+    for i in range(n - horizon):
+        entry = close[i]
+        if max(high[i + 1:i + horizon + 1]) >= entry * (1 + thresh):
+            labels[i] = 1
+        elif min(low[i + 1:i + horizon + 1]) <= entry * (1 - loss):
+            labels[i] = -1
+        else:
+            max_price = None
+            for p in close[i + 1:i + horizon + 1]:
+                if max_price is None:
+                    if (p - entry) / entry >= start:
+                        max_price = p
+                    continue
+                max_price = max(max_price, p)
+                if (p - max_price) / max_price <= -down:
+                    labels[i] = 2
+                    break
+    return labels
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_trailing_labels_and_grid_match_reference():
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, 400)))
+    high = close * (1 + rng.uniform(0, 0.002, 400))
+    low = close * (1 - rng.uniform(0, 0.002, 400))
+    df = pd.DataFrame({"open": close, "high": high, "low": low, "close": close, "volume": 1.0})
+
+    thresholds = [0.003, 0.006]
+    losses = [0.004, 0.008]
+    trails = [(None, None), (0.001, 0.0005), (0.002, 0.001)]
+    windows = labeling.future_windows(df, 5)
+    counts = labeling.label_grid_counts(windows, 5, thresholds, losses, trails)
+    for i, thresh in enumerate(thresholds):
+        for j, loss in enumerate(losses):
+            for k, (start, down) in enumerate(trails):
+                result = labeling.make_labels_trailing(df, 5, thresh, loss, start, down, windows=windows)
+                if start is None:
+                    start, down = float("inf"), 0.0
+                expected = _trailing_reference(
+                    list(close), list(high), list(low), 5, thresh, loss, start, down
+                )
+                assert list(result["label"]) == expected
+                assert list(counts[i, j, k]) == [expected.count(v) for v in (1, 2, -1, 0)]
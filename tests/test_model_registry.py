@@ -0,0 +1,74 @@
+import sys
+import threading
+from pathlib import Path
+
+PIPELINE_DIR = Path(__file__).resolve().parents[1] / "f5_ml_pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+from model_registry import ModelCache, ModelRegistry, list_models, load_model  # noqa: E402
+
+
+def test_publish_swaps_current_and_prunes(tmp_path):
+    registry = ModelRegistry(tmp_path, keep=2)
+    assert registry.current_version("KRW-AAA") is None
+
+    for i in range(1, 6):
+        version = registry.publish("KRW-AAA", {"weights": i}, {"features": ["f1"], "auc": 0.5 + i / 100})
+        assert version == i
+        assert registry.current_version("KRW-AAA") == i
+
+    model, meta = registry.load("KRW-AAA")
+    assert model == {"weights": 5}
+    assert meta["version"] == 5 and meta["features"] == ["f1"]
+    # 현재 버전 + 이전 2개만 남는다
+    assert registry.versions("KRW-AAA") == [3, 4, 5]
+    assert registry.load("KRW-AAA", 3)[0] == {"weights": 3}
+    assert not list((tmp_path / "KRW-AAA").glob(".*.tmp"))
+
+
+def test_load_model_falls_back_to_legacy_pickle(tmp_path):
+    import joblib
+
+    joblib.dump({"legacy": True}, tmp_path / "KRW-BBB_model.pkl")
+    ModelRegistry(tmp_path).publish("KRW-AAA", {"new": True}, {})
+    assert list_models(tmp_path) == ["KRW-AAA", "KRW-BBB"]
+    assert load_model(tmp_path, "KRW-BBB") == ({"legacy": True}, {})
+    assert load_model(tmp_path, "KRW-AAA")[0] == {"new": True}
+
+
+def test_model_cache_reloads_only_new_versions(tmp_path, monkeypatch):
+    registry = ModelRegistry(tmp_path)
+    cache = ModelCache(tmp_path)
+    assert cache.get("KRW-AAA") is None
+
+    registry.publish("KRW-AAA", {"v": 1}, {})
+    loads = []
+    original = ModelRegistry.load
+
+    def counting_load(self, symbol, version=None):
+        loads.append(version)
+        return original(self, symbol, version)
+
+    monkeypatch.setattr(ModelRegistry, "load", counting_load)
+    first = cache.get("KRW-AAA")[0]
+    assert cache.get("KRW-AAA")[0] is first
+    assert loads == [1]
+
+    registry.publish("KRW-AAA", {"v": 2}, {})
+    assert cache.get("KRW-AAA")[0] == {"v": 2}
+    assert cache.version("KRW-AAA") == 2
+    assert loads == [1, 2]
+
+
+def test_concurrent_publish_assigns_unique_versions(tmp_path):
+    registry = ModelRegistry(tmp_path, keep=10)
+    threads = [
+        threading.Thread(target=registry.publish, args=("KRW-AAA", {"i": i}, {}))
+        for i in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert registry.versions("KRW-AAA") == [1, 2, 3, 4]
+    assert registry.current_version("KRW-AAA") == 4
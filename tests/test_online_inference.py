@@ -0,0 +1,226 @@
+import importlib.util
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+try:
+    import numpy as np
+    import pandas as pd
+    import lightgbm as lgb
+    deps_available = True
+except Exception:  # pragma: no cover - optional deps missing
+    deps_available = False
+
+FEATURES = ["rsi14", "ema5_ema20_diff", "bb_dist", "vol_ratio", "hour", "m5_close"]
+
+
+def _candles(n=320, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    return pd.DataFrame({
+        # pyupbit 형식: KST 기준 timestamp
+        "timestamp": pd.date_range("2025-01-01 08:30", periods=n, freq="min"),
+        "open": close + rng.normal(0, 0.1, n),
+        "high": close + rng.uniform(0.1, 0.5, n),
+        "low": close - rng.uniform(0.1, 0.5, n),
+        "close": close,
+        "volume": rng.uniform(1, 10, n),
+    })
+
+
+def _batch_features(candles, features=FEATURES):
+    spec = importlib.util.spec_from_file_location(
+        "fe_mod", ROOT / "f5_ml_pipeline" / "03_feature_engineering.py"
+    )
+    fe = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(fe)
+    # 02_data_cleaning 과 같이 빠진 분을 1분 격자로 채운다
+    grid = candles.set_index("timestamp").resample("1min").ffill().reset_index()
+    ts = grid["timestamp"].dt.tz_localize("Asia/Seoul")
+    clean = grid.assign(
+        timestamp=ts.dt.tz_convert("UTC"), candle_date_time_kst=ts.dt.tz_localize(None)
+    )
+    X = fe.add_features(clean, features)[features].astype(np.float32)
+    return X.set_index(grid["timestamp"]).loc[candles["timestamp"]].reset_index(drop=True)
+
+
+def _publish(registry, X, seed, features=FEATURES):
+    y = (np.random.default_rng(seed).random(len(X)) < 1 / (1 + np.exp(-X["ema5_ema20_diff"] * 5))).astype(int)
+    model = lgb.LGBMClassifier(n_estimators=20, num_leaves=7, min_child_samples=5, verbose=-1)
+    model.fit(X, y)
+    registry.publish("KRW-AAA", model, {"features": features})
+    return model
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_online_scores_match_batch_and_hot_swap(tmp_path):
+    from f2_buy_signal.online_inference import MIN_ROWS, OnlineInference
+    from model_registry import ModelRegistry
+
+    candles = _candles()
+    X = _batch_features(candles)
+    registry = ModelRegistry(tmp_path)
+    model = _publish(registry, X, seed=0)
+
+    fetched = []
+
+    def fetch(symbol, count):
+        fetched.append(count)
+        # 시작 시점 이력: 마지막 행은 아직 진행 중인 캔들
+        return candles.iloc[: MIN_ROWS + 1]
+
+    online = OnlineInference(model_dir=tmp_path, fetch=fetch, window=len(candles))
+    assert online.score("KRW-BBB", candles) is None  # 모델 없음 -> 배치 경로 사용
+
+    results = []
+    for i in range(MIN_ROWS, MIN_ROWS + 40):
+        # 신호 루프는 매번 최근 50개 캔들을 가져온다
+        res = online.score("KRW-AAA", candles.iloc[i - 49 : i + 2])
+        assert res["timestamp"] == candles["timestamp"].iloc[i].tz_localize("Asia/Seoul").tz_convert("UTC")
+        expected = model.predict_proba(X.iloc[[i]])[:, 1][0]
+        assert res["buy_prob"] == pytest.approx(expected, abs=1e-9)
+        results.append(res)
+    assert fetched == [len(candles)]
+
+    # 새 캔들이 없으면 모델을 다시 평가하지 않는다
+    again = online.score("KRW-AAA", candles.iloc[MIN_ROWS + 39 - 49 : MIN_ROWS + 41])
+    assert again is results[-1]
+
+    # 새 버전이 공개되면 같은 캔들이라도 새 모델로 다시 평가한다
+    new_model = _publish(registry, X, seed=1)
+    swapped = online.score("KRW-AAA", candles.iloc[MIN_ROWS + 39 - 49 : MIN_ROWS + 41])
+    assert swapped["version"] == 2
+    expected = new_model.predict_proba(X.iloc[[MIN_ROWS + 39]])[:, 1][0]
+    assert swapped["buy_prob"] == pytest.approx(expected, abs=1e-9)
+    assert set(["rsi14", "ema5", "ema20"]) <= set(swapped)
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_online_seeded_mid_history_with_missing_minutes(tmp_path):
+    from f2_buy_signal.online_inference import MIN_ROWS, OnlineInference
+    from model_registry import ModelRegistry
+
+    # 거래 없는 분은 Upbit 응답에서 빠진다
+    candles = _candles(1000, seed=5)
+    keep = np.random.default_rng(7).random(len(candles)) > 0.15
+    keep[0] = True
+    candles = candles[keep].reset_index(drop=True)
+    X = _batch_features(candles)
+    registry = ModelRegistry(tmp_path)
+    model = _publish(registry, X, seed=0)
+
+    # 배치 피처는 파일 처음부터 계산되지만 온라인 이력은 중간부터 시작한다
+    start = 400
+    online = OnlineInference(model_dir=tmp_path, fetch=lambda s, n: candles.iloc[start : start + MIN_ROWS + 1])
+    for i in range(start + MIN_ROWS, start + MIN_ROWS + 60):
+        res = online.score("KRW-AAA", candles.iloc[i - 49 : i + 2])
+        expected = model.predict_proba(X.iloc[[i]])[:, 1][0]
+        assert res["buy_prob"] == pytest.approx(expected, abs=1e-6)
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_online_scores_full_default_feature_set(tmp_path, load_stage, make_upbit_minutes):
+    import logging
+
+    from f2_buy_signal.online_inference import OnlineInference
+    from model_registry import ModelRegistry
+
+    raw = make_upbit_minutes(1500, seed=2)
+    cleaning = load_stage("clean_mod", "02_data_cleaning.py")
+    fe = load_stage("fe_mod", "03_feature_engineering.py")
+    clean = cleaning._clean_df(raw, logging.getLogger("test"))
+
+    # 06_train 과 같이 03 결과의 모든 숫자형 변환 컬럼으로 학습
+    def design(df):
+        return df.drop(columns=["timestamp"]).apply(pd.to_numeric, errors="coerce").fillna(0).astype(np.float32)
+
+    X = design(fe.add_features(clean))
+    features = list(X.columns)
+    assert {"obv", "vwap", "unit", "candle_acc_trade_price", "market", "m5_close"} <= set(features)
+    votes = (X["close"] > X["vwap"]).astype(int) + (X["obv"] > X["obv"].median()) + (X["ema5_ema20_diff"] > 0)
+    y = (votes >= 2).astype(int)
+    model = lgb.LGBMClassifier(n_estimators=30, num_leaves=7, min_child_samples=5, verbose=-1)
+    model.fit(X, y)
+    ModelRegistry(tmp_path / "models").publish("KRW-AAA", model, {"features": features})
+
+    # pyupbit 응답 형식: KST timestamp, 거래대금은 value
+    ts = pd.to_datetime(raw["candle_date_time_kst"]).dt.tz_localize("Asia/Seoul")
+    candles = pd.DataFrame({
+        "timestamp": ts,
+        "open": raw["opening_price"],
+        "high": raw["high_price"],
+        "low": raw["low_price"],
+        "close": raw["trade_price"],
+        "volume": raw["candle_acc_trade_volume"],
+        "value": raw["candle_acc_trade_price"],
+    })
+    stamp = ts.dt.tz_convert("UTC")
+    cut = int(np.searchsorted(clean["timestamp"], stamp.iloc[1000]))
+    clean_dir = tmp_path / "clean"
+    clean_dir.mkdir()
+    clean.iloc[:cut].to_parquet(clean_dir / "KRW-AAA_clean.parquet", index=False)
+
+    # 정제 파일 없이는 obv/vwap 을 이어 붙일 수 없어 배치 예측을 사용
+    bare = OnlineInference(model_dir=tmp_path / "models", fetch=lambda s, n: candles.iloc[700:1001],
+                           clean_dir=tmp_path / "missing")
+    assert bare.score("KRW-AAA", candles.iloc[950:1002]) is None
+
+    online = OnlineInference(model_dir=tmp_path / "models", fetch=lambda s, n: candles.iloc[700:1001],
+                             clean_dir=clean_dir)
+    for i in range(1000, 1030):
+        res = online.score("KRW-AAA", candles.iloc[i - 49 : i + 2])
+        assert res["timestamp"] == stamp.iloc[i]
+        # 배치 08 단계가 이 캔들까지의 데이터로 계산한 마지막 행
+        upto = int(np.searchsorted(clean["timestamp"], stamp.iloc[i], side="right"))
+        row = design(fe.add_features(clean.iloc[:upto])).iloc[[-1]]
+        expected = model.predict_proba(row)[:, 1][0]
+        assert res["buy_prob"] == pytest.approx(expected, abs=1e-6)
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_online_skips_models_with_features_it_cannot_build(tmp_path):
+    from f2_buy_signal.online_inference import OnlineInference
+    from model_registry import ModelRegistry
+
+    candles = _candles()
+    X = _batch_features(candles).assign(orderbook_ratio=0.0)
+    registry = ModelRegistry(tmp_path)
+    _publish(registry, X, seed=0, features=list(X.columns))
+    online = OnlineInference(model_dir=tmp_path, fetch=lambda s, n: candles, clean_dir=tmp_path)
+    # 0 으로 채운 행을 평가하지 않고 배치 예측 파일을 사용
+    assert online.score("KRW-AAA", candles) is None
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_online_skips_symbols_routed_to_pooled_model(tmp_path):
+    from f2_buy_signal.online_inference import OnlineInference
+    from model_registry import ModelRegistry
+    from pooled_model import POOLED_MODEL
+
+    candles = _candles()
+    X = _batch_features(candles)
+    registry = ModelRegistry(tmp_path)
+    model = _publish(registry, X, seed=0)
+    enabled = tmp_path / "enabled.yaml"
+    enabled.write_text("pooled:\n  enabled: true\n", encoding="utf-8")
+    disabled = tmp_path / "disabled.yaml"
+    disabled.write_text("pooled:\n  enabled: false\n", encoding="utf-8")
+    online = OnlineInference(model_dir=tmp_path, fetch=lambda s, n: candles, config_path=enabled)
+
+    def publish_pooled(route):
+        meta = {"features": FEATURES, "symbols": ["KRW-AAA"], "routing": {"KRW-AAA": route}}
+        registry.publish(POOLED_MODEL, model, meta)
+
+    # 공통 모델로 라우팅된 심볼은 남아 있는 자기 모델 대신 배치 예측 파일을 사용
+    publish_pooled("pooled")
+    assert online.score("KRW-AAA", candles) is None
+    # pooled.enabled 가 꺼져 있으면 공개된 공통 모델은 라우팅에 쓰지 않는다
+    off = OnlineInference(model_dir=tmp_path, fetch=lambda s, n: candles, config_path=disabled)
+    assert off.score("KRW-AAA", candles) is not None
+    # 다시 자기 모델로 라우팅되면 온라인 추론을 재개한다
+    publish_pooled("symbol")
+    res = online.score("KRW-AAA", candles)
+    assert res["buy_prob"] == pytest.approx(model.predict_proba(X.iloc[[-2]])[:, 1][0], abs=1e-9)
@@ -0,0 +1,99 @@
+import json
+import pytest
+
+try:
+    import numpy as np  # noqa: F401
+    import pandas as pd  # noqa: F401
+    import lightgbm  # noqa: F401
+    import optuna
+    deps_available = True
+except Exception:  # pragma: no cover - optional deps missing
+    deps_available = False
+
+CONFIG_TEXT = """model:
+  learning_rate: 0.1
+  num_leaves: 7
+  n_estimators: 30
+  early_stopping_rounds: 10
+optuna:
+  mode: {mode}
+  n_trials: {trials}
+  workers: 2
+"""
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm/optuna not available")
+def test_optuna_stage_tunes_from_cache_and_train_picks_up(tmp_path, monkeypatch, load_stage, make_frame):
+    train_mod = load_stage("train_optuna", "06_train.py")
+    stage = load_stage("optuna_stage", "06_optuna_tpe.py")
+    split_dir = tmp_path / "05_split"
+    split_dir.mkdir()
+    for seed, symbol in enumerate(["AAA", "BBB"]):
+        make_frame("2024-01-01", 1500, seed).to_parquet(split_dir / f"{symbol}_train.parquet", index=False)
+        make_frame("2024-01-03", 400, seed + 10).to_parquet(split_dir / f"{symbol}_valid.parquet", index=False)
+
+    config = {"model": {"learning_rate": 0.1, "num_leaves": 7, "n_estimators": 30},
+              "incremental": {"enabled": True, "refresh_hours": 24, "min_new_rows": 1}}
+    for name, value in [("SPLIT_DIR", split_dir), ("MODEL_DIR", tmp_path / "06_models"),
+                        ("TUNED_DIR", tmp_path / "06_optuna"), ("CONFIG", config),
+                        ("DATASET_CACHE", train_mod.DatasetCache(tmp_path / "cache"))]:
+        monkeypatch.setattr(train_mod, name, value)
+    for symbol in ["AAA", "BBB"]:
+        train_mod.train_and_eval(symbol)
+    first = json.loads((tmp_path / "06_models" / "AAA_metrics.json").read_text())["lineage"]
+    assert first["params"]["learning_rate"] == 0.1
+
+    for name, value in [("SPLIT_DIR", split_dir), ("CACHE_DIR", tmp_path / "cache"),
+                        ("TUNED_DIR", tmp_path / "06_optuna"), ("LOG_PATH", tmp_path / "optuna.log"),
+                        ("CONFIG_PATH", tmp_path / "train_config.yaml")]:
+        monkeypatch.setattr(stage, name, value)
+
+    # 튜닝은 캐시된 Dataset 만 사용한다
+    import split_io
+
+    def fail(*args, **kwargs):
+        raise AssertionError("split data read during tuning")
+
+    monkeypatch.setattr(split_io, "load_split", fail)
+    stage.CONFIG_PATH.write_text(CONFIG_TEXT.format(mode="symbol", trials=6), encoding="utf-8")
+    stage.main()
+    url = f"sqlite:///{tmp_path / '06_optuna' / 'optuna.db'}"
+    for symbol in ["AAA", "BBB"]:
+        study = optuna.load_study(study_name=symbol, storage=url)
+        assert len(study.trials) == 6
+        best = json.loads((tmp_path / "06_optuna" / f"{symbol}_params.json").read_text())
+        assert best["auc"] == pytest.approx(study.best_value)
+        assert best["params"]["bagging_freq"] == 1
+
+    # 다시 실행하면 같은 연구에 이어서 시도를 쌓는다
+    stage.CONFIG_PATH.write_text(CONFIG_TEXT.format(mode="pooled", trials=3), encoding="utf-8")
+    stage.main(workers=1)
+    assert len(optuna.load_study(study_name="pooled", storage=url).trials) == 3
+    assert (tmp_path / "06_optuna" / "pooled_params.json").exists()
+
+    # 06_train 은 심볼별 최적값을 덮어쓰고, 파라미터가 바뀌었으므로 전체 재학습
+    tuned = json.loads((tmp_path / "06_optuna" / "AAA_params.json").read_text())["params"]
+    monkeypatch.undo()
+    for name, value in [("SPLIT_DIR", split_dir), ("MODEL_DIR", tmp_path / "06_models"),
+                        ("TUNED_DIR", tmp_path / "06_optuna"), ("CONFIG", config),
+                        ("DATASET_CACHE", train_mod.DatasetCache(tmp_path / "cache"))]:
+        monkeypatch.setattr(train_mod, name, value)
+    assert train_mod._model_params("AAA") == {**config["model"], **tuned}
+    train_mod.train_and_eval("AAA")
+    second = json.loads((tmp_path / "06_models" / "AAA_metrics.json").read_text())["lineage"]
+    assert second["refresh_reason"] == "params_changed"
+    assert second["params"]["learning_rate"] == tuned["learning_rate"]
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm/optuna not available")
+def test_search_space_stays_exportable():
+    from optuna_search import suggest_params
+    from tree_export import MAX_LEAVES
+
+    study = optuna.create_study(direction="maximize")
+    for _ in range(20):
+        trial = study.ask()
+        params = suggest_params(trial)
+        assert params["num_leaves"] <= MAX_LEAVES
+        study.tell(trial, 0.5)
+    assert study.trials[0].distributions["num_leaves"].high == MAX_LEAVES
@@ -0,0 +1,146 @@
+import json
+import pytest
+
+try:
+    import numpy as np
+    import pandas as pd
+    pandas_available = True
+except Exception:  # pragma: no cover - pandas missing
+    pandas_available = False
+
+
+def _arrays(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    return {
+        "close": close.astype(np.float32),
+        "high": (close * (1 + rng.uniform(0, 0.003, n))).astype(np.float32),
+        "low": (close * (1 - rng.uniform(0, 0.003, n))).astype(np.float32),
+        "prob": rng.random(n),
+    }
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_pool_sweep_matches_serial_and_backtest():
+    from backtest_engine import COMMISSION, simulate_trades
+    from param_sweep import grid, run_sweep
+
+    data = {"AAA": _arrays(2000, 1), "BBB": _arrays(1500, 2)}
+    combos = grid([0.005, 0.01], [0.005, 0.01], [(None, None), (0.003, 0.001)], [0.6, 0.9])
+
+    serial = run_sweep(data, combos, workers=1)
+    pooled = run_sweep(data, combos, workers=2)
+    assert len(serial) == 2 * len(combos)
+    assert sorted(map(str, pooled)) == sorted(map(str, serial))
+
+    row = next(
+        r for r in serial
+        if r["symbol"] == "AAA" and r["thresh_pct"] == 0.01 and r["trail_start_pct"] == 0.003
+        and r["loss_pct"] == 0.005 and r["prob_threshold"] == 0.6
+    )
+    a = data["AAA"]
+    params = {"thresh_pct": 0.01, "loss_pct": 0.005, "trail_start_pct": 0.003, "trail_down_pct": 0.001}
+    trades = simulate_trades(a["close"], a["high"], a["low"], (a["prob"] > 0.6).astype(int), params)
+    net = [float(p) / float(a["close"][s]) - 1 - COMMISSION for s, _, p, _ in trades]
+    assert row["total_entries"] == len(trades)
+    assert row["trail_count"] == sum(t[3] == "TS" for t in trades)
+    assert row["avg_roi"] == pytest.approx(np.mean(net))
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_sweep_stage_ranks_and_select_uses_best(tmp_path, monkeypatch, load_stage):
+    from pred_store import PredictionStore, prediction_frame
+    from split_io import write_manifest
+
+    sweep = load_stage("sweep_mod", "09_param_sweep.py")
+    select = load_stage("select_mod", "10_select_best_strategies.py")
+    for name in ["PRED_DIR", "LABEL_DIR", "SPLIT_DIR", "OUT_DIR"]:
+        monkeypatch.setattr(sweep, name, tmp_path / name)
+        (tmp_path / name).mkdir()
+    monkeypatch.setattr(sweep, "OUT_FILE", tmp_path / "OUT_DIR" / "sweep_results.csv")
+    monkeypatch.setattr(sweep, "LOG_PATH", tmp_path / "sweep.log")
+    monkeypatch.setattr(sweep, "THRESH_LIST", [0.005, 0.01])
+    monkeypatch.setattr(sweep, "LOSS_LIST", [0.005])
+    monkeypatch.setattr(sweep, "TRAIL_LIST", [(None, None), (0.003, 0.001)])
+    monkeypatch.setattr(sweep, "PROB_LIST", [0.5, 0.8])
+
+    arrays = _arrays(1200, 3)
+    ts = pd.date_range("2025-01-01", periods=1200, freq="min", tz="UTC")
+    frame = pd.DataFrame({"timestamp": ts, **{k: arrays[k] for k in ["close", "high", "low"]}})
+    PredictionStore(sweep.PRED_DIR).append("AAA", prediction_frame(frame, arrays["prob"]))
+    frame.to_parquet(sweep.LABEL_DIR / "AAA_label.parquet", index=False)
+    write_manifest(sweep.SPLIT_DIR, "AAA", sweep.LABEL_DIR / "AAA_label.parquet", 1200,
+                   {"train": (0, 0), "valid": (0, 600), "test": (600, 1200)})
+
+    sweep.main(workers=1)
+
+    table = pd.read_csv(sweep.OUT_FILE)
+    assert len(table) == 8
+    assert table["rank"].tolist() == list(range(1, 9))
+    assert table["select_sharpe"].is_monotonic_decreasing
+    assert table["trail_start_pct"].isna().sum() == 4
+
+    monkeypatch.setattr(select, "SWEEP_FILE", sweep.OUT_FILE)
+    monkeypatch.setattr(select, "SUMMARY_DIR", tmp_path / "none")
+    for name, value in [("MIN_WIN_RATE", 0), ("MIN_AVG_ROI", -1), ("MIN_SHARPE", -1e9),
+                        ("MAX_MDD", 1), ("MIN_ENTRIES", 1)]:
+        monkeypatch.setattr(select, name, value)
+    best = table.iloc[0]
+    (chosen,) = select.select_strategies()
+    assert chosen["symbol"] == "AAA"
+    assert chosen["sharpe"] == pytest.approx(best["sharpe"])
+    expected = {k: (None if pd.isna(best[k]) else float(best[k])) for k in select.SWEEP_PARAM_KEYS}
+    assert chosen["params"] == expected
+    json.dumps(chosen)
+
+    # 1위 조합이 테스트 구간 기준에서 빠지면 테스트 성과로 다음 순위를 고르지 않는다
+    edited = table.copy()
+    edited.loc[0, "total_entries"] = 0
+    edited.to_csv(tmp_path / "edited.csv", index=False)
+    monkeypatch.setattr(select, "SWEEP_FILE", tmp_path / "edited.csv")
+    assert select.select_strategies() == []
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_sweep_ranks_on_valid_and_reports_test(tmp_path, monkeypatch, load_stage):
+    from param_sweep import grid, run_sweep
+    from pred_store import PredictionStore, prediction_frame
+    from split_io import write_manifest
+
+    sweep = load_stage("sweep_oos_mod", "09_param_sweep.py")
+    for name in ["PRED_DIR", "LABEL_DIR", "SPLIT_DIR", "OUT_DIR"]:
+        monkeypatch.setattr(sweep, name, tmp_path / name)
+        (tmp_path / name).mkdir()
+    monkeypatch.setattr(sweep, "OUT_FILE", tmp_path / "OUT_DIR" / "sweep_results.csv")
+    monkeypatch.setattr(sweep, "LOG_PATH", tmp_path / "sweep.log")
+    monkeypatch.setattr(sweep, "THRESH_LIST", [0.005, 0.01])
+    monkeypatch.setattr(sweep, "LOSS_LIST", [0.005])
+    monkeypatch.setattr(sweep, "TRAIL_LIST", [(None, None)])
+    monkeypatch.setattr(sweep, "PROB_LIST", [0.5, 0.8])
+
+    arrays = _arrays(1200, 4)
+    ts = pd.date_range("2025-01-01", periods=1200, freq="min", tz="UTC")
+    frame = pd.DataFrame({"timestamp": ts, **{k: arrays[k] for k in ["close", "high", "low"]}})
+    for symbol in ["AAA", "BBB"]:
+        PredictionStore(sweep.PRED_DIR).append(symbol, prediction_frame(frame, arrays["prob"]))
+        frame.to_parquet(sweep.LABEL_DIR / f"{symbol}_label.parquet", index=False)
+    # BBB 는 분할 매니페스트가 없어 학습 구간이 섞일 수 있으므로 제외된다
+    write_manifest(sweep.SPLIT_DIR, "AAA", sweep.LABEL_DIR / "AAA_label.parquet", 1200,
+                   {"train": (0, 700), "valid": (700, 900), "test": (900, 1200)})
+
+    sweep.main(workers=1)
+
+    table = pd.read_csv(sweep.OUT_FILE)
+    assert set(table["symbol"]) == {"AAA"}
+    combos = grid([0.005, 0.01], [0.005], [(None, None)], [0.5, 0.8])
+    valid = run_sweep({"AAA": {k: v[700:900] for k, v in arrays.items()}}, combos, workers=1)
+    test = run_sweep({"AAA": {k: v[900:] for k, v in arrays.items()}}, combos, workers=1)
+    # 순위는 검증 구간 성과로만 정해진다
+    best = max(valid, key=lambda r: (r["sharpe"], r["avg_roi"], r["total_entries"]))
+    top = table.iloc[0]
+    assert (top["thresh_pct"], top["prob_threshold"]) == (best["thresh_pct"], best["prob_threshold"])
+    assert top["select_sharpe"] == pytest.approx(best["sharpe"])
+    # 보고/선별 열은 겹치지 않는 테스트 구간의 성과
+    (held,) = [r for r in test if (r["thresh_pct"], r["prob_threshold"]) == (best["thresh_pct"], best["prob_threshold"])]
+    assert top["total_entries"] == held["total_entries"]
+    assert top["avg_roi"] == pytest.approx(held["avg_roi"])
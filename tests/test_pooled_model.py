@@ -0,0 +1,196 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+try:
+    import numpy as np
+    import pandas as pd
+    import lightgbm  # noqa: F401
+    deps_available = True
+except Exception:  # pragma: no cover - optional deps missing
+    deps_available = False
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_regime_and_routing_rules():
+    from pooled_model import add_pool_features, common_features, regime_edges, route_symbols
+
+    edges = regime_edges(np.arange(100.0), 4)
+    assert len(edges) == 3
+    df = add_pool_features(pd.DataFrame({"volatility14": [0.0, 30.0, 99.0]}), 2, edges)
+    assert df["vol_regime"].tolist() == [0, 1, 3]
+    assert (df["symbol_id"] == 2).all()
+    assert common_features([["a", "b", "c"], ["c", "a"]]) == ["a", "c"]
+
+    routing = route_symbols({"A": 0.70, "B": 0.70, "C": 0.45}, {"A": 0.80, "B": 0.71}, 0.02, 0.5)
+    assert routing == {"A": "symbol", "B": "pooled", "C": "symbol"}
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_pooled_training_and_batched_predict(tmp_path, monkeypatch, load_stage, make_frame):
+    from model_registry import list_models
+    from pooled_model import POOLED_MODEL, load_pooled
+
+    train_mod = load_stage("train_pooled", "06_train.py")
+    predict_mod = load_stage("predict_pooled", "08_predict.py")
+    eval_mod = load_stage("eval_pooled", "07_eval.py")
+    split_dir = tmp_path / "05_split"
+    model_dir = tmp_path / "06_models"
+    feature_dir = tmp_path / "03_feature"
+    split_dir.mkdir()
+    feature_dir.mkdir()
+    # CCC 는 라벨이 피처와 무관해 공통 모델 성능이 낮다
+    noise = {"AAA": 0.3, "BBB": 0.3, "CCC": 50.0}
+    for seed, symbol in enumerate(noise):
+        opts = {"noise": noise[symbol], "extra": ["volatility14"]}
+        make_frame("2024-01-01", 1200, seed, **opts).to_parquet(split_dir / f"{symbol}_train.parquet", index=False)
+        make_frame("2024-01-02", 400, seed + 10, **opts).to_parquet(split_dir / f"{symbol}_valid.parquet", index=False)
+        make_frame("2024-01-03", 50, seed + 20, **opts).drop(columns="signal1").to_parquet(
+            feature_dir / f"{symbol}_feature.parquet", index=False
+        )
+        make_frame("2024-01-04", 300, seed + 30, noise[symbol], extra=["volatility14", "prices"]).to_parquet(
+            split_dir / f"{symbol}_test.parquet", index=False
+        )
+
+    config = {
+        "model": {"learning_rate": 0.1, "num_leaves": 7, "n_estimators": 30},
+        "pooled": {"enabled": True, "vol_regimes": 3, "min_auc": 0.6, "max_auc_gap": 0.02},
+    }
+    for name, value in [("SPLIT_DIR", split_dir), ("MODEL_DIR", model_dir), ("CONFIG", config),
+                        ("TUNED_DIR", tmp_path / "06_optuna"), ("LOG_PATH", tmp_path / "train.log"),
+                        ("DATASET_CACHE", train_mod.DatasetCache(tmp_path / "cache"))]:
+        monkeypatch.setattr(train_mod, name, value)
+
+    trained = []
+    real_train = train_mod.train_and_eval
+    monkeypatch.setattr(train_mod, "train_and_eval", lambda s, now=None: (trained.append(s), real_train(s, now))[1])
+    train_mod.main()
+    model, meta = load_pooled(model_dir)
+    assert meta["symbols"] == ["AAA", "BBB", "CCC"]
+    assert meta["features"] == ["x1", "x2", "volatility14", "symbol_id", "vol_regime"]
+    assert len(meta["vol_edges"]) == 2
+    assert meta["routing"] == {"AAA": "pooled", "BBB": "pooled", "CCC": "symbol"}
+    # 자기 모델이 없는 심볼은 라우팅 비교용 도전 모델을 먼저 학습
+    assert trained == ["AAA", "BBB", "CCC"]
+    assert list_models(model_dir) == ["AAA", "BBB", "CCC"]
+    with open(model_dir / f"{POOLED_MODEL}_metrics.json", encoding="utf-8") as f:
+        assert json.load(f)["symbol_auc"]["AAA"] > 0.8
+
+    # 데이터가 그대로이면 공통 모델을 다시 학습하지 않는다
+    trained.clear()
+    train_mod.main()
+    assert train_mod.ModelRegistry(model_dir).current_version(POOLED_MODEL) == 1
+    assert trained == ["CCC"]
+
+    # 공통 모델로 라우팅된 심볼의 자기 모델도 own_refresh_hours 가 지나면 다시 학습
+    metrics_path = model_dir / "AAA_metrics.json"
+    stale = json.loads(metrics_path.read_text(encoding="utf-8"))
+    stale["lineage"]["trained_at"] = (datetime.now() - timedelta(hours=25)).isoformat(timespec="seconds")
+    metrics_path.write_text(json.dumps(stale), encoding="utf-8")
+    trained.clear()
+    train_mod.main()
+    assert trained == ["AAA", "CCC"]
+
+    enabled = tmp_path / "train_config.yaml"
+    enabled.write_text("pooled:\n  enabled: true\n", encoding="utf-8")
+    for name, value in [("MODEL_DIR", model_dir), ("FEATURE_DIR", feature_dir), ("CONFIG_PATH", enabled),
+                        ("PRED_DIR", tmp_path / "08_pred"), ("LOG_PATH", tmp_path / "predict.log")]:
+        monkeypatch.setattr(predict_mod, name, value)
+    calls = []
+    real_proba = type(model).predict_proba
+
+    def counting(self, X):
+        calls.append(len(X))
+        return real_proba(self, X)
+
+    monkeypatch.setattr(type(model), "predict_proba", counting)
+    predict_mod.main()
+    # AAA/BBB 는 한 번에, CCC 는 자기 모델로 예측
+    assert calls == [100, 50]
+    store = predict_mod.PredictionStore(tmp_path / "08_pred")
+    for symbol in noise:
+        assert store.last_timestamp(symbol) == pd.Timestamp("2024-01-03 00:49", tz="UTC")
+
+    features = pd.read_parquet(feature_dir / "AAA_feature.parquet")
+    features[["x1", "x2", "volatility14"]] = features[["x1", "x2", "volatility14"]].astype("float32")
+    expected = model.predict_proba(
+        np.column_stack([features[["x1", "x2", "volatility14"]].to_numpy(), np.zeros(50),
+                         np.searchsorted(meta["vol_edges"], features["volatility14"].to_numpy(), side="right")])
+    )[:, 1]
+    pred = pd.read_parquet(tmp_path / "08_pred" / "AAA")
+    np.testing.assert_allclose(pred["buy_prob"].to_numpy(), expected, rtol=1e-6)
+
+    # 07_eval 도 08 과 같이 라우팅해 공통 모델로 평가하고, 공통 모델 전체 지표를 남긴다
+    from model_registry import load_model
+    from pooled_model import pool_matrix
+    from sklearn.metrics import roc_auc_score
+
+    for name, value in [("SPLIT_DIR", split_dir), ("MODEL_DIR", model_dir), ("CONFIG_PATH", enabled),
+                        ("EVAL_DIR", tmp_path / "07_eval"), ("LOG_PATH", tmp_path / "eval.log")]:
+        monkeypatch.setattr(eval_mod, name, value)
+    eval_mod.main()
+
+    def metrics(name):
+        with open(tmp_path / "07_eval" / f"{name}_metrics.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    assert metrics(POOLED_MODEL)["symbols"] == ["AAA", "BBB", "CCC"]
+    test = pd.read_parquet(split_dir / "AAA_test.parquet")
+    prob = model.predict_proba(pool_matrix(test, meta, "AAA"))[:, 1]
+    assert metrics("AAA")["auc"] == pytest.approx(roc_auc_score(test["signal1"], prob))
+    test = pd.read_parquet(split_dir / "CCC_test.parquet")
+    own, _ = load_model(model_dir, "CCC")
+    prob = own.predict_proba(test[list(own.feature_names_in_)])[:, 1]
+    assert metrics("CCC")["auc"] == pytest.approx(roc_auc_score(test["signal1"], prob))
+
+    # pooled.enabled 를 끄면 공개된 공통 모델이 남아 있어도 라우팅하지 않는다
+    from pooled_model import active_pooled
+
+    enabled.write_text("pooled:\n  enabled: false\n", encoding="utf-8")
+    assert active_pooled(model_dir, enabled) is None
+    monkeypatch.setattr(eval_mod, "EVAL_DIR", tmp_path / "07_eval_off")
+    eval_mod.main()
+    assert sorted(p.name for p in (tmp_path / "07_eval_off").iterdir()) == [
+        f"{s}_metrics.json" for s in noise
+    ]
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_routing_compares_own_model_on_pooled_valid_rows(tmp_path, monkeypatch, load_stage, make_frame):
+    from model_registry import load_model
+    from pooled_model import POOLED_MODEL
+    from sklearn.metrics import roc_auc_score
+
+    train_mod = load_stage("train_route", "06_train.py")
+    split_dir = tmp_path / "05_split"
+    model_dir = tmp_path / "06_models"
+    split_dir.mkdir()
+    for seed, symbol in enumerate(["AAA", "BBB"]):
+        # AAA 자기 모델만 쓰는 noise 피처는 공통 피처에 없다
+        extra = ["volatility14", "noise"] if symbol == "AAA" else ["volatility14"]
+        for start, n, part in [("2024-01-01", 1200, "train"), ("2024-01-02", 400, "valid")]:
+            frame = make_frame(start, n, seed + (10 if part == "valid" else 0), 0.3, extra=extra)
+            frame.to_parquet(split_dir / f"{symbol}_{part}.parquet", index=False)
+
+    config = {"model": {"learning_rate": 0.1, "num_leaves": 7, "n_estimators": 30}}
+    for name, value in [("SPLIT_DIR", split_dir), ("MODEL_DIR", model_dir), ("CONFIG", config),
+                        ("TUNED_DIR", tmp_path / "06_optuna"),
+                        ("DATASET_CACHE", train_mod.DatasetCache(tmp_path / "cache"))]:
+        monkeypatch.setattr(train_mod, name, value)
+    train_mod.train_and_eval("AAA")
+    # 예전 검증 세트로 계산된 지표 파일은 비교에 쓰지 않는다
+    metrics_path = model_dir / "AAA_metrics.json"
+    stale = json.loads(metrics_path.read_text(encoding="utf-8"))
+    metrics_path.write_text(json.dumps({**stale, "auc": 0.999}), encoding="utf-8")
+
+    config["pooled"] = {"enabled": True, "vol_regimes": 2, "min_auc": 0.5, "max_auc_gap": 0.02}
+    train_mod.train_pooled(["AAA", "BBB"])
+    with open(model_dir / f"{POOLED_MODEL}_metrics.json", encoding="utf-8") as f:
+        own_auc = json.load(f)["own_auc"]
+    assert own_auc["BBB"] is None
+    valid = pd.read_parquet(split_dir / "AAA_valid.parquet")
+    own, _ = load_model(model_dir, "AAA")
+    prob = own.predict_proba(valid[list(own.feature_names_in_)])[:, 1]
+    assert "noise" in own.feature_names_in_
+    assert own_auc["AAA"] == pytest.approx(roc_auc_score(valid["signal1"], prob), abs=1e-6)
@@ -0,0 +1,133 @@
+import json
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+try:
+    import numpy as np
+    import pandas as pd
+    pandas_available = True
+except Exception:  # pragma: no cover - pandas missing
+    pandas_available = False
+
+CONFIG = {
+    "ENTRY_SIZE_INITIAL": 7000,
+    "MAX_SYMBOLS": 10,
+    "TP_PCT": 0.3,
+    "MINIMUM_TICKS": 2,
+    "HOLD_SECS": 180,
+    "TRAIL_START_PCT": 0.3,
+    "TRAIL_STEP_PCT": 0.2,
+    "TRAILING_STOP_ENABLED": True,
+}
+
+
+def _symbol(n, seed, offset=0):
+    from f3_order.utils import apply_tick_size
+
+    rng = np.random.default_rng(seed)
+    raw = 1500.0 * np.exp(np.cumsum(rng.normal(0, 0.0015, n)))
+    close = np.array([apply_tick_size(p) for p in raw])
+    high = np.array([apply_tick_size(p * (1 + u), "ceil") for p, u in zip(close, rng.uniform(0, 0.002, n))])
+    times = 1_700_000_000 + 60 * (np.arange(n) + offset)
+    return {"times": times, "close": close, "high": high, "signal": (rng.random(n) < 0.05).astype(int)}
+
+
+def _overlaps(trades):
+    """각 거래 구간 (진입 ~ 청산 봉) 에서 동시에 보유한 포지션 수의 최댓값."""
+    events = sorted([(t["entry_time"], 1) for t in trades] + [(t["exit_time"] + 1, -1) for t in trades],
+                    key=lambda e: (e[0], e[1]))
+    depth = peak = 0
+    for _, step in events:
+        depth += step
+        peak = max(peak, depth)
+    return peak
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_unconstrained_portfolio_matches_per_symbol_simulation():
+    from portfolio_backtest import FEE_RATE, run_portfolio
+    from sell_simulator import simulate_trades
+
+    data = {"AAA": _symbol(3000, 1)}
+    result = run_portfolio(data, CONFIG, initial_krw=1e9)
+    a = data["AAA"]
+    expected = simulate_trades(a["close"], a["high"], a["signal"], CONFIG, a["times"])
+    got = [(t["entry_time"], t["exit_time"], t["exit_price"], t["result"]) for t in result.trades]
+    assert got == [(a["times"][s], a["times"][e], p, r) for s, e, p, r, _ in expected]
+
+    cost = CONFIG["ENTRY_SIZE_INITIAL"] * (1 + FEE_RATE)
+    assert result.trades[0]["pnl"] == pytest.approx(
+        result.trades[0]["qty"] * result.trades[0]["exit_price"] * (1 - FEE_RATE) - cost
+    )
+    assert result.equity[-1] == pytest.approx(1e9 + sum(t["pnl"] for t in result.trades))
+    assert result.summary["skipped_max_symbols"] == 0
+    assert result.summary["skipped_balance"] == 0
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_max_symbols_and_balance_limits():
+    from portfolio_backtest import run_portfolio
+
+    data = {name: _symbol(2000, seed, offset=seed % 3) for seed, name in enumerate(["A", "B", "C", "D"])}
+    limited = run_portfolio(data, {**CONFIG, "MAX_SYMBOLS": 2}, initial_krw=1e9)
+    assert _overlaps(limited.trades) <= 2
+    assert limited.slots.max() == 2
+    assert limited.summary["skipped_max_symbols"] > 0
+
+    # 두 번째 진입 금액(수수료 포함)이 모자라는 잔고
+    poor = run_portfolio(data, CONFIG, initial_krw=10000)
+    assert _overlaps(poor.trades) == 1
+    assert poor.summary["skipped_balance"] > 0
+
+    free = run_portfolio(data, {**CONFIG, "MAX_SYMBOLS": 4}, initial_krw=1e9)
+    assert _overlaps(free.trades) > 2
+    assert len(free.trades) > len(limited.trades)
+    for result in (limited, poor, free):
+        assert len(result.equity) == len(result.times) == len(np.unique(np.concatenate(
+            [a["times"] for a in data.values()])))
+        assert 0 <= result.summary["capital_utilization"] <= 1
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_scaling_settings_rejected():
+    from portfolio_backtest import run_portfolio
+
+    with pytest.raises(ValueError):
+        run_portfolio({"A": _symbol(100, 0)}, {**CONFIG, "AVG_ENABLED": True, "AVG_MAX_COUNT": 1})
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_portfolio_stage_writes_outputs(tmp_path, monkeypatch, load_stage):
+    from pred_store import PredictionStore, prediction_frame
+
+    stage = load_stage("portfolio_stage", "09_portfolio_backtest.py")
+    for name in ["PRED_DIR", "LABEL_DIR", "OUT_DIR"]:
+        monkeypatch.setattr(stage, name, tmp_path / name)
+        (tmp_path / name).mkdir()
+    monkeypatch.setattr(stage, "LOG_PATH", tmp_path / "portfolio.log")
+    monkeypatch.setattr(stage, "load_settings", lambda: CONFIG)
+
+    for seed, symbol in enumerate(["KRW-A", "KRW-B"]):
+        a = _symbol(500, seed)
+        frame = pd.DataFrame({
+            "timestamp": pd.to_datetime(a["times"], unit="s", utc=True),
+            "close": a["close"],
+            "high": a["high"],
+        })
+        PredictionStore(stage.PRED_DIR).append(symbol, prediction_frame(frame, a["signal"] * 0.9))
+        frame.to_parquet(stage.LABEL_DIR / f"{symbol}_label.parquet", index=False)
+
+    stage.main(initial_krw=100000)
+
+    equity = pd.read_csv(stage.OUT_DIR / "portfolio_equity.csv")
+    trades = pd.read_csv(stage.OUT_DIR / "portfolio_trades.csv")
+    with open(stage.OUT_DIR / "portfolio_summary.json", encoding="utf-8") as f:
+        summary = json.load(f)
+    assert len(equity) == 500
+    assert summary["total_entries"] == len(trades) > 0
+    assert set(trades["symbol"]) == {"KRW-A", "KRW-B"}
+    assert equity["equity"].iloc[-1] == pytest.approx(summary["final_equity"])
@@ -0,0 +1,103 @@
+import importlib.util
+import sys
+from pathlib import Path
+import pytest
+
+PIPELINE_DIR = Path(__file__).resolve().parents[1] / "f5_ml_pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+try:
+    import numpy as np
+    import pandas as pd
+    pandas_available = True
+except Exception:  # pragma: no cover - pandas missing
+    pandas_available = False
+
+
+def _load_predict_module():
+    spec = importlib.util.spec_from_file_location("predict_mod", PIPELINE_DIR / "08_predict.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _ThresholdModel:
+    feature_names_in_ = np.array(["rsi14", "ema5"]) if pandas_available else None
+
+    def predict_proba(self, X):
+        prob = 1 / (1 + np.exp(-(X["rsi14"].to_numpy() - 50) / 10))
+        return np.column_stack([1 - prob, prob])
+
+
+def _features(start, n):
+    ts = pd.date_range("2025-01-01", periods=n, freq="min", tz="UTC") + pd.Timedelta(minutes=start)
+    idx = np.arange(start, start + n)
+    return pd.DataFrame({
+        "timestamp": ts,
+        "close": (100 + idx).astype(np.float32),
+        "rsi14": (idx * 7 % 100).astype(np.float32),
+        "ema5": np.ones(n, dtype=np.float32),
+        "ema20": np.zeros(n, dtype=np.float32),
+        "unused": np.zeros(n, dtype=np.float32),
+    })
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_predict_scores_only_new_rows(tmp_path, monkeypatch):
+    import pred_store
+
+    mod = _load_predict_module()
+    feature_dir = tmp_path / "03_feature"
+    pred_dir = tmp_path / "08_pred"
+    feature_dir.mkdir()
+    monkeypatch.setattr(mod, "FEATURE_DIR", feature_dir)
+    monkeypatch.setattr(mod, "PRED_DIR", pred_dir)
+
+    scored = []
+    model = _ThresholdModel()
+    original = model.predict_proba
+
+    def counting(X):
+        scored.append(len(X))
+        return original(X)
+
+    model.predict_proba = counting
+    monkeypatch.setattr(mod, "load_model", lambda model_dir, symbol: (model, {}))
+
+    path = feature_dir / "AAA_feature.parquet"
+    _features(0, 120).to_parquet(path, index=False, row_group_size=50)
+    mod.predict_signal("AAA")
+    pd.concat([_features(0, 120), _features(120, 5)]).to_parquet(path, index=False, row_group_size=50)
+    mod.predict_signal("AAA")
+    mod.predict_signal("AAA")  # 새 행이 없으면 아무것도 하지 않음
+
+    assert scored == [120, 5]
+    store = pred_store.PredictionStore(pred_dir)
+    assert len(store.parts("AAA")) == 2
+    result = store.load("AAA")
+    assert list(result.columns) == pred_store.PRED_COLUMNS
+    full = _features(0, 125)
+    assert result["timestamp"].tolist() == full["timestamp"].tolist()
+    expected = original(full)[:, 1]
+    assert np.allclose(result["buy_prob"], expected, atol=1e-6)
+    assert result["buy_signal"].tolist() == (expected > 0.5).astype(int).tolist()
+
+    latest = pd.read_csv(pred_dir / "AAA_pred.csv")
+    assert len(latest) == 1
+    assert latest["rsi14"].iloc[0] == full["rsi14"].iloc[-1]
+    assert "unused" not in latest.columns
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_prediction_store_compacts_parts(tmp_path):
+    import pred_store
+
+    store = pred_store.PredictionStore(tmp_path, compact_parts=3)
+    for i in range(5):
+        frame = pred_store.prediction_frame(_features(i * 2, 2), np.array([0.2, 0.8]))
+        store.append("AAA", frame)
+        assert len(store.parts("AAA")) <= 3
+    result = store.load("AAA")
+    assert result["timestamp"].tolist() == _features(0, 10)["timestamp"].tolist()
+    assert store.last_timestamp("AAA") == result["timestamp"].iloc[-1]
+    assert store.symbols() == ["AAA"]
@@ -0,0 +1,154 @@
+import sys
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "f5_ml_pipeline"))
+
+try:
+    import numpy as np
+    pandas_available = True
+except Exception:  # pragma: no cover - numpy missing
+    pandas_available = False
+
+BASE = {
+    "ENTRY_SIZE_INITIAL": 7000,
+    "TP_PCT": 0.18,
+    "MINIMUM_TICKS": 2,
+    "HOLD_SECS": 180,
+    "TRAIL_START_PCT": 0.3,
+    "TRAIL_STEP_PCT": 0.2,
+    "TRAILING_STOP_ENABLED": True,
+}
+SCALING = {
+    **BASE,
+    "PYR_ENABLED": True, "PYR_MAX_COUNT": 2, "PYR_TRIGGER": 0.1, "PYR_SIZE": 5000,
+    "AVG_ENABLED": True, "AVG_MAX_COUNT": 1, "AVG_TRIGGER": 0.2, "AVG_SIZE": 7000,
+}
+
+
+def _candles(n, seed, base=1500.0):
+    from f3_order.utils import apply_tick_size
+
+    rng = np.random.default_rng(seed)
+    raw = base * np.exp(np.cumsum(rng.normal(0, 0.0015, n)))
+    close = np.array([apply_tick_size(p) for p in raw])
+    high = np.array([apply_tick_size(p * (1 + u), "ceil") for p, u in zip(close, rng.uniform(0, 0.002, n))])
+    return close, high
+
+
+class _Client:
+    def __init__(self):
+        self.orders = {}
+
+    def place_order(self, market, side, volume, price, ord_type):
+        uuid = f"o{len(self.orders)}"
+        self.orders[uuid] = price
+        return {"uuid": uuid, "state": "wait" if ord_type == "limit" else "done"}
+
+    def cancel_order(self, uuid):
+        self.orders.pop(uuid, None)
+
+
+class _Handler:
+    def send_alert(self, *args, **kwargs):
+        pass
+
+    def handle_slippage(self, *args, **kwargs):
+        pass
+
+    def handle(self, exc, context=""):
+        raise exc
+
+
+def _live_exit(close, high, start, config, tmp_path, monkeypatch):
+    """실제 ``PositionManager.hold_loop`` 를 1분봉 종가로 돌린 결과."""
+    import f3_order.position_manager as pm_mod
+
+    clock = {"t": 0.0}
+    monkeypatch.setattr(pm_mod, "now", lambda: clock["t"])
+    monkeypatch.setattr(pm_mod.PositionManager, "log_order_to_db", lambda self, data: None)
+    pm = pm_mod.PositionManager.__new__(pm_mod.PositionManager)
+    pm.config = config
+    pm.exception_handler = _Handler()
+    pm.positions_file = str(tmp_path / "positions.json")
+    pm.sell_config_path = str(tmp_path / "sell_list.json")
+    pm.positions = []
+    pm.client = _Client()
+    pm.tp_orders = {}
+
+    entry = float(close[start])
+    pm.open_position({"symbol": "KRW-SIM", "price": entry, "qty": config["ENTRY_SIZE_INITIAL"] / entry})
+    pos = pm.positions[0]
+    for i in range(start + 1, len(close)):
+        clock["t"] = (i - start) * 60.0
+        uuid = pm.tp_orders.get("KRW-SIM")
+        if uuid and high[i] >= pm.client.orders[uuid]:
+            return i, pm.client.orders[uuid], "TP", pos["entry_price"]
+        pos["current_price"] = float(close[i])
+        pm.hold_loop()
+        if pos["status"] == "closed":
+            return i, float(close[i]), "TS", pos["entry_price"]
+    return len(close) - 1, float(close[-1]), "FORCE", pos["entry_price"]
+
+
+def test_calc_tp_price_minimum_ticks():
+    from f3_order.utils import calc_tp_price
+
+    # 1000원대 호가 5원: 0.18% 는 한 틱에 그치므로 최소 2틱 위로 올린다
+    assert calc_tp_price(1000, 0.18, 2) == 1010
+    assert calc_tp_price(1000, 1.0, 2) == 1010
+    assert calc_tp_price(1000, 1.2, 2) == 1015
+    assert calc_tp_price(95, 0.18, 2) == pytest.approx(95.2)
+
+
+@pytest.mark.skipif(not pandas_available, reason="numpy not available")
+@pytest.mark.parametrize(
+    "config",
+    [BASE, SCALING, {**SCALING, "TP_PCT": 1.0}, {**BASE, "TP_PCT": 1.0}, {**BASE, "TRAILING_STOP_ENABLED": False}],
+)
+def test_simulator_matches_live_position_manager(config, tmp_path, monkeypatch):
+    from sell_simulator import simulate_position
+
+    close, high = _candles(400, seed=4)
+    for start in range(0, 380, 7):
+        expected = _live_exit(close, high, start, config, tmp_path, monkeypatch)
+        result = simulate_position(close, high, start, config)
+        assert result[:3] == expected[:3]
+        assert result[3] == pytest.approx(expected[3])
+
+
+@pytest.mark.skipif(not pandas_available, reason="numpy not available")
+@pytest.mark.parametrize(
+    "config",
+    [BASE, {**BASE, "TP_PCT": 1.0}, {**BASE, "TP_PCT": 0}, {**BASE, "TRAILING_STOP_ENABLED": False}],
+)
+def test_vectorized_exits_match_position_loop(config, monkeypatch):
+    import sell_simulator
+    from backtest_engine import REASONS
+
+    monkeypatch.setattr(sell_simulator, "FIRST_WINDOW", 4)
+    monkeypatch.setattr(sell_simulator, "BLOCK_CELLS", 64)
+    close, high = _candles(600, seed=9, base=98.0)
+    starts = np.arange(len(close))
+    exit_idx, reason, price, entry = sell_simulator.exit_table(close, high, starts, config)
+    for s in starts:
+        idx, value, name, avg = sell_simulator.simulate_position(close, high, int(s), config)
+        assert (exit_idx[s], REASONS[reason[s]], price[s], entry[s]) == (idx, name, value, avg)
+
+
+@pytest.mark.skipif(not pandas_available, reason="numpy not available")
+def test_sweep_settings_rows():
+    from sell_simulator import simulate_trades, sweep_settings
+
+    close, high = _candles(3000, seed=2)
+    signal = (np.random.default_rng(0).random(len(close)) < 0.05).astype(int)
+    settings = [{**BASE, "TP_PCT": tp} for tp in (0.18, 0.5, 1.0)] + [SCALING]
+    rows = sweep_settings({"KRW-SIM": {"close": close, "high": high, "signal": signal}}, settings)
+    assert [r["TP_PCT"] for r in rows] == [0.18, 0.5, 1.0, 0.18]
+    for row, config in zip(rows, settings):
+        trades = simulate_trades(close, high, signal, config)
+        assert row["total_entries"] == len(trades)
+        assert row["tp_count"] == sum(t[3] == "TP" for t in trades)
+        assert row["sl_count"] == 0
@@ -0,0 +1,87 @@
+import importlib.util
+import sys
+from pathlib import Path
+import pytest
+
+PIPELINE_DIR = Path(__file__).resolve().parents[1] / "f5_ml_pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+try:
+    import pandas as pd
+    pandas_available = True
+except Exception:  # pragma: no cover - pandas missing
+    pandas_available = False
+
+
+def _load_split_module():
+    spec = importlib.util.spec_from_file_location("split_mod", PIPELINE_DIR / "05_split.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_manifest_slices_match_time_split(tmp_path, monkeypatch):
+    import split_io
+
+    split_mod = _load_split_module()
+    label_dir = tmp_path / "04_label"
+    split_dir = tmp_path / "05_split"
+    label_dir.mkdir()
+    split_dir.mkdir()
+    monkeypatch.setattr(split_mod, "SPLIT_DIR", split_dir)
+
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=95, freq="1min"),
+        "close": [float(i) for i in range(95)],
+        "label": [i % 3 - 1 for i in range(95)],
+    })
+    label_path = label_dir / "KRW-AAA_label.parquet"
+    df.to_parquet(label_path, index=False, row_group_size=10)
+    # 예전 방식의 분할 파일은 매니페스트 작성 시 정리된다
+    df.to_parquet(split_dir / "KRW-AAA_train.parquet", index=False)
+
+    split_mod.process_file(label_path, train_ratio=0.7, valid_ratio=0.2)
+
+    assert not (split_dir / "KRW-AAA_train.parquet").exists()
+    assert split_io.list_symbols(split_dir) == ["KRW-AAA"]
+    expected = split_mod.time_split(df, 0.7, 0.2)
+    for part, exp in zip(split_io.PARTS, expected):
+        got = split_io.load_split(split_dir, "KRW-AAA", part)
+        pd.testing.assert_frame_equal(got, exp.reset_index(drop=True))
+    closes = split_io.load_split(split_dir, "KRW-AAA", "valid", columns=["close"])
+    assert list(closes.columns) == ["close"]
+    assert closes["close"].tolist() == [float(i) for i in range(66, 85)]
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_load_split_reads_legacy_files(tmp_path):
+    import split_io
+
+    df = pd.DataFrame({"feat": [1.0, 2.0], "signal1": [1, 0]})
+    df.to_parquet(tmp_path / "AAA_test.parquet", index=False)
+    pd.testing.assert_frame_equal(split_io.load_split(tmp_path, "AAA", "test"), df)
+    assert split_io.list_symbols(tmp_path, "test") == ["AAA"]
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_load_split_rejects_rewritten_label_file(tmp_path, monkeypatch):
+    import split_io
+
+    split_mod = _load_split_module()
+    label_dir = tmp_path / "04_label"
+    split_dir = tmp_path / "05_split"
+    label_dir.mkdir()
+    split_dir.mkdir()
+    monkeypatch.setattr(split_mod, "SPLIT_DIR", split_dir)
+    df = pd.DataFrame({"close": [float(i) for i in range(50)]})
+    label_path = label_dir / "KRW-AAA_label.parquet"
+    df.to_parquet(label_path, index=False)
+    split_mod.process_file(label_path, train_ratio=0.7, valid_ratio=0.2)
+
+    # 04 단계가 라벨 파일을 다시 쓰면 예전 행 범위로 자르지 않는다
+    pd.concat([df.iloc[10:], df]).to_parquet(label_path, index=False)
+    with pytest.raises(split_io.StaleSplitError):
+        split_io.load_split(split_dir, "KRW-AAA", "train")
+    with pytest.raises(split_io.StaleSplitError):
+        split_io.load_range(split_dir, "KRW-AAA", 0, 10)
@@ -0,0 +1,61 @@
+import logging
+
+import pytest
+
+try:
+    import numpy as np
+    import pandas as pd
+    deps_available = True
+except Exception:  # pragma: no cover - optional deps missing
+    deps_available = False
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas not available")
+def test_feature_state_matches_batch_features(load_stage, make_upbit_minutes):
+    from streaming_features import FEATURES, FeatureState, cumulative_seed
+
+    fe = load_stage("fe_mod", "03_feature_engineering.py")
+    cleaning = load_stage("clean_mod", "02_data_cleaning.py")
+    clean = cleaning._clean_df(make_upbit_minutes(), logging.getLogger("test"))
+    batch = fe.add_features(clean)
+
+    # 앞 300행은 누적 시드로, 나머지는 캔들 단위로 갱신
+    start = 300
+    state = FeatureState()
+    state.seed(cumulative_seed(clean.iloc[:start]))
+    rows = [
+        state.update(r.timestamp.value, r.open, r.high, r.low, r.close, r.volume,
+                     pd.Timestamp(r.candle_date_time_kst))
+        for r in clean.iloc[start:].itertuples()
+    ]
+    got = pd.DataFrame(rows)
+    assert set(got.columns) == FEATURES
+
+    # EMA120 이 수렴한 뒤(온라인 WINDOW 와 같은 720행)부터 비교한다.
+    # m5/일봉 피처는 배치가 구간 전체를 보므로 아래에서 마지막 행으로 비교
+    warm = got.iloc[720:].reset_index(drop=True)
+    expected = batch.iloc[start + 720:].reset_index(drop=True)
+    for col in sorted(FEATURES - {"d_close"}):
+        if col.startswith("m5_"):
+            continue
+        np.testing.assert_allclose(
+            warm[col].to_numpy(float).astype(np.float32),
+            expected[col].to_numpy(np.float32),
+            rtol=2e-6,
+            atol=1e-6,
+            err_msg=col,
+        )
+
+    for i in (start + 800, start + 801, start + 803):
+        last = fe.add_features(clean.iloc[: i + 1]).iloc[-1]
+        for col in ["m5_open", "m5_high", "m5_low", "m5_close", "m5_volume", "d_close"]:
+            assert got[col].iloc[i - start] == pytest.approx(float(last[col]), rel=1e-6), col
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas not available")
+def test_unseeded_state_leaves_out_cumulative_features():
+    from streaming_features import CUMULATIVE, FeatureState
+
+    state = FeatureState()
+    row = state.update(0, 1.0, 2.0, 0.5, 1.5, 3.0, pd.Timestamp("2025-01-01 09:00"))
+    assert not CUMULATIVE & set(row)
@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+try:
+    import pandas as pd
+    import numpy as np
+except Exception:
+    pandas_available = False
+else:
+    pandas_available = True
+    import indicators
+    import streaming_indicators as si
+
+
+def _candles(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.uniform(0, 1, n)
+    low = close - rng.uniform(0, 1, n)
+    volume = rng.uniform(0, 10, n)
+    # flat stretch exercises zero-range and zero-loss branches
+    close[50:60] = close[50]
+    high[50:60] = close[50]
+    low[50:60] = close[50]
+    index = pd.date_range("2024-01-01 22:00", periods=n, freq="min")
+    return pd.DataFrame({"high": high, "low": low, "close": close, "volume": volume}, index=index)
+
+
+def _stream(indicator, rows, call):
+    return np.array([call(indicator, row) for row in rows], dtype=float)
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_streaming_matches_batch():
+    df = _candles()
+    rows = list(df.itertuples())
+    h, l, c, v = df["high"], df["low"], df["close"], df["volume"]
+
+    cases = [
+        (indicators.ema(c, 20), si.EMA(span=20), lambda s, r: s.update(r.close)),
+        (indicators.sma(c, 20), si.SMA(20), lambda s, r: s.update(r.close)),
+        (indicators.rsi(c, 14), si.RSI(14), lambda s, r: s.update(r.close)),
+        (indicators.atr(h, l, c, 14), si.ATR(14), lambda s, r: s.update(r.high, r.low, r.close)),
+        (indicators.macd(c)[1], si.MACD(), lambda s, r: s.update(r.close)[1]),
+        (indicators.stochastic(h, l, c, 7)[1], si.Stochastic(7), lambda s, r: s.update(r.high, r.low, r.close)[1]),
+        (indicators.bollinger_bands(c)[1], si.BollingerBands(), lambda s, r: s.update(r.close)[1]),
+        (c.rolling(20).mean() + 2 * c.rolling(20).std(), si.BollingerBands(ddof=1), lambda s, r: s.update(r.close)[1]),
+        (indicators.vwap(h, l, c, v), si.VWAP(), lambda s, r: s.update(r.high, r.low, r.close, r.volume, r.Index)),
+        (indicators.mfi(h, l, c, v, 14), si.MFI(14), lambda s, r: s.update(r.high, r.low, r.close, r.volume)),
+        (indicators.adx(h, l, c, 14)[0], si.ADX(14), lambda s, r: s.update(r.high, r.low, r.close)[0]),
+        (indicators.parabolic_sar(h, l), si.ParabolicSAR(), lambda s, r: s.update(r.high, r.low)),
+    ]
+    for expected, indicator, call in cases:
+        got = _stream(indicator, rows, call)
+        np.testing.assert_allclose(got, expected.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True,
+                                   err_msg=type(indicator).__name__)
+
+    # EMA follows pandas exactly, including NaN gaps
+    gappy = c.copy()
+    gappy.iloc[[0, 10, 11, 30]] = np.nan
+    ema = si.EMA(span=5)
+    got = np.array([ema.update(x) for x in gappy])
+    np.testing.assert_array_equal(got, gappy.ewm(span=5, adjust=False).mean().to_numpy())
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_vwap_without_timestamp_accumulates_all_rows():
+    df = _candles(100).reset_index(drop=True)
+    expected = indicators.vwap(df["high"], df["low"], df["close"], df["volume"])
+    stream = si.VWAP()
+    got = [stream.update(r.high, r.low, r.close, r.volume) for r in df.itertuples()]
+    np.testing.assert_allclose(got, expected.to_numpy())
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_snapshot_restore_roundtrip():
+    df = _candles(200)
+    rows = list(df.itertuples())
+    full = si.ADX(14)
+    expected = [full.update(r.high, r.low, r.close) for r in rows]
+
+    first = si.ADX(14)
+    for r in rows[:120]:
+        first.update(r.high, r.low, r.close)
+    state = json.loads(json.dumps(first.snapshot()))
+    resumed = si.ADX(14)
+    resumed.restore(state)
+    got = [resumed.update(r.high, r.low, r.close) for r in rows[120:]]
+    assert got == expected[120:]
+
+    vwap = si.VWAP()
+    vwap.update(1, 1, 1, 1, rows[0].Index)
+    clone = si.VWAP()
+    clone.restore(json.loads(json.dumps(vwap.snapshot())))
+    assert clone.update(2, 2, 2, 1, rows[1].Index) == vwap.update(2, 2, 2, 1, rows[1].Index)
+
+
+@pytest.mark.skipif(not pandas_available, reason="pandas not available")
+def test_rolling_window_stays_exact_on_long_streams_and_restores():
+    df = _candles(3000, seed=3)
+    c = df["close"] + 1e6  # large offset stresses the running sums
+    gappy = c.copy()
+    gappy.iloc[[5, 6, 700, 1500]] = np.nan
+
+    window = si._Window(20, min_periods=1)
+    rows = []
+    for i, x in enumerate(gappy):
+        if i == 1800:
+            clone = si._Window(20, min_periods=1)
+            clone.restore(json.loads(json.dumps(window.snapshot())))
+            window = clone
+        window.push(x)
+        rows.append((window.sum(), window.min(), window.max(), window.std()))
+    got = np.array(rows)
+    roll = gappy.rolling(20, min_periods=1)
+    expected = np.column_stack([roll.sum(), roll.min(), roll.max(), roll.std()])
+    np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-6, equal_nan=True)
@@ -0,0 +1,118 @@
+import importlib.util
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+import pytest
+
+PIPELINE_DIR = Path(__file__).resolve().parents[1] / "f5_ml_pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+try:
+    import numpy as np  # noqa: F401
+    import pandas as pd
+
+    spec = importlib.util.spec_from_file_location("train_mod", PIPELINE_DIR / "06_train.py")
+    train_mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(train_mod)
+    deps_available = True
+except Exception:  # pragma: no cover - optional deps missing
+    deps_available = False
+
+
+def _write_splits(split_dir, train, valid):
+    train.to_parquet(split_dir / "AAA_train.parquet", index=False)
+    valid.to_parquet(split_dir / "AAA_valid.parquet", index=False)
+
+
+def _lineage(model_dir):
+    with open(model_dir / "AAA_metrics.json", "r", encoding="utf-8") as f:
+        return json.load(f)["lineage"]
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_incremental_training_lineage(tmp_path, monkeypatch, make_frame):
+    split_dir = tmp_path / "05_split"
+    model_dir = tmp_path / "06_models"
+    split_dir.mkdir()
+    monkeypatch.setattr(train_mod, "SPLIT_DIR", split_dir)
+    monkeypatch.setattr(train_mod, "MODEL_DIR", model_dir)
+    monkeypatch.setattr(train_mod, "DATASET_CACHE", train_mod.DatasetCache(tmp_path / "cache"))
+    monkeypatch.setattr(train_mod, "CONFIG", {
+        "model": {"learning_rate": 0.1, "num_leaves": 7, "n_estimators": 40},
+        "incremental": {
+            "enabled": True,
+            "refresh_hours": 24,
+            "extra_estimators": 5,
+            "min_new_rows": 50,
+            "max_drift": 100,
+            "max_auc_drop": 1.0,
+        },
+    })
+    now = datetime(2024, 1, 1)
+    train = make_frame("2024-01-01", 2000, 0)
+    valid = make_frame("2024-01-03", 400, 1)
+    _write_splits(split_dir, train, valid)
+
+    train_mod.train_and_eval("AAA", now=now)
+    first = _lineage(model_dir)
+    assert first["mode"] == "full" and first["refresh_reason"] == "no_model"
+    assert first["num_trees"] == 40
+
+    # 신규 행이 min_new_rows 보다 적으면 기존 모델을 유지
+    _write_splits(split_dir, pd.concat([train, make_frame("2024-01-02 10:00", 20, 2)]), valid)
+    train_mod.train_and_eval("AAA", now=now + timedelta(hours=1))
+    assert _lineage(model_dir) == first
+
+    more = pd.concat([train, make_frame("2024-01-02 10:00", 200, 3)], ignore_index=True)
+    _write_splits(split_dir, more, valid)
+    train_mod.train_and_eval("AAA", now=now + timedelta(hours=2))
+    second = _lineage(model_dir)
+    assert second["mode"] == "incremental"
+    assert second["parent_version"] == 1 and second["version"] == 2
+    assert second["new_rows"] == 200
+    assert second["num_trees"] == 45
+    assert second["base_trained_at"] == first["base_trained_at"]
+
+    _write_splits(split_dir, pd.concat([more, make_frame("2024-01-02 14:00", 200, 4)]), valid)
+    train_mod.train_and_eval("AAA", now=now + timedelta(hours=25))
+    third = _lineage(model_dir)
+    assert third["mode"] == "full" and third["refresh_reason"] == "schedule"
+    assert third["version"] == 3 and third["num_trees"] == 40
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_training_reuses_cached_dataset(tmp_path, monkeypatch, make_frame):
+    split_dir = tmp_path / "05_split"
+    model_dir = tmp_path / "06_models"
+    split_dir.mkdir()
+    monkeypatch.setattr(train_mod, "SPLIT_DIR", split_dir)
+    monkeypatch.setattr(train_mod, "MODEL_DIR", model_dir)
+    monkeypatch.setattr(train_mod, "DATASET_CACHE", train_mod.DatasetCache(tmp_path / "cache"))
+    monkeypatch.setattr(train_mod, "CONFIG", {
+        "model": {"learning_rate": 0.1, "num_leaves": 7, "n_estimators": 20},
+    })
+    _write_splits(split_dir, make_frame("2024-01-01", 1000, 0), make_frame("2024-01-02", 300, 1))
+
+    train_mod.train_and_eval("AAA")
+    assert (tmp_path / "cache" / "AAA.train.bin").exists()
+    with open(model_dir / "AAA_metrics.json", "r", encoding="utf-8") as f:
+        first = json.load(f)
+
+    # 데이터가 그대로이면 Parquet 를 다시 읽지 않는다
+    def fail(*args, **kwargs):
+        raise AssertionError("split data read despite cache")
+
+    monkeypatch.setattr(train_mod, "load_split", fail)
+    train_mod.train_and_eval("AAA")
+    with open(model_dir / "AAA_metrics.json", "r", encoding="utf-8") as f:
+        second = json.load(f)
+    assert second["auc"] == pytest.approx(first["auc"])
+    assert second["lineage"]["version"] == 2
+
+    model, meta = train_mod.ModelRegistry(model_dir).load("AAA")
+    assert meta["version"] == 2 and meta["features"] == ["x1", "x2"]
+    valid = make_frame("2024-01-02", 300, 1)
+    assert list(model.feature_names_in_) == ["x1", "x2"]
+    assert model.predict_proba(valid).shape == (300, 2)
+    assert set(model.predict(valid)) <= {0, 1}
@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+import pytest
+
+PIPELINE_DIR = Path(__file__).resolve().parents[1] / "f5_ml_pipeline"
+sys.path.insert(0, str(PIPELINE_DIR))
+
+try:
+    import numpy as np
+    import pandas as pd
+    import lightgbm as lgb
+    deps_available = True
+except Exception:  # pragma: no cover - optional deps missing
+    deps_available = False
+
+
+def _data(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6)).astype(np.float32)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    X[rng.random(X.shape) < 0.05] = 0
+    y = ((np.nan_to_num(X[:, 0]) + 0.5 * np.nan_to_num(X[:, 1]) > 0) ^ (rng.random(n) < 0.2)).astype(int)
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(6)]), y
+
+
+@pytest.mark.skipif(not deps_available, reason="lightgbm not available")
+@pytest.mark.parametrize(
+    "params",
+    [{}, {"zero_as_missing": True}, {"use_missing": False}, {"min_child_samples": 5000}],
+)
+def test_compiled_trees_match_lightgbm_exactly(params, tmp_path):
+    from tree_export import CompiledTrees, export_model
+
+    X, y = _data()
+    model = lgb.LGBMClassifier(n_estimators=60, num_leaves=15, verbose=-1, **params).fit(X, y)
+    compiled = export_model(model)
+    expected = model.predict_proba(X)
+    assert np.array_equal(compiled.predict_proba(X), expected)
+    assert np.array_equal(compiled.predict(X), model.predict(X))
+    # 한 행 (피처 순서 배열) 입력
+    assert np.array_equal(compiled.predict_proba(X.to_numpy()[7]), expected[[7]])
+
+    path = tmp_path / "model.npz"
+    compiled.save(path)
+    loaded = CompiledTrees.load(path)
+    assert list(loaded.feature_names_in_) == list(X.columns)
+    assert np.array_equal(loaded.predict_proba(X), expected)
+
+
+@pytest.mark.skipif(not deps_available, reason="lightgbm not available")
+def test_booster_best_iteration_and_registry_cache(tmp_path):
+    from booster_model import BoosterClassifier
+    from model_registry import COMPILED_FILE, ModelCache, ModelRegistry
+    from tree_export import CompiledTrees, export_model
+
+    X, y = _data(seed=1)
+    booster = lgb.train({"objective": "binary", "num_leaves": 7, "verbose": -1}, lgb.Dataset(X, y), 40)
+    model = BoosterClassifier(booster, best_iteration=25)
+    assert np.array_equal(export_model(model).predict_proba(X), model.predict_proba(X))
+
+    registry = ModelRegistry(tmp_path)
+    registry.publish("KRW-AAA", model, {"features": list(X.columns)})
+    assert (tmp_path / "KRW-AAA" / "v000001" / COMPILED_FILE).is_file()
+    registry.publish("KRW-BBB", {"not": "a booster"}, {})
+    assert not (tmp_path / "KRW-BBB" / "v000001" / COMPILED_FILE).exists()
+
+    cache = ModelCache(tmp_path, compiled=True)
+    compiled, meta = cache.get("KRW-AAA")
+    assert isinstance(compiled, CompiledTrees)
+    assert meta["features"] == list(X.columns)
+    assert np.array_equal(compiled.predict_proba(X), model.predict_proba(X))
+    # 변환 파일이 없는 모델은 pickle 로 읽는다
+    assert cache.get("KRW-BBB")[0] == {"not": "a booster"}
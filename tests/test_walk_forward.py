@@ -0,0 +1,103 @@
+import json
+import pytest
+
+try:
+    import numpy as np  # noqa: F401
+    import pandas as pd
+    import lightgbm  # noqa: F401
+    deps_available = True
+except Exception:  # pragma: no cover - optional deps missing
+    deps_available = False
+
+CONFIG_TEXT = """model:
+  learning_rate: 0.1
+  num_leaves: 7
+  n_estimators: 30
+walk_forward:
+  folds: 3
+  test_ratio: 0.1
+  valid_ratio: 0.1
+  window: {window}
+  warm_start: {warm}
+  extra_estimators: 5
+"""
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+@pytest.mark.parametrize("window", ["expanding", "rolling"])
+def test_walk_forward_bounds_are_time_ordered(window):
+    from split_io import walk_forward_bounds
+
+    folds = walk_forward_bounds(1000, 4, 0.1, 0.05, window)
+    assert len(folds) == 4
+    assert folds[-1]["test"][1] == 1000
+    for k, fold in enumerate(folds):
+        assert fold["train"][1] == fold["valid"][0] and fold["valid"][1] == fold["test"][0]
+        assert fold["test"][1] - fold["test"][0] == 100
+        if k:
+            assert fold["test"][0] == folds[k - 1]["test"][1]
+    lengths = {f["train"][1] - f["train"][0] for f in folds}
+    assert (len(lengths) == 1) == (window == "rolling")
+    assert walk_forward_bounds(100, 10, 0.1, 0.05) == []
+
+
+@pytest.mark.skipif(not deps_available, reason="pandas/lightgbm not available")
+def test_walk_forward_stage_trains_per_fold(tmp_path, monkeypatch, load_stage, make_frame):
+    import split_io
+    import walk_forward
+
+    split_mod = load_stage("split_wf", "05_split.py")
+    stage = load_stage("wf_stage", "07_walk_forward.py")
+    label_dir = tmp_path / "04_label"
+    split_dir = tmp_path / "05_split"
+    label_dir.mkdir()
+    split_dir.mkdir()
+    df = make_frame("2024-01-01", 3000, 0, extra=["prices"])
+    label_path = label_dir / "AAA_label.parquet"
+    df.to_parquet(label_path, index=False)
+    with open(label_dir / "AAA_best_params.json", "w", encoding="utf-8") as f:
+        json.dump({"thresh_pct": 0.003, "loss_pct": 0.003}, f)
+
+    monkeypatch.setattr(split_mod, "SPLIT_DIR", split_dir)
+    split_mod.process_file(label_path, 0.7, 0.2, {"folds": 3, "test_ratio": 0.1, "valid_ratio": 0.1})
+    assert split_io.fold_count(split_dir, "AAA") == 3
+    test = split_io.load_split(split_dir, "AAA", "test", fold=1)
+    pd.testing.assert_frame_equal(test, df.iloc[2400:2700].reset_index(drop=True))
+    # 기본 분할은 그대로
+    assert split_io.read_manifest(split_dir, "AAA")["splits"]["train"] == [0, 2100]
+
+    for name, value in [("SPLIT_DIR", split_dir), ("LABEL_DIR", label_dir), ("CACHE_DIR", tmp_path / "cache"),
+                        ("OUT_DIR", tmp_path / "out"), ("LOG_PATH", tmp_path / "wf.log"),
+                        ("CONFIG_PATH", tmp_path / "train_config.yaml")]:
+        monkeypatch.setattr(stage, name, value)
+
+    def run(window, warm, workers):
+        stage.CONFIG_PATH.write_text(CONFIG_TEXT.format(window=window, warm=warm), encoding="utf-8")
+        stage.main(workers=workers)
+        return pd.read_csv(stage.OUT_DIR / "walk_forward_folds.csv")
+
+    warm = run("expanding", "true", 1)
+    assert warm["fold"].tolist() == [0, 1, 2]
+    assert warm["mode"].tolist() == ["full", "warm", "warm"]
+    assert warm["train_rows"].tolist() == [1800, 2100, 2400]
+    assert (warm["auc"] > 0.6).all()
+    assert (warm["bt_total_entries"] > 0).all()
+    with open(stage.OUT_DIR / "walk_forward_summary.json", encoding="utf-8") as f:
+        summary = json.load(f)["AAA"]
+    assert summary["folds"] == 3
+    assert summary["auc_mean"] == pytest.approx(warm["auc"].mean())
+    assert summary["bt_total_entries"] == warm["bt_total_entries"].sum()
+
+    # 창별 Dataset 은 캐시에서 다시 읽는다
+    assert (tmp_path / "cache" / "AAA.wf2.train.bin").exists()
+    real_load = walk_forward.load_split
+
+    def test_only(split_dir, symbol, part, columns=None, fold=None):
+        assert part == "test", "fold dataset rebuilt despite cache"
+        return real_load(split_dir, symbol, part, columns, fold)
+
+    monkeypatch.setattr(walk_forward, "load_split", test_only)
+    cold = run("expanding", "false", 1)
+    assert cold["mode"].tolist() == ["full"] * 3
+    pooled = run("expanding", "false", 2)
+    pd.testing.assert_frame_equal(pooled, cold)